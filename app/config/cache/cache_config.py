@@ -27,12 +27,33 @@ class CacheConfig:
     redis_db: int = 0
     redis_password: Optional[str] = None
     
+    # Pool de conexões Redis compartilhado pelo processo
+    redis_max_connections: int = 20
+    redis_health_check_interval: int = 30
+    
     # Tamanho máximo do cache em memória (em itens)
     memory_max_size: int = 1000
     
+    # Tamanho máximo aproximado do cache em memória (em bytes, 0 = sem limite)
+    memory_max_bytes: int = 64 * 1024 * 1024
+    
+    # Cache em memória (L1) à frente do Redis: itens e tempo de vida em segundos (0 itens = desativado)
+    l1_max_size: int = 1000
+    l1_ttl: int = 30
+    
+    # Tamanho máximo aproximado do L1 (em bytes, 0 = sem limite)
+    l1_max_bytes: int = 16 * 1024 * 1024
+    
     # Prefixo para chaves de cache
     key_prefix: str = "controlix:"
     
+    # Codificação dos valores no Redis (pickle, msgpack) e compressão (auto, zstd, lz4, zlib, none)
+    codec_serializer: str = "pickle"
+    codec_compression: str = "auto"
+    
+    # Tamanho mínimo (em bytes) para comprimir um valor
+    codec_compress_threshold: int = 1024
+    
     @classmethod
     def from_settings(cls) -> 'CacheConfig':
         """
@@ -61,10 +82,28 @@ class CacheConfig:
                 config.redis_port = redis_settings.get('port', config.redis_port)
                 config.redis_db = redis_settings.get('db', config.redis_db)
                 config.redis_password = redis_settings.get('password', config.redis_password)
+                config.redis_max_connections = redis_settings.get('max_connections',
+                                                                  config.redis_max_connections)
+                config.redis_health_check_interval = redis_settings.get('health_check_interval',
+                                                                        config.redis_health_check_interval)
             
             # Configurações de memória
             memory_settings = cache_settings.get('memory', {})
             config.memory_max_size = memory_settings.get('max_size', config.memory_max_size)
+            config.memory_max_bytes = memory_settings.get('max_bytes', config.memory_max_bytes)
+            
+            # Configurações do L1 à frente do Redis
+            l1_settings = cache_settings.get('l1', {})
+            config.l1_max_size = l1_settings.get('max_size', config.l1_max_size)
+            config.l1_ttl = l1_settings.get('ttl', config.l1_ttl)
+            config.l1_max_bytes = l1_settings.get('max_bytes', config.l1_max_bytes)
+            
+            # Configurações de codificação
+            codec_settings = cache_settings.get('codec', {})
+            config.codec_serializer = codec_settings.get('serializer', config.codec_serializer)
+            config.codec_compression = codec_settings.get('compression', config.codec_compression)
+            config.codec_compress_threshold = codec_settings.get('compress_threshold',
+                                                                 config.codec_compress_threshold)
             
             logger.info(f"Configurações de cache carregadas: tipo={config.cache_type}")
             return config
@@ -88,10 +127,23 @@ class CacheConfig:
                 'host': self.redis_host,
                 'port': self.redis_port,
                 'db': self.redis_db,
-                'password': self.redis_password
+                'password': self.redis_password,
+                'max_connections': self.redis_max_connections,
+                'health_check_interval': self.redis_health_check_interval
             },
             'memory': {
-                'max_size': self.memory_max_size
+                'max_size': self.memory_max_size,
+                'max_bytes': self.memory_max_bytes
+            },
+            'l1': {
+                'max_size': self.l1_max_size,
+                'ttl': self.l1_ttl,
+                'max_bytes': self.l1_max_bytes
+            },
+            'codec': {
+                'serializer': self.codec_serializer,
+                'compression': self.codec_compression,
+                'compress_threshold': self.codec_compress_threshold
             },
             'key_prefix': self.key_prefix
         }
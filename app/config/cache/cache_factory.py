@@ -2,11 +2,19 @@
 Fábrica para criar instâncias de cache.
 """
 
-from typing import Optional, Dict, Any, Protocol
+from typing import Optional, Dict, Any, Iterable, List, Protocol
+import json
+import time
+import uuid
 import logging
-import redis
+import threading
 from pathlib import Path
 from .cache_config import CacheConfig
+from app.core.cache.lru import LRUCache, estimate_size
+from app.core.cache.table_generations import TableGenerations
+from app.core.cache.codec import CodecError, create_codec
+from app.core.cache.namespace import KeySweeper, NamespaceVersion
+from app.core.cache.redis_connections import redis_connections
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +53,39 @@ class Cache(Protocol):
         """
         ...
     
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache em uma única operação.
+        
+        Args:
+            keys: Chaves dos valores.
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas).
+        """
+        ...
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None) -> None:
+        """
+        Armazena vários valores no cache em uma única operação.
+        
+        Args:
+            items: Valores por chave.
+            ttl: Tempo de vida padrão em segundos (opcional).
+            ttls: Tempo de vida por chave, sobrepondo o padrão (opcional).
+        """
+        ...
+    
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Remove vários valores do cache em uma única operação.
+        
+        Args:
+            keys: Chaves dos valores a serem removidos.
+        """
+        ...
+    
     def clear(self) -> None:
         """Remove todos os valores do cache."""
         ...
@@ -64,8 +105,9 @@ class MemoryCache:
             config: Configurações do cache.
         """
         self.config = config
-        self.data: Dict[str, Any] = {}
-        self.ttls: Dict[str, float] = {}
+        # Remoção LRU em O(1), limitada em itens e bytes; expiração indexada por heap
+        self.data = LRUCache(config.memory_max_size, max_bytes=config.memory_max_bytes)
+        self.generations = TableGenerations()
         logger.info("Cache em memória inicializado")
     
     def get(self, key: str) -> Optional[Any]:
@@ -78,17 +120,8 @@ class MemoryCache:
         Returns:
             Any: Valor armazenado ou None se não encontrado.
         """
-        import time
-        
-        if key not in self.data:
-            return None
-        
-        # Verificar TTL
-        if key in self.ttls and time.time() > self.ttls[key]:
-            self.delete(key)
-            return None
-        
-        return self.data[key]
+        # Itens expirados são removidos pelo próprio mecanismo LRU
+        return self.data.get(key)
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -99,21 +132,12 @@ class MemoryCache:
             value: Valor a ser armazenado.
             ttl: Tempo de vida em segundos (opcional).
         """
-        import time
-        
-        # Verificar tamanho máximo
-        if len(self.data) >= self.config.memory_max_size:
-            # Remover item mais antigo
-            oldest_key = next(iter(self.data))
-            self.delete(oldest_key)
-        
-        self.data[key] = value
-        
         # Definir TTL
-        if ttl is not None:
-            self.ttls[key] = time.time() + ttl
-        elif self.config.default_ttl > 0:
-            self.ttls[key] = time.time() + self.config.default_ttl
+        if ttl is None and self.config.default_ttl > 0:
+            ttl = self.config.default_ttl
+        
+        # Os itens menos recentemente usados são removidos se os limites forem excedidos
+        self.data.set(key, value, size=estimate_size(value), ttl=ttl)
     
     def delete(self, key: str) -> None:
         """
@@ -122,13 +146,56 @@ class MemoryCache:
         Args:
             key: Chave do valor a ser removido.
         """
-        self.data.pop(key, None)
-        self.ttls.pop(key, None)
+        self.data.delete(key)
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache com uma única aquisição do lock.
+        
+        Args:
+            keys: Chaves dos valores.
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas).
+        """
+        return self.data.get_many(keys)
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None) -> None:
+        """
+        Armazena vários valores no cache com uma única aquisição do lock.
+        
+        Args:
+            items: Valores por chave.
+            ttl: Tempo de vida padrão em segundos (opcional).
+            ttls: Tempo de vida por chave, sobrepondo o padrão (opcional).
+        """
+        if ttl is None and self.config.default_ttl > 0:
+            ttl = self.config.default_ttl
+        sizes = {key: estimate_size(value) for key, value in items.items()}
+        self.data.set_many(items, sizes, ttl=ttl, ttls=ttls)
+    
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Remove vários valores do cache com uma única aquisição do lock.
+        
+        Args:
+            keys: Chaves dos valores a serem removidos.
+        """
+        self.data.delete_many(keys)
     
     def clear(self) -> None:
         """Remove todos os valores do cache."""
         self.data.clear()
-        self.ttls.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cache.
+        
+        Returns:
+            Dict[str, Any]: Tamanho, hits, misses e evictions.
+        """
+        return self.data.get_stats()
     
     def close(self) -> None:
         """Fecha a conexão com o cache (não aplicável para cache em memória)."""
@@ -145,15 +212,28 @@ class RedisCache:
             config: Configurações do cache.
         """
         self.config = config
-        self.client = redis.Redis(
-            host=config.redis_host,
-            port=config.redis_port,
-            db=config.redis_db,
-            password=config.redis_password,
-            decode_responses=True
-        )
+        # Cliente sobre o pool compartilhado pelo processo (valores binários do codificador)
+        self.client = redis_connections.get_client_for_config(config)
+        self.codec = create_codec(config)
+        # Gerações por tabela compartilhadas entre processos
+        self.generations = TableGenerations(lambda: self.client, prefix=f"{config.key_prefix}gen:")
+        # Versão do namespace embutida nas chaves: clear() apenas a incrementa
+        self.namespace = NamespaceVersion(lambda: self.client, config.key_prefix)
+        self.sweeper = KeySweeper(lambda: self.client, self.namespace)
         logger.info("Cache Redis inicializado")
     
+    def _full_key(self, key: str) -> str:
+        """
+        Obtém a chave completa no Redis, com prefixo e versão do namespace.
+        
+        Args:
+            key: Chave do valor.
+            
+        Returns:
+            str: Chave completa.
+        """
+        return f"{self.namespace.key_prefix()}{key}"
+    
     def get(self, key: str) -> Optional[Any]:
         """
         Obtém um valor do cache.
@@ -164,12 +244,14 @@ class RedisCache:
         Returns:
             Any: Valor armazenado ou None se não encontrado.
         """
-        import json
-        
         try:
-            key = f"{self.config.key_prefix}{key}"
+            key = self._full_key(key)
             value = self.client.get(key)
-            return json.loads(value) if value else None
+            return self.codec.decode(value) if value is not None else None
+        except CodecError as e:
+            # Formato antigo ou de outra configuração: tratado como ausente
+            logger.debug(f"Valor de cache ignorado: {e}")
+            return None
         except Exception as e:
             logger.error(f"Erro ao obter valor do Redis: {e}")
             return None
@@ -183,11 +265,9 @@ class RedisCache:
             value: Valor a ser armazenado.
             ttl: Tempo de vida em segundos (opcional).
         """
-        import json
-        
         try:
-            key = f"{self.config.key_prefix}{key}"
-            value = json.dumps(value)
+            key = self._full_key(key)
+            value = self.codec.encode(value)
             
             if ttl is not None:
                 self.client.setex(key, ttl, value)
@@ -208,29 +288,394 @@ class RedisCache:
             key: Chave do valor a ser removido.
         """
         try:
-            key = f"{self.config.key_prefix}{key}"
+            key = self._full_key(key)
             self.client.delete(key)
         except Exception as e:
             logger.error(f"Erro ao remover valor do Redis: {e}")
     
-    def clear(self) -> None:
-        """Remove todos os valores do cache com o prefixo configurado."""
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache com um único MGET (uma ida e volta ao Redis).
+        
+        Args:
+            keys: Chaves dos valores.
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas).
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
         try:
-            pattern = f"{self.config.key_prefix}*"
-            keys = self.client.keys(pattern)
-            if keys:
-                self.client.delete(*keys)
+            prefix = self.namespace.key_prefix()
+            values = self.client.mget([f"{prefix}{key}" for key in keys])
         except Exception as e:
-            logger.error(f"Erro ao limpar cache Redis: {e}")
+            logger.error(f"Erro ao obter valores do Redis: {e}")
+            return {}
+        
+        found = {}
+        for key, value in zip(keys, values):
+            if value is None:
+                continue
+            try:
+                found[key] = self.codec.decode(value)
+            except CodecError as e:
+                logger.debug(f"Valor de cache ignorado: {e}")
+        return found
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None) -> None:
+        """
+        Armazena vários valores no cache com um pipeline de SET/SETEX.
+        
+        Args:
+            items: Valores por chave.
+            ttl: Tempo de vida padrão em segundos (opcional).
+            ttls: Tempo de vida por chave, sobrepondo o padrão (opcional).
+        """
+        if not items:
+            return
+        ttls = ttls or {}
+        default_ttl = ttl if ttl is not None else (self.config.default_ttl or None)
+        try:
+            prefix = self.namespace.key_prefix()
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                key_ttl = ttls.get(key, default_ttl)
+                full_key = f"{prefix}{key}"
+                if key_ttl:
+                    pipe.setex(full_key, key_ttl, self.codec.encode(value))
+                else:
+                    pipe.set(full_key, self.codec.encode(value))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Erro ao armazenar valores no Redis: {e}")
+    
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Remove vários valores do cache com um único UNLINK (liberação assíncrona no servidor).
+        
+        Args:
+            keys: Chaves dos valores a serem removidos.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            prefix = self.namespace.key_prefix()
+            keys = [f"{prefix}{key}" for key in keys]
+            self.client.unlink(*keys)
+        except Exception as e:
+            logger.error(f"Erro ao remover valores do Redis: {e}")
+    
+    def clear(self) -> None:
+        """
+        Remove todos os valores do cache com o prefixo configurado.
+        
+        Incrementa a versão do namespace (O(1)); as chaves antigas expiram pelo TTL
+        ou são removidas em segundo plano com SCAN + UNLINK.
+        """
+        if self.namespace.bump():
+            self.sweeper.schedule()
     
     def close(self) -> None:
         """Fecha a conexão com o Redis."""
         try:
+            self.sweeper.stop()
             self.client.close()
             logger.info("Conexão com Redis fechada")
         except Exception as e:
             logger.error(f"Erro ao fechar conexão com Redis: {e}")
 
+class TieredRedisCache(RedisCache):
+    """
+    Cache Redis (L2) precedido por um LRU em memória do processo (L1).
+    
+    Leituras repetidas são atendidas pelo L1 sem ida e volta ao Redis. Cada escrita,
+    remoção ou limpeza é publicada em um canal pub/sub, e todas as instâncias
+    (inclusive de outros processos) removem as entradas afetadas do seu L1.
+    Enquanto a assinatura do canal não está ativa, o L1 é ignorado, pois
+    invalidações poderiam ser perdidas; o TTL curto do L1 limita o efeito de uma
+    mensagem perdida. As gerações de tabelas seguem o mesmo esquema: ficam em uma
+    cópia local pelo TTL do L1 e os incrementos são publicados no mesmo canal.
+    """
+    
+    # Espera entre tentativas de reassinar o canal de invalidação (segundos)
+    RESUBSCRIBE_DELAY = 1.0
+    
+    def __init__(self, config: CacheConfig):
+        """
+        Inicializa o cache em dois níveis.
+        
+        Args:
+            config: Configurações do cache.
+        """
+        super().__init__(config)
+        self.l1 = LRUCache(config.l1_max_size, max_bytes=config.l1_max_bytes)
+        self.l1_ttl = config.l1_ttl
+        # Sem a cópia local, cada consulta faria um MGET das gerações antes do L1
+        self.generations = TableGenerations(lambda: self.client, prefix=f"{config.key_prefix}gen:",
+                                            local_ttl=self.l1_ttl,
+                                            local_valid=lambda: self._subscribed,
+                                            on_bump=self._publish_generations)
+        self.channel = f"{config.key_prefix}invalidate"
+        self._origin = uuid.uuid4().hex
+        # Incrementado a cada invalidação: leituras do L2 que cruzaram uma
+        # invalidação não são copiadas para o L1
+        self._epoch = 0
+        self._l1_lock = threading.Lock()
+        self._subscribed = False
+        self._listener: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'invalidations_received': 0}
+    
+    def _ensure_listener(self) -> None:
+        """Inicia a thread de assinatura do canal de invalidação no primeiro uso."""
+        if self._listener is None:
+            with self._l1_lock:
+                if self._listener is None and not self._stop_event.is_set():
+                    self._listener = threading.Thread(target=self._listen, daemon=True,
+                                                      name="cache-invalidation")
+                    self._listener.start()
+    
+    def _listen(self) -> None:
+        """Assina o canal de invalidação, reassinando após falhas de conexão."""
+        failures = 0
+        while not self._stop_event.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Invalidações podem ter sido perdidas enquanto não havia assinatura
+                self._invalidate_local(None)
+                self._subscribed = True
+                failures = 0
+                logger.debug(f"Canal de invalidação de cache assinado: {self.channel}")
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._handle_message(message['data'])
+            except Exception as e:
+                # Apenas a primeira falha seguida é registrada como erro
+                log = logger.error if failures == 0 else logger.debug
+                log(f"Erro na assinatura do canal de invalidação de cache: {e}")
+                failures += 1
+            finally:
+                self._subscribed = False
+                self._invalidate_local(None)
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stop_event.wait(self.RESUBSCRIBE_DELAY)
+    
+    def _handle_message(self, data: bytes) -> None:
+        """Aplica uma mensagem de invalidação publicada por outra instância."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Mensagem de invalidação de cache inválida: {e}")
+            return
+        if message.get('o') == self._origin:
+            return
+        self.stats['invalidations_received'] += 1
+        if 'g' in message:
+            self.generations.forget(message['g'])
+            return
+        self._invalidate_local(None if message.get('c') else message.get('k', []))
+    
+    def _invalidate_local(self, keys: Optional[List[str]]) -> None:
+        """
+        Remove entradas do L1.
+        
+        Args:
+            keys: Chaves a remover (None = todas).
+        """
+        with self._l1_lock:
+            self._epoch += 1
+            if keys is None:
+                self.l1.clear()
+            else:
+                self.l1.delete_many(keys)
+        if keys is None:
+            self.generations.forget()
+    
+    def _publish(self, keys: Optional[List[str]]) -> None:
+        """
+        Publica uma invalidação para as demais instâncias.
+        
+        Args:
+            keys: Chaves invalidadas (None = limpeza completa).
+        """
+        message = {'o': self._origin, 'c': 1} if keys is None else {'o': self._origin, 'k': keys}
+        self._send(message)
+    
+    def _publish_generations(self, tags: List[str]) -> None:
+        """
+        Publica gerações incrementadas para que as demais instâncias descartem sua cópia local.
+        
+        Args:
+            tags: Etiquetas das tabelas alteradas.
+        """
+        self._send({'o': self._origin, 'g': tags})
+    
+    def _send(self, message: Dict[str, Any]) -> None:
+        """Publica uma mensagem no canal de invalidação."""
+        try:
+            self.client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Erro ao publicar invalidação de cache: {e}")
+    
+    def _l1_ttl(self, ttl: Optional[int]) -> int:
+        """Tempo de vida no L1: o menor entre o TTL do L1 e o do valor."""
+        return min(self.l1_ttl, ttl) if ttl else self.l1_ttl
+    
+    def _fill_l1(self, items: Dict[str, Any], epoch: int) -> None:
+        """Copia para o L1 valores lidos do L2, se nenhuma invalidação ocorreu desde a leitura."""
+        with self._l1_lock:
+            if self._subscribed and self._epoch == epoch:
+                self.l1.set_many(items, ttl=self.l1_ttl)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Obtém um valor do L1 ou, na ausência, do Redis.
+        
+        Args:
+            key: Chave do valor.
+            
+        Returns:
+            Any: Valor armazenado ou None se não encontrado.
+        """
+        self._ensure_listener()
+        if self._subscribed:
+            value = self.l1.get(key)
+            if value is not None:
+                self.stats['l1_hits'] += 1
+                return value
+        
+        epoch = self._epoch
+        value = super().get(key)
+        if value is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['l2_hits'] += 1
+        self._fill_l1({key: value}, epoch)
+        return value
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores: os ausentes do L1 são lidos do Redis em um único MGET.
+        
+        Args:
+            keys: Chaves dos valores.
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas).
+        """
+        self._ensure_listener()
+        keys = list(keys)
+        found = self.l1.get_many(keys) if self._subscribed else {}
+        self.stats['l1_hits'] += len(found)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            epoch = self._epoch
+            fetched = super().get_many(missing)
+            self.stats['l2_hits'] += len(fetched)
+            self.stats['misses'] += len(missing) - len(fetched)
+            self._fill_l1(fetched, epoch)
+            found.update(fetched)
+        return found
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Armazena um valor no Redis e no L1, invalidando o L1 das demais instâncias.
+        
+        Args:
+            key: Chave para o valor.
+            value: Valor a ser armazenado.
+            ttl: Tempo de vida em segundos (opcional).
+        """
+        self._ensure_listener()
+        super().set(key, value, ttl)
+        with self._l1_lock:
+            self._epoch += 1
+            if self._subscribed:
+                self.l1.set(key, value, ttl=self._l1_ttl(ttl))
+        self._publish([key])
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None) -> None:
+        """
+        Armazena vários valores no Redis e no L1, invalidando o L1 das demais instâncias.
+        
+        Args:
+            items: Valores por chave.
+            ttl: Tempo de vida padrão em segundos (opcional).
+            ttls: Tempo de vida por chave, sobrepondo o padrão (opcional).
+        """
+        if not items:
+            return
+        self._ensure_listener()
+        super().set_many(items, ttl, ttls)
+        ttls = ttls or {}
+        with self._l1_lock:
+            self._epoch += 1
+            if self._subscribed:
+                self.l1.set_many(items, ttl=self._l1_ttl(ttl),
+                                 ttls={key: self._l1_ttl(ttls[key]) for key in items if key in ttls})
+        self._publish(list(items))
+    
+    def delete(self, key: str) -> None:
+        """
+        Remove um valor do Redis e do L1 de todas as instâncias.
+        
+        Args:
+            key: Chave do valor a ser removido.
+        """
+        super().delete(key)
+        self._invalidate_local([key])
+        self._publish([key])
+    
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Remove vários valores do Redis e do L1 de todas as instâncias.
+        
+        Args:
+            keys: Chaves dos valores a serem removidos.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        super().delete_many(keys)
+        self._invalidate_local(keys)
+        self._publish(keys)
+    
+    def clear(self) -> None:
+        """Remove todos os valores do Redis e do L1 de todas as instâncias."""
+        super().clear()
+        self._invalidate_local(None)
+        self._publish(None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas dos dois níveis.
+        
+        Returns:
+            Dict[str, Any]: Acertos no L1 e no Redis, ausências, invalidações recebidas
+            e estatísticas do L1.
+        """
+        return {**self.stats, 'subscribed': self._subscribed, 'l1': self.l1.get_stats()}
+    
+    def close(self) -> None:
+        """Encerra a assinatura do canal e fecha a conexão com o Redis."""
+        self._stop_event.set()
+        listener = self._listener
+        if listener is not None and listener is not threading.current_thread():
+            listener.join(timeout=2)
+        self.l1.clear()
+        super().close()
+
 class CacheFactory:
     """Fábrica para criar instâncias de cache."""
     
@@ -263,7 +708,7 @@ class CacheFactory:
         # Criar instância apropriada
         if config.cache_type == "redis":
             try:
-                return RedisCache(config)
+                return CacheFactory._create_redis(config)
             except Exception as e:
                 logger.error(f"Erro ao criar cache Redis: {e}")
                 logger.info("Usando cache em memória como fallback")
@@ -272,6 +717,21 @@ class CacheFactory:
             logger.info("Cache em memória inicializado")
             return MemoryCache(config)
     
+    @staticmethod
+    def _create_redis(config: CacheConfig) -> Cache:
+        """
+        Cria o cache Redis, precedido pelo L1 em memória se configurado.
+        
+        Args:
+            config: Configurações do cache.
+            
+        Returns:
+            Cache: TieredRedisCache ou RedisCache.
+        """
+        if config.l1_max_size > 0:
+            return TieredRedisCache(config)
+        return RedisCache(config)
+    
     @staticmethod
     def create_from_config(config: CacheConfig) -> Cache:
         """
@@ -285,7 +745,7 @@ class CacheFactory:
         """
         if config.cache_type == "redis":
             try:
-                return RedisCache(config)
+                return CacheFactory._create_redis(config)
             except Exception as e:
                 logger.error(f"Erro ao criar cache Redis: {e}")
                 logger.info("Usando cache em memória como fallback")
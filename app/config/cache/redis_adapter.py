@@ -2,11 +2,12 @@
 Adaptador Redis para o sistema de cache.
 """
 
-import redis
 import logging
-import json
 from typing import Any, Dict, Optional, Union
 from app.config.cache.cache_config import CacheConfig
+from app.core.cache.codec import CodecError, create_codec
+from app.core.cache.namespace import KeySweeper, NamespaceVersion
+from app.core.cache.redis_connections import redis_connections
 
 logger = logging.getLogger(__name__)
 
@@ -22,29 +23,36 @@ class RedisAdapter:
         """
         self.config = config or CacheConfig()
         self._client = None
+        self.codec = create_codec(self.config)
         self._connect()
+        # Versão do namespace embutida nas chaves: clear() apenas a incrementa
+        self.namespace = NamespaceVersion(lambda: self._client, self.config.key_prefix)
+        self.sweeper = KeySweeper(lambda: self._client, self.namespace)
     
     def _connect(self) -> None:
         """Estabelece conexão com o Redis."""
         try:
             if not self._client:
-                redis_config = self.config.get_redis_config()
-                self._client = redis.Redis(
-                    host=redis_config['host'],
-                    port=redis_config['port'],
-                    db=redis_config['db'],
-                    password=redis_config['password'],
-                    ssl=redis_config['ssl'],
-                    socket_timeout=redis_config['socket_timeout'],
-                    retry_on_timeout=redis_config['retry_on_timeout'],
-                    max_connections=redis_config['max_connections']
-                )
+                # Cliente sobre o pool compartilhado pelo processo
+                self._client = redis_connections.get_client_for_config(self.config)
                 logger.info("Conexão com Redis estabelecida")
         except Exception as e:
             logger.error(f"Erro ao conectar ao Redis: {e}")
             raise
     
-    def _serialize(self, value: Any) -> str:
+    def _full_key(self, key: str) -> str:
+        """
+        Obtém a chave completa no Redis, com prefixo e versão do namespace.
+        
+        Args:
+            key: Chave do valor
+            
+        Returns:
+            str: Chave completa
+        """
+        return f"{self.namespace.key_prefix()}{key}"
+    
+    def _serialize(self, value: Any) -> bytes:
         """
         Serializa um valor para armazenamento.
         
@@ -52,10 +60,10 @@ class RedisAdapter:
             value: Valor a ser serializado
             
         Returns:
-            str: Valor serializado
+            bytes: Valor serializado
         """
         try:
-            return json.dumps(value)
+            return self.codec.encode(value)
         except Exception as e:
             logger.error(f"Erro ao serializar valor: {e}")
             raise
@@ -73,7 +81,11 @@ class RedisAdapter:
         if value is None:
             return None
         try:
-            return json.loads(value.decode('utf-8'))
+            return self.codec.decode(value)
+        except CodecError as e:
+            # Formato antigo ou de outra configuração: tratado como ausente
+            logger.debug(f"Valor de cache ignorado: {e}")
+            return None
         except Exception as e:
             logger.error(f"Erro ao deserializar valor: {e}")
             raise
@@ -89,7 +101,7 @@ class RedisAdapter:
             Any: Valor armazenado ou None se não encontrado
         """
         try:
-            value = self._client.get(key)
+            value = self._client.get(self._full_key(key))
             return self._deserialize(value)
         except Exception as e:
             logger.error(f"Erro ao obter valor do Redis: {e}")
@@ -111,7 +123,7 @@ class RedisAdapter:
             serialized = self._serialize(value)
             if ttl is None:
                 ttl = self.config.get_ttl()
-            return self._client.setex(key, ttl, serialized)
+            return self._client.setex(self._full_key(key), ttl, serialized)
         except Exception as e:
             logger.error(f"Erro ao armazenar valor no Redis: {e}")
             return False
@@ -127,23 +139,99 @@ class RedisAdapter:
             bool: True se removido com sucesso
         """
         try:
-            return bool(self._client.delete(key))
+            return bool(self._client.delete(self._full_key(key)))
         except Exception as e:
             logger.error(f"Erro ao remover valor do Redis: {e}")
             return False
     
+    def get_many(self, keys: list) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache com um único MGET.
+        
+        Args:
+            keys: Chaves dos valores
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas)
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            prefix = self.namespace.key_prefix()
+            values = self._client.mget([f"{prefix}{key}" for key in keys])
+        except Exception as e:
+            logger.error(f"Erro ao obter valores do Redis: {e}")
+            return {}
+        found = {}
+        for key, value in zip(keys, values):
+            value = self._deserialize(value)
+            if value is not None:
+                found[key] = value
+        return found
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Armazena vários valores no cache com um pipeline de SETEX.
+        
+        Args:
+            items: Valores por chave
+            ttl: Tempo de vida padrão em segundos (opcional)
+            ttls: Tempo de vida por chave, sobrepondo o padrão (opcional)
+            
+        Returns:
+            bool: True se armazenados com sucesso
+        """
+        if not items:
+            return True
+        try:
+            if ttl is None:
+                ttl = self.config.get_ttl()
+            ttls = ttls or {}
+            prefix = self.namespace.key_prefix()
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(f"{prefix}{key}", ttls.get(key, ttl), self._serialize(value))
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"Erro ao armazenar valores no Redis: {e}")
+            return False
+    
+    def delete_many(self, keys: list) -> int:
+        """
+        Remove vários valores do cache com um único UNLINK.
+        
+        Args:
+            keys: Chaves dos valores
+            
+        Returns:
+            int: Número de chaves removidas
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            prefix = self.namespace.key_prefix()
+            return int(self._client.unlink(*[f"{prefix}{key}" for key in keys]))
+        except Exception as e:
+            logger.error(f"Erro ao remover valores do Redis: {e}")
+            return 0
+    
     def clear(self) -> bool:
         """
         Limpa todo o cache.
         
+        Incrementa a versão do namespace (O(1)); as chaves antigas expiram pelo TTL
+        ou são removidas em segundo plano com SCAN + UNLINK.
+        
         Returns:
             bool: True se limpo com sucesso
         """
-        try:
-            return self._client.flushdb()
-        except Exception as e:
-            logger.error(f"Erro ao limpar Redis: {e}")
+        if not self.namespace.bump():
             return False
+        self.sweeper.schedule()
+        return True
     
     def exists(self, key: str) -> bool:
         """
@@ -156,7 +244,7 @@ class RedisAdapter:
             bool: True se a chave existe
         """
         try:
-            return bool(self._client.exists(key))
+            return bool(self._client.exists(self._full_key(key)))
         except Exception as e:
             logger.error(f"Erro ao verificar existência no Redis: {e}")
             return False
@@ -172,7 +260,7 @@ class RedisAdapter:
             int: Tempo restante em segundos ou -1 se não existe
         """
         try:
-            return self._client.ttl(key)
+            return self._client.ttl(self._full_key(key))
         except Exception as e:
             logger.error(f"Erro ao obter TTL do Redis: {e}")
             return -1
@@ -181,14 +269,18 @@ class RedisAdapter:
         """
         Lista chaves que correspondem ao padrão.
         
+        Usa SCAN de forma incremental, sem bloquear o servidor como KEYS.
+        
         Args:
             pattern: Padrão de busca (default: '*')
             
         Returns:
-            list: Lista de chaves encontradas
+            list: Lista de chaves encontradas (sem prefixo)
         """
         try:
-            return [key.decode('utf-8') for key in self._client.keys(pattern)]
+            prefix = self.namespace.key_prefix()
+            return [key.decode('utf-8')[len(prefix):]
+                    for key in self._client.scan_iter(match=f"{prefix}{pattern}", count=500)]
         except Exception as e:
             logger.error(f"Erro ao listar chaves do Redis: {e}")
             return []
@@ -217,6 +309,7 @@ class RedisAdapter:
         """Fecha a conexão com o Redis."""
         try:
             if self._client:
+                self.sweeper.stop()
                 self._client.close()
                 logger.info("Conexão com Redis fechada")
         except Exception as e:
@@ -1,6 +1,5 @@
 import logging
-from typing import Any
-from datetime import datetime, timedelta
+from typing import Any, List, Tuple
 from app.core.cache.cache_manager import cache_manager
 from app.config.settings import dynamic_settings
 
@@ -9,71 +8,67 @@ logger = logging.getLogger(__name__)
 
 class SettingsCache:
     def __init__(self):
-        self.reload_interval = timedelta(minutes=5)
-        self.last_reload = None
         self.cache_prefix = "settings:"
-        
+        self.section = ['window']
+        # Atualizado apenas quando configurações da seção mudam
+        dynamic_settings.subscribe(self.section, self._on_settings_changed)
+
     def get_setting(self, key: str) -> Any:
-        """Obtém configuração do cache"""
-        self._check_reload()
+        """Obtém configuração do cache (carregando do índice de configurações na falta)"""
         cache_key = f"{self.cache_prefix}{key}"
-        return cache_manager.get(cache_key)
-        
-    def _check_reload(self):
-        """Verifica se precisa recarregar configurações"""
-        now = datetime.now()
-        if not self.last_reload or (now - self.last_reload) > self.reload_interval:
-            self._reload_settings()
-            
-    def _reload_settings(self):
-        """Recarrega configurações com tratamento robusto"""
+        value = cache_manager.get(cache_key)
+        if value is None:
+            value = self._load(key)
+        return value
+
+    def _load(self, key: str) -> Any:
+        """Lê uma configuração do índice de DynamicSettings e a armazena no cache"""
         try:
             if not dynamic_settings:
                 raise ValueError("DynamicSettings não inicializado")
-                
-            settings = dynamic_settings._settings.get('window', {})
-            
-            if not isinstance(settings, dict):
-                raise TypeError("Configurações devem ser um dicionário")
-                
-            # Atualiza o timestamp da última recarga
-            self.last_reload = datetime.now()
-            
-            # Armazena cada configuração individualmente no cache
-            for key, value in settings.items():
-                cache_key = f"{self.cache_prefix}{key}"
-                cache_manager.set(
-                    cache_key, 
-                    value, 
-                    timeout=int(self.reload_interval.total_seconds())
-                )
-                
-            logger.debug("Configurações recarregadas no cache")
-            
+
+            value = dynamic_settings.get_setting(self.section + [key])
+            if value is not None:
+                # Fora do warm start: o arquivo de configurações é a fonte
+                cache_manager.set(f"{self.cache_prefix}{key}", value, persist=False)
+            return value
+
         except Exception as e:
-            logger.critical("Falha crítica no recarregamento de configurações", exc_info=True)
-            raise RuntimeError("Não foi possível recarregar configurações") from e
-            
+            logger.critical("Falha crítica no carregamento de configurações", exc_info=True)
+            raise RuntimeError("Não foi possível carregar configurações") from e
+
+    def _on_settings_changed(self, changed_paths: List[Tuple[str, ...]]):
+        """Descarta do cache apenas as configurações alteradas"""
+        depth = len(self.section)
+        keys = set()
+        for path in changed_paths:
+            if len(path) <= depth:
+                # A seção inteira foi substituída
+                self.invalidate_cache()
+                return
+            keys.add(path[depth])
+
+        for key in keys:
+            cache_manager.delete(f"{self.cache_prefix}{key}")
+        logger.debug(f"Configurações atualizadas no cache: {sorted(keys)}")
+
     def invalidate_cache(self):
         """Invalida o cache de configurações"""
         try:
-            # Força recarga no próximo acesso
-            self.last_reload = None
-            
             # Remove todas as entradas com o prefixo de configurações
             keys_to_delete = [
                 key for key in cache_manager.cache.keys()
                 if key.startswith(self.cache_prefix)
             ]
-            
+
             for key in keys_to_delete:
                 cache_manager.delete(key)
-                
+
             logger.debug("Cache de configurações invalidado")
-            
+
         except Exception as e:
             logger.error(f"Erro ao invalidar cache: {e}", exc_info=True)
             raise
 
 # Instância global
-settings_cache = SettingsCache() 
\ No newline at end of file
+settings_cache = SettingsCache()
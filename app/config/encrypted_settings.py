@@ -3,12 +3,13 @@ import customtkinter as ctk
 from cryptography.fernet import Fernet
 from pathlib import Path
 from .secure_storage import SecureStorage
-from typing import Optional
+from typing import Optional, Dict
 import base64
 from app.config.settings import SECURITY_SETTINGS, SECURITY_DIR
 import keyring
 import os
 import time
+import threading
 
 # Logger específico para configurações criptografadas
 logger = logging.getLogger(__name__)
@@ -332,6 +333,33 @@ class EncryptedSettings:
                 # Se tudo falhar, apenas loga o erro
                 logger.error(f"{title}: {message}")
 
+# Instâncias por diretório, compartilhadas pelo processo
+_settings_instances: Dict[Path, 'EncryptedSettings'] = {}
+_settings_lock = threading.Lock()
+
+def get_encrypted_settings(config_dir: Path) -> EncryptedSettings:
+    """
+    Obtém a instância de EncryptedSettings de um diretório, criando-a no primeiro uso.
+    
+    A instância é memoizada por processo, de modo que os arquivos e o keyring
+    são processados e descriptografados uma única vez por diretório.
+    
+    Args:
+        config_dir: Diretório com crypto.key e .env.encrypted
+        
+    Returns:
+        EncryptedSettings: Instância compartilhada
+    """
+    config_dir = Path(config_dir)
+    instance = _settings_instances.get(config_dir)
+    if instance is None:
+        with _settings_lock:
+            instance = _settings_instances.get(config_dir)
+            if instance is None:
+                instance = EncryptedSettings(config_dir)
+                _settings_instances[config_dir] = instance
+    return instance
+
 def load_settings():
     """Carrega as configurações e retorna as configurações ou raise exception"""
     try:
@@ -5,11 +5,15 @@ import os
 import logging.config
 from app.core.scripts.icon_mapper import IconMapper
 import json
+import atexit
+import threading
 from datetime import datetime
 import customtkinter as ctk
-from typing import Callable, Any, Optional, Dict
+from typing import Callable, Any, Optional, Dict, List, Tuple
 import appdirs
 import sys
+from types import MappingProxyType
+from app.ui.dispatcher import tk_dispatcher
 
 # Informações da aplicação
 APP_NAME = "Controlix"
@@ -739,14 +743,127 @@ else:
     logger.debug(f"Diretório de ícones encontrado: {ICONS_DIR}")
     logger.debug(f"Ícones disponíveis: {[f.name for f in ICONS_DIR.glob('*')]}")
 
+# Intervalo sem alterações (segundos) após o qual as configurações são gravadas
+SETTINGS_FLUSH_DELAY = 1.0
+
+SettingsPath = Tuple[str, ...]
+
+_MISSING = object()
+
+def _flatten(value: Any, prefix: SettingsPath, target: Dict[SettingsPath, Any]) -> Any:
+    """
+    Indexa um valor e, se for dicionário, todos os seus descendentes pelo caminho.
+    
+    Dicionários são indexados como visões somente leitura de uma cópia, para que
+    índices já retornados não mudem com alterações posteriores da árvore.
+    
+    Returns:
+        Any: Valor indexado (a visão somente leitura, no caso de dicionários).
+    """
+    if isinstance(value, dict):
+        value = MappingProxyType({key: _flatten(child, prefix + (key,), target)
+                                  for key, child in value.items()})
+    target[prefix] = value
+    return value
+
+def _thaw(value: Any) -> Any:
+    """
+    Copia um valor a gravar, convertendo visões somente leitura do índice em dicionários.
+    
+    A árvore de configurações não compartilha dicionários nem listas com o chamador,
+    que poderia alterá-los depois sem passar por set_setting.
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _thaw(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [_thaw(child) for child in value]
+    return value
+
+def _paths_overlap(first: SettingsPath, second: SettingsPath) -> bool:
+    """Verifica se um caminho é prefixo do outro (alterar um afeta o outro)."""
+    length = min(len(first), len(second))
+    return first[:length] == second[:length]
+
 class DynamicSettings:
-    """Gerencia configurações dinâmicas do sistema."""
+    """
+    Gerencia configurações dinâmicas do sistema.
+
+    As alterações são aplicadas em memória e gravadas em lote (write-behind): o
+    arquivo é regravado de forma atômica depois de SETTINGS_FLUSH_DELAY segundos
+    sem novas alterações, em flush()/save() ou no encerramento. Os observadores
+    são notificados uma vez por gravação, na thread da interface: gravações feitas
+    em outras threads (ex.: pelo temporizador) enviam a notificação pelo despachante.
+
+    As leituras usam um índice imutável (caminho em tupla → valor), substituído
+    atomicamente a cada alteração: get_setting é uma única consulta de dicionário.
+    """
     
-    def __init__(self):
-        """Inicializa as configurações dinâmicas."""
+    def __init__(self, flush_delay: float = SETTINGS_FLUSH_DELAY, dispatcher=None):
+        """
+        Inicializa as configurações dinâmicas.
+        
+        Args:
+            flush_delay: Segundos sem alterações antes da gravação (0 = gravar a cada alteração)
+            dispatcher: Despachante das notificações para a thread da interface
+                (padrão: tk_dispatcher)
+        """
         self.config_file = CONFIG_FILE
+        self.flush_delay = flush_delay
+        self.dispatcher = dispatcher if dispatcher is not None else tk_dispatcher
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
         self._settings = self._load_settings()
         self._observers = []
+        self._subscriptions: List[Tuple[SettingsPath, Callable[[List[SettingsPath]], None]]] = []
+        self._pending: Dict[SettingsPath, None] = {}
+        self._timer: Optional[threading.Timer] = None
+    
+    @property
+    def _settings(self) -> dict:
+        """Árvore de configurações (as alterações devem passar por set_setting)."""
+        return self._data
+    
+    @_settings.setter
+    def _settings(self, value: dict) -> None:
+        """Substitui a árvore de configurações e reconstrói o índice de leitura."""
+        index: Dict[SettingsPath, Any] = {}
+        _flatten(value, (), index)
+        with self._lock:
+            self._data = value
+            self._index = MappingProxyType(index)
+    
+    def snapshot(self):
+        """
+        Retorna o índice atual das configurações.
+        
+        Returns:
+            Mapping[Tuple[str, ...], Any]: Mapeamento somente leitura do caminho ao valor,
+            que não muda após retornado (alterações geram um novo índice). Ramos são
+            visões somente leitura (MappingProxyType); folhas como listas são
+            compartilhadas e não devem ser alteradas in-place.
+        """
+        return self._index
+    
+    def _reindex(self, path: SettingsPath, value: Any = _MISSING) -> None:
+        """
+        Recalcula no índice o ramo alterado e seus ancestrais e substitui o índice; requer o lock.
+        
+        Cada alteração copia o índice inteiro (O(n) no número de caminhos), o que é
+        aceitável para o tamanho do arquivo de configurações; em troca, as leituras
+        não usam lock e índices já retornados nunca mudam.
+        """
+        size = len(path)
+        index = {key: item for key, item in self._index.items() if key[:size] != path}
+        if value is not _MISSING:
+            _flatten(value, path, index)
+        # Ancestrais (criados ou alterados) recebem novas visões, do mais profundo à raiz
+        nodes = [self._data]
+        for key in path[:-1]:
+            nodes.append(nodes[-1][key])
+        for depth in range(size - 1, -1, -1):
+            prefix = path[:depth]
+            index[prefix] = MappingProxyType({key: index[prefix + (key,)] for key in nodes[depth]})
+        self._index = MappingProxyType(index)
     
     def _load_settings(self) -> dict:
         """
@@ -766,14 +883,62 @@ class DynamicSettings:
             logger.error(f"Erro ao carregar configurações: {e}")
             return {}
     
+    def _mark_changed(self, path: SettingsPath) -> None:
+        """Registra um caminho alterado e reagenda a gravação; requer o lock."""
+        self._pending[path] = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.flush_delay > 0:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _write(self, data: str) -> None:
+        """Grava o conteúdo em um arquivo temporário e o renomeia sobre o arquivo de configurações."""
+        temp_file = self.config_file.with_suffix(self.config_file.suffix + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.config_file)
+    
+    def flush(self, force: bool = False) -> bool:
+        """
+        Grava as alterações pendentes e notifica os observadores.
+        
+        Args:
+            force: Grava o arquivo mesmo sem alterações pendentes.
+            
+        Returns:
+            bool: True se o arquivo foi gravado.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending and not force:
+                    return False
+                changed = list(self._pending)
+                self._pending.clear()
+                data = json.dumps(self._settings, indent=4, ensure_ascii=False)
+            try:
+                self._write(data)
+                logger.debug(f"Configurações salvas com sucesso ({len(changed)} alterações)")
+            except Exception as e:
+                logger.error(f"Erro ao salvar configurações: {e}")
+                with self._lock:
+                    for path in changed:
+                        self._pending.setdefault(path, None)
+                return False
+        if changed:
+            self._dispatch_notifications(changed)
+        return True
+    
     def save(self) -> None:
-        """Salva as configurações no arquivo."""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=4, ensure_ascii=False)
-            logger.debug("Configurações salvas com sucesso")
-        except Exception as e:
-            logger.error(f"Erro ao salvar configurações: {e}")
+        """Salva imediatamente as configurações no arquivo."""
+        self.flush(force=True)
     
     def get_setting(self, path: list, default: Any = None) -> Any:
         """
@@ -786,30 +951,33 @@ class DynamicSettings:
         Returns:
             Any: Valor da configuração ou valor padrão.
         """
-        current = self._settings
-        for key in path:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return default
-        return current
+        return self._index.get(tuple(path), default)
     
     def set_setting(self, path: list, value: Any) -> None:
         """
         Define uma configuração pelo caminho.
         
+        A gravação e a notificação ocorrem na próxima gravação em lote.
+        
         Args:
             path: Lista com o caminho para a configuração.
-            value: Valor a ser definido.
+            value: Valor a ser definido (dicionários e listas são copiados).
         """
-        current = self._settings
-        for key in path[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
-        current[path[-1]] = value
-        self.save()
-        self._notify_observers()
+        value = _thaw(value)
+        with self._lock:
+            current = self._settings
+            for key in path[:-1]:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+            # Valor igual já gravado: nada a fazer
+            if current.get(path[-1], _MISSING) == value:
+                return
+            current[path[-1]] = value
+            self._reindex(tuple(path), value)
+            self._mark_changed(tuple(path))
+        if self.flush_delay <= 0:
+            self.flush()
     
     def delete_setting(self, path: list) -> None:
         """
@@ -818,28 +986,33 @@ class DynamicSettings:
         Args:
             path: Lista com o caminho para a configuração.
         """
-        current = self._settings
-        for key in path[:-1]:
-            if key not in current:
+        with self._lock:
+            current = self._settings
+            for key in path[:-1]:
+                if key not in current:
+                    return
+                current = current[key]
+            if path[-1] not in current:
                 return
-            current = current[key]
-        if path[-1] in current:
             del current[path[-1]]
-            self.save()
-            self._notify_observers()
+            self._reindex(tuple(path))
+            self._mark_changed(tuple(path))
+        if self.flush_delay <= 0:
+            self.flush()
     
     def clear(self) -> None:
         """Limpa todas as configurações."""
-        self._settings = {}
-        self.save()
-        self._notify_observers()
+        with self._lock:
+            self._settings = {}
+            self._mark_changed(())
+        self.flush()
     
     def add_observer(self, observer: Callable[[], None]) -> None:
         """
         Adiciona um observador para mudanças nas configurações.
         
         Args:
-            observer: Função a ser chamada quando houver mudanças.
+            observer: Função chamada (sem argumentos) uma vez por gravação com alterações.
         """
         if observer not in self._observers:
             self._observers.append(observer)
@@ -854,13 +1027,71 @@ class DynamicSettings:
         if observer in self._observers:
             self._observers.remove(observer)
     
-    def _notify_observers(self) -> None:
-        """Notifica todos os observadores sobre mudanças."""
-        for observer in self._observers:
+    def subscribe(self, path: list, callback: Callable[[List[SettingsPath]], None]) -> None:
+        """
+        Inscreve uma função para mudanças em um caminho (ou abaixo dele).
+        
+        Args:
+            path: Lista com o caminho observado (ex.: ['window', 'appearance_mode']).
+            callback: Função chamada uma vez por gravação com a lista dos caminhos
+                alterados que afetam o caminho observado.
+        """
+        subscription = (tuple(path), callback)
+        with self._lock:
+            if subscription not in self._subscriptions:
+                self._subscriptions.append(subscription)
+    
+    def unsubscribe(self, path: list, callback: Callable[[List[SettingsPath]], None]) -> None:
+        """
+        Cancela uma inscrição.
+        
+        Args:
+            path: Caminho usado na inscrição.
+            callback: Função inscrita.
+        """
+        with self._lock:
+            subscription = (tuple(path), callback)
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+    
+    def _dispatch_notifications(self, changed: List[SettingsPath]) -> None:
+        """
+        Entrega as notificações de uma gravação na thread da interface.
+        
+        Fora da thread principal (ex.: no temporizador), as notificações são enfileiradas
+        no despachante; sem interface ativa, são entregues na thread atual.
+        
+        Args:
+            changed: Caminhos alterados desde a última gravação.
+        """
+        if threading.current_thread() is not threading.main_thread() and self.dispatcher.is_attached():
+            self.dispatcher.call_soon(self._notify_observers, changed)
+        else:
+            self._notify_observers(changed)
+    
+    def _notify_observers(self, changed: List[SettingsPath]) -> None:
+        """
+        Notifica os observadores e as inscrições afetadas pelos caminhos alterados.
+        
+        Args:
+            changed: Caminhos alterados desde a última gravação.
+        """
+        with self._lock:
+            observers = list(self._observers)
+            subscriptions = list(self._subscriptions)
+        for observer in observers:
             try:
                 observer()
             except Exception as e:
                 logger.error(f"Erro ao notificar observador: {e}")
+        for path, callback in subscriptions:
+            affected = [item for item in changed if _paths_overlap(path, item)]
+            if not affected:
+                continue
+            try:
+                callback(affected)
+            except Exception as e:
+                logger.error(f"Erro ao notificar inscrição em {'.'.join(path)}: {e}")
     
     def get_window_setting(self, key: str, default: Any = None) -> Any:
         """
@@ -918,6 +1149,7 @@ class DynamicSettings:
 
 # Instância global das configurações dinâmicas
 dynamic_settings = DynamicSettings()
+atexit.register(dynamic_settings.flush)
 
 SECURITY_SETTINGS = {
     'database_encryption': {
@@ -950,5 +1182,7 @@ CACHE_SETTINGS = {
     'default_timeout': 300,     # 5 minutos em segundos
     'cleanup_interval': 3600,   # Limpeza a cada 1 hora
     'memory_warning': 75,       # Aviso em 75% de uso de memória
-    'memory_critical': 90       # Limpeza em 90% de uso de memória
+    'memory_critical': 90,      # Limpeza em 90% de uso de memória
+    'warm_start': False,        # Grava as entradas mais usadas ao sair e as recarrega ao iniciar
+    'warm_start_entries': 200   # Máximo de entradas por cache no snapshot
 }
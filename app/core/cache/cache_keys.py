@@ -0,0 +1,178 @@
+"""
+Geração determinística de chaves de cache.
+As chaves dependem apenas da consulta normalizada e da codificação canônica dos
+parâmetros, e não de hash() (aleatorizado por processo via PYTHONHASHSEED), para
+que processos diferentes e reinícios da aplicação compartilhem as mesmas entradas.
+"""
+
+import re
+import json
+import hashlib
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# Versão do esquema de chaves: alterá-la descarta as entradas antigas
+KEY_SCHEME_VERSION = 1
+
+# Tamanho do resumo em bytes (32 caracteres hexadecimais)
+DIGEST_SIZE = 16
+
+# Tipos cuja representação (repr) já é canônica e distingue o tipo (1, '1', True, 1.0)
+_INLINE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Argumentos escalares com representação até este tamanho entram na chave sem resumo
+MAX_INLINE_SIZE = 128
+
+# Literais de string (preservados) ou sequências de espaços (colapsadas)
+_SQL_TOKEN_RE = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`)|\s+""")
+
+@lru_cache(maxsize=1024)
+def normalize_sql(query: str) -> str:
+    """
+    Normaliza uma consulta SQL para uso em chaves de cache.
+
+    Colapsa espaços em branco fora de literais e remove espaços nas extremidades;
+    o conteúdo de strings e identificadores entre crases não é alterado.
+
+    Args:
+        query: Consulta SQL
+
+    Returns:
+        str: Consulta normalizada
+    """
+    def replace(match):
+        return match.group(1) if match.group(1) is not None else " "
+    return _SQL_TOKEN_RE.sub(replace, query).strip()
+
+def _canonical(value: Any) -> Any:
+    """
+    Converte um valor em uma estrutura JSON canônica com marcação de tipo.
+
+    A marcação evita colisões entre valores com a mesma representação textual
+    (ex.: 1, '1' e True).
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return ["b", value]
+    if isinstance(value, int):
+        return ["i", str(value)]
+    if isinstance(value, float):
+        return ["f", repr(value)]
+    if isinstance(value, Decimal):
+        return ["d", str(value.normalize()) if value.is_finite() else str(value)]
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["da", value.isoformat()]
+    if isinstance(value, time):
+        return ["t", value.isoformat()]
+    if isinstance(value, timedelta):
+        return ["td", value.days, value.seconds, value.microseconds]
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return ["by", bytes(value).hex()]
+    if isinstance(value, (list, tuple)):
+        return ["l", [_canonical(item) for item in value]]
+    if isinstance(value, (set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return ["s", sorted(items, key=lambda item: json.dumps(item, sort_keys=True))]
+    if isinstance(value, dict):
+        items = [[_canonical(k), _canonical(v)] for k, v in value.items()]
+        return ["m", sorted(items, key=lambda item: json.dumps(item[0], sort_keys=True))]
+    # Tipos desconhecidos: nome qualificado do tipo + representação textual
+    return ["o", f"{type(value).__module__}.{type(value).__qualname__}", str(value)]
+
+def encode_params(params: Any) -> bytes:
+    """
+    Codifica parâmetros de forma canônica e estável entre processos.
+
+    Listas e tuplas produzem a mesma codificação, assim como dicionários com as
+    mesmas chaves em qualquer ordem.
+
+    Args:
+        params: Parâmetros da consulta ou argumentos de uma função
+
+    Returns:
+        bytes: Codificação canônica
+    """
+    return json.dumps(_canonical(params), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def digest(*parts: bytes) -> str:
+    """
+    Calcula o resumo BLAKE2b das partes informadas.
+
+    Args:
+        *parts: Partes já codificadas da chave
+
+    Returns:
+        str: Resumo hexadecimal
+    """
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        # Prefixo de tamanho: ("ab", "c") e ("a", "bc") produzem resumos diferentes
+        hasher.update(len(part).to_bytes(8, "big"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+def query_key(query: str, params: Any = None, namespace: Optional[str] = None,
+              generations: Optional[Dict[str, int]] = None) -> str:
+    """
+    Gera a chave de cache de uma consulta SQL.
+
+    Args:
+        query: Consulta SQL
+        params: Parâmetros da consulta
+        namespace: Prefixo legível da chave (ex.: 'mysql_local')
+        generations: Geração atual das tabelas lidas pela consulta; quando uma
+            delas é incrementada, a consulta passa a usar outra chave
+
+    Returns:
+        str: Chave de cache
+    """
+    parts = [f"v{KEY_SCHEME_VERSION}".encode(), normalize_sql(query).encode("utf-8"),
+             encode_params(params)]
+    if generations:
+        parts.append(encode_params(generations))
+    key = digest(*parts)
+    return f"{namespace}:{key}" if namespace else key
+
+def call_key(name: str, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """
+    Gera a chave de cache de uma chamada a partir do nome já qualificado.
+
+    Chamadas com poucos argumentos escalares (str, int, float, bool, None) usam a
+    representação dos argumentos diretamente, sem codificação JSON nem resumo;
+    as demais usam a codificação canônica resumida com BLAKE2b.
+
+    Args:
+        name: Nome qualificado da função
+        args: Argumentos posicionais
+        kwargs: Argumentos nomeados
+
+    Returns:
+        str: Chave de cache no formato 'nome:(argumentos)' ou 'nome:resumo'
+    """
+    if all(type(arg) in _INLINE_TYPES for arg in args) and (
+            not kwargs or all(type(value) in _INLINE_TYPES for value in kwargs.values())):
+        inline = repr(args) if not kwargs else f"{args!r}{sorted(kwargs.items())!r}"
+        if len(inline) <= MAX_INLINE_SIZE:
+            return f"{name}:{inline}"
+    key = digest(f"v{KEY_SCHEME_VERSION}".encode(), name.encode("utf-8"),
+                 encode_params([list(args), kwargs or {}]))
+    return f"{name}:{key}"
+
+def function_key(func, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """
+    Gera a chave de cache de uma chamada de função.
+
+    Args:
+        func: Função chamada
+        args: Argumentos posicionais
+        kwargs: Argumentos nomeados
+
+    Returns:
+        str: Chave de cache no formato 'modulo.funcao:argumentos' (ver call_key)
+    """
+    return call_key(f"{func.__module__}.{func.__qualname__}", args, kwargs)
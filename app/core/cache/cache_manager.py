@@ -1,23 +1,33 @@
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List
 import json
 from pathlib import Path
 from app.config.settings import CACHE_DIR, CACHE_SETTINGS
+from app.core.cache.lru import LRUCache
 
 logger = logging.getLogger(__name__)
 
+def _count_hit(entry: Dict[str, Any]) -> None:
+    """Incrementa o contador de acessos de uma entrada (chamado sob o lock do LRUCache)."""
+    entry['hits'] += 1
+
 class CacheManager:
     def __init__(self):
         """Inicializa o gerenciador de cache"""
-        self.cache: Dict[str, Dict] = {}
         self.max_size = CACHE_SETTINGS['max_size']
+        # Remoção LRU em O(1) feita pelo mecanismo compartilhado
+        self.cache = LRUCache(self.max_size, on_evict=self._on_evict)
         self.default_timeout = CACHE_SETTINGS['default_timeout']
         self.stats = {
             'hits': 0,
             'misses': 0,
             'evictions': 0
         }
+        # Prefixos descartados (ex.: cache_clear de @cached): suas entradas ficam fora do snapshot
+        self._unpersisted_prefixes: tuple = ()
+        self._prefix_lock = threading.Lock()
         
     def get(self, key: str) -> Optional[Any]:
         """Obtém um valor do cache com tratamento de erro detalhado"""
@@ -25,11 +35,12 @@ class CacheManager:
             if not isinstance(key, str):
                 raise TypeError(f"Chave deve ser string, recebido: {type(key)}")
                 
-            if key not in self.cache:
+            # Acertos da entrada contados sob o lock do LRU (usados no ranking do warm start)
+            entry = self.cache.get(key, on_hit=_count_hit)
+            if entry is None:
                 self.stats['misses'] += 1
                 return None
                 
-            entry = self.cache[key]
             if datetime.now() > entry['expires']:
                 self.delete(key)
                 self.stats['misses'] += 1
@@ -42,8 +53,8 @@ class CacheManager:
             logger.error(f"Falha ao recuperar chave '{key}': {str(e)}", exc_info=True)
             return None
             
-    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
-        """Armazena um valor no cache com validação de entrada"""
+    def set(self, key: str, value: Any, timeout: Optional[int] = None, persist: bool = True) -> bool:
+        """Armazena um valor no cache com validação de entrada (persist=False exclui do warm start)"""
         try:
             if not isinstance(key, str):
                 raise TypeError(f"Chave inválida: {type(key)}")
@@ -51,19 +62,17 @@ class CacheManager:
             if timeout is not None and (not isinstance(timeout, int) or timeout < 0):
                 raise ValueError(f"Timeout inválido: {timeout}")
                 
-            # Limpa cache se necessário
-            if len(self.cache) >= self.max_size:
-                self._evict_oldest()
-                
             expires = datetime.now() + timedelta(
                 seconds=timeout or self.default_timeout
             )
             
-            self.cache[key] = {
+            self.cache.set(key, {
                 'value': value,
                 'expires': expires,
-                'created': datetime.now()
-            }
+                'created': datetime.now(),
+                'hits': 0,
+                'persist': persist
+            })
             return True
             
         except Exception as e:
@@ -72,24 +81,51 @@ class CacheManager:
             
     def delete(self, key: str):
         """Remove um item do cache"""
-        if key in self.cache:
-            del self.cache[key]
+        self.cache.delete(key)
             
     def clear(self):
         """Limpa todo o cache"""
         self.cache.clear()
         
-    def _evict_oldest(self):
-        """Remove o item mais antigo do cache"""
-        if not self.cache:
-            return
-            
-        oldest = min(
-            self.cache.items(),
-            key=lambda x: x[1]['created']
-        )[0]
+    def exclude_prefix(self, prefix: str):
+        """Exclui do snapshot de warm start as entradas cujas chaves começam com o prefixo"""
+        with self._prefix_lock:
+            if prefix not in self._unpersisted_prefixes:
+                self._unpersisted_prefixes += (prefix,)
+        
+    def export_entries(self) -> List[Dict]:
+        """Exporta as entradas persistíveis para o snapshot de warm start"""
+        now = datetime.now()
+        excluded = self._unpersisted_prefixes
+        entries = []
+        for recency, (key, entry) in enumerate(self.cache.items()):
+            if not entry.get('persist', True) or entry['expires'] <= now:
+                continue
+            if excluded and key.startswith(excluded):
+                continue
+            entries.append({
+                'key': key,
+                'value': entry['value'],
+                'ttl': (entry['expires'] - now).total_seconds(),
+                'tags': [],
+                'hits': entry.get('hits', 0),
+                'recency': recency
+            })
+        return entries
+        
+    def import_entries(self, entries: List[Dict]) -> int:
+        """Importa entradas de um snapshot sem sobrescrever valores já presentes"""
+        imported = 0
+        for entry in entries:
+            if entry['key'] in self.cache:
+                continue
+            # Arredonda para cima: o timeout é validado como inteiro
+            if self.set(entry['key'], entry['value'], max(int(entry['ttl'] + 0.999), 1)):
+                imported += 1
+        return imported
         
-        self.delete(oldest)
+    def _on_evict(self, key: str, entry: Dict):
+        """Contabiliza itens removidos por capacidade (menos recentemente usados)"""
         self.stats['evictions'] += 1
         
     def get_stats(self) -> Dict:
@@ -0,0 +1,271 @@
+"""
+Codificação binária dos valores armazenados no Redis.
+Cada valor é gravado com um cabeçalho versionado (assinatura, versão do formato,
+serializador e compressão), de modo que mudanças de formato ou valores gravados
+por outra configuração sejam tratados como ausentes em vez de corromper o cache.
+Serializa com pickle (protocolo 5) ou msgpack com tipos estendidos, preservando
+datetime, Decimal e timedelta retornados pelo MySQL, e comprime os valores acima
+de um limite com zstd, lz4 ou zlib, conforme disponibilidade.
+"""
+
+import zlib
+import pickle
+import logging
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Assinatura e versão do formato: alterar a versão descarta os valores antigos
+MAGIC = b"CX"
+CODEC_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+# Valores menores que o limite (em bytes) não são comprimidos
+DEFAULT_COMPRESS_THRESHOLD = 1024
+
+# Identificadores gravados no cabeçalho
+SERIALIZERS = {'pickle': 1, 'msgpack': 2}
+COMPRESSIONS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+
+class CodecError(ValueError):
+    """Valor em formato desconhecido ou não suportado neste processo."""
+
+# Tipos estendidos do msgpack
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_TIMEDELTA = 4
+_EXT_DECIMAL = 5
+_EXT_SET = 6
+_EXT_TUPLE = 7
+
+def _msgpack_default(value: Any) -> Any:
+    """
+    Converte tipos não nativos do msgpack em tipos estendidos.
+
+    Com strict_types, tuplas e subclasses de tipos nativos também passam por aqui.
+    """
+    if isinstance(value, tuple):
+        return msgpack.ExtType(_EXT_TUPLE, _msgpack_pack(list(value)))
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode())
+    if isinstance(value, timedelta):
+        return msgpack.ExtType(_EXT_TIMEDELTA, _msgpack_pack([value.days, value.seconds, value.microseconds]))
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, (set, frozenset)):
+        return msgpack.ExtType(_EXT_SET, _msgpack_pack(list(value)))
+    for base in (bool, int, float, str, bytes, list, dict):
+        if isinstance(value, base):
+            return base(value)
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """Reconstrói os tipos estendidos do msgpack."""
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return time.fromisoformat(data.decode())
+    if code == _EXT_TIMEDELTA:
+        days, seconds, microseconds = _msgpack_unpack(data)
+        return timedelta(days=days, seconds=seconds, microseconds=microseconds)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_SET:
+        return set(_msgpack_unpack(data))
+    if code == _EXT_TUPLE:
+        return tuple(_msgpack_unpack(data))
+    return msgpack.ExtType(code, data)
+
+def _msgpack_pack(value: Any) -> bytes:
+    """Serializa com msgpack e tipos estendidos."""
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True, strict_types=True)
+
+def _msgpack_unpack(data: bytes) -> Any:
+    """Desserializa com msgpack e tipos estendidos."""
+    return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+def _serializer_functions(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """Retorna as funções de serialização e desserialização de um serializador."""
+    if name == 'pickle':
+        return (lambda value: pickle.dumps(value, protocol=5)), pickle.loads
+    if name == 'msgpack':
+        if msgpack is None:
+            raise CodecError("msgpack não instalado")
+        return _msgpack_pack, _msgpack_unpack
+    raise CodecError(f"Serializador desconhecido: {name}")
+
+def _compression_functions(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """Retorna as funções de compressão e descompressão de um algoritmo."""
+    if name == 'none':
+        return (lambda data: data), (lambda data: data)
+    if name == 'zlib':
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    if name == 'zstd':
+        if zstandard is None:
+            raise CodecError("zstandard não instalado")
+        # Instâncias do zstandard não podem ser usadas por várias threads ao mesmo tempo
+        return ((lambda data: zstandard.ZstdCompressor(level=3).compress(data)),
+                (lambda data: zstandard.ZstdDecompressor().decompress(data)))
+    if name == 'lz4':
+        if lz4_frame is None:
+            raise CodecError("lz4 não instalado")
+        return lz4_frame.compress, lz4_frame.decompress
+    raise CodecError(f"Compressão desconhecida: {name}")
+
+def best_compression() -> str:
+    """
+    Retorna o melhor algoritmo de compressão disponível.
+
+    Returns:
+        str: 'zstd', 'lz4' ou 'zlib'
+    """
+    if zstandard is not None:
+        return 'zstd'
+    if lz4_frame is not None:
+        return 'lz4'
+    return 'zlib'
+
+class Codec:
+    """
+    Codificador de valores de cache com cabeçalho versionado.
+
+    Valores gravados com qualquer serializador ou compressão disponíveis neste
+    processo podem ser lidos, independentemente da configuração de escrita.
+
+    Atributos:
+        serializer (str): Serializador usado na escrita ('pickle' ou 'msgpack')
+        compression (str): Compressão usada na escrita ('none', 'zlib', 'zstd' ou 'lz4')
+        threshold (int): Tamanho mínimo em bytes para comprimir
+    """
+
+    def __init__(self, serializer: str = 'pickle', compression: str = 'auto',
+                 threshold: int = DEFAULT_COMPRESS_THRESHOLD):
+        """
+        Inicializa o codificador.
+
+        Args:
+            serializer: Serializador usado na escrita
+            compression: Compressão usada na escrita ('auto' = melhor disponível)
+            threshold: Tamanho mínimo em bytes para comprimir
+
+        Raises:
+            CodecError: Se o serializador ou a compressão não estiverem disponíveis
+        """
+        if compression == 'auto':
+            compression = best_compression()
+        self.serializer = serializer
+        self.compression = compression
+        self.threshold = threshold
+        self._dumps, _ = _serializer_functions(serializer)
+        self._compress, _ = _compression_functions(compression)
+        self._decoders: Dict[Tuple[int, int], Tuple[Callable, Callable]] = {}
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Codifica um valor para armazenamento.
+
+        Args:
+            value: Valor a ser codificado
+
+        Returns:
+            bytes: Cabeçalho seguido do valor serializado (e possivelmente comprimido)
+        """
+        payload = self._dumps(value)
+        compression = 'none'
+        if self.compression != 'none' and len(payload) >= self.threshold:
+            compressed = self._compress(payload)
+            # Dados pouco compressíveis são gravados sem compressão
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        header = MAGIC + bytes((CODEC_VERSION, SERIALIZERS[self.serializer], COMPRESSIONS[compression]))
+        return header + payload
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decodifica um valor armazenado.
+
+        Args:
+            data: Valor lido do Redis
+
+        Returns:
+            Any: Valor original
+
+        Raises:
+            CodecError: Se o formato, a versão ou os algoritmos não forem suportados
+        """
+        if isinstance(data, str):
+            raise CodecError("Valor textual sem cabeçalho")
+        data = bytes(data)
+        if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+            raise CodecError("Valor sem cabeçalho do codificador")
+        version, serializer_id, compression_id = data[len(MAGIC):HEADER_SIZE]
+        if version != CODEC_VERSION:
+            raise CodecError(f"Versão de codificação não suportada: {version}")
+
+        decoders = self._decoders.get((serializer_id, compression_id))
+        if decoders is None:
+            serializer = _name_for(SERIALIZERS, serializer_id)
+            compression = _name_for(COMPRESSIONS, compression_id)
+            decoders = (_serializer_functions(serializer)[1], _compression_functions(compression)[1])
+            self._decoders[(serializer_id, compression_id)] = decoders
+
+        loads, decompress = decoders
+        try:
+            return loads(decompress(data[HEADER_SIZE:]))
+        except Exception as e:
+            raise CodecError(f"Valor corrompido: {e}") from e
+
+def _name_for(table: Dict[str, int], identifier: int) -> str:
+    """Obtém o nome correspondente a um identificador do cabeçalho."""
+    for name, value in table.items():
+        if value == identifier:
+            return name
+    raise CodecError(f"Identificador desconhecido no cabeçalho: {identifier}")
+
+def create_codec(config: Optional[Any] = None) -> Codec:
+    """
+    Cria o codificador definido na configuração de cache.
+
+    Se o serializador ou a compressão configurados não estiverem instalados,
+    usa pickle e a melhor compressão disponível.
+
+    Args:
+        config: CacheConfig (opcional)
+
+    Returns:
+        Codec: Codificador configurado
+    """
+    serializer = getattr(config, 'codec_serializer', 'pickle')
+    compression = getattr(config, 'codec_compression', 'auto')
+    threshold = getattr(config, 'codec_compress_threshold', DEFAULT_COMPRESS_THRESHOLD)
+    try:
+        return Codec(serializer, compression, threshold)
+    except CodecError as e:
+        logger.warning(f"Codificador de cache indisponível ({e}), usando pickle")
+        return Codec('pickle', 'auto', threshold)
@@ -1,32 +1,191 @@
+import time
+import inspect
+import logging
+import itertools
+import threading
+import weakref
 from functools import wraps
-from typing import Optional
-import hashlib
-import json
+from typing import Any, Callable, Dict, Optional
 from .cache_manager import cache_manager
+from .cache_keys import call_key
 
-def cached(timeout: Optional[int] = None):
-    """Decorador para cachear resultados de funções"""
+logger = logging.getLogger(__name__)
+
+class _NoneMarker:
+    """Marca um resultado None armazenado (cache_manager.get retorna None na ausência)."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Desserializado como a instância única do módulo (ex.: snapshot de warm start)
+        return '_NONE'
+
+    def __repr__(self):
+        return '<cached None>'
+
+_NONE = _NoneMarker()
+
+# Identificadores de instância: nunca reutilizados, ao contrário de id()
+_instance_ids = weakref.WeakKeyDictionary()
+_instance_counter = itertools.count(1)
+_instance_lock = threading.Lock()
+
+def _instance_token(instance: Any) -> str:
+    """
+    Identifica a instância de um método na chave de cache.
+
+    Args:
+        instance: self (ou cls) da chamada
+
+    Returns:
+        str: Nome da classe para métodos de classe; tipo e número único da instância
+        nos demais casos
+    """
+    if isinstance(instance, type):
+        return f"{instance.__module__}.{instance.__qualname__}"
+    name = type(instance).__qualname__
+    try:
+        with _instance_lock:
+            number = _instance_ids.get(instance)
+            if number is None:
+                number = _instance_ids[instance] = next(_instance_counter)
+        return f"{name}#{number}"
+    except TypeError:
+        # Instância sem suporte a referência fraca (ex.: __slots__)
+        return f"{name}@{id(instance)}"
+
+def _is_method(func: Callable) -> bool:
+    """Indica se o primeiro parâmetro da função é self ou cls."""
+    try:
+        parameters = list(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return False
+    return bool(parameters) and parameters[0] in ('self', 'cls')
+
+def cached(timeout: Optional[int] = None, key_func: Optional[Callable[..., Any]] = None,
+           method: Optional[bool] = None, cache_none: bool = True):
+    """
+    Decorador para cachear resultados de funções
+
+    O wrapper expõe cache_info() (acertos, ausências e latências) e cache_clear(),
+    que descarta em O(1) apenas as entradas da função decorada. Após cache_clear()
+    as entradas da função deixam de ir para o snapshot de warm start: a geração
+    reinicia a cada execução e elas voltariam a ser alcançáveis.
+
+    Args:
+        timeout: Tempo de vida em segundos (padrão do cache_manager se None)
+        key_func: Função que recebe os mesmos argumentos e retorna a chave
+            (str ou valor codificável) usada no lugar dos argumentos
+        method: Se True, o primeiro argumento (self/cls) é identificado pela
+            instância em vez do valor; se None, detecta pelo nome do parâmetro
+        cache_none: Se True, resultados None também são armazenados
+    """
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Cria chave única baseada na função e argumentos
-            key = f"{func.__module__}.{func.__name__}"
-            args_key = hashlib.md5(
-                json.dumps((args, kwargs), sort_keys=True).encode()
-            ).hexdigest()
-            cache_key = f"{key}:{args_key}"
-            
-            # Tenta obter do cache
-            result = cache_manager.get(cache_key)
-            if result is not None:
+        name = f"{func.__module__}.{func.__qualname__}"
+        is_method = _is_method(func) if method is None else method
+        # Geração incluída nas chaves: cache_clear() a incrementa
+        generation = itertools.count(2)
+        # persist: apenas a geração inicial é comum a todas as execuções
+        state = {'prefix': f"{name}:1", 'persist': not is_method}
+        stats = {
+            'hits': 0,
+            'misses': 0,
+            'hit_time': 0.0,
+            'miss_time': 0.0
+        }
+
+        def make_key(args, kwargs) -> Optional[str]:
+            try:
+                if key_func is not None:
+                    custom = key_func(*args, **kwargs)
+                    if isinstance(custom, str):
+                        return f"{state['prefix']}:{custom}"
+                    return call_key(state['prefix'], (custom,))
+                if is_method and args:
+                    args = (_instance_token(args[0]),) + tuple(args[1:])
+                return call_key(state['prefix'], args, kwargs)
+            except Exception as e:
+                logger.error(f"Erro ao gerar chave de cache para {name}: {e}")
+                return None
+
+        def lookup(cache_key: str):
+            value = cache_manager.get(cache_key)
+            if value is None:
+                return False, None
+            return True, (None if value is _NONE else value)
+
+        def store(cache_key: str, result: Any) -> None:
+            if result is None:
+                if not cache_none:
+                    return
+                result = _NONE
+            # Chaves de métodos identificam a instância e não valem em outra execução
+            cache_manager.set(cache_key, result, timeout, persist=state['persist'])
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                cache_key = make_key(args, kwargs)
+                if cache_key is None:
+                    return await func(*args, **kwargs)
+
+                found, result = lookup(cache_key)
+                if found:
+                    stats['hits'] += 1
+                    stats['hit_time'] += time.perf_counter() - start
+                    return result
+
+                result = await func(*args, **kwargs)
+                store(cache_key, result)
+                stats['misses'] += 1
+                stats['miss_time'] += time.perf_counter() - start
                 return result
-                
-            # Se não encontrou, executa função
-            result = func(*args, **kwargs)
-            
-            # Armazena resultado no cache
-            cache_manager.set(cache_key, result, timeout)
-            return result
-            
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                # Cria chave única e estável baseada na função e argumentos
+                cache_key = make_key(args, kwargs)
+                if cache_key is None:
+                    return func(*args, **kwargs)
+
+                # Tenta obter do cache
+                found, result = lookup(cache_key)
+                if found:
+                    stats['hits'] += 1
+                    stats['hit_time'] += time.perf_counter() - start
+                    return result
+
+                # Se não encontrou, executa função e armazena resultado no cache
+                result = func(*args, **kwargs)
+                store(cache_key, result)
+                stats['misses'] += 1
+                stats['miss_time'] += time.perf_counter() - start
+                return result
+
+        def cache_info() -> Dict[str, Any]:
+            """Retorna acertos, ausências e latências médias (ms) da função decorada."""
+            hits, misses = stats['hits'], stats['misses']
+            total = hits + misses
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / total * 100 if total else 0,
+                'avg_hit_ms': stats['hit_time'] / hits * 1000 if hits else 0,
+                'avg_miss_ms': stats['miss_time'] / misses * 1000 if misses else 0
+            }
+
+        def cache_clear() -> None:
+            """Descarta as entradas da função decorada e zera as estatísticas."""
+            # As entradas antigas ficam inalcançáveis e saem do cache pelo LRU/TTL; também
+            # não vão para o snapshot, onde a próxima execução (de volta à geração 1) as leria
+            cache_manager.exclude_prefix(f"{state['prefix']}:")
+            state['prefix'] = f"{name}:{next(generation)}"
+            state['persist'] = False
+            stats.update(hits=0, misses=0, hit_time=0.0, miss_time=0.0)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
@@ -0,0 +1,421 @@
+"""
+Mecanismo LRU compartilhado pelos caches em memória.
+Baseado em OrderedDict: leitura, escrita e remoção do item menos recentemente
+usado são O(1), ao contrário da busca linear pelo item mais antigo. O tamanho
+aproximado de cada item é calculado uma única vez, na escrita, permitindo limitar
+o cache em bytes sem consultar o sistema operacional. Itens com TTL são indexados
+em um heap por instante de expiração (relógio monotônico), de modo que a remoção
+dos expirados custa O(expirados) em vez de percorrer todo o cache.
+"""
+
+import sys
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Profundidade máxima percorrida ao estimar o tamanho de estruturas aninhadas
+MAX_SIZE_DEPTH = 4
+
+# Entradas obsoletas toleradas no heap de expiração antes de reconstruí-lo
+HEAP_COMPACT_SLACK = 64
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estima o tamanho em bytes de um valor, incluindo o conteúdo de contêineres.
+
+    A estimativa é aproximada (objetos compartilhados são contados mais de uma vez
+    e estruturas muito profundas são truncadas), mas suficiente para limitar o
+    consumo de memória de resultados de consultas (listas de dicionários).
+
+    Args:
+        value: Valor a ser medido
+
+    Returns:
+        int: Tamanho aproximado em bytes
+    """
+    size = sys.getsizeof(value)
+    if _depth >= MAX_SIZE_DEPTH:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+class LRUCache:
+    """
+    Armazenamento em memória com política LRU e contadores de uso.
+
+    Thread-safe: todas as operações são protegidas por um único lock.
+
+    Atributos:
+        max_size (int): Número máximo de itens (0 ou negativo = sem limite)
+        max_bytes (int): Tamanho máximo aproximado em bytes (0 ou negativo = sem limite)
+        total_bytes (int): Tamanho aproximado atual em bytes
+        stats (Dict[str, int]): Contadores de hits, misses, evictions e expirations
+    """
+
+    def __init__(self, max_size: int, on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+                 max_bytes: int = 0, sizeof: Callable[[Any], int] = estimate_size,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_size: Número máximo de itens
+            on_evict: Callback chamado com (chave, valor) a cada item removido por capacidade
+            max_bytes: Tamanho máximo aproximado em bytes
+            sizeof: Função que estima o tamanho de um valor
+            clock: Relógio monotônico usado para o TTL (substituível em testes)
+        """
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self.clock = clock
+        self.total_bytes = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        # Expiração atual de cada chave (instante, sequência) e heap de (instante, sequência, chave);
+        # entradas do heap cuja sequência não é mais a atual são descartadas ao serem alcançadas
+        self._expires: Dict[Hashable, Tuple[float, int]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def get(self, key: Hashable, default: Any = None,
+            on_hit: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Obtém um valor e o marca como usado recentemente.
+
+        Args:
+            key: Chave do valor
+            default: Valor retornado se a chave não existir
+            on_hit: Função chamada com o valor encontrado ainda sob o lock
+                (ex.: contadores de acesso guardados no próprio valor)
+
+        Returns:
+            Any: Valor armazenado ou default
+        """
+        with self._lock:
+            # Recupera de forma incremental a memória dos itens já expirados
+            self._purge_expired(self.clock())
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats['hits'] += 1
+            if on_hit is not None:
+                on_hit(value)
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Obtém um valor sem alterar a ordem de uso nem os contadores.
+
+        Args:
+            key: Chave do valor
+            default: Valor retornado se a chave não existir
+
+        Returns:
+            Any: Valor armazenado ou default
+        """
+        with self._lock:
+            if self._is_expired(key):
+                return default
+            return self._data.get(key, default)
+
+    def remaining_ttl(self, key: Hashable) -> Optional[float]:
+        """
+        Obtém o tempo de vida restante de uma chave.
+
+        Args:
+            key: Chave do valor
+
+        Returns:
+            Optional[float]: Segundos até a expiração, ou None se a chave não expira
+            ou não existe
+        """
+        with self._lock:
+            current = self._expires.get(key)
+            if current is None or key not in self._data:
+                return None
+            return max(current[0] - self.clock(), 0.0)
+
+    def set(self, key: Hashable, value: Any, size: Optional[int] = None,
+            ttl: Optional[float] = None) -> bool:
+        """
+        Armazena um valor, removendo os itens menos recentemente usados se necessário.
+
+        Args:
+            key: Chave do valor
+            value: Valor a ser armazenado
+            size: Tamanho do valor em bytes (padrão: estimado com sizeof)
+            ttl: Tempo de vida em segundos (None = sem expiração)
+
+        Returns:
+            bool: False se o valor sozinho excede max_bytes e não foi armazenado
+        """
+        return self.set_many({key: value}, {key: size} if size is not None else None, ttl)[key]
+
+    def set_many(self, items: Dict[Hashable, Any], sizes: Optional[Dict[Hashable, int]] = None,
+                 ttl: Optional[float] = None, ttls: Optional[Dict[Hashable, float]] = None) -> Dict[Hashable, bool]:
+        """
+        Armazena vários valores com uma única aquisição do lock.
+
+        Args:
+            items: Valores por chave
+            sizes: Tamanho de cada valor em bytes (padrão: estimado com sizeof)
+            ttl: Tempo de vida padrão em segundos (None = sem expiração)
+            ttls: Tempo de vida por chave, sobrepondo o padrão
+
+        Returns:
+            Dict[Hashable, bool]: Por chave, False se o valor excede max_bytes e não foi armazenado
+        """
+        sizes = sizes or {}
+        ttls = ttls or {}
+        # Tamanhos estimados fora do lock
+        measured = {key: sizes[key] if sizes.get(key) is not None else self.sizeof(value)
+                    for key, value in items.items()}
+        stored: Dict[Hashable, bool] = {}
+
+        with self._lock:
+            now = self.clock()
+            self._purge_expired(now)
+            for key, value in items.items():
+                size = measured[key]
+                if self.max_bytes > 0 and size > self.max_bytes:
+                    self._remove(key)
+                    stored[key] = False
+                    continue
+                self._store(key, value, size, ttls.get(key, ttl), now)
+                stored[key] = True
+            self._compact_heap()
+            evicted = self._evict_while(lambda: (0 < self.max_size < len(self._data)) or
+                                        (0 < self.max_bytes < self.total_bytes))
+        self._notify_evicted(evicted)
+        return stored
+
+    def _store(self, key: Hashable, value: Any, size: int, ttl: Optional[float], now: float) -> None:
+        """Grava um valor e sua contabilidade, sem remoções por capacidade; requer o lock."""
+        if key in self._data:
+            self.total_bytes -= self._sizes.get(key, 0)
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._sizes[key] = size
+        self.total_bytes += size
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            self._sequence += 1
+            expires = now + ttl
+            self._expires[key] = (expires, self._sequence)
+            heapq.heappush(self._heap, (expires, self._sequence, key))
+
+    def get_many(self, keys: Iterable[Hashable],
+                 on_hit: Optional[Callable[[Any], None]] = None) -> Dict[Hashable, Any]:
+        """
+        Obtém vários valores com uma única aquisição do lock.
+
+        Args:
+            keys: Chaves dos valores
+            on_hit: Função chamada com cada valor encontrado ainda sob o lock
+
+        Returns:
+            Dict[Hashable, Any]: Valores encontrados (chaves ausentes ou expiradas são omitidas)
+        """
+        found: Dict[Hashable, Any] = {}
+        with self._lock:
+            self._purge_expired(self.clock())
+            for key in keys:
+                value = self._data.get(key, _MISSING)
+                if value is _MISSING:
+                    self.stats['misses'] += 1
+                    continue
+                self._data.move_to_end(key)
+                self.stats['hits'] += 1
+                if on_hit is not None:
+                    on_hit(value)
+                found[key] = value
+        return found
+
+    def delete_many(self, keys: Iterable[Hashable]) -> int:
+        """
+        Remove várias chaves com uma única aquisição do lock.
+
+        Args:
+            keys: Chaves a serem removidas
+
+        Returns:
+            int: Número de chaves que existiam
+        """
+        with self._lock:
+            return sum(1 for key in keys if self._remove(key) is not _MISSING)
+
+    def purge_expired(self) -> int:
+        """
+        Remove os itens expirados.
+
+        Percorre apenas o topo do heap de expiração: o custo é proporcional ao
+        número de itens expirados, não ao tamanho do cache.
+
+        Returns:
+            int: Número de itens removidos
+        """
+        with self._lock:
+            return self._purge_expired(self.clock())
+
+    def _purge_expired(self, now: float) -> int:
+        """Remove os itens com expiração até now; requer o lock."""
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            current = self._expires.get(key)
+            if current is not None and current[1] == sequence:
+                self._remove(key)
+                self.stats['expirations'] += 1
+                removed += 1
+        return removed
+
+    def _compact_heap(self) -> None:
+        """Reconstrói o heap quando as entradas obsoletas dominam; requer o lock."""
+        if len(self._heap) > 2 * len(self._expires) + HEAP_COMPACT_SLACK:
+            self._heap = [(expires, sequence, key) for key, (expires, sequence) in self._expires.items()]
+            heapq.heapify(self._heap)
+
+    def _is_expired(self, key: Hashable) -> bool:
+        """Verifica se a chave tem expiração vencida; requer o lock."""
+        current = self._expires.get(key)
+        return current is not None and current[0] <= self.clock()
+
+    def _remove(self, key: Hashable) -> Any:
+        """Remove uma chave e sua contabilidade; requer o lock."""
+        value = self._data.pop(key, _MISSING)
+        if value is not _MISSING:
+            self.total_bytes -= self._sizes.pop(key, 0)
+            self._expires.pop(key, None)
+        return value
+
+    def trim(self, target_bytes: int) -> int:
+        """
+        Remove itens menos recentemente usados até o tamanho ficar abaixo do alvo.
+
+        Usado para liberar memória de forma incremental sob pressão, em vez de
+        descartar o cache inteiro.
+
+        Args:
+            target_bytes: Tamanho máximo desejado em bytes
+
+        Returns:
+            int: Número de itens removidos
+        """
+        with self._lock:
+            evicted = self._evict_while(lambda: self._data and self.total_bytes > target_bytes)
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def _evict_while(self, condition: Callable[[], bool]) -> List[Tuple[Hashable, Any]]:
+        """Remove itens do início (menos recentemente usados) enquanto a condição valer; requer o lock."""
+        evicted: List[Tuple[Hashable, Any]] = []
+        while self._data and condition():
+            key, value = self._data.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(key, 0)
+            self._expires.pop(key, None)
+            self.stats['evictions'] += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _notify_evicted(self, evicted: List[Tuple[Hashable, Any]]) -> None:
+        """Chama o callback de remoção fora do lock."""
+        if self.on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                try:
+                    self.on_evict(evicted_key, evicted_value)
+                except Exception as e:
+                    logger.error(f"Erro no callback de remoção do cache: {e}")
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove uma chave e retorna seu valor.
+
+        Args:
+            key: Chave a ser removida
+            default: Valor retornado se a chave não existir
+
+        Returns:
+            Any: Valor removido ou default
+        """
+        with self._lock:
+            value = self._remove(key)
+            return default if value is _MISSING else value
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Remove uma chave.
+
+        Args:
+            key: Chave a ser removida
+
+        Returns:
+            bool: True se a chave existia
+        """
+        return self.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        """Remove todos os itens (os contadores são mantidos)."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._expires.clear()
+            self._heap.clear()
+            self.total_bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Retorna uma cópia das chaves, da menos para a mais recentemente usada."""
+        with self._lock:
+            return list(self._data.keys())
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Retorna uma cópia dos itens, do menos para o mais recentemente usado."""
+        with self._lock:
+            return list(self._data.items())
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data and not self._is_expired(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cache.
+
+        Returns:
+            Dict[str, Any]: Tamanho, capacidade, contadores e taxa de acertos (%)
+        """
+        with self._lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                **self.stats,
+                'hit_ratio': (self.stats['hits'] / total * 100) if total > 0 else 0
+            }
@@ -1,16 +1,18 @@
 import logging
 from datetime import datetime
-from typing import Dict
-import json
-from pathlib import Path
-from app.config.settings import CACHE_DIR
+from typing import Dict, List, Optional
 from app.core.cache.cache_manager import cache_manager
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Campos numéricos gravados no histórico do cache
+HISTORY_FIELDS = ('size', 'hits', 'misses', 'evictions', 'hit_ratio')
+
 class CacheMonitor:
     def __init__(self):
-        self.stats_file = CACHE_DIR / 'cache_stats.json'
+        # Histórico em buffer circular persistente (acréscimo O(1), sem reescrever o arquivo)
+        self.history = metrics.series('cache', HISTORY_FIELDS, capacity=1000)
         self.last_check = datetime.now()
         
     def collect_stats(self) -> Dict:
@@ -28,29 +30,29 @@ class CacheMonitor:
         return stats
         
     def _save_stats(self, stats: Dict):
-        """Salva estatísticas em arquivo"""
+        """Acrescenta as estatísticas ao histórico"""
         try:
-            # Carrega estatísticas anteriores
-            if self.stats_file.exists():
-                with open(self.stats_file, 'r') as f:
-                    history = json.load(f)
-            else:
-                history = []
-                
-            # Adiciona novas estatísticas
-            history.append(stats)
-            
-            # Mantém apenas últimas 1000 amostras
-            if len(history) > 1000:
-                history = history[-1000:]
-                
-            # Salva arquivo
-            with open(self.stats_file, 'w') as f:
-                json.dump(history, f, indent=2)
-                
+            current = stats['stats']
+            total = current['hits'] + current['misses']
+            self.history.append({
+                'size': current['size'],
+                'hits': current['hits'],
+                'misses': current['misses'],
+                'evictions': current['evictions'],
+                'hit_ratio': current['hits'] / total * 100 if total else 0
+            })
         except Exception as e:
             logger.error(f"Erro ao salvar estatísticas: {e}")
             
+    def get_history(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    bucket_seconds: Optional[float] = None) -> List[Dict]:
+        """Retorna o histórico do intervalo, agrupado em intervalos de bucket_seconds se informado"""
+        start_ts = start.timestamp() if start else None
+        end_ts = end.timestamp() if end else None
+        if bucket_seconds:
+            return self.history.downsample(bucket_seconds, start_ts, end_ts)
+        return self.history.range(start_ts, end_ts)
+            
     def get_performance_metrics(self) -> Dict:
         """Calcula métricas de performance"""
         stats = cache_manager.get_stats()
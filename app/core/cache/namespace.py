@@ -0,0 +1,231 @@
+"""
+Versionamento de namespace para limpeza de cache sem bloquear o Redis.
+Todas as chaves de valores incluem a versão atual do namespace
+('controlix:v<versão>:<chave>'); limpar o cache apenas incrementa a versão (O(1)),
+tornando as entradas antigas inalcançáveis. A memória é recuperada pelos TTLs ou
+por um varredor em segundo plano que percorre o keyspace com SCAN e remove as
+versões antigas com UNLINK, respeitando um orçamento de tempo por iteração.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Intervalo em segundos durante o qual a versão lida do Redis é reutilizada
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+# Orçamento de tempo por iteração do varredor e pausa entre iterações (segundos)
+DEFAULT_SWEEP_BUDGET = 0.005
+DEFAULT_SWEEP_INTERVAL = 0.1
+
+# Chaves solicitadas ao Redis por chamada de SCAN
+DEFAULT_SCAN_COUNT = 500
+
+class NamespaceVersion:
+    """
+    Versão do namespace de chaves de um cache.
+
+    A versão é compartilhada entre processos via Redis e mantida localmente por
+    refresh_interval segundos, para não acrescentar uma ida e volta a cada leitura;
+    uma limpeza feita por outro processo é percebida após esse intervalo.
+
+    Atributos:
+        prefix (str): Prefixo comum das chaves
+        version_key (str): Chave do Redis que guarda a versão
+        refresh_interval (float): Validade local da versão em segundos
+    """
+
+    def __init__(self, client_getter: Callable[[], Any], prefix: str,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Inicializa a versão do namespace.
+
+        Args:
+            client_getter: Função que retorna o cliente Redis atual
+            prefix: Prefixo comum das chaves (ex.: 'controlix:')
+            refresh_interval: Validade local da versão em segundos
+        """
+        self._client_getter = client_getter
+        self.prefix = prefix
+        self.version_key = f"{prefix}ns"
+        self.refresh_interval = refresh_interval
+        self._version: Optional[int] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def current(self, refresh: bool = False) -> int:
+        """
+        Obtém a versão atual do namespace.
+
+        Args:
+            refresh: Se True, relê a versão do Redis mesmo dentro do intervalo de atualização
+
+        Returns:
+            int: Versão atual (a última conhecida se o Redis falhar)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not refresh and self._version is not None and now < self._expires:
+                return self._version
+
+        try:
+            client = self._client_getter()
+            value = client.get(self.version_key)
+            if value is None:
+                # Versão perdida (eviction/reinício do Redis): reiniciar a partir do
+                # relógio, para não voltar a uma versão já usada por entradas antigas
+                client.set(self.version_key, time.time_ns() // 1000, nx=True)
+                value = client.get(self.version_key)
+            version = int(value)
+        except Exception as e:
+            logger.error(f"Erro ao obter versão do namespace de cache: {e}")
+            with self._lock:
+                return self._version if self._version is not None else 0
+
+        with self._lock:
+            self._version = version
+            self._expires = now + self.refresh_interval
+        return version
+
+    def key_prefix(self) -> str:
+        """
+        Retorna o prefixo das chaves da versão atual.
+
+        Returns:
+            str: Prefixo no formato '<prefixo>v<versão>:'
+        """
+        return f"{self.prefix}v{self.current()}:"
+
+    def bump(self) -> bool:
+        """
+        Incrementa a versão, descartando logicamente todas as entradas (O(1)).
+
+        Returns:
+            bool: True se a versão foi incrementada
+        """
+        try:
+            client = self._client_getter()
+            if client.get(self.version_key) is None:
+                self.current()
+            version = int(client.incr(self.version_key))
+        except Exception as e:
+            logger.error(f"Erro ao incrementar versão do namespace de cache: {e}")
+            return False
+
+        with self._lock:
+            self._version = version
+            self._expires = time.monotonic() + self.refresh_interval
+        return True
+
+class KeySweeper:
+    """
+    Varredor em segundo plano das chaves de versões antigas do namespace.
+
+    Cada iteração executa SCANs e UNLINKs até esgotar o orçamento de tempo e
+    então pausa, de modo que o servidor Redis nunca fica bloqueado.
+
+    Atributos:
+        budget (float): Orçamento de tempo por iteração em segundos
+        interval (float): Pausa entre iterações em segundos
+        stats (Dict[str, int]): Chaves examinadas, removidas e varreduras concluídas
+    """
+
+    def __init__(self, client_getter: Callable[[], Any], namespace: NamespaceVersion,
+                 budget: float = DEFAULT_SWEEP_BUDGET, interval: float = DEFAULT_SWEEP_INTERVAL,
+                 scan_count: int = DEFAULT_SCAN_COUNT):
+        """
+        Inicializa o varredor.
+
+        Args:
+            client_getter: Função que retorna o cliente Redis atual
+            namespace: Versão do namespace cujas versões antigas serão removidas
+            budget: Orçamento de tempo por iteração em segundos
+            interval: Pausa entre iterações em segundos
+            scan_count: Chaves solicitadas por chamada de SCAN
+        """
+        self._client_getter = client_getter
+        self.namespace = namespace
+        self.budget = budget
+        self.interval = interval
+        self.scan_count = scan_count
+        self._versioned = re.compile(rb"^" + re.escape(namespace.prefix.encode()) + rb"v(\d+):")
+        self._cursor = 0
+        self._thread: Optional[threading.Thread] = None
+        self._rerun = False
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {
+            'scanned': 0,
+            'unlinked': 0,
+            'sweeps': 0
+        }
+
+    def schedule(self) -> None:
+        """Agenda uma varredura completa; se houver uma em andamento, ela será repetida."""
+        with self._lock:
+            if self._thread is not None:
+                self._rerun = True
+                return
+            self._rerun = False
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="cache-sweeper")
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a varredura em andamento."""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        """Executa iterações até completar a varredura do keyspace."""
+        try:
+            while not self._stop_event.is_set():
+                if self.step():
+                    with self._lock:
+                        if not self._rerun:
+                            return
+                        self._rerun = False
+                self._stop_event.wait(self.interval)
+        except Exception as e:
+            logger.error(f"Erro na varredura de chaves de cache: {e}")
+        finally:
+            with self._lock:
+                self._thread = None
+
+    def step(self) -> bool:
+        """
+        Executa uma iteração da varredura dentro do orçamento de tempo.
+
+        Returns:
+            bool: True se o keyspace foi percorrido por completo
+        """
+        client = self._client_getter()
+        deadline = time.monotonic() + self.budget
+        pattern = f"{self.namespace.prefix}v*"
+
+        while True:
+            # Relida a cada página: outro processo pode incrementar a versão durante a
+            # varredura, e apenas versões estritamente anteriores são removidas
+            current = self.namespace.current(refresh=True)
+            self._cursor, keys = client.scan(self._cursor, match=pattern, count=self.scan_count)
+            stale = []
+            for key in keys:
+                raw = key.encode() if isinstance(key, str) else key
+                match = self._versioned.match(raw)
+                if match and int(match.group(1)) < current:
+                    stale.append(key)
+            self.stats['scanned'] += len(keys)
+            if stale:
+                # UNLINK libera a memória em uma thread do servidor, sem bloqueá-lo
+                self.stats['unlinked'] += int(client.unlink(*stale))
+            if self._cursor == 0:
+                self.stats['sweeps'] += 1
+                return True
+            if time.monotonic() >= deadline:
+                return False
@@ -0,0 +1,166 @@
+"""
+Gerenciador de conexões Redis compartilhado pelo processo.
+Todos os caches e adaptadores recebem clientes que compartilham um único pool
+limitado por servidor (BlockingConnectionPool), com keepalive de socket,
+verificação periódica das conexões ociosas e novas tentativas com backoff e
+jitter, evitando uma tempestade de reconexões após um reinício do Redis.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Conexões máximas por servidor, compartilhadas por todos os clientes do processo
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Espera máxima por uma conexão livre quando o pool está esgotado (segundos)
+DEFAULT_POOL_TIMEOUT = 5.0
+
+# Intervalo após o qual uma conexão ociosa é verificada com PING antes do uso (segundos)
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+
+# Novas tentativas em erros de conexão, com backoff exponencial e jitter
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.05
+BACKOFF_CAP = 1.0
+
+class RedisConnectionManager:
+    """
+    Fornece clientes Redis que compartilham um pool por servidor.
+
+    Os clientes são leves: fechar um deles apenas devolve sua conexão ao pool,
+    que permanece aberto até close_all().
+    """
+
+    def __init__(self):
+        """Inicializa o gerenciador (os pools são criados no primeiro uso)."""
+        self._pools: Dict[Tuple, Any] = {}
+        self._clients: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                   password: Optional[str] = None, ssl: bool = False,
+                   socket_timeout: Optional[float] = 5.0,
+                   max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                   health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL):
+        """
+        Obtém um cliente Redis sobre o pool compartilhado do servidor.
+
+        As opções do pool (max_connections, health_check_interval, socket_timeout)
+        valem a partir do primeiro cliente de cada servidor.
+
+        Args:
+            host: Host do servidor Redis
+            port: Porta do servidor Redis
+            db: Número do banco de dados Redis
+            password: Senha para autenticação
+            ssl: Se True, usa conexão SSL
+            socket_timeout: Timeout das operações em segundos
+            max_connections: Número máximo de conexões do pool
+            health_check_interval: Intervalo de verificação das conexões ociosas
+
+        Returns:
+            redis.Redis: Cliente que devolve valores binários (decode_responses=False)
+        """
+        import redis
+
+        endpoint = (host, port, db, password, ssl)
+        with self._lock:
+            pool = self._pools.get(endpoint)
+            if pool is None:
+                pool = self._create_pool(redis, host, port, db, password, ssl, socket_timeout,
+                                         max_connections, health_check_interval)
+                self._pools[endpoint] = pool
+                logger.info(f"Pool Redis criado para {host}:{port}/{db} "
+                            f"(máximo de {max_connections} conexões)")
+            self._clients[endpoint] = self._clients.get(endpoint, 0) + 1
+        return redis.Redis(connection_pool=pool)
+
+    def get_client_for_config(self, config):
+        """
+        Obtém um cliente Redis a partir de uma configuração de cache.
+
+        Args:
+            config: CacheConfig
+
+        Returns:
+            redis.Redis: Cliente sobre o pool compartilhado
+        """
+        return self.get_client(
+            host=config.redis_host,
+            port=config.redis_port,
+            db=config.redis_db,
+            password=config.redis_password,
+            max_connections=config.redis_max_connections,
+            health_check_interval=config.redis_health_check_interval
+        )
+
+    @staticmethod
+    def _create_pool(redis, host: str, port: int, db: int, password: Optional[str], ssl: bool,
+                     socket_timeout: Optional[float], max_connections: int,
+                     health_check_interval: int):
+        """Cria o pool limitado de um servidor."""
+        from redis.backoff import EqualJitterBackoff
+        from redis.retry import Retry
+
+        kwargs = {
+            'host': host,
+            'port': port,
+            'db': db,
+            'password': password,
+            'socket_timeout': socket_timeout,
+            'socket_connect_timeout': socket_timeout,
+            'socket_keepalive': True,
+            'health_check_interval': health_check_interval,
+            # Jitter espalha as reconexões dos vários clientes após um reinício
+            'retry': Retry(EqualJitterBackoff(cap=BACKOFF_CAP, base=BACKOFF_BASE), DEFAULT_RETRIES),
+            'retry_on_error': [redis.exceptions.ConnectionError, redis.exceptions.TimeoutError]
+        }
+        if ssl:
+            kwargs['connection_class'] = redis.SSLConnection
+        return redis.BlockingConnectionPool(max_connections=max_connections,
+                                            timeout=DEFAULT_POOL_TIMEOUT, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna a utilização dos pools.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Por servidor ('host:porta/db'): clientes, conexões
+            criadas, em uso, ociosas e utilização (% do máximo)
+        """
+        stats = {}
+        with self._lock:
+            for endpoint, pool in self._pools.items():
+                host, port, db = endpoint[:3]
+                created = len(getattr(pool, '_connections', []))
+                queue = getattr(getattr(pool, 'pool', None), 'queue', ())
+                # A fila do BlockingConnectionPool contém None nas vagas ainda não usadas
+                idle = sum(1 for connection in list(queue) if connection is not None)
+                in_use = max(created - idle, 0)
+                stats[f"{host}:{port}/{db}"] = {
+                    'clients': self._clients.get(endpoint, 0),
+                    'max_connections': pool.max_connections,
+                    'created': created,
+                    'in_use': in_use,
+                    'idle': idle,
+                    'utilization': in_use / pool.max_connections * 100 if pool.max_connections else 0
+                }
+        return stats
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões de todos os pools."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._clients.clear()
+        for pool in pools:
+            try:
+                pool.disconnect()
+            except Exception as e:
+                logger.error(f"Erro ao fechar pool Redis: {e}")
+
+# Instância global
+redis_connections = RedisConnectionManager()
@@ -0,0 +1,138 @@
+"""
+Modo stale-while-revalidate para resultados em cache.
+Cada entrada guarda o instante até o qual é considerada atual; depois disso, e
+até o fim do TTL de obsolescência, o valor ainda é servido imediatamente enquanto
+uma atualização é agendada em um pequeno pool de threads em segundo plano, com no
+máximo uma atualização pendente por chave.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Número de threads de atualização (poucas, para não esgotar os pools de conexão)
+DEFAULT_REFRESH_WORKERS = 2
+
+# Marcador dos envelopes com instante de validade
+_ENVELOPE_MARKER = '_swr'
+
+def wrap(value: Any, fresh_ttl: float) -> Dict[str, Any]:
+    """
+    Envolve um valor com o instante até o qual ele é considerado atual.
+
+    Usa o relógio de parede, pois o envelope pode ser compartilhado entre
+    processos através do Redis.
+
+    Args:
+        value: Valor a ser armazenado
+        fresh_ttl: Tempo em segundos durante o qual o valor é atual
+
+    Returns:
+        Dict[str, Any]: Envelope serializável
+    """
+    return {_ENVELOPE_MARKER: 1, 'fresh_until': time.time() + fresh_ttl, 'value': value}
+
+def unwrap(entry: Any) -> Tuple[Any, bool]:
+    """
+    Extrai o valor de uma entrada do cache.
+
+    Args:
+        entry: Entrada lida do cache (envelope ou valor simples)
+
+    Returns:
+        Tuple[Any, bool]: Valor e se ele já passou do tempo de validade
+    """
+    if isinstance(entry, dict) and entry.get(_ENVELOPE_MARKER) == 1:
+        return entry['value'], time.time() >= entry['fresh_until']
+    return entry, False
+
+class RefreshPool:
+    """
+    Pool de atualização em segundo plano com deduplicação por chave.
+
+    Atributos:
+        max_workers (int): Número de threads de atualização
+        stats (Dict[str, int]): Atualizações agendadas, ignoradas (já pendentes) e com falha
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_REFRESH_WORKERS):
+        """
+        Inicializa o pool (as threads só são criadas na primeira atualização).
+
+        Args:
+            max_workers: Número de threads de atualização
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            'scheduled': 0,
+            'deduplicated': 0,
+            'failed': 0
+        }
+
+    def schedule(self, key: str, refresh: Callable[[], Any]) -> bool:
+        """
+        Agenda a atualização de uma chave, se ainda não houver uma pendente.
+
+        Args:
+            key: Chave de cache a ser atualizada
+            refresh: Função que recalcula e grava o valor
+
+        Returns:
+            bool: True se a atualização foi agendada
+        """
+        with self._lock:
+            if key in self._pending:
+                self.stats['deduplicated'] += 1
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="cache-refresh")
+            self._pending.add(key)
+            self.stats['scheduled'] += 1
+            try:
+                self._executor.submit(self._run, key, refresh)
+            except RuntimeError as e:
+                # Pool encerrado (saída da aplicação): o valor obsoleto continua sendo servido
+                self._pending.discard(key)
+                logger.debug(f"Atualização de cache não agendada: {e}")
+                return False
+        return True
+
+    def _run(self, key: str, refresh: Callable[[], Any]) -> None:
+        """Executa a atualização e libera a chave para novos agendamentos."""
+        try:
+            refresh()
+        except Exception as e:
+            with self._lock:
+                self.stats['failed'] += 1
+            logger.error(f"Erro ao atualizar cache em segundo plano: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def is_pending(self, key: str) -> bool:
+        """Verifica se há atualização pendente para a chave."""
+        with self._lock:
+            return key in self._pending
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Encerra o pool de threads.
+
+        Args:
+            wait: Se True, aguarda as atualizações em andamento
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+# Instância global
+refresh_pool = RefreshPool()
@@ -0,0 +1,197 @@
+"""
+Coalescência de requisições concorrentes (single-flight) por chave de cache.
+Quando uma entrada popular expira, apenas a primeira chamada executa a consulta;
+as chamadas concorrentes com a mesma chave aguardam e recebem o mesmo resultado.
+Entre processos, um lease opcional no Redis (SET NX PX) elege um único executor,
+e os demais aguardam o resultado aparecer no cache compartilhado.
+"""
+
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tempo de vida do lease no Redis: limita o bloqueio se o processo executor morrer
+DEFAULT_LEASE_MS = 10000
+
+# Tempo máximo de espera pelo executor antes de calcular o valor localmente
+DEFAULT_WAIT_TIMEOUT = 15.0
+
+# Intervalo entre consultas ao cache enquanto outro processo detém o lease
+DEFAULT_POLL_INTERVAL = 0.05
+
+# Libera o lease apenas se ainda pertencer a este executor
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class _Call:
+    """Execução em andamento para uma chave."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Executa no máximo uma computação simultânea por chave.
+
+    Atributos:
+        prefix (str): Prefixo das chaves de lease no Redis
+        lease_ms (int): Tempo de vida do lease em milissegundos
+        wait_timeout (float): Espera máxima pelo executor, em segundos
+        stats (Dict[str, int]): Contadores de execuções, chamadas coalescidas e esperas por lease
+    """
+
+    def __init__(self, client_getter: Optional[Callable[[], Any]] = None, prefix: str = "lease:",
+                 lease_ms: int = DEFAULT_LEASE_MS, wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Inicializa o coordenador.
+
+        Args:
+            client_getter: Função que retorna o cliente Redis atual (None = apenas no processo)
+            prefix: Prefixo das chaves de lease no Redis
+            lease_ms: Tempo de vida do lease em milissegundos
+            wait_timeout: Espera máxima pelo executor, em segundos
+            poll_interval: Intervalo entre consultas ao cache durante a espera por lease
+        """
+        self._client_getter = client_getter
+        self.prefix = prefix
+        self.lease_ms = lease_ms
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'executions': 0,
+            'coalesced': 0,
+            'lease_waits': 0
+        }
+
+    def _client(self):
+        """Retorna o cliente Redis atual, ou None sem coordenação entre processos."""
+        return self._client_getter() if self._client_getter is not None else None
+
+    def do(self, key: str, compute: Callable[[], Any],
+           lookup: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Executa compute uma única vez para chamadas concorrentes com a mesma chave.
+
+        Args:
+            key: Chave de cache da computação
+            compute: Função que calcula (e armazena em cache) o valor
+            lookup: Função que lê o valor do cache (None se ausente); usada para
+                evitar recomputar um valor gravado por outro executor
+
+        Returns:
+            Any: Resultado de compute (ou do executor que a realizou)
+
+        Raises:
+            Exception: O erro lançado por compute é repassado a todas as chamadas coalescidas
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # Executor travado: calcular sem coordenação em vez de bloquear indefinidamente
+            logger.warning(f"Tempo esgotado aguardando execução coalescida: {key}")
+            return compute()
+
+        try:
+            call.result = self._lead(key, compute, lookup)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _lead(self, key: str, compute: Callable[[], Any], lookup: Optional[Callable[[], Any]]) -> Any:
+        """Executa a computação como líder do processo, coordenando com outros processos via lease."""
+        # Outro executor pode ter gravado o valor entre a falta no cache e a eleição
+        if lookup is not None:
+            value = lookup()
+            if value is not None:
+                return value
+
+        client = self._client()
+        if client is None:
+            return self._execute(compute)
+
+        token = uuid.uuid4().hex
+        lease_key = f"{self.prefix}{key}"
+        deadline = time.monotonic() + self.wait_timeout
+        while not self._acquire(client, lease_key, token):
+            # Outro processo está calculando: aguardar o resultado no cache compartilhado
+            self.stats['lease_waits'] += 1
+            if time.monotonic() >= deadline:
+                logger.warning(f"Tempo esgotado aguardando lease de cache: {key}")
+                return self._execute(compute)
+            time.sleep(self.poll_interval)
+            if lookup is not None:
+                value = lookup()
+                if value is not None:
+                    return value
+
+        try:
+            return self._execute(compute)
+        finally:
+            self._release(client, lease_key, token)
+
+    def _execute(self, compute: Callable[[], Any]) -> Any:
+        """Executa a computação contabilizando a execução."""
+        with self._lock:
+            self.stats['executions'] += 1
+        return compute()
+
+    def _acquire(self, client, lease_key: str, token: str) -> bool:
+        """
+        Tenta obter o lease com SET NX PX.
+
+        Returns:
+            bool: True se o lease foi obtido ou se o Redis está indisponível
+            (sem coordenação, cada processo calcula o próprio valor)
+        """
+        try:
+            return bool(client.set(lease_key, token, nx=True, px=self.lease_ms))
+        except Exception as e:
+            logger.error(f"Erro ao obter lease de cache no Redis: {e}")
+            return True
+
+    def _release(self, client, lease_key: str, token: str) -> None:
+        """Libera o lease se ainda pertencer a este executor."""
+        try:
+            client.eval(_RELEASE_SCRIPT, 1, lease_key, token)
+        except Exception as e:
+            logger.error(f"Erro ao liberar lease de cache no Redis: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Retorna estatísticas da coalescência.
+
+        Returns:
+            Dict[str, int]: Execuções, chamadas coalescidas, esperas por lease e chaves em andamento
+        """
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._calls)}
@@ -0,0 +1,222 @@
+"""
+Contadores de geração por tabela para invalidação de cache.
+Cada resultado em cache é gravado sob uma chave que inclui a geração atual das
+tabelas lidas pela consulta; uma escrita apenas incrementa a geração das tabelas
+alteradas (O(1)), tornando inalcançáveis as entradas antigas, que expiram pelo TTL.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def table_tags(tables: Iterable[str], is_local: Optional[bool] = None) -> List[str]:
+    """
+    Gera as etiquetas de geração das tabelas, separadas por banco.
+
+    Args:
+        tables: Nomes das tabelas
+        is_local: True para o banco local, False para o remoto, None para ambos
+
+    Returns:
+        List[str]: Etiquetas ordenadas (ex.: 'local.equipes')
+    """
+    sides = ('local', 'remote') if is_local is None else ('local' if is_local else 'remote',)
+    return sorted(f"{side}.{table}" for table in set(tables) for side in sides)
+
+class TableGenerations:
+    """
+    Registro de gerações por etiqueta de tabela.
+
+    Sem cliente Redis os contadores ficam em memória; com Redis eles são
+    compartilhados entre processos (MGET para leitura, INCR para invalidação).
+    Com local_ttl > 0 as gerações lidas do Redis ficam em uma cópia local de vida
+    curta, usada apenas enquanto local_valid() for verdadeiro; incrementos de
+    outras instâncias devem ser repassados a forget() (ex.: via pub/sub).
+
+    Atributos:
+        prefix (str): Prefixo das chaves de geração no Redis
+        local_ttl (float): Validade da cópia local em segundos (0 = desativada)
+    """
+
+    def __init__(self, client_getter: Optional[Callable[[], Any]] = None, prefix: str = "gen:",
+                 local_ttl: float = 0, local_valid: Optional[Callable[[], bool]] = None,
+                 on_bump: Optional[Callable[[List[str]], None]] = None):
+        """
+        Inicializa o registro de gerações.
+
+        Args:
+            client_getter: Função que retorna o cliente Redis atual (ou None para memória)
+            prefix: Prefixo das chaves de geração no Redis
+            local_ttl: Validade da cópia local das gerações em segundos (0 = desativada)
+            local_valid: Função que indica se a cópia local pode ser usada
+            on_bump: Chamada com as etiquetas após cada incremento (para avisar outras instâncias)
+        """
+        self._client_getter = client_getter
+        self.prefix = prefix
+        self.local_ttl = local_ttl
+        self._local_valid = local_valid
+        self._on_bump = on_bump
+        self._generations: Dict[str, int] = {}
+        # Cópia local das gerações do Redis: etiqueta -> (geração, expira em)
+        self._local: Dict[str, Tuple[int, float]] = {}
+        # Incrementado a cada descarte: leituras que cruzaram um descarte não são copiadas
+        self._local_epoch = 0
+        self._lock = threading.Lock()
+
+    def _client(self):
+        """Retorna o cliente Redis atual, ou None para contadores em memória."""
+        return self._client_getter() if self._client_getter is not None else None
+
+    def _use_local(self) -> bool:
+        """Indica se a cópia local das gerações do Redis pode ser usada."""
+        return self.local_ttl > 0 and (self._local_valid is None or self._local_valid())
+
+    def _get_local(self, tags: List[str]) -> Optional[Dict[str, int]]:
+        """Retorna as gerações da cópia local, ou None se alguma faltar ou tiver expirado."""
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for tag in tags:
+                cached = self._local.get(tag)
+                if cached is None or cached[1] <= now:
+                    return None
+                result[tag] = cached[0]
+        return result
+
+    def forget(self, tags: Optional[Iterable[str]] = None) -> None:
+        """
+        Descarta gerações da cópia local (a próxima leitura consulta o Redis).
+
+        Args:
+            tags: Etiquetas a descartar (None = todas)
+        """
+        with self._lock:
+            self._local_epoch += 1
+            if tags is None:
+                self._local.clear()
+            else:
+                for tag in tags:
+                    self._local.pop(tag, None)
+
+    def get_many(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """
+        Obtém a geração atual de cada etiqueta.
+
+        Args:
+            tags: Etiquetas das tabelas
+
+        Returns:
+            Optional[Dict[str, int]]: Gerações por etiqueta, ou None se o Redis falhar
+            (o chamador deve então ignorar o cache)
+        """
+        tags = list(tags)
+        if not tags:
+            return {}
+
+        client = self._client()
+        if client is None:
+            with self._lock:
+                return {tag: self._generations.get(tag, 0) for tag in tags}
+
+        use_local = self._use_local()
+        if use_local:
+            local = self._get_local(tags)
+            if local is not None:
+                return local
+            with self._lock:
+                epoch = self._local_epoch
+
+        try:
+            keys = [f"{self.prefix}{tag}" for tag in tags]
+            values = client.mget(keys)
+            missing = [key for key, value in zip(keys, values) if value is None]
+            if missing:
+                # Contador perdido (eviction/reinício do Redis): reiniciar a partir do
+                # relógio, para não voltar a um valor já usado por entradas antigas
+                seed = time.time_ns() // 1000
+                pipe = client.pipeline()
+                for key in missing:
+                    pipe.set(key, seed, nx=True)
+                pipe.execute()
+                values = client.mget(keys)
+            generations = {tag: int(value) for tag, value in zip(tags, values)}
+        except Exception as e:
+            logger.error(f"Erro ao obter gerações de tabelas no Redis: {e}")
+            return None
+
+        if use_local:
+            expires_at = time.monotonic() + self.local_ttl
+            with self._lock:
+                if self._local_epoch == epoch:
+                    for tag, generation in generations.items():
+                        self._local[tag] = (generation, expires_at)
+        return generations
+
+    def bump(self, tags: Iterable[str]) -> bool:
+        """
+        Incrementa a geração das etiquetas, invalidando as entradas que as usam.
+
+        Args:
+            tags: Etiquetas das tabelas alteradas
+
+        Returns:
+            bool: True se todas as gerações foram incrementadas
+            (em caso de falha o chamador deve limpar o cache)
+        """
+        tags = list(tags)
+        if not tags:
+            return True
+
+        client = self._client()
+        if client is None:
+            with self._lock:
+                for tag in tags:
+                    self._generations[tag] = self._generations.get(tag, 0) + 1
+            return True
+
+        try:
+            pipe = client.pipeline()
+            for tag in tags:
+                pipe.incr(f"{self.prefix}{tag}")
+            pipe.execute()
+            success = True
+        except Exception as e:
+            logger.error(f"Erro ao incrementar gerações de tabelas no Redis: {e}")
+            success = False
+
+        # Mesmo após falha, a cópia local destas etiquetas não é mais confiável
+        self.forget(tags)
+        if self._on_bump is not None:
+            self._on_bump(tags)
+        return success
+
+
+    def restore(self, saved: Dict[str, int]) -> List[str]:
+        """
+        Restaura gerações salvas por uma execução anterior (warm start).
+
+        Só são restauradas as etiquetas ainda não incrementadas nesta execução:
+        uma escrita já ocorrida torna as entradas salvas dessas tabelas inválidas.
+        Com Redis as gerações já são persistentes e nada é alterado.
+
+        Args:
+            saved: Gerações por etiqueta no momento do snapshot
+
+        Returns:
+            List[str]: Etiquetas cujas entradas salvas continuam válidas
+        """
+        if self._client() is not None:
+            current = self.get_many(saved) or {}
+            return [tag for tag, generation in saved.items() if current.get(tag) == generation]
+
+        restored = []
+        with self._lock:
+            for tag, generation in saved.items():
+                # Etiqueta já incrementada: mesmo um valor igual corresponde a outros dados
+                if tag not in self._generations:
+                    self._generations[tag] = generation
+                    restored.append(tag)
+        return restored
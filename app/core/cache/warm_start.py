@@ -0,0 +1,277 @@
+"""
+Snapshot de aquecimento (warm start) dos caches em memória.
+No encerramento, as entradas mais usadas de cada cache registrado são gravadas em
+disco com suas etiquetas de tabela, expiração e a marca d'água de sincronização
+de cada tabela. Na inicialização seguinte o snapshot é recarregado em segundo
+plano, descartando entradas expiradas e as de tabelas cuja marca d'água mudou.
+Recurso opcional: ativado por CACHE_SETTINGS['warm_start'].
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.config.settings import CACHE_DIR, CACHE_SETTINGS
+from app.core.cache.codec import Codec, CodecError
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do snapshot: alterá-la descarta os snapshots antigos
+SNAPSHOT_VERSION = 1
+
+# Número padrão de entradas gravadas por cache
+DEFAULT_MAX_ENTRIES = 200
+
+WatermarkGetter = Callable[[str], Optional[datetime]]
+
+def rank_entries(entries: Iterable[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Seleciona as entradas mais quentes.
+
+    Args:
+        entries: Entradas com 'hits' e 'recency' (maior = usada mais recentemente)
+        limit: Número máximo de entradas
+
+    Returns:
+        List[Dict[str, Any]]: Entradas ordenadas por acertos e, no empate, por recência
+    """
+    ranked = sorted(entries, key=lambda entry: (entry.get('hits', 0), entry.get('recency', 0)),
+                    reverse=True)
+    return ranked[:limit]
+
+def _table(tag: str) -> str:
+    """Extrai o nome da tabela de uma etiqueta ('local.equipes' → 'equipes')."""
+    return tag.split('.', 1)[-1]
+
+class CacheSnapshot:
+    """
+    Arquivo de snapshot de um cache.
+
+    Cada entrada exportada pelo cache é um dicionário com 'key', 'value',
+    'ttl' (segundos restantes ou None), 'tags', 'hits' e 'recency'.
+
+    Atributos:
+        path (Path): Arquivo do snapshot
+        max_entries (int): Número máximo de entradas gravadas
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 watermark_getter: Optional[WatermarkGetter] = None):
+        """
+        Inicializa o snapshot.
+
+        Args:
+            path: Arquivo do snapshot
+            max_entries: Número máximo de entradas gravadas
+            watermark_getter: Função que retorna a marca d'água de sincronização de uma tabela
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.watermark_getter = watermark_getter
+        self.codec = Codec()
+
+    def _watermark(self, table: str) -> Optional[str]:
+        """Marca d'água atual de uma tabela em formato ISO, ou None."""
+        if self.watermark_getter is None:
+            return None
+        watermark = self.watermark_getter(table)
+        return watermark.isoformat() if watermark is not None else None
+
+    def save(self, entries: Iterable[Dict[str, Any]],
+             generations: Optional[Dict[str, int]] = None) -> int:
+        """
+        Grava as entradas mais quentes de forma atômica.
+
+        Args:
+            entries: Entradas exportadas pelo cache
+            generations: Gerações atuais das etiquetas de tabela (se as chaves as incluem)
+
+        Returns:
+            int: Número de entradas gravadas
+        """
+        now = time.time()
+        selected = []
+        for entry in rank_entries(entries, self.max_entries):
+            ttl = entry.get('ttl')
+            if ttl is not None and ttl <= 0:
+                continue
+            selected.append({
+                'key': entry['key'],
+                'value': entry['value'],
+                'tags': list(entry.get('tags') or ()),
+                'hits': entry.get('hits', 0),
+                # Expiração em tempo de relógio, válida entre execuções
+                'expires_at': now + ttl if ttl is not None else None
+            })
+
+        tags = {tag for entry in selected for tag in entry['tags']}
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': now,
+            'entries': selected,
+            'watermarks': {_table(tag): self._watermark(_table(tag)) for tag in tags},
+            'generations': {tag: generations[tag] for tag in tags if tag in generations}
+                           if generations else {}
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        temp_path.write_bytes(self.codec.encode(snapshot))
+        os.replace(temp_path, self.path)
+        logger.info(f"Snapshot de cache gravado: {len(selected)} entradas em {self.path.name}")
+        return len(selected)
+
+    def load(self) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Lê o snapshot e o remove (cada snapshot é usado uma única vez).
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, int]]: Entradas ainda válidas, com
+            'ttl' recalculado, e as gerações salvas
+        """
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return [], {}
+        finally:
+            self.path.unlink(missing_ok=True)
+
+        try:
+            snapshot = self.codec.decode(data)
+        except CodecError as e:
+            logger.warning(f"Snapshot de cache ignorado: {e}")
+            return [], {}
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            logger.warning(f"Snapshot de cache em formato desconhecido ignorado: {self.path.name}")
+            return [], {}
+
+        # Tabelas sincronizadas desde o snapshot: seus dados podem ter mudado. Uma marca
+        # d'água salva e desconhecida agora (ex.: registro perdido) também conta como mudança
+        moved = {table for table, saved in snapshot['watermarks'].items()
+                 if self._watermark(table) != saved}
+
+        now = time.time()
+        valid = []
+        for entry in snapshot['entries']:
+            expires_at = entry['expires_at']
+            if expires_at is not None and expires_at <= now:
+                continue
+            if any(_table(tag) in moved for tag in entry['tags']):
+                continue
+            valid.append({**entry, 'ttl': expires_at - now if expires_at is not None else None})
+
+        dropped = len(snapshot['entries']) - len(valid)
+        logger.info(f"Snapshot de cache lido: {len(valid)} entradas válidas, {dropped} descartadas")
+        return valid, snapshot['generations']
+
+class WarmStart:
+    """
+    Coordena os snapshots dos caches registrados.
+
+    Os caches registrados implementam export_entries() e import_entries(entries).
+
+    Atributos:
+        enabled (bool): Se False, registro, restauração e gravação não fazem nada
+        directory (Path): Diretório dos snapshots
+        max_entries (int): Número máximo de entradas por cache
+    """
+
+    def __init__(self, directory: Path, max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = False):
+        """
+        Inicializa o coordenador.
+
+        Args:
+            directory: Diretório dos snapshots
+            max_entries: Número máximo de entradas por cache
+            enabled: Ativa o recurso
+        """
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._caches: Dict[str, Tuple[Any, Any, CacheSnapshot]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, cache: Any, generations: Any = None,
+                 watermark_getter: Optional[WatermarkGetter] = None) -> None:
+        """
+        Registra um cache.
+
+        Args:
+            name: Nome do cache (também o nome do arquivo de snapshot)
+            cache: Cache com export_entries() e import_entries()
+            generations: TableGenerations usado nas chaves do cache (opcional)
+            watermark_getter: Função que retorna a marca d'água de sincronização de uma tabela
+        """
+        if not self.enabled:
+            return
+        snapshot = CacheSnapshot(self.directory / f"{name}.snapshot", self.max_entries, watermark_getter)
+        with self._lock:
+            self._caches[name] = (cache, generations, snapshot)
+
+    def restore(self) -> int:
+        """
+        Recarrega os snapshots nos caches registrados.
+
+        Returns:
+            int: Número de entradas restauradas
+        """
+        with self._lock:
+            caches = list(self._caches.items())
+
+        restored = 0
+        for name, (cache, generations, snapshot) in caches:
+            try:
+                entries, saved_generations = snapshot.load()
+                if saved_generations and generations is not None:
+                    # As chaves incluem as gerações: só valem se elas puderem ser restauradas
+                    current = set(generations.restore(saved_generations))
+                    entries = [entry for entry in entries
+                               if all(tag in current for tag in entry['tags'] if tag in saved_generations)]
+                restored += cache.import_entries(entries)
+            except Exception as e:
+                logger.error(f"Erro ao restaurar snapshot do cache {name}: {e}")
+        return restored
+
+    def restore_async(self) -> Optional[threading.Thread]:
+        """
+        Recarrega os snapshots em segundo plano.
+
+        Returns:
+            Optional[threading.Thread]: Thread da restauração, ou None se desativado
+        """
+        if not self.enabled:
+            return None
+        thread = threading.Thread(target=self.restore, daemon=True, name="cache-warm-start")
+        thread.start()
+        return thread
+
+    def save_all(self) -> int:
+        """
+        Grava o snapshot de cada cache registrado.
+
+        Returns:
+            int: Número total de entradas gravadas
+        """
+        with self._lock:
+            caches = list(self._caches.items())
+
+        saved = 0
+        for name, (cache, generations, snapshot) in caches:
+            try:
+                entries = cache.export_entries()
+                tags = {tag for entry in entries for tag in entry.get('tags') or ()}
+                current = generations.get_many(tags) if generations is not None and tags else None
+                saved += snapshot.save(entries, current)
+            except Exception as e:
+                logger.error(f"Erro ao gravar snapshot do cache {name}: {e}")
+        return saved
+
+# Instância global
+warm_start = WarmStart(
+    CACHE_DIR / 'warm_start',
+    CACHE_SETTINGS.get('warm_start_entries', DEFAULT_MAX_ENTRIES),
+    CACHE_SETTINGS.get('warm_start', False)
+)
@@ -0,0 +1,8 @@
+"""
+Métricas da aplicação em séries temporais de buffer circular.
+"""
+
+from app.core.metrics.timeseries import TimeSeries
+from app.core.metrics.registry import MetricsRegistry, metrics
+
+__all__ = ['TimeSeries', 'MetricsRegistry', 'metrics']
@@ -0,0 +1,82 @@
+"""
+Registro das séries temporais de métricas da aplicação.
+Monitores de memória e de cache, pools de conexão e a sincronização obtêm suas
+séries pelo nome; cada série é um buffer circular em um arquivo próprio dentro
+do diretório de métricas.
+"""
+
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from app.config.settings import CACHE_DIR
+from app.core.metrics.timeseries import DEFAULT_CAPACITY, TimeSeries
+
+logger = logging.getLogger(__name__)
+
+class MetricsRegistry:
+    """
+    Séries temporais nomeadas, criadas no primeiro uso.
+
+    Atributos:
+        directory (Optional[Path]): Diretório dos arquivos (None = séries em memória)
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Inicializa o registro.
+
+        Args:
+            directory: Diretório dos arquivos (None = séries em memória)
+        """
+        self.directory = Path(directory) if directory else None
+        self._series: Dict[str, TimeSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, name: str, fields: Sequence[str], capacity: int = DEFAULT_CAPACITY) -> TimeSeries:
+        """
+        Obtém (ou cria) uma série.
+
+        Se o arquivo não puder ser usado, a série é mantida apenas em memória.
+
+        Args:
+            name: Nome da série (também o nome do arquivo)
+            fields: Nomes dos campos de cada amostra
+            capacity: Número máximo de amostras mantidas
+
+        Returns:
+            TimeSeries: Série registrada com esse nome
+        """
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                path = self.directory / f"{name}.ts" if self.directory else None
+                try:
+                    series = TimeSeries(fields, capacity, path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Erro ao abrir série de métricas '{name}', usando memória: {e}")
+                    series = TimeSeries(fields, capacity)
+                self._series[name] = series
+            elif series.fields != tuple(fields):
+                raise ValueError(f"Série '{name}' já registrada com os campos {series.fields}")
+            return series
+
+    def names(self) -> List[str]:
+        """Retorna os nomes das séries registradas."""
+        with self._lock:
+            return sorted(self._series)
+
+    def flush_all(self) -> None:
+        """Grava no disco todas as séries."""
+        with self._lock:
+            series = list(self._series.values())
+        for item in series:
+            try:
+                item.flush()
+            except Exception as e:
+                logger.error(f"Erro ao gravar série de métricas: {e}")
+
+# Instância global
+metrics = MetricsRegistry(CACHE_DIR / 'metrics')
+atexit.register(metrics.flush_all)
@@ -0,0 +1,268 @@
+"""
+Série temporal numérica em buffer circular binário de tamanho fixo.
+Cada amostra é um registro de float64 (instante + um valor por campo) gravado em
+posição fixa de um mmap, de modo que acrescentar é O(1) e não há reescrita de
+histórico. Com um arquivo, o buffer é persistente entre execuções; sem arquivo,
+usa memória anônima.
+"""
+
+import mmap
+import time
+import zlib
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho: magia, versão, número de campos, CRC dos nomes, capacidade, próxima posição, amostras
+MAGIC = b"CXTS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQ")
+
+# Número padrão de amostras mantidas
+DEFAULT_CAPACITY = 1440
+
+class TimeSeries:
+    """
+    Buffer circular de amostras numéricas com instante.
+
+    Os instantes devem ser não decrescentes (time.time() por padrão): as consultas
+    por intervalo usam busca binária sobre o buffer. Thread-safe.
+
+    Atributos:
+        fields (Tuple[str, ...]): Nomes dos campos de cada amostra
+        capacity (int): Número máximo de amostras mantidas
+        path (Optional[Path]): Arquivo do buffer (None = memória anônima)
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = DEFAULT_CAPACITY,
+                 path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa a série, reaproveitando o arquivo se ele tiver o mesmo formato.
+
+        Args:
+            fields: Nomes dos campos de cada amostra
+            capacity: Número máximo de amostras mantidas
+            path: Arquivo do buffer (None = memória anônima)
+        """
+        if not fields or capacity <= 0:
+            raise ValueError("A série precisa de ao menos um campo e capacidade positiva")
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.path = Path(path) if path else None
+        self._record = struct.Struct("<" + "d" * (len(self.fields) + 1))
+        self._schema = zlib.crc32(",".join(self.fields).encode("utf-8"))
+        self._size = HEADER.size + capacity * self._record.size
+        self._lock = threading.Lock()
+        self._file = None
+        self._buffer = self._open()
+        self._head, self._count = self._read_header()
+
+    def _open(self) -> mmap.mmap:
+        """Mapeia o arquivo (recriando-o se o formato mudou) ou memória anônima."""
+        if self.path is None:
+            buffer = mmap.mmap(-1, self._size)
+            self._write_header(buffer, 0, 0)
+            return buffer
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self._file = open(self.path, "r+b")
+        self._file.seek(0, 2)
+        valid = self._file.tell() == self._size
+        if valid:
+            self._file.seek(0)
+            valid = self._header_matches(self._file.read(HEADER.size))
+        if not valid:
+            self._file.truncate(0)
+            self._file.truncate(self._size)
+        buffer = mmap.mmap(self._file.fileno(), self._size)
+        if not valid:
+            logger.info(f"Série temporal criada: {self.path.name}")
+            self._write_header(buffer, 0, 0)
+        return buffer
+
+    def _header_matches(self, data: bytes) -> bool:
+        """Verifica se um cabeçalho corresponde ao formato desta série."""
+        if len(data) < HEADER.size:
+            return False
+        magic, version, n_fields, schema, capacity, head, count = HEADER.unpack(data)
+        return (magic == MAGIC and version == FORMAT_VERSION and n_fields == len(self.fields)
+                and schema == self._schema and capacity == self.capacity
+                and head < capacity and count <= capacity)
+
+    def _write_header(self, buffer: mmap.mmap, head: int, count: int) -> None:
+        """Grava o cabeçalho com a posição e o número de amostras."""
+        HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, len(self.fields), self._schema,
+                         self.capacity, head, count)
+
+    def _read_header(self):
+        """Lê a posição e o número de amostras do cabeçalho."""
+        header = HEADER.unpack_from(self._buffer, 0)
+        return header[5], header[6]
+
+    def append(self, values: Union[Mapping[str, float], Sequence[float]],
+               timestamp: Optional[float] = None) -> None:
+        """
+        Acrescenta uma amostra (O(1)), sobrescrevendo a mais antiga se o buffer estiver cheio.
+
+        Args:
+            values: Valores por campo (mapeamento) ou na ordem de fields; campos ausentes valem NaN
+            timestamp: Instante da amostra (padrão: time.time())
+        """
+        if isinstance(values, Mapping):
+            row = [float(values.get(field, float("nan"))) for field in self.fields]
+        else:
+            row = [float(value) for value in values]
+            if len(row) != len(self.fields):
+                raise ValueError(f"Esperados {len(self.fields)} valores, recebidos {len(row)}")
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            offset = HEADER.size + self._head * self._record.size
+            self._record.pack_into(self._buffer, offset, timestamp, *row)
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._write_header(self._buffer, self._head, self._count)
+
+    def _unpack(self, index: int) -> tuple:
+        """Lê a amostra de índice lógico (0 = mais antiga); requer o lock."""
+        position = (self._head - self._count + index) % self.capacity
+        return self._record.unpack_from(self._buffer, HEADER.size + position * self._record.size)
+
+    def _timestamp(self, index: int) -> float:
+        """Lê apenas o instante da amostra de índice lógico; requer o lock."""
+        position = (self._head - self._count + index) % self.capacity
+        return struct.unpack_from("<d", self._buffer, HEADER.size + position * self._record.size)[0]
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """Busca binária do instante no buffer; requer o lock."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            value = self._timestamp(middle)
+            if value < timestamp or (right and value == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _rows(self, start: Optional[float], end: Optional[float]) -> List[tuple]:
+        """Amostras com start <= instante <= end, da mais antiga para a mais recente."""
+        with self._lock:
+            first = self._bisect(start, right=False) if start is not None else 0
+            last = self._bisect(end, right=True) if end is not None else self._count
+            return [self._unpack(index) for index in range(first, last)]
+
+    def _to_dict(self, row: tuple) -> Dict[str, float]:
+        """Converte um registro em dicionário com 'timestamp' e os campos."""
+        return {'timestamp': row[0], **dict(zip(self.fields, row[1:]))}
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, float]]:
+        """
+        Retorna as amostras de um intervalo.
+
+        Args:
+            start: Instante inicial (inclusive; None = desde a mais antiga)
+            end: Instante final (inclusive; None = até a mais recente)
+
+        Returns:
+            List[Dict[str, float]]: Amostras com 'timestamp' e os campos
+        """
+        return [self._to_dict(row) for row in self._rows(start, end)]
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """
+        Retorna a amostra mais recente.
+
+        Returns:
+            Optional[Dict[str, float]]: Amostra ou None se a série está vazia
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            row = self._unpack(self._count - 1)
+        return self._to_dict(row)
+
+    def _summarize(self, rows: List[tuple]) -> Dict[str, Any]:
+        """Calcula média, mínimo, máximo e último valor de cada campo (NaN é ignorado)."""
+        summary: Dict[str, Any] = {'count': len(rows)}
+        for column, field in enumerate(self.fields, start=1):
+            values = [row[column] for row in rows if row[column] == row[column]]
+            if values:
+                summary[field] = {
+                    'avg': sum(values) / len(values),
+                    'min': min(values),
+                    'max': max(values),
+                    'last': values[-1]
+                }
+        return summary
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Resume as amostras de um intervalo.
+
+        Args:
+            start: Instante inicial (inclusive)
+            end: Instante final (inclusive)
+
+        Returns:
+            Dict[str, Any]: 'count' e, por campo, 'avg', 'min', 'max' e 'last'
+        """
+        return self._summarize(self._rows(start, end))
+
+    def downsample(self, bucket_seconds: float, start: Optional[float] = None,
+                   end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Agrupa as amostras em intervalos fixos e resume cada um.
+
+        Args:
+            bucket_seconds: Duração de cada intervalo em segundos
+            start: Instante inicial (inclusive)
+            end: Instante final (inclusive)
+
+        Returns:
+            List[Dict[str, Any]]: Por intervalo não vazio: 'timestamp' (início) e o resumo
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds deve ser positivo")
+        buckets: List[Dict[str, Any]] = []
+        current_bucket = None
+        rows: List[tuple] = []
+        for row in self._rows(start, end):
+            bucket = row[0] - row[0] % bucket_seconds
+            if bucket != current_bucket and rows:
+                buckets.append({'timestamp': current_bucket, **self._summarize(rows)})
+                rows = []
+            current_bucket = bucket
+            rows.append(row)
+        if rows:
+            buckets.append({'timestamp': current_bucket, **self._summarize(rows)})
+        return buckets
+
+    def clear(self) -> None:
+        """Remove todas as amostras."""
+        with self._lock:
+            self._head = self._count = 0
+            self._write_header(self._buffer, 0, 0)
+
+    def flush(self) -> None:
+        """Grava no disco as páginas alteradas do arquivo."""
+        if self.path is not None:
+            with self._lock:
+                self._buffer.flush()
+
+    def close(self) -> None:
+        """Grava e libera o mapeamento e o arquivo."""
+        with self._lock:
+            if self.path is not None:
+                self._buffer.flush()
+            self._buffer.close()
+            if self._file is not None:
+                self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+class ConnectionObserver:
+    """Disponibilidade do banco remoto, derivada dos circuit breakers remotos."""
+
+    def __init__(self):
+        self._open_circuits: Set[str] = set()
+        self._lock = threading.Lock()
+        self._observers = []
+
+    def is_remote_available(self) -> bool:
+        """Verifica se o banco remoto está disponível (nenhum circuito remoto aberto)"""
+        return not self._open_circuits
+
+    def on_circuit_state_change(self, name: str, old_state: str, new_state: str):
+        """Atualiza a disponibilidade a partir da mudança de estado de um circuito remoto"""
+        with self._lock:
+            was_available = not self._open_circuits
+            if new_state == 'closed':
+                self._open_circuits.discard(name)
+            else:
+                self._open_circuits.add(name)
+            available = not self._open_circuits
+
+        if available != was_available:
+            logger.info(f"Banco remoto {'disponível' if available else 'indisponível: modo offline'}")
+            self._notify_observers(available)
+
+    def add_observer(self, callback):
+        """Adiciona um observer"""
+        if callback not in self._observers:
+            self._observers.append(callback)
+
+    def remove_observer(self, callback):
+        """Remove um observer"""
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify_observers(self, available: bool):
+        """Notifica os observers sobre mudanças"""
+        for observer in list(self._observers):
+            try:
+                observer(available)
+            except Exception as e:
+                logger.error(f"Erro ao notificar observer de conexão: {e}")
+
+# Instância global do observer
+connection_observer = ConnectionObserver()
+
+def is_remote_available() -> bool:
+    """Verifica se o banco remoto está disponível"""
+    return connection_observer.is_remote_available()
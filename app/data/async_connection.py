@@ -0,0 +1,175 @@
+"""
+Fachada assíncrona sobre o gerenciador de conexões.
+Executa as chamadas bloqueantes do banco em uma thread de I/O dedicada, com seu
+próprio event loop asyncio, para que a thread da interface nunca espere por SQL.
+"""
+
+import asyncio
+import logging
+import threading
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de chamadas ao banco executadas simultaneamente
+# (abaixo do tamanho padrão dos pools, para não esgotá-los)
+DEFAULT_MAX_WORKERS = 4
+
+class AsyncDatabase:
+    """
+    Fachada assíncrona do DatabaseConnection.
+
+    As corrotinas (aquery, aupdate, ...) rodam no event loop da thread de I/O e
+    delegam as chamadas bloqueantes a um pool de threads, permitindo consultas
+    concorrentes com asyncio.gather. Da thread da interface, use submit() para
+    agendar uma corrotina e obter um Future cancelável.
+
+    Atributos:
+        max_workers (int): Número máximo de chamadas simultâneas ao banco
+    """
+
+    def __init__(self, db_connection=None, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Inicializa a fachada (a thread de I/O só é criada no primeiro uso).
+
+        Args:
+            db_connection: Instância de DatabaseConnection (padrão: a instância global)
+            max_workers: Número máximo de chamadas simultâneas ao banco
+        """
+        self._db = db_connection
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def db(self):
+        """Gerenciador de conexões usado pela fachada."""
+        if self._db is None:
+            from app.data.connection import get_db_connection
+            self._db = get_db_connection()
+        return self._db
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Inicia a thread de I/O com o event loop, se ainda não estiver em execução."""
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="db-io")
+                self._loop = asyncio.new_event_loop()
+                self._loop.set_default_executor(self._executor)
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(self._loop, ready),
+                    daemon=True,
+                    name="db-async-loop"
+                )
+                self._thread.start()
+                ready.wait()
+                logger.debug("Event loop assíncrono do banco iniciado")
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        """Executa o event loop na thread de I/O."""
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """
+        Agenda uma corrotina no event loop do banco a partir de qualquer thread.
+
+        Cancelar o Future cancela a corrotina; uma chamada SQL já em andamento
+        termina na thread de I/O, mas seu resultado é descartado.
+
+        Args:
+            coro: Corrotina a ser executada
+
+        Returns:
+            Future: Resultado da corrotina
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def arun(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa uma função bloqueante no pool de threads de I/O.
+
+        Args:
+            func: Função a ser executada
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            Resultado da função
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def aquery(self, query: str, params: tuple = None, is_local: bool = True,
+                     use_cache: bool = False) -> List[Dict]:
+        """
+        Executa uma consulta SQL sem bloquear o chamador.
+
+        Args:
+            query: Consulta SQL
+            params: Parâmetros para a consulta
+            is_local: Se True, usa o banco local, caso contrário o remoto
+            use_cache: Se True, usa cache para consultas de leitura
+
+        Returns:
+            List[Dict]: Resultados da consulta
+        """
+        return await self.arun(self.db.execute_query, query, params, is_local, use_cache)
+
+    async def aupdate(self, query: str, params: tuple = None, is_local: bool = True) -> int:
+        """
+        Executa uma operação de atualização sem bloquear o chamador.
+
+        Args:
+            query: Consulta SQL
+            params: Parâmetros para a consulta
+            is_local: Se True, usa o banco local, caso contrário o remoto
+
+        Returns:
+            int: Número de linhas afetadas
+        """
+        return await self.arun(self.db.execute_update, query, params, is_local)
+
+    async def atest_connection(self, credentials: Optional[Dict] = None) -> bool:
+        """
+        Testa a conexão com o banco de dados sem bloquear o chamador.
+
+        Ao contrário de DatabaseConnection.test_connection, não altera o status
+        label: widgets só podem ser atualizados pela thread da interface.
+
+        Args:
+            credentials: Credenciais para testar (opcional)
+
+        Returns:
+            bool: True se a conexão for bem-sucedida
+        """
+        return await self.arun(self.db.mysql_connection.test_connection, credentials)
+
+    def close(self) -> None:
+        """Para o event loop e o pool de threads de I/O."""
+        with self._lock:
+            if self._loop is not None and self._thread.is_alive():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._loop = None
+            self._thread = None
+            self._executor = None
+
+# Instância global da fachada assíncrona
+async_db = AsyncDatabase()
@@ -5,9 +5,10 @@ Permite escolher entre diferentes implementações de cache.
 
 import logging
 import os
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from enum import Enum, auto
 from app.config.settings import CACHE_DIR
+from app.core.cache.table_generations import TableGenerations
 
 logger = logging.getLogger(__name__)
 
@@ -120,12 +121,14 @@ class NullCache:
     def __init__(self, **kwargs):
         """Inicializa o cache nulo."""
         self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self.generations = TableGenerations()
         
     def get(self, key: str) -> None:
         """Sempre retorna None."""
         return None
         
-    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+    def set(self, key: str, value: Any, timeout: Optional[int] = None,
+            tags: Optional[List[str]] = None) -> bool:
         """Não faz nada e retorna True."""
         return True
         
@@ -133,6 +136,18 @@ class NullCache:
         """Não faz nada e retorna True."""
         return True
         
+    def get_many(self, keys: list) -> Dict:
+        """Sempre retorna um dicionário vazio."""
+        return {}
+        
+    def set_many(self, items: Dict, timeout: Optional[int] = None, timeouts: Optional[Dict] = None) -> bool:
+        """Não faz nada e retorna True."""
+        return True
+        
+    def delete_many(self, keys: list) -> int:
+        """Não faz nada e retorna 0."""
+        return 0
+        
     def clear(self) -> bool:
         """Não faz nada e retorna True."""
         return True
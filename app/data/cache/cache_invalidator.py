@@ -1,7 +1,10 @@
 import logging
-from typing import Set, Dict, List
+import threading
+import weakref
+from typing import Iterable, Optional, Set, Dict, List
 from datetime import datetime, timedelta
 import re
+from app.core.cache.table_generations import table_tags
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,10 @@ class CacheInvalidator:
         self._compiled_patterns: Dict[str, re.Pattern] = {}
         self._compile_patterns()
         
+        # Caches com gerações por tabela (referências fracas: caches descartados saem sozinhos)
+        self._caches = weakref.WeakSet()
+        self._caches_lock = threading.Lock()
+        
     def _compile_patterns(self):
         """Compila padrões de regex para melhor performance"""
         for table, patterns in self.invalidation_patterns.items():
@@ -53,5 +60,72 @@ class CacheInvalidator:
                 
         return tables
 
+    def register_cache(self, cache) -> None:
+        """
+        Registra um cache para invalidação por tabela.
+        
+        Args:
+            cache: Cache com o atributo generations (TableGenerations) e o método clear()
+        """
+        with self._caches_lock:
+            self._caches.add(cache)
+    
+    def unregister_cache(self, cache) -> None:
+        """
+        Remove um cache do registro.
+        
+        Args:
+            cache: Cache registrado
+        """
+        with self._caches_lock:
+            self._caches.discard(cache)
+    
+    def invalidate_tables(self, tables: Iterable[str], is_local: Optional[bool] = None) -> None:
+        """
+        Invalida em todos os caches registrados as consultas que leem as tabelas.
+        
+        Incrementa apenas a geração de cada tabela (O(1)); se o incremento falhar
+        (ex.: Redis indisponível) o cache afetado é limpo por completo.
+        
+        Args:
+            tables: Nomes das tabelas alteradas
+            is_local: True para o banco local, False para o remoto, None para ambos
+        """
+        tags = table_tags(tables, is_local)
+        if not tags:
+            return
+        
+        with self._caches_lock:
+            caches = list(self._caches)
+        
+        for cache in caches:
+            try:
+                if not cache.generations.bump(tags):
+                    cache.clear()
+            except Exception as e:
+                logger.error(f"Erro ao invalidar cache das tabelas {tags}: {e}")
+        logger.debug(f"Cache invalidado para: {', '.join(tags)}")
+    
+    def invalidate_table(self, table_name: str, is_local: Optional[bool] = None) -> None:
+        """
+        Invalida em todos os caches registrados as consultas que leem uma tabela.
+        
+        Args:
+            table_name: Nome da tabela
+            is_local: True para o banco local, False para o remoto, None para ambos
+        """
+        self.invalidate_tables([table_name.lower()], is_local)
+    
+    def invalidate_all(self) -> None:
+        """Limpa todos os caches registrados."""
+        with self._caches_lock:
+            caches = list(self._caches)
+        
+        for cache in caches:
+            try:
+                cache.clear()
+            except Exception as e:
+                logger.error(f"Erro ao limpar cache: {e}")
+
 # Instância global
 cache_invalidator = CacheInvalidator() 
\ No newline at end of file
@@ -1,14 +1,27 @@
 import logging
 import psutil
 import threading
-from typing import Dict
-from datetime import datetime, timedelta
-import json
-from pathlib import Path
-from app.config.settings import CACHE_DIR
+import weakref
+from typing import Callable, Dict, List
+from datetime import datetime
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Níveis de pressão de memória
+PRESSURE_NORMAL = 0
+PRESSURE_WARNING = 1
+PRESSURE_CRITICAL = 2
+
+# Intervalo entre amostras de memória em segundos
+SAMPLE_INTERVAL = 5
+
+# Pontos percentuais abaixo do limite necessários para sair de um nível de pressão
+PRESSURE_HYSTERESIS = 5.0
+
+# Campos numéricos gravados no histórico de memória
+HISTORY_FIELDS = ('rss', 'vms', 'percent', 'system_percent')
+
 class MemoryMonitor:
     _instance = None
     
@@ -23,30 +36,116 @@ class MemoryMonitor:
             self.initialized = True
             self.warning_threshold = warning_threshold  # % de memória
             self.critical_threshold = critical_threshold
-            self.stats_file = CACHE_DIR / 'memory_stats.json'
-            self.stats_history = []
             self.max_history = 1000
+            # Histórico em buffer circular persistente (acréscimo O(1))
+            self.history = metrics.series('memory', HISTORY_FIELDS, capacity=self.max_history)
+            self.sample_interval = SAMPLE_INTERVAL
+            self.history_interval = 60  # Uma amostra no histórico por minuto
             self._monitor_thread = None
             self._stop_monitor = False
-            self._load_stats()
+            self._stop_event = threading.Event()
+            self._thread_lock = threading.Lock()
+            # Último nível de pressão amostrado (lido sem chamadas ao sistema)
+            self.pressure = PRESSURE_NORMAL
+            self.last_sample: Dict = {}
+            self._listeners: List = []
+            self._listeners_lock = threading.Lock()
         
     def start_monitoring(self):
-        """Inicia monitoramento em thread separada"""
-        self._stop_monitor = False
-        self._monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            daemon=True,
-            name="Memory-Monitor"
-        )
-        self._monitor_thread.start()
+        """Inicia monitoramento em thread separada (chamadas repetidas são ignoradas)"""
+        with self._thread_lock:
+            if self._monitor_thread is not None and self._monitor_thread.is_alive():
+                return
+            self._stop_monitor = False
+            self._stop_event.clear()
+            self._monitor_thread = threading.Thread(
+                target=self._monitor_loop,
+                daemon=True,
+                name="Memory-Monitor"
+            )
+            self._monitor_thread.start()
         logger.info("Monitor de memória iniciado")
         
     def stop_monitoring(self):
         """Para o monitoramento"""
         self._stop_monitor = True
+        self._stop_event.set()
         if self._monitor_thread:
             self._monitor_thread.join()
-        self._save_stats()
+        self.history.flush()
+    
+    def add_listener(self, callback: Callable[[int], None]):
+        """
+        Registra um callback chamado a cada amostra com pressão de memória.
+        
+        O callback recebe PRESSURE_WARNING ou PRESSURE_CRITICAL e, uma vez ao fim da
+        pressão, PRESSURE_NORMAL; roda na thread do monitor. Métodos são guardados por referência fraca, para que caches
+        descartados não sejam mantidos vivos pelo monitor.
+        
+        Args:
+            callback: Função que recebe o nível de pressão
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
+        with self._listeners_lock:
+            self._listeners.append(ref)
+    
+    def _notify_listeners(self, level: int):
+        """Notifica os callbacks registrados sobre a pressão de memória"""
+        with self._listeners_lock:
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+            callbacks = [ref() for ref in self._listeners]
+        
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(level)
+            except Exception as e:
+                logger.error(f"Erro ao notificar pressão de memória: {e}")
+    
+    def _classify(self, system_percent: float) -> int:
+        """
+        Converte o uso de memória do sistema em nível de pressão.
+        
+        Com histerese: o nível atual só é deixado quando o uso cai PRESSURE_HYSTERESIS
+        pontos abaixo do seu limite, evitando oscilar em torno dele.
+        """
+        if system_percent > self.critical_threshold:
+            return PRESSURE_CRITICAL
+        if self.pressure == PRESSURE_CRITICAL and system_percent > self.critical_threshold - PRESSURE_HYSTERESIS:
+            return PRESSURE_CRITICAL
+        if system_percent > self.warning_threshold:
+            return PRESSURE_WARNING
+        if self.pressure != PRESSURE_NORMAL and system_percent > self.warning_threshold - PRESSURE_HYSTERESIS:
+            return PRESSURE_WARNING
+        return PRESSURE_NORMAL
+    
+    def sample(self) -> Dict:
+        """
+        Coleta uma amostra de memória, atualiza o nível de pressão e notifica os caches.
+        
+        Returns:
+            Dict: Amostra coletada
+        """
+        stats = self.get_memory_usage()
+        self.last_sample = stats
+        level = self._classify(stats['system_percent'])
+        
+        if level != self.pressure:
+            if level == PRESSURE_CRITICAL:
+                logger.critical(
+                    f"Uso crítico de memória: {stats['system_percent']}% "
+                    f"RSS: {stats['rss']:.1f}MB"
+                )
+            elif level == PRESSURE_WARNING:
+                logger.info(f"Uso alto de memória: {stats['system_percent']}%")
+        previous = self.pressure
+        self.pressure = level
+        
+        # Sob pressão, os caches ajustam seu limite a cada amostra; o fim da pressão também é avisado
+        if level != PRESSURE_NORMAL or previous != PRESSURE_NORMAL:
+            self._notify_listeners(level)
+        return stats
         
     def get_memory_usage(self) -> Dict:
         """Retorna uso atual de memória"""
@@ -62,79 +161,44 @@ class MemoryMonitor:
         }
         
     def should_clear_cache(self) -> bool:
-        """Verifica se deve limpar cache baseado no uso de memória"""
-        mem_usage = self.get_memory_usage()
+        """
+        Verifica se há pressão de memória, usando a última amostra do monitor.
         
-        if mem_usage['system_percent'] > self.critical_threshold:
-            logger.warning(f"Uso crítico de memória: {mem_usage['system_percent']}%")
-            return True
-            
-        if mem_usage['system_percent'] > self.warning_threshold:
-            logger.info(f"Uso alto de memória: {mem_usage['system_percent']}%")
-            return True
-            
-        return False
+        Não faz chamadas ao sistema: o nível é atualizado em segundo plano.
+        """
+        return self.pressure != PRESSURE_NORMAL
         
     def _monitor_loop(self):
         """Loop principal de monitoramento"""
+        last_history = 0.0
         while not self._stop_monitor:
             try:
-                stats = self.get_memory_usage()
-                self.stats_history.append(stats)
-                
-                # Mantém histórico limitado
-                if len(self.stats_history) > self.max_history:
-                    self.stats_history.pop(0)
-                
-                # Salva estatísticas periodicamente
-                if len(self.stats_history) % 100 == 0:
-                    self._save_stats()
+                stats = self.sample()
                 
-                # Verifica uso crítico
-                if stats['system_percent'] > self.critical_threshold:
-                    logger.critical(
-                        f"Uso crítico de memória: {stats['system_percent']}% "
-                        f"RSS: {stats['rss']:.1f}MB"
-                    )
+                now = datetime.now().timestamp()
+                if now - last_history >= self.history_interval:
+                    last_history = now
+                    self.history.append(stats, timestamp=now)
                 
             except Exception as e:
                 logger.error(f"Erro no monitor de memória: {e}")
                 
-            threading.Event().wait(60)  # Monitora a cada 1 minuto
+            self._stop_event.wait(self.sample_interval)
             
     def get_stats_summary(self) -> Dict:
         """Retorna resumo das estatísticas"""
-        if not self.stats_history:
+        summary = self.history.summary()
+        if not summary['count']:
             return {}
-            
-        rss_values = [s['rss'] for s in self.stats_history]
-        percent_values = [s['percent'] for s in self.stats_history]
         
         return {
-            'current': self.get_memory_usage(),
-            'avg_rss': sum(rss_values) / len(rss_values),
-            'max_rss': max(rss_values),
-            'avg_percent': sum(percent_values) / len(percent_values),
-            'max_percent': max(percent_values),
-            'samples': len(self.stats_history)
+            'current': self.last_sample or self.history.latest(),
+            'avg_rss': summary['rss']['avg'],
+            'max_rss': summary['rss']['max'],
+            'avg_percent': summary['percent']['avg'],
+            'max_percent': summary['percent']['max'],
+            'samples': summary['count']
         }
-        
-    def _save_stats(self):
-        """Salva estatísticas em arquivo"""
-        try:
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.stats_history[-100:], f)  # Salva últimas 100 amostras
-        except Exception as e:
-            logger.error(f"Erro ao salvar estatísticas: {e}")
-            
-    def _load_stats(self):
-        """Carrega estatísticas salvas"""
-        try:
-            if self.stats_file.exists():
-                with open(self.stats_file) as f:
-                    self.stats_history = json.load(f)
-        except Exception as e:
-            logger.error(f"Erro ao carregar estatísticas: {e}")
 
 # Instância global
 memory_monitor = MemoryMonitor() 
\ No newline at end of file
@@ -1,61 +1,71 @@
 from typing import Any, Optional, Dict, Pattern, List, Union
-from datetime import datetime, timedelta
+from datetime import timedelta
 import logging
 import json
-import hashlib
+import time
 import re
 from .cache_invalidator import cache_invalidator
-from .memory_monitor import memory_monitor
+from .memory_monitor import memory_monitor, PRESSURE_NORMAL, PRESSURE_WARNING, PRESSURE_CRITICAL
+from app.core.cache.cache_keys import query_key
+from app.core.cache.lru import LRUCache, estimate_size
+from app.core.cache.table_generations import TableGenerations
 
 logger = logging.getLogger(__name__)
 
+# Tamanho máximo aproximado do cache em bytes (64 MB)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Fração do tamanho atual mantida ao entrar em cada nível de pressão de memória
+PRESSURE_KEEP_RATIO = {PRESSURE_WARNING: 0.75, PRESSURE_CRITICAL: 0.5}
+
+def _count_hit(entry: Dict[str, Any]) -> None:
+    """Incrementa o contador de acessos de uma entrada (chamado sob o lock do LRUCache)."""
+    entry['hits'] += 1
+
 class QueryCache:
-    def __init__(self, max_size: int = 1000):
-        self.cache = {}
+    def __init__(self, max_size: int = 1000, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache = LRUCache(max_size, max_bytes=max_bytes)  # Remoção LRU em O(1), limitada em bytes
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.hits = 0
         self.misses = 0
         self.invalidations = 0
         self.default_timeout = timedelta(minutes=5)  # Timeout padrão
         self.memory_monitor = memory_monitor
         self.memory_monitor.start_monitoring()
-        self._cleanup_counter = 0  # Adicionando o contador de limpeza
+        # Limite em bytes enquanto dura a pressão de memória (None = sem pressão)
+        self._pressure_level = PRESSURE_NORMAL
+        self._pressure_budget: Optional[int] = None
+        # A pressão de memória é amostrada em segundo plano, fora do caminho de escrita
+        self.memory_monitor.add_listener(self._on_memory_pressure)
+        self.generations = TableGenerations()  # Gerações por tabela para invalidação
         
     def get_query_result(self, query: str, params: tuple) -> Optional[dict]:
         """Obtém resultado de query do cache"""
         key = self._make_key(query, params)
-        if key in self.cache:
-            entry = self.cache[key]
-            if not self._is_expired(entry):
-                self.hits += 1
-                return entry['result']
-            else:
-                self.delete(key)
+        entry = self.cache.get(key)  # Entradas expiradas já foram removidas pelo LRUCache
+        if entry is not None:
+            self.hits += 1
+            return entry['result']
         self.misses += 1
         return None
         
     def set_query_result(self, query: str, params: tuple, result: dict, timeout: Optional[timedelta] = None):
         """Armazena resultado de query"""
-        if self.memory_monitor.should_clear_cache():
-            self.clear()
-            return
-            
-        if len(self.cache) >= self.max_size:
-            self._evict_oldest()
-            
         key = self._make_key(query, params)
-        self.cache[key] = {
+        self.cache.set(key, {
             'result': result,
             'query': query,
-            'timestamp': datetime.now(),
-            'expires': datetime.now() + (timeout or self.default_timeout)
-        }
+            'timestamp': time.monotonic()
+        }, size=estimate_size(result), ttl=self._ttl_seconds(timeout))
         
     def invalidate_patterns(self, patterns: List[Union[str, Pattern]]):
         """Invalida cache baseado em padrões de query"""
         invalidated = 0
-        for key, entry in list(self.cache.items()):
-            query = entry['query']
+        for key, entry in self.cache.items():
+            query = entry.get('query')
+            if query is None:
+                continue
             for pattern in patterns:
                 # Compila o padrão se for string
                 if isinstance(pattern, str):
@@ -71,94 +81,107 @@ class QueryCache:
     
     def get(self, key: str) -> Optional[Any]:
         """Obtém valor do cache"""
-        self._increment_cleanup()
-        
-        if key not in self.cache:
-            return None
-            
-        entry = self.cache[key]
-        if datetime.now() > entry['expires']:
-            del self.cache[key]
+        entry = self.cache.get(key, on_hit=_count_hit)
+        if entry is None:
             return None
-            
-        entry['hits'] += 1
         return entry['value']
         
-    def set(self, key: str, value: Any, timeout: Optional[timedelta] = None):
-        """Armazena valor no cache"""
-        # Verifica uso de memória antes de cachear
-        if self.memory_monitor.should_clear_cache():
-            self.clear()
-            return
-            
-        if len(self.cache) >= self.max_size:
-            self._evict_oldest()
-            
-        expires = datetime.now() + (timeout or self.default_timeout)
-        self.cache[key] = {
+    def set(self, key: str, value: Any, timeout: Optional[timedelta] = None,
+            tags: Optional[List[str]] = None):
+        """Armazena valor no cache (tags: etiquetas das tabelas lidas, usadas pelo warm start)"""
+        self.cache.set(key, {
             'value': value,
-            'expires': expires,
             'hits': 0,
-            'created': datetime.now()
-        }
+            'created': time.monotonic(),
+            'tags': list(tags) if tags else []
+        }, size=estimate_size(value), ttl=self._ttl_seconds(timeout))
         
     def delete(self, key: str):
         """Remove item do cache"""
-        if key in self.cache:
-            del self.cache[key]
+        self.cache.delete(key)
+        
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Obtém vários valores com uma única aquisição do lock (chaves ausentes são omitidas)"""
+        return {key: entry['value'] for key, entry in self.cache.get_many(keys, on_hit=_count_hit).items()}
+        
+    def set_many(self, items: Dict[str, Any], timeout: Optional[timedelta] = None,
+                 timeouts: Optional[Dict[str, timedelta]] = None):
+        """Armazena vários valores com uma única aquisição do lock (timeouts sobrepõe o timeout por chave)"""
+        now = time.monotonic()
+        entries = {key: {'value': value, 'hits': 0, 'created': now} for key, value in items.items()}
+        sizes = {key: estimate_size(value) for key, value in items.items()}
+        ttls = {key: self._ttl_seconds(key_timeout) for key, key_timeout in (timeouts or {}).items()}
+        self.cache.set_many(entries, sizes, ttl=self._ttl_seconds(timeout), ttls=ttls)
+        
+    def delete_many(self, keys: List[str]) -> int:
+        """Remove vários itens do cache"""
+        return self.cache.delete_many(keys)
             
     def clear(self):
         """Limpa todo o cache"""
         self.cache.clear()
         
-    def _cleanup_least_used(self):
-        """Remove itens menos usados"""
-        if not self.cache:
+    def _on_memory_pressure(self, level: int):
+        """
+        Libera memória removendo as entradas menos usadas.
+        
+        Ao entrar em um nível mais grave o cache é reduzido uma vez a uma fração do
+        tamanho atual; enquanto a pressão dura, esse tamanho passa a ser o limite
+        (o cache não volta a crescer nem é esvaziado a cada amostra).
+        """
+        if level == PRESSURE_NORMAL:
+            self._pressure_level = PRESSURE_NORMAL
+            self._pressure_budget = None
             return
+        if level > self._pressure_level:
+            budget = int(self.cache.total_bytes * PRESSURE_KEEP_RATIO.get(level, 1.0))
+            if self._pressure_budget is not None:
+                budget = min(budget, self._pressure_budget)
+            self._pressure_budget = budget
+        self._pressure_level = level
+        removed = self.cache.trim(self._pressure_budget)
+        if removed:
+            logger.info(f"Pressão de memória: {removed} entradas removidas do cache de consultas")
             
-        # Remove 10% dos itens menos usados
-        items = sorted(
-            self.cache.items(),
-            key=lambda x: (x[1]['hits'], x[1]['created'])
-        )
+    def _ttl_seconds(self, timeout: Optional[timedelta]) -> float:
+        """Converte o timeout em segundos para o heap de expiração"""
+        return (timeout or self.default_timeout).total_seconds()
         
-        to_remove = max(len(self.cache) // 10, 1)
-        for key, _ in items[:to_remove]:
-            del self.cache[key]
-            
-    def _increment_cleanup(self):
-        """Controle de limpeza periódica"""
-        self._cleanup_counter += 1
-        if self._cleanup_counter >= 1000:
-            self._cleanup_expired()
-            self._cleanup_counter = 0
-            
-    def _cleanup_expired(self):
-        """Remove itens expirados"""
-        now = datetime.now()
-        expired = [k for k, v in self.cache.items() if v['expires'] < now]
-        for key in expired:
-            del self.cache[key]
+    def export_entries(self) -> List[Dict[str, Any]]:
+        """Exporta as entradas gravadas com set() para o snapshot de warm start"""
+        entries = []
+        for recency, (key, entry) in enumerate(self.cache.items()):
+            if 'value' not in entry:
+                continue
+            entries.append({
+                'key': key,
+                'value': entry['value'],
+                'ttl': self.cache.remaining_ttl(key),
+                'tags': entry.get('tags', []),
+                'hits': entry['hits'],
+                'recency': recency
+            })
+        return entries
+        
+    def import_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """Importa entradas de um snapshot sem sobrescrever valores já presentes"""
+        imported = 0
+        for entry in entries:
+            if entry['key'] in self.cache:
+                continue
+            ttl = entry['ttl']
+            self.set(entry['key'], entry['value'],
+                     timedelta(seconds=ttl) if ttl is not None else None, entry['tags'])
+            imported += 1
+        return imported
+        
+    def purge_expired(self) -> int:
+        """Remove entradas expiradas (custo proporcional ao número de expiradas)"""
+        return self.cache.purge_expired()
 
     def _make_key(self, query: str, params: tuple) -> str:
         """Cria chave única para query"""
-        # Usa hash para evitar chaves muito longas
-        params_str = '_'.join(map(str, params)) if params else ''
-        key_str = f"{query}_{params_str}"
-        return hashlib.md5(key_str.encode()).hexdigest()
-    
-    def _is_expired(self, entry: Dict) -> bool:
-        """Verifica se entrada está expirada"""
-        return datetime.now() > entry['expires']
-    
-    def _evict_oldest(self):
-        """Remove entrada mais antiga do cache"""
-        if not self.cache:
-            return
-            
-        oldest_key = min(self.cache.keys(), 
-                        key=lambda k: self.cache[k]['timestamp'])
-        self.delete(oldest_key)
+        return query_key(query, params)
     
     def get_stats(self) -> Dict:
         """Retorna estatísticas do cache"""
@@ -167,7 +190,10 @@ class QueryCache:
             'hits': self.hits,
             'misses': self.misses,
             'hit_ratio': self.hits / (self.hits + self.misses) * 100 if (self.hits + self.misses) > 0 else 0,
-            'invalidations': self.invalidations
+            'invalidations': self.invalidations,
+            'evictions': self.cache.stats['evictions'],
+            'bytes': self.cache.total_bytes,
+            'max_bytes': self.max_bytes
         }
         
         # Adiciona estatísticas de memória
@@ -4,11 +4,14 @@ Implementa a mesma interface que o sistema de cache em memória.
 """
 
 import logging
-import json
-import hashlib
 import time
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timedelta
+from app.core.cache.cache_keys import query_key
+from app.core.cache.table_generations import TableGenerations
+from app.core.cache.codec import Codec, CodecError
+from app.core.cache.namespace import KeySweeper, NamespaceVersion
+from app.core.cache.redis_connections import redis_connections
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,8 @@ class RedisAdapter:
     """
     
     def __init__(self, prefix: str = "controlix:", host: str = "localhost", port: int = 6379, 
-                 db: int = 0, password: Optional[str] = None, socket_timeout: int = 5):
+                 db: int = 0, password: Optional[str] = None, socket_timeout: int = 5,
+                 codec: Optional[Codec] = None):
         """
         Inicializa o adaptador Redis.
         
@@ -34,6 +38,7 @@ class RedisAdapter:
             db: Número do banco de dados Redis
             password: Senha para autenticação no Redis
             socket_timeout: Timeout para conexão com o Redis
+            codec: Codificador dos valores (padrão: pickle com compressão acima de 1 KB)
         """
         self.prefix = prefix
         self.redis_config = {
@@ -41,10 +46,15 @@ class RedisAdapter:
             'port': port,
             'db': db,
             'password': password,
-            'socket_timeout': socket_timeout,
-            'decode_responses': True  # Para retornar strings em vez de bytes
+            'socket_timeout': socket_timeout
         }
+        self.codec = codec or Codec()
         self.client = None
+        # Gerações por tabela compartilhadas entre processos
+        self.generations = TableGenerations(lambda: self.client, prefix=f"{prefix}gen:")
+        # Versão do namespace embutida nas chaves: clear() apenas a incrementa
+        self.namespace = NamespaceVersion(lambda: self.client, prefix)
+        self.sweeper = KeySweeper(lambda: self.client, self.namespace)
         self.stats = {
             'hits': 0,
             'misses': 0,
@@ -60,8 +70,8 @@ class RedisAdapter:
             bool: True se a conexão foi bem-sucedida, False caso contrário
         """
         try:
-            import redis
-            self.client = redis.Redis(**self.redis_config)
+            # Cliente sobre o pool compartilhado pelo processo (valores binários do codificador)
+            self.client = redis_connections.get_client(**self.redis_config)
             # Testar conexão
             self.client.ping()
             logger.info(f"Conectado ao Redis em {self.redis_config['host']}:{self.redis_config['port']}")
@@ -76,7 +86,7 @@ class RedisAdapter:
             
     def _get_full_key(self, key: str) -> str:
         """
-        Obtém a chave completa com prefixo para uso no Redis.
+        Obtém a chave completa com prefixo e versão do namespace para uso no Redis.
         
         Args:
             key: Chave base
@@ -84,7 +94,7 @@ class RedisAdapter:
         Returns:
             str: Chave completa com prefixo
         """
-        return f"{self.prefix}{key}"
+        return f"{self.namespace.key_prefix()}{key}"
         
     def get(self, key: str) -> Optional[Any]:
         """
@@ -109,19 +119,21 @@ class RedisAdapter:
                 
             # Deserializar o valor
             try:
-                result = json.loads(value)
-                self.stats['hits'] += 1
-                return result
-            except json.JSONDecodeError:
-                # Se não for JSON, retorna o valor como string
-                self.stats['hits'] += 1
-                return value
+                result = self.codec.decode(value)
+            except CodecError as e:
+                # Formato antigo ou de outra configuração: tratado como ausente
+                logger.debug(f"Valor de cache ignorado: {e}")
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return result
                 
         except Exception as e:
             logger.error(f"Erro ao obter valor do Redis: {e}")
             return None
             
-    def set(self, key: str, value: Any, timeout: Optional[timedelta] = None) -> bool:
+    def set(self, key: str, value: Any, timeout: Optional[timedelta] = None,
+            tags: Optional[List[str]] = None) -> bool:
         """
         Armazena um valor no cache.
         
@@ -129,6 +141,7 @@ class RedisAdapter:
             key: Chave do valor
             value: Valor a ser armazenado
             timeout: Tempo de expiração (opcional)
+            tags: Etiquetas das tabelas lidas (ignoradas: o Redis já persiste os valores)
             
         Returns:
             bool: True se o valor foi armazenado com sucesso, False caso contrário
@@ -140,7 +153,7 @@ class RedisAdapter:
             full_key = self._get_full_key(key)
             
             # Serializar o valor
-            serialized = json.dumps(value)
+            serialized = self.codec.encode(value)
             
             # Calcular tempo de expiração em segundos
             expiration = int(timeout.total_seconds()) if timeout else None
@@ -178,29 +191,108 @@ class RedisAdapter:
             logger.error(f"Erro ao remover valor do Redis: {e}")
             return False
             
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache com um único MGET (uma ida e volta ao Redis).
+        
+        Args:
+            keys: Chaves dos valores
+            
+        Returns:
+            Dict[str, Any]: Valores encontrados (chaves ausentes são omitidas)
+        """
+        keys = list(keys)
+        if not self.client or not keys:
+            return {}
+            
+        try:
+            values = self.client.mget([self._get_full_key(key) for key in keys])
+        except Exception as e:
+            logger.error(f"Erro ao obter valores do Redis: {e}")
+            return {}
+            
+        found = {}
+        for key, value in zip(keys, values):
+            if value is None:
+                continue
+            try:
+                found[key] = self.codec.decode(value)
+            except CodecError as e:
+                logger.debug(f"Valor de cache ignorado: {e}")
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+        
+    def set_many(self, items: Dict[str, Any], timeout: Optional[timedelta] = None,
+                 timeouts: Optional[Dict[str, timedelta]] = None) -> bool:
+        """
+        Armazena vários valores no cache com um pipeline de SET/SETEX.
+        
+        Args:
+            items: Valores por chave
+            timeout: Tempo de expiração padrão (opcional)
+            timeouts: Tempo de expiração por chave, sobrepondo o padrão (opcional)
+            
+        Returns:
+            bool: True se todos os valores foram armazenados, False caso contrário
+        """
+        if not self.client:
+            return False
+        if not items:
+            return True
+            
+        try:
+            timeouts = timeouts or {}
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                key_timeout = timeouts.get(key, timeout)
+                expiration = int(key_timeout.total_seconds()) if key_timeout else None
+                if expiration:
+                    pipe.setex(self._get_full_key(key), expiration, self.codec.encode(value))
+                else:
+                    pipe.set(self._get_full_key(key), self.codec.encode(value))
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"Erro ao armazenar valores no Redis: {e}")
+            return False
+            
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Remove vários valores do cache com um único UNLINK (liberação assíncrona no servidor).
+        
+        Args:
+            keys: Chaves dos valores
+            
+        Returns:
+            int: Número de chaves removidas
+        """
+        keys = [self._get_full_key(key) for key in keys]
+        if not self.client or not keys:
+            return 0
+            
+        try:
+            return int(self.client.unlink(*keys))
+        except Exception as e:
+            logger.error(f"Erro ao remover valores do Redis: {e}")
+            return 0
+            
     def clear(self) -> bool:
         """
         Limpa todo o cache.
         
+        Incrementa a versão do namespace (O(1)); as chaves antigas expiram pelo TTL
+        ou são removidas em segundo plano com SCAN + UNLINK.
+        
         Returns:
             bool: True se o cache foi limpo com sucesso, False caso contrário
         """
         if not self.client:
             return False
             
-        try:
-            # Limpar apenas as chaves com o prefixo
-            cursor = 0
-            while True:
-                cursor, keys = self.client.scan(cursor, f"{self.prefix}*", 100)
-                if keys:
-                    self.client.delete(*keys)
-                if cursor == 0:
-                    break
-            return True
-        except Exception as e:
-            logger.error(f"Erro ao limpar cache no Redis: {e}")
+        if not self.namespace.bump():
             return False
+        self.sweeper.schedule()
+        return True
             
     def get_stats(self) -> Dict:
         """
@@ -250,14 +342,16 @@ class RedisAdapter:
             
         try:
             invalidated = 0
+            prefix = self.namespace.key_prefix()
             for pattern in patterns:
-                # Usar scan para encontrar chaves que correspondem ao padrão
+                # Usar scan para encontrar chaves da versão atual que correspondem ao padrão;
+                # UNLINK libera a memória sem bloquear o servidor
                 cursor = 0
                 while True:
-                    cursor, keys = self.client.scan(cursor, f"{self.prefix}{pattern}*", 100)
+                    cursor, keys = self.client.scan(cursor, f"{prefix}{pattern}*", 100)
                     if keys:
                         invalidated += len(keys)
-                        self.client.delete(*keys)
+                        self.client.unlink(*keys)
                     if cursor == 0:
                         break
                         
@@ -308,12 +402,7 @@ class RedisAdapter:
         Returns:
             str: Chave única
         """
-        # Normalizar query (remover espaços extras)
-        normalized_query = " ".join(query.split())
-        
-        # Gerar hash da query e parâmetros
-        key_str = f"{normalized_query}:{str(params)}"
-        return hashlib.md5(key_str.encode()).hexdigest()
+        return query_key(query, params)
         
     def health_check(self) -> bool:
         """
@@ -334,6 +423,7 @@ class RedisAdapter:
     def __del__(self):
         """Destrutor da classe, fecha a conexão com o Redis."""
         try:
+            self.sweeper.stop()
             if self.client:
                 self.client.close()
         except:
@@ -1,113 +1,252 @@
 import logging
+import sqlite3
+import threading
 from pathlib import Path
 import json
 import time
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from app.config.settings import CACHE_DIR, PERFORMANCE_SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# Arquivo único do cache em disco (dentro de CACHE_DIR)
+CACHE_DB_NAME = 'disk_cache.db'
+
+# Resolução da data de último acesso: leituras mais frequentes não regravam o índice
+ACCESS_RESOLUTION = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed);
+
+-- Contagem e tamanho total mantidos pelos gatilhos, sem percorrer as entradas
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    total_size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage (id, entries, total_size) VALUES (1, 0, 0);
+
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE usage SET entries = entries + 1, total_size = total_size + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE usage SET entries = entries - 1, total_size = total_size - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE usage SET total_size = total_size - OLD.size + NEW.size WHERE id = 1;
+END;
+"""
+
 class CacheManager:
-    def __init__(self):
+    """
+    Cache em disco armazenado em um único arquivo SQLite (modo WAL).
+
+    Cada entrada guarda chave, valor (JSON), expiração, tamanho e último acesso.
+    As buscas usam a chave primária e a limpeza usa os índices de expiração e de
+    último acesso, sem percorrer o diretório de cache.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_size: Optional[int] = None,
+                 timeout: Optional[int] = None):
+        """
+        Inicializa o cache em disco.
+
+        Args:
+            path: Arquivo do banco (padrão: CACHE_DIR / 'disk_cache.db')
+            max_size: Tamanho máximo em bytes (padrão: PERFORMANCE_SETTINGS['cache_size'] MB)
+            timeout: Tempo de vida padrão em segundos (padrão: PERFORMANCE_SETTINGS['cache_timeout'])
+        """
         self.cache_dir = CACHE_DIR
-        self.cache_timeout = PERFORMANCE_SETTINGS['cache_timeout']
-        self.max_size = PERFORMANCE_SETTINGS['cache_size'] * 1024 * 1024  # Converte para bytes
-        
+        self.path = Path(path) if path else CACHE_DIR / CACHE_DB_NAME
+        self.cache_timeout = timeout or PERFORMANCE_SETTINGS['cache_timeout']
+        self.max_size = max_size or PERFORMANCE_SETTINGS['cache_size'] * 1024 * 1024  # Converte para bytes
+        self._lock = threading.Lock()
+        self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        """Abre o banco, recriando-o se o arquivo estiver corrompido."""
+        try:
+            return self._connect()
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Cache em disco corrompido, recriando {self.path}: {e}")
+            for suffix in ('', '-wal', '-shm'):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+            return self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conecta ao banco e cria o esquema."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: cada comando é sua própria transação, salvo BEGIN explícito
+        conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
     def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
         """Armazena um valor no cache"""
         try:
-            cache_file = self.cache_dir / f"{key}.cache"
-            
-            cache_data = {
-                'value': value,
-                'timestamp': time.time(),
-                'timeout': timeout or self.cache_timeout
-            }
-            
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f)
-                
+            blob = json.dumps(value).encode('utf-8')
+            if len(blob) > self.max_size:
+                logger.warning(f"Valor maior que o limite do cache em disco: {key}")
+                return False
+
+            now = time.time()
+            with self._lock:
+                # UPSERT (e não REPLACE) para que o gatilho de tamanho seja acionado
+                self._conn.execute(
+                    "INSERT INTO entries (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires, "
+                    "size = excluded.size, accessed = excluded.accessed",
+                    (key, blob, now + (timeout or self.cache_timeout), len(blob), now)
+                )
+                if self._total_size() > self.max_size:
+                    self._trim(self.max_size)
+
             logger.debug(f"Valor armazenado em cache: {key}")
             return True
-            
+
         except Exception as e:
             logger.error(f"Erro ao armazenar em cache: {e}")
             return False
-    
+
     def get(self, key: str) -> Optional[Any]:
         """Recupera um valor do cache"""
         try:
-            cache_file = self.cache_dir / f"{key}.cache"
-            
-            if not cache_file.exists():
-                return None
-                
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            # Verifica se o cache expirou
-            if time.time() - cache_data['timestamp'] > cache_data['timeout']:
-                cache_file.unlink()  # Remove arquivo expirado
-                return None
-                
+            now = time.time()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires, accessed FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                value, expires, accessed = row
+                # Verifica se o cache expirou
+                if expires <= now:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    return None
+
+                if now - accessed >= ACCESS_RESOLUTION:
+                    self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+
             logger.debug(f"Valor recuperado do cache: {key}")
-            return cache_data['value']
-            
+            return json.loads(value)
+
         except Exception as e:
             logger.error(f"Erro ao recuperar do cache: {e}")
             return None
-    
+
     def clear(self, key: Optional[str] = None):
         """Limpa o cache"""
         try:
-            if key:
-                cache_file = self.cache_dir / f"{key}.cache"
-                if cache_file.exists():
-                    cache_file.unlink()
+            with self._lock:
+                if key:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
                     logger.debug(f"Cache limpo para: {key}")
-            else:
-                # Limpa todo o cache
-                for cache_file in self.cache_dir.glob("*.cache"):
-                    cache_file.unlink()
-                logger.debug("Cache completamente limpo")
-                
+                else:
+                    # Limpa todo o cache
+                    self._conn.execute("DELETE FROM entries")
+                    logger.debug("Cache completamente limpo")
+
         except Exception as e:
             logger.error(f"Erro ao limpar cache: {e}")
-    
+
     def cleanup(self):
-        """Remove arquivos de cache expirados e mantém o tamanho máximo"""
+        """Remove entradas expiradas e mantém o tamanho máximo"""
         try:
-            current_size = 0
-            files = []
-            
-            # Lista todos os arquivos de cache com seus timestamps
-            for cache_file in self.cache_dir.glob("*.cache"):
-                try:
-                    stat = cache_file.stat()
-                    current_size += stat.st_size
-                    files.append((cache_file, stat.st_mtime))
-                except:
-                    continue
-            
-            # Remove arquivos expirados
-            for file, mtime in files:
-                if time.time() - mtime > self.cache_timeout:
-                    file.unlink()
-                    current_size -= file.stat().st_size
-            
-            # Se ainda estiver acima do limite, remove os mais antigos
-            if current_size > self.max_size:
-                files.sort(key=lambda x: x[1])  # Ordena por timestamp
-                for file, _ in files:
-                    if current_size <= self.max_size:
-                        break
-                    current_size -= file.stat().st_size
-                    file.unlink()
-                    
-            logger.debug(f"Limpeza de cache concluída. Tamanho atual: {current_size/1024/1024:.2f}MB")
-            
+            with self._lock:
+                # Remove entradas expiradas (busca pelo índice de expiração)
+                expired = self._conn.execute(
+                    "DELETE FROM entries WHERE expires <= ?", (time.time(),)
+                ).rowcount
+
+                # Se ainda estiver acima do limite, remove as menos usadas recentemente
+                evicted = self._trim(self.max_size) if self._total_size() > self.max_size else 0
+                current_size = self._total_size()
+
+            logger.debug(f"Limpeza de cache concluída ({expired} expiradas, {evicted} removidas). "
+                         f"Tamanho atual: {current_size/1024/1024:.2f}MB")
+
         except Exception as e:
             logger.error(f"Erro na limpeza do cache: {e}")
 
+    def _total_size(self) -> int:
+        """Tamanho total das entradas em bytes, mantido pelos gatilhos."""
+        return self._conn.execute("SELECT total_size FROM usage WHERE id = 1").fetchone()[0]
+
+    def _trim(self, target: int) -> int:
+        """
+        Remove as entradas menos usadas recentemente até o tamanho total caber no alvo.
+
+        Args:
+            target: Tamanho máximo em bytes após a remoção
+
+        Returns:
+            int: Número de entradas removidas
+        """
+        excess = self._total_size() - target
+        victims = []
+        # Percorre o índice de último acesso apenas até liberar o excedente
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed")
+        try:
+            for key, size in cursor:
+                if excess <= 0:
+                    break
+                victims.append((key,))
+                excess -= size
+        finally:
+            cursor.close()
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return len(victims)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cache em disco.
+
+        Returns:
+            Dict[str, Any]: Número de entradas, tamanho total e limite em bytes
+        """
+        try:
+            with self._lock:
+                entries, total_size = self._conn.execute(
+                    "SELECT entries, total_size FROM usage WHERE id = 1"
+                ).fetchone()
+            return {
+                'entries': entries,
+                'total_size': total_size,
+                'max_size': self.max_size
+            }
+        except Exception as e:
+            logger.error(f"Erro ao obter estatísticas do cache: {e}")
+            return {}
+
+    def close(self):
+        """Fecha o banco do cache"""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            logger.error(f"Erro ao fechar cache em disco: {e}")
+
 # Instância global do gerenciador de cache
-cache_manager = CacheManager() 
\ No newline at end of file
+cache_manager = CacheManager()
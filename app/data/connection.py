@@ -11,28 +11,43 @@ from tkinter import messagebox
 from app.config.settings import DATABASE, IS_DEVELOPMENT, SECURITY_DIR
 from app.config.encrypted_settings import EncryptedSettings, ConfigError
 from app.core.observer.auth_observer import auth_observer
+from app.core.observer.connection_observer import connection_observer, is_remote_available
 from app.data.mysql.mysql_connection import MySQLConnection
+from app.data.mysql.outbox import SyncOutbox
+from app.data.mysql.sql_tables import extract_tables, is_read_query
+from app.data.mysql.sync_watermarks import sync_watermarks
 from app.data.cache.query_cache import QueryCache
 from app.data.cache.cache_invalidator import cache_invalidator
 from app.data.cache.cache_factory import CacheFactory, CacheType
+from app.core.cache.cache_keys import query_key
+from app.core.cache.table_generations import table_tags
+from app.core.cache.cache_manager import cache_manager
+from app.core.cache.warm_start import warm_start
+from app.ui.dispatcher import tk_dispatcher
 
 # Banco de dados
 import mysql.connector
 from mysql.connector import Error
 import threading
 import logging
-from typing import Optional, Union, Dict, List
+from typing import Optional, Union, Dict, List, Tuple
 from pathlib import Path
 import tempfile
 import atexit
 import time
-import hashlib
 import os
 import shutil
 
 # Logger específico para conexão com banco
 logger = logging.getLogger(__name__)
 
+# Lado que respondeu a uma leitura roteada
+READ_SIDE_LOCAL = 'local'
+READ_SIDE_REMOTE = 'remote'
+
+# Defasagem máxima padrão (em segundos) aceita para leituras na réplica local
+DEFAULT_MAX_STALENESS = 300
+
 class DatabaseConnection:
     """
     Gerencia conexões com bancos de dados MySQL.
@@ -55,27 +70,37 @@ class DatabaseConnection:
         if not hasattr(self, 'initialized'):
             logger.info("Inicializando gerenciador de conexões de banco de dados")
             
-            # Configurações criptografadas para cada banco
-            self.local_settings = EncryptedSettings(SECURITY_DIR / 'mysql_local')
-            self.remote_settings = EncryptedSettings(SECURITY_DIR / 'mysql_remoto')
-            
-            # Conexão MySQL
-            self.mysql_connection = MySQLConnection(
-                local_settings=self.local_settings,
-                remote_settings=self.remote_settings
-            )
+            # Conexão MySQL (pools e configurações criptografadas são carregados sob demanda)
+            self.mysql_connection = MySQLConnection()
             self.current_connection = None
+            self._warm_up_thread = None
+            
+            # Outbox de escritas write-behind para o banco remoto
+            self.outbox = SyncOutbox(self.mysql_connection)
             
             # Cache de consultas
             cache_type_str = os.environ.get('CACHE_TYPE', 'MEMORY')
             cache_type = CacheFactory.get_cache_type_from_string(cache_type_str)
             self.query_cache = CacheFactory.create(cache_type)
+            cache_invalidator.register_cache(self.query_cache)
             
             logger.info(f"Usando cache do tipo: {cache_type}")
             
+            # Warm start opcional: recarrega em segundo plano as entradas mais usadas na execução anterior
+            if hasattr(self.query_cache, 'export_entries'):
+                warm_start.register('query_cache', self.query_cache, self.query_cache.generations,
+                                    watermark_getter=sync_watermarks.get)
+            warm_start.register('function_cache', cache_manager)
+            warm_start.restore_async()
+            
             # Inicializar o status label como None
             self.status_label = None
             
+            # Estatísticas do roteamento de leituras
+            # (incrementadas também pelas threads do AsyncDatabase, por isso protegidas por lock)
+            self.routing_stats = {READ_SIDE_LOCAL: 0, READ_SIDE_REMOTE: 0, 'fallbacks': 0}
+            self._routing_stats_lock = threading.Lock()
+            
             # Registrar para limpeza de recursos
             atexit.register(self.close)
             
@@ -83,6 +108,51 @@ class DatabaseConnection:
             self.initialized = True
             logger.info("Gerenciador de conexões de banco de dados inicializado")
     
+    @property
+    def local_settings(self) -> EncryptedSettings:
+        """Configurações criptografadas do banco local (carregadas no primeiro acesso)."""
+        return self.mysql_connection.local_settings
+    
+    @property
+    def remote_settings(self) -> EncryptedSettings:
+        """Configurações criptografadas do banco remoto (carregadas no primeiro acesso)."""
+        return self.mysql_connection.remote_settings
+    
+    def warm_up(self, include_remote: bool = True) -> threading.Thread:
+        """
+        Inicializa os pools em uma thread de segundo plano e inicia a drenagem do outbox.
+        
+        Deve ser chamado depois que a primeira janela estiver visível, para que
+        a abertura da aplicação não dependa da latência do banco remoto.
+        Chamadas repetidas reutilizam a thread em andamento.
+        
+        Args:
+            include_remote: Se True, também aquece o pool remoto
+            
+        Returns:
+            threading.Thread: Thread de aquecimento
+        """
+        with self._lock:
+            if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+                self._warm_up_thread = threading.Thread(
+                    target=self._warm_up,
+                    args=(include_remote,),
+                    daemon=True,
+                    name="db-warm-up"
+                )
+                self._warm_up_thread.start()
+                logger.debug("Aquecimento dos pools iniciado em segundo plano")
+            return self._warm_up_thread
+    
+    def _warm_up(self, include_remote: bool) -> None:
+        """Aquece os pools e, com o banco local disponível, inicia a drenagem do outbox."""
+        status = self.mysql_connection.warm_up(include_remote=include_remote)
+        if status['local']:
+            try:
+                self.outbox.start()
+            except Exception as e:
+                logger.error(f"Erro ao iniciar drenagem do outbox: {e}")
+    
     def set_status_label(self, label: ctk.CTkLabel) -> None:
         """
         Define o label para exibir mensagens de status da conexão.
@@ -92,13 +162,53 @@ class DatabaseConnection:
         """
         logger.debug("Status label configurado para conexão de banco de dados")
         self.status_label = label
+        # Chamado na thread da interface: garante que o despachante esteja em execução
+        tk_dispatcher.attach(label.winfo_toplevel())
+        connection_observer.add_observer(self._on_remote_availability_change)
         
-        # Atualiza o status inicial se necessário
-        if hasattr(self, 'mysql_connection') and self.mysql_connection.is_connected():
+        # Atualiza o status inicial sem abrir conexões (os pools são criados sob demanda)
+        if not is_remote_available():
+            self._show_offline_status()
+        elif hasattr(self, 'mysql_connection') and (self.mysql_connection.has_pool(True) or
+                                                    self.mysql_connection.has_pool(False)):
             self.status_label.configure(text="Conectado ao banco de dados", text_color="green")
         else:
             self.status_label.configure(text="Desconectado do banco de dados", text_color="gray")
     
+    def _show_offline_status(self) -> None:
+        """Exibe no status label que a aplicação está em modo offline."""
+        self.status_label.configure(text="Modo offline: banco remoto indisponível", text_color="orange")
+    
+    def _on_remote_availability_change(self, available: bool) -> None:
+        """
+        Atualiza o status label quando o banco remoto entra ou sai do modo offline.
+        
+        As notificações chegam de threads de segundo plano (sondagem do circuito,
+        workers), então a atualização é entregue à thread da interface pelo
+        tk_dispatcher: after() não pode ser chamado fora da thread do mainloop.
+        
+        Args:
+            available: True se o banco remoto está disponível
+        """
+        label = self.status_label
+        if label is None:
+            return
+        
+        def update():
+            if available:
+                label.configure(text="Conectado ao banco de dados", text_color="green")
+            else:
+                self._show_offline_status()
+        
+        def apply():
+            try:
+                if label.winfo_exists():
+                    update()
+            except Exception as e:
+                logger.debug(f"Não foi possível atualizar o status da conexão: {e}")
+        
+        tk_dispatcher.call_soon(apply)
+    
     def get_connection(self, is_local: bool = True) -> mysql.connector.MySQLConnection:
         """
         Obtém uma conexão com o banco de dados MySQL.
@@ -150,8 +260,11 @@ class DatabaseConnection:
             List[Dict]: Lista de resultados como dicionários
         """
         # Verificar se pode usar cache
+        cache_key = None
         if use_cache and query.strip().upper().startswith("SELECT"):
-            cache_key = self._generate_cache_key(query, params)
+            cache_key = self._generate_cache_key(query, params, is_local)
+        
+        if cache_key is not None:
             cached_result = self.query_cache.get(cache_key)
             
             if cached_result is not None:
@@ -161,110 +274,169 @@ class DatabaseConnection:
         # Executar consulta
         result = self.mysql_connection.execute_query(query, params, is_local)
         
-        # Armazenar em cache se necessário
-        if use_cache and query.strip().upper().startswith("SELECT"):
-            cache_key = self._generate_cache_key(query, params)
-            self.query_cache.set(cache_key, result)
+        # Armazenar em cache se necessário (as etiquetas permitem validar o warm start)
+        if cache_key is not None:
+            self.query_cache.set(cache_key, result, tags=table_tags(extract_tables(query), is_local))
         
         return result
     
-    def execute_update(self, query: str, params: tuple = None, is_local: bool = True) -> int:
+    def choose_read_side(self, query: str, max_staleness: float = DEFAULT_MAX_STALENESS) -> str:
         """
-        Executa uma operação de atualização (INSERT, UPDATE, DELETE).
+        Decide qual banco deve responder a uma leitura.
+        
+        A leitura vai para o banco local somente se todas as tabelas envolvidas são
+        espelhadas pela sincronização e foram sincronizadas dentro do limite de defasagem.
+        No modo offline (banco remoto indisponível) o limite de defasagem é ignorado.
         
         Args:
             query: Consulta SQL
-            params: Parâmetros para a consulta
-            is_local: Se True, usa o banco local, caso contrário o remoto
+            max_staleness: Defasagem máxima aceita em segundos
             
         Returns:
-            int: Número de linhas afetadas
+            str: READ_SIDE_LOCAL ou READ_SIDE_REMOTE
         """
-        # Invalidar cache para operações de escrita
-        if not query.strip().upper().startswith("SELECT"):
-            self._invalidate_cache_for_table(self._extract_table_from_query(query))
+        if not is_read_query(query):
+            return READ_SIDE_REMOTE
         
-        # Executar operação
-        return self.mysql_connection.execute_update(query, params, is_local)
+        tables = extract_tables(query)
+        if not tables:
+            return READ_SIDE_REMOTE
+        
+        if not is_remote_available():
+            if tables <= sync_watermarks.replicated_tables:
+                return READ_SIDE_LOCAL
+            return READ_SIDE_REMOTE
+        
+        if all(sync_watermarks.is_fresh(table, max_staleness) for table in tables):
+            return READ_SIDE_LOCAL
+        
+        return READ_SIDE_REMOTE
     
-    def execute_batch(self, query: str, params_list: List[tuple], is_local: bool = True) -> int:
+    def execute_routed_query(self, query: str, params: tuple = None,
+                             max_staleness: float = DEFAULT_MAX_STALENESS,
+                             use_cache: bool = False) -> Tuple[List[Dict], str]:
         """
-        Executa uma operação em lote (batch).
+        Executa uma leitura preferindo a réplica local quando ela está suficientemente atualizada.
+        
+        Se a leitura local falhar, a consulta é repetida no banco remoto.
         
         Args:
             query: Consulta SQL
-            params_list: Lista de tuplas de parâmetros
-            is_local: Se True, usa o banco local, caso contrário o remoto
+            params: Parâmetros para a consulta
+            max_staleness: Defasagem máxima aceita em segundos para usar o banco local
+            use_cache: Se True, usa cache para consultas de leitura
             
         Returns:
-            int: Número total de linhas afetadas
+            Tuple[List[Dict], str]: Resultados e o lado que respondeu (READ_SIDE_LOCAL ou READ_SIDE_REMOTE)
         """
-        # Invalidar cache para operações de escrita
-        if not query.strip().upper().startswith("SELECT"):
-            self._invalidate_cache_for_table(self._extract_table_from_query(query))
+        if self.choose_read_side(query, max_staleness) == READ_SIDE_LOCAL:
+            try:
+                result = self.execute_query(query, params, is_local=True, use_cache=use_cache)
+                self._count_route(READ_SIDE_LOCAL)
+                return result, READ_SIDE_LOCAL
+            except Exception as e:
+                logger.warning(f"Leitura local falhou, usando banco remoto: {e}")
+                self._count_route('fallbacks')
         
-        # Executar operação em lote
-        return self.mysql_connection.execute_batch(query, params_list, is_local)
+        result = self.execute_query(query, params, is_local=False, use_cache=use_cache)
+        self._count_route(READ_SIDE_REMOTE)
+        return result, READ_SIDE_REMOTE
+    
+    def _count_route(self, key: str) -> None:
+        """Incrementa um contador do roteamento de leituras."""
+        with self._routing_stats_lock:
+            self.routing_stats[key] += 1
     
-    def _generate_cache_key(self, query: str, params: tuple = None) -> str:
+    def get_routing_stats(self) -> Dict[str, int]:
         """
-        Gera uma chave de cache para uma consulta.
+        Obtém uma cópia consistente das estatísticas do roteamento de leituras.
+        
+        Returns:
+            Dict[str, int]: Leituras atendidas por lado e número de fallbacks
+        """
+        with self._routing_stats_lock:
+            return dict(self.routing_stats)
+    
+    def execute_update(self, query: str, params: tuple = None, is_local: bool = True) -> int:
+        """
+        Executa uma operação de atualização (INSERT, UPDATE, DELETE).
         
         Args:
             query: Consulta SQL
             params: Parâmetros para a consulta
+            is_local: Se True, usa o banco local, caso contrário o remoto
             
         Returns:
-            str: Chave de cache
+            int: Número de linhas afetadas
         """
-        # Normalizar query (remover espaços extras)
-        normalized_query = " ".join(query.split())
+        # Executar operação (o cache das tabelas alteradas é invalidado pelo MySQLConnection)
+        return self.mysql_connection.execute_update(query, params, is_local)
+    
+    def execute_write_behind(self, query: str, params: tuple = None) -> int:
+        """
+        Executa uma escrita no banco local e a agenda para o remoto (write-behind).
+        
+        A escrita e o registro no outbox são confirmados na mesma transação local;
+        o banco remoto é atualizado em segundo plano, inclusive após quedas do remoto
+        ou reinícios da aplicação.
         
-        # Gerar hash da query e parâmetros
-        key = f"{normalized_query}:{str(params)}"
-        return hashlib.md5(key.encode()).hexdigest()
+        Args:
+            query: Consulta SQL de escrita (INSERT, UPDATE, DELETE)
+            params: Parâmetros para a consulta
+            
+        Returns:
+            int: Número de linhas afetadas no banco local
+        """
+        return self.outbox.write(query, params)
     
-    def _extract_table_from_query(self, query: str) -> Optional[str]:
+    def execute_batch(self, query: str, params_list: List[tuple], is_local: bool = True, parallel: int = 1) -> int:
         """
-        Extrai o nome da tabela de uma consulta SQL.
-        Implementação simplificada, pode não funcionar para consultas complexas.
+        Executa uma operação em lote (batch).
         
         Args:
             query: Consulta SQL
+            params_list: Lista de tuplas de parâmetros
+            is_local: Se True, usa o banco local, caso contrário o remoto
+            parallel: Número de blocos executados em paralelo em conexões separadas
             
         Returns:
-            Optional[str]: Nome da tabela ou None se não for possível extrair
+            int: Número total de linhas afetadas
         """
-        query = query.strip().upper()
-        
-        if query.startswith("INSERT INTO"):
-            parts = query.split("INSERT INTO")[1].strip().split()
-            return parts[0].strip('`"\'')
-        elif query.startswith("UPDATE"):
-            parts = query.split("UPDATE")[1].strip().split()
-            return parts[0].strip('`"\'')
-        elif query.startswith("DELETE FROM"):
-            parts = query.split("DELETE FROM")[1].strip().split()
-            return parts[0].strip('`"\'')
-        
-            return None
+        # Executar operação em lote (o cache das tabelas alteradas é invalidado pelo MySQLConnection)
+        return self.mysql_connection.execute_batch(query, params_list, is_local, parallel=parallel)
     
-    def _invalidate_cache_for_table(self, table_name: Optional[str]) -> None:
+    def _generate_cache_key(self, query: str, params: tuple = None, is_local: bool = True) -> Optional[str]:
         """
-        Invalida o cache para uma tabela específica.
+        Gera uma chave de cache para uma consulta.
+        
+        A chave inclui a geração atual de cada tabela lida pela consulta.
         
         Args:
-            table_name: Nome da tabela
+            query: Consulta SQL
+            params: Parâmetros para a consulta
+            is_local: Se True, a consulta é executada no banco local
+            
+        Returns:
+            Optional[str]: Chave de cache, ou None se as gerações não puderem ser lidas
         """
-        if table_name:
-            logger.debug(f"Invalidando cache para tabela: {table_name}")
-            cache_invalidator.invalidate_table(table_name)
+        generations = self.query_cache.generations.get_many(table_tags(extract_tables(query), is_local))
+        if generations is None:
+            return None
+        return query_key(query, params, namespace='local' if is_local else 'remote',
+                         generations=generations)
     
     def close(self) -> None:
         """Fecha todas as conexões e libera recursos."""
         logger.info("Fechando conexões de banco de dados")
         
         try:
+            # Parar a drenagem do outbox (escritas pendentes continuam no banco local)
+            if hasattr(self, 'outbox'):
+                self.outbox.stop()
+            
+            # Gravar o snapshot de warm start (se ativado)
+            warm_start.save_all()
+            
             # Fechar conexão MySQL
             if hasattr(self, 'mysql_connection'):
                 self.mysql_connection.close()
@@ -342,6 +514,24 @@ def execute_query(query: str, params: tuple = None, is_local: bool = True, use_c
     return db.execute_query(query, params, is_local, use_cache)
 
 
+def execute_routed_query(query: str, params: tuple = None, max_staleness: float = DEFAULT_MAX_STALENESS,
+                         use_cache: bool = False) -> Tuple[List[Dict], str]:
+    """
+    Executa uma leitura preferindo a réplica local dentro do limite de defasagem.
+    
+    Args:
+        query: Consulta SQL
+        params: Parâmetros para a consulta
+        max_staleness: Defasagem máxima aceita em segundos para usar o banco local
+        use_cache: Se True, usa cache para consultas de leitura
+        
+        Returns:
+        Tuple[List[Dict], str]: Resultados e o lado que respondeu
+    """
+    db = get_db_connection()
+    return db.execute_routed_query(query, params, max_staleness, use_cache)
+
+
 def execute_update(query: str, params: tuple = None, is_local: bool = True) -> int:
     """
     Executa uma operação de atualização (INSERT, UPDATE, DELETE).
@@ -358,7 +548,22 @@ def execute_update(query: str, params: tuple = None, is_local: bool = True) -> i
     return db.execute_update(query, params, is_local)
 
 
-def execute_batch(query: str, params_list: List[tuple], is_local: bool = True) -> int:
+def execute_write_behind(query: str, params: tuple = None) -> int:
+    """
+    Executa uma escrita no banco local e a agenda para o banco remoto.
+    
+    Args:
+        query: Consulta SQL de escrita
+        params: Parâmetros para a consulta
+        
+        Returns:
+        int: Número de linhas afetadas no banco local
+    """
+    db = get_db_connection()
+    return db.execute_write_behind(query, params)
+
+
+def execute_batch(query: str, params_list: List[tuple], is_local: bool = True, parallel: int = 1) -> int:
     """
     Executa uma operação em lote (batch).
     
@@ -366,9 +571,10 @@ def execute_batch(query: str, params_list: List[tuple], is_local: bool = True) -
         query: Consulta SQL
         params_list: Lista de tuplas de parâmetros
         is_local: Se True, usa o banco local, caso contrário o remoto
+        parallel: Número de blocos executados em paralelo em conexões separadas
         
         Returns:
         int: Número total de linhas afetadas
     """
     db = get_db_connection()
-    return db.execute_batch(query, params_list, is_local)
+    return db.execute_batch(query, params_list, is_local, parallel)
@@ -0,0 +1,446 @@
+"""
+Módulo para execução de operações em lote no MySQL.
+Reescreve instruções suportadas em formas multi-linha e divide os lotes
+pelo tamanho estimado do pacote, respeitando o max_allowed_packet do servidor.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+# Valor padrão do max_allowed_packet quando não for possível consultar o servidor (4MB)
+DEFAULT_MAX_ALLOWED_PACKET = 4 * 1024 * 1024
+
+# Fração do pacote efetivamente usada (margem para cabeçalhos e escapes)
+PACKET_SAFETY_RATIO = 0.9
+
+# Limites de linhas por instrução reescrita
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_MAX_UPDATE_ROWS = 500
+
+_INSERT_RE = re.compile(
+    r"^\s*((?:INSERT(?:\s+(?:IGNORE|LOW_PRIORITY|HIGH_PRIORITY|DELAYED))*|REPLACE(?:\s+(?:LOW_PRIORITY|DELAYED))*)\s+(?:INTO\s+)?.+?)\bVALUES?\s*\(",
+    re.IGNORECASE | re.DOTALL
+)
+_UPDATE_RE = re.compile(
+    r"^\s*UPDATE\s+(`?[\w.]+`?)\s+SET\s+(.+?)\s+WHERE\s+(`?\w+`?)\s*=\s*%s\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+_ASSIGNMENT_RE = re.compile(r"^\s*(`?\w+`?)\s*=\s*%s\s*$", re.DOTALL)
+
+
+class BatchStatement:
+    """
+    Representação de uma instrução de lote após a análise.
+
+    Atributos:
+        kind (str): 'insert' (INSERT/REPLACE multi-linha), 'update' (UPDATE com CASE) ou 'generic'
+        query (str): Consulta original
+        head (str): Parte fixa antes das linhas (INSERT/REPLACE)
+        row_template (str): Grupo de valores de uma linha, ex.: "(%s, %s)"
+        tail (str): Parte fixa após as linhas (ex.: ON DUPLICATE KEY UPDATE ...)
+        table (str): Tabela alvo (UPDATE)
+        columns (List[str]): Colunas atribuídas (UPDATE)
+        key_column (str): Coluna da cláusula WHERE (UPDATE)
+    """
+
+    def __init__(self, kind: str, query: str, head: str = "", row_template: str = "", tail: str = "",
+                 table: str = "", columns: Optional[List[str]] = None, key_column: str = ""):
+        self.kind = kind
+        self.query = query
+        self.head = head
+        self.row_template = row_template
+        self.tail = tail
+        self.table = table
+        self.columns = columns or []
+        self.key_column = key_column
+
+    @property
+    def is_rewritable(self) -> bool:
+        """Indica se a instrução pode ser reescrita em forma multi-linha."""
+        return self.kind != 'generic'
+
+
+def _scan_unquoted(text: str):
+    """
+    Percorre o texto retornando (índice, caractere) apenas fora de literais e identificadores.
+
+    Args:
+        text: Texto SQL
+    """
+    quote = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\' and quote != '`':
+                i += 2
+                continue
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+        else:
+            yield i, char
+        i += 1
+
+
+def _count_placeholders(text: str) -> int:
+    """Conta os placeholders %s fora de literais."""
+    count = 0
+    previous = None
+    for _, char in _scan_unquoted(text):
+        if previous == '%' and char == 's':
+            count += 1
+        previous = char
+    return count
+
+
+def _split_top_level(text: str, separator: str = ',') -> List[str]:
+    """Divide o texto pelo separador, ignorando parênteses aninhados e literais."""
+    parts = []
+    depth = 0
+    start = 0
+    for index, char in _scan_unquoted(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _find_group_end(text: str, start: int) -> int:
+    """Retorna o índice do parêntese que fecha o grupo iniciado em start."""
+    depth = 0
+    for index, char in _scan_unquoted(text[start:]):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return start + index
+    return -1
+
+
+def parse_batch_statement(query: str) -> BatchStatement:
+    """
+    Analisa uma instrução de lote e identifica se pode ser reescrita.
+
+    Suporta:
+        - INSERT [IGNORE] ... VALUES (...) [ON DUPLICATE KEY UPDATE ...] sem placeholders no ODKU
+        - REPLACE ... VALUES (...)
+        - UPDATE tabela SET col = %s[, ...] WHERE chave = %s
+
+    Args:
+        query: Consulta SQL com placeholders %s
+
+    Returns:
+        BatchStatement: Instrução analisada (kind='generic' se não suportada)
+    """
+    if '%(' in query:
+        # Placeholders nomeados não são reescritos
+        return BatchStatement('generic', query)
+
+    match = _INSERT_RE.match(query)
+    if match:
+        group_start = match.end() - 1
+        group_end = _find_group_end(query, group_start)
+        if group_end > 0:
+            head = query[:group_start].rstrip()
+            head = re.sub(r"\bVALUE\s*$", "VALUES", head, flags=re.IGNORECASE)
+            row_template = query[group_start:group_end + 1]
+            tail = query[group_end + 1:].strip().rstrip(';').strip()
+            # O ODKU com placeholders repetiria parâmetros por linha
+            if _count_placeholders(tail) == 0 and _count_placeholders(row_template) > 0:
+                return BatchStatement('insert', query, head=head, row_template=row_template, tail=tail)
+        return BatchStatement('generic', query)
+
+    match = _UPDATE_RE.match(query)
+    if match:
+        table, assignments, key_column = match.groups()
+        columns = []
+        for assignment in _split_top_level(assignments):
+            column_match = _ASSIGNMENT_RE.match(assignment)
+            if not column_match:
+                return BatchStatement('generic', query)
+            columns.append(column_match.group(1))
+        if columns:
+            return BatchStatement('update', query, table=table, columns=columns, key_column=key_column)
+
+    return BatchStatement('generic', query)
+
+
+def estimate_param_size(value: Any) -> int:
+    """
+    Estima o tamanho em bytes de um parâmetro após a conversão para literal SQL.
+
+    Args:
+        value: Valor do parâmetro
+
+    Returns:
+        int: Tamanho aproximado em bytes
+    """
+    if value is None:
+        return 4
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value))
+    if isinstance(value, str):
+        # Aspas + pior caso de escape proporcional
+        encoded = len(value.encode('utf-8'))
+        return encoded + encoded // 8 + 2
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value) * 2 + 10
+    if isinstance(value, (datetime, date, dt_time, timedelta)):
+        return 28
+    return len(str(value)) + 2
+
+
+def estimate_row_size(params: Sequence[Any], template_size: int) -> int:
+    """Estima o tamanho em bytes de uma linha renderizada."""
+    return template_size + sum(estimate_param_size(value) for value in params)
+
+
+def chunk_rows(params_list: Sequence[Sequence[Any]], budget: int, max_rows: int,
+               row_size: Callable[[Sequence[Any]], int]) -> List[List[Sequence[Any]]]:
+    """
+    Divide as linhas em blocos que caibam no orçamento de bytes.
+
+    Args:
+        params_list: Lista de parâmetros por linha
+        budget: Tamanho máximo em bytes por bloco
+        max_rows: Número máximo de linhas por bloco
+        row_size: Função que estima o tamanho de uma linha
+
+    Returns:
+        List[List[Sequence[Any]]]: Blocos de linhas
+    """
+    chunks = []
+    current = []
+    current_size = 0
+
+    for params in params_list:
+        size = row_size(params)
+        if current and (current_size + size > budget or len(current) >= max_rows):
+            chunks.append(current)
+            current = []
+            current_size = 0
+        if size > budget:
+            logger.warning(f"Linha com tamanho estimado de {size} bytes excede o limite do pacote ({budget} bytes)")
+        current.append(params)
+        current_size += size
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def build_multi_row_insert(statement: BatchStatement, rows: List[Sequence[Any]]) -> Tuple[str, Tuple]:
+    """
+    Monta um INSERT/REPLACE multi-linha.
+
+    Args:
+        statement: Instrução analisada do tipo 'insert'
+        rows: Linhas do bloco
+
+    Returns:
+        Tuple[str, Tuple]: Consulta e parâmetros achatados
+    """
+    values = ", ".join([statement.row_template] * len(rows))
+    query = f"{statement.head} {values}"
+    if statement.tail:
+        query = f"{query} {statement.tail}"
+    params = tuple(value for row in rows for value in row)
+    return query, params
+
+
+def build_case_update(statement: BatchStatement, rows: List[Sequence[Any]]) -> Tuple[str, Tuple]:
+    """
+    Monta um UPDATE multi-linha usando CASE sobre a coluna chave.
+
+    Linhas repetidas para a mesma chave mantêm apenas a última ocorrência,
+    preservando o estado final que as execuções sequenciais produziriam.
+
+    Args:
+        statement: Instrução analisada do tipo 'update'
+        rows: Linhas do bloco (valores das colunas seguidos da chave)
+
+    Returns:
+        Tuple[str, Tuple]: Consulta e parâmetros achatados
+    """
+    latest: Dict[Any, Sequence[Any]] = {}
+    for row in rows:
+        latest[row[-1]] = row
+    unique_rows = list(latest.values())
+
+    key = statement.key_column
+    set_clauses = []
+    params: List[Any] = []
+    for index, column in enumerate(statement.columns):
+        whens = " ".join(["WHEN %s THEN %s"] * len(unique_rows))
+        set_clauses.append(f"{column} = CASE {key} {whens} ELSE {column} END")
+        for row in unique_rows:
+            params.extend((row[-1], row[index]))
+
+    placeholders = ", ".join(["%s"] * len(unique_rows))
+    params.extend(row[-1] for row in unique_rows)
+
+    query = f"UPDATE {statement.table} SET {', '.join(set_clauses)} WHERE {key} IN ({placeholders})"
+    return query, tuple(params)
+
+
+class BatchWriter:
+    """
+    Executa operações em lote com reescrita multi-linha e divisão por tamanho de pacote.
+
+    Atributos:
+        get_connection (Callable): Função que obtém uma conexão do pool
+        release_connection (Callable): Função que devolve a conexão ao pool
+        max_allowed_packet (int): Tamanho máximo de pacote do servidor em bytes
+        max_rows (int): Número máximo de linhas por instrução
+        parallel (int): Número de blocos executados em paralelo (conexões separadas)
+    """
+
+    def __init__(self, get_connection: Callable[[], mysql.connector.MySQLConnection],
+                 release_connection: Callable[[mysql.connector.MySQLConnection], None],
+                 max_allowed_packet: int = DEFAULT_MAX_ALLOWED_PACKET,
+                 max_rows: int = DEFAULT_MAX_ROWS,
+                 parallel: int = 1):
+        self.get_connection = get_connection
+        self.release_connection = release_connection
+        self.max_allowed_packet = max_allowed_packet
+        self.max_rows = max_rows
+        self.parallel = max(1, parallel)
+
+    def plan(self, query: str, params_list: Sequence[Sequence[Any]]) -> List[Tuple[str, Any, bool]]:
+        """
+        Gera o plano de execução do lote.
+
+        Args:
+            query: Consulta SQL
+            params_list: Lista de parâmetros
+
+        Returns:
+            List[Tuple[str, Any, bool]]: (consulta, parâmetros, usa_executemany) por bloco
+        """
+        statement = parse_batch_statement(query)
+
+        if statement.kind == 'insert':
+            fixed_size = len(statement.head) + len(statement.tail) + 2
+            template_size = len(statement.row_template) + 2
+            row_size = lambda row: estimate_row_size(row, template_size)
+            max_rows = self.max_rows
+        elif statement.kind == 'update':
+            fixed_size = len(statement.table) + len(statement.key_column) + 32
+            # Cada linha gera um WHEN/THEN por coluna e um valor no IN
+            template_size = (len(statement.key_column) + 16) * len(statement.columns) + 4
+            key_copies = len(statement.columns)
+            row_size = lambda row: estimate_row_size(row, template_size) + estimate_param_size(row[-1]) * key_copies
+            max_rows = min(self.max_rows, DEFAULT_MAX_UPDATE_ROWS)
+        else:
+            fixed_size = len(query)
+            row_size = lambda row: estimate_row_size(row, 0)
+            max_rows = self.max_rows
+
+        budget = max(int(self.max_allowed_packet * PACKET_SAFETY_RATIO) - fixed_size, 1024)
+        chunks = chunk_rows(params_list, budget, max_rows, row_size)
+
+        plan = []
+        for chunk in chunks:
+            if statement.kind == 'insert':
+                plan.append((*build_multi_row_insert(statement, chunk), False))
+            elif statement.kind == 'update':
+                plan.append((*build_case_update(statement, chunk), False))
+            else:
+                plan.append((query, chunk, True))
+
+        logger.debug(f"Lote de {len(params_list)} linhas dividido em {len(plan)} bloco(s) ({statement.kind})")
+        return plan
+
+    def _run_chunk(self, cursor, chunk_query: str, chunk_params: Any, use_executemany: bool) -> int:
+        """Executa um bloco do plano em um cursor."""
+        if use_executemany:
+            cursor.executemany(chunk_query, chunk_params)
+        else:
+            cursor.execute(chunk_query, chunk_params)
+        return max(cursor.rowcount, 0)
+
+    def _execute_sequential(self, plan: List[Tuple[str, Any, bool]]) -> int:
+        """Executa todos os blocos em uma única conexão e transação."""
+        connection = None
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            affected = 0
+            for chunk_query, chunk_params, use_executemany in plan:
+                affected += self._run_chunk(cursor, chunk_query, chunk_params, use_executemany)
+            connection.commit()
+            cursor.close()
+            return affected
+        except Error:
+            if connection:
+                connection.rollback()
+            raise
+        finally:
+            if connection:
+                self.release_connection(connection)
+
+    def execute_plan(self, plan: List[Tuple[str, Any, bool]]) -> int:
+        """
+        Executa um plano (ou a concatenação de vários) em uma única conexão e transação.
+
+        Args:
+            plan: Blocos gerados por plan()
+
+        Returns:
+            int: Número total de linhas afetadas
+        """
+        if not plan:
+            return 0
+        return self._execute_sequential(plan)
+
+    def _execute_isolated(self, chunk_query: str, chunk_params: Any, use_executemany: bool) -> int:
+        """Executa um bloco em conexão e transação próprias."""
+        return self._execute_sequential([(chunk_query, chunk_params, use_executemany)])
+
+    def execute(self, query: str, params_list: Sequence[Sequence[Any]]) -> int:
+        """
+        Executa o lote.
+
+        Em modo sequencial todos os blocos são confirmados em uma única transação.
+        Em modo paralelo cada bloco usa sua própria conexão e transação, portanto
+        uma falha pode deixar outros blocos já confirmados.
+
+        Args:
+            query: Consulta SQL
+            params_list: Lista de parâmetros
+
+        Returns:
+            int: Número total de linhas afetadas
+        """
+        if not params_list:
+            return 0
+
+        plan = self.plan(query, params_list)
+
+        if self.parallel == 1 or len(plan) == 1:
+            return self._execute_sequential(plan)
+
+        with ThreadPoolExecutor(max_workers=min(self.parallel, len(plan)),
+                                thread_name_prefix="mysql-batch") as executor:
+            futures = [executor.submit(self._execute_isolated, *step) for step in plan]
+            return sum(future.result() for future in futures)
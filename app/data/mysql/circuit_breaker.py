@@ -0,0 +1,382 @@
+"""
+Circuit breaker para conexões MySQL.
+Evita que chamadas a um banco indisponível esperem o timeout de conexão:
+após uma taxa de falhas elevada o circuito abre e as chamadas falham imediatamente
+até que uma sondagem em segundo plano confirme que o servidor voltou.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mysql.connector import Error, InterfaceError, OperationalError, PoolError
+
+logger = logging.getLogger(__name__)
+
+# Estados do circuito
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# Códigos de erro do cliente MySQL que indicam servidor inacessível
+CONNECTION_ERRNOS = {
+    2002,  # CR_CONNECTION_ERROR
+    2003,  # CR_CONN_HOST_ERROR
+    2005,  # CR_UNKNOWN_HOST
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST
+    2055,  # CR_SERVER_LOST_EXTENDED
+}
+
+class CircuitOpenError(Error):
+    """Chamada recusada porque o circuito do banco está aberto."""
+    pass
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Verifica se um erro indica falha de comunicação com o servidor (e não erro de SQL).
+
+    Args:
+        error: Exceção capturada
+
+    Returns:
+        bool: True se a falha deve contar para o circuit breaker
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    if isinstance(error, PoolError):
+        # Pool esgotado não significa servidor fora do ar
+        return False
+    if isinstance(error, Error):
+        if error.errno in CONNECTION_ERRNOS:
+            return True
+        return error.errno is None and isinstance(error, (InterfaceError, OperationalError))
+    return False
+
+class CircuitBreaker:
+    """
+    Circuit breaker com estados fechado, aberto e meio-aberto.
+
+    O circuito abre quando, entre as últimas `window_size` chamadas (e com pelo menos
+    `min_calls` registradas), a proporção de falhas atinge `failure_rate_threshold`.
+    Depois de `open_duration` segundos o circuito passa a meio-aberto: se houver uma
+    função de sondagem, ela é executada em segundo plano e decide se o circuito fecha;
+    sem sondagem, uma única chamada de teste é liberada.
+
+    Atributos:
+        name (str): Nome do circuito (usado em logs e notificações)
+        state (str): Estado atual (STATE_CLOSED, STATE_OPEN ou STATE_HALF_OPEN)
+    """
+
+    def __init__(self,
+                 name: str,
+                 failure_rate_threshold: float = 0.5,
+                 window_size: int = 20,
+                 min_calls: int = 5,
+                 open_duration: float = 30.0,
+                 probe: Optional[Callable[[], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o circuit breaker.
+
+        Args:
+            name: Nome do circuito
+            failure_rate_threshold: Proporção de falhas (0-1) que abre o circuito
+            window_size: Quantidade de chamadas consideradas na janela deslizante
+            min_calls: Mínimo de chamadas na janela antes de avaliar a taxa de falhas
+            open_duration: Tempo em segundos que o circuito permanece aberto antes da sondagem
+            probe: Função que testa o servidor (deve lançar exceção em caso de falha)
+            clock: Relógio monotônico (substituível em testes)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.probe = probe
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        # Serializa a entrega das transições, feita fora de _lock
+        self._notify_lock = threading.Lock()
+        self._events: List[Tuple[str, str]] = []
+        self._window = deque(maxlen=window_size)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._probe_thread = None
+        self._stop_probe = threading.Event()
+        self._listeners: List[Callable[[str, str, str], None]] = []
+
+        self.stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    @contextmanager
+    def _locked(self):
+        """Adquire o lock e, ao liberá-lo, entrega as transições ocorridas."""
+        try:
+            with self._lock:
+                yield
+        finally:
+            self._dispatch_events()
+
+    def _dispatch_events(self) -> None:
+        """
+        Notifica os observers das transições pendentes, em ordem e sem o lock do circuito.
+
+        Assim um observer pode consultar o circuito (state, before_call), inclusive
+        de outra thread, sem risco de deadlock. Se outra thread já está entregando,
+        ela também entrega as transições enfileiradas por esta.
+        """
+        while self._notify_lock.acquire(blocking=False):
+            try:
+                with self._lock:
+                    events, self._events = self._events, []
+                    listeners = list(self._listeners)
+                for old_state, new_state in events:
+                    for listener in listeners:
+                        try:
+                            listener(self.name, old_state, new_state)
+                        except Exception as e:
+                            logger.error(f"Erro ao notificar mudança do circuito '{self.name}': {e}")
+            finally:
+                self._notify_lock.release()
+            with self._lock:
+                if not self._events:
+                    return
+
+    @property
+    def state(self) -> str:
+        """Estado atual do circuito."""
+        with self._locked():
+            self._maybe_half_open()
+            return self._state
+
+    def is_closed(self) -> bool:
+        """Verifica se o circuito está fechado (chamadas liberadas normalmente)."""
+        return self.state == STATE_CLOSED
+
+    def add_listener(self, callback: Callable[[str, str, str], None]) -> None:
+        """
+        Adiciona um observer de mudanças de estado.
+
+        Args:
+            callback: Função chamada com (nome, estado_anterior, novo_estado)
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str, str], None]) -> None:
+        """Remove um observer de mudanças de estado."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def before_call(self) -> None:
+        """
+        Verifica se uma chamada pode prosseguir.
+
+        Raises:
+            CircuitOpenError: Se o circuito está aberto (ou meio-aberto com teste em andamento)
+        """
+        with self._locked():
+            self._maybe_half_open()
+
+            if self._state == STATE_CLOSED:
+                return
+
+            if self._state == STATE_HALF_OPEN and self.probe is None and not self._trial_in_flight:
+                # Sem sondagem em segundo plano: libera uma única chamada de teste
+                self._trial_in_flight = True
+                return
+
+            self.stats['rejected'] += 1
+            remaining = max(0.0, self._opened_at + self.open_duration - self._clock())
+
+        raise CircuitOpenError(
+            msg=f"Circuito '{self.name}' aberto: servidor indisponível (nova tentativa em {remaining:.0f}s)"
+        )
+
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida."""
+        with self._locked():
+            self.stats['successes'] += 1
+            self._window.append(True)
+            if self._state == STATE_HALF_OPEN:
+                self._trial_in_flight = False
+                self._transition(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """Registra uma falha de comunicação com o servidor."""
+        with self._locked():
+            self.stats['failures'] += 1
+            self._window.append(False)
+
+            if self._state == STATE_HALF_OPEN:
+                self._trial_in_flight = False
+                self._transition(STATE_OPEN)
+            elif self._state == STATE_CLOSED and self._failure_rate_exceeded():
+                self._transition(STATE_OPEN)
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Executa uma função protegida pelo circuito.
+
+        Apenas erros de conexão (ver is_connection_error) contam como falha.
+
+        Args:
+            func: Função a ser executada
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            Resultado da função
+
+        Raises:
+            CircuitOpenError: Se o circuito está aberto
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_connection_error(e):
+                self.record_failure()
+            else:
+                self.release_trial()
+            raise
+        self.record_success()
+        return result
+
+    def release_trial(self) -> None:
+        """Libera a chamada de teste do estado meio-aberto sem registrar resultado."""
+        with self._locked():
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        """Fecha o circuito e descarta o histórico de chamadas."""
+        with self._locked():
+            self._window.clear()
+            self._trial_in_flight = False
+            self._stop_probe.set()
+            if self._state != STATE_CLOSED:
+                self._transition(STATE_CLOSED)
+
+    def get_status(self) -> Dict[str, object]:
+        """
+        Obtém o estado e as estatísticas do circuito.
+
+        Returns:
+            Dict[str, object]: Estado, taxa de falhas na janela e contadores
+        """
+        with self._locked():
+            self._maybe_half_open()
+            calls = len(self._window)
+            failures = calls - sum(self._window)
+            return {
+                'name': self.name,
+                'state': self._state,
+                'window_calls': calls,
+                'failure_rate': failures / calls if calls else 0.0,
+                **self.stats
+            }
+
+    def _failure_rate_exceeded(self) -> bool:
+        """Verifica se a taxa de falhas da janela atingiu o limite."""
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return False
+        failures = calls - sum(self._window)
+        return failures / calls >= self.failure_rate_threshold
+
+    def _maybe_half_open(self) -> None:
+        """Passa para meio-aberto quando o tempo de abertura expira (modo sem sondagem)."""
+        if (self._state == STATE_OPEN and self.probe is None
+                and self._clock() - self._opened_at >= self.open_duration):
+            self._transition(STATE_HALF_OPEN)
+
+    def _transition(self, new_state: str) -> None:
+        """
+        Altera o estado do circuito e enfileira a notificação dos observers.
+
+        Deve ser chamado com o lock adquirido (via _locked, que entrega as
+        notificações depois de liberá-lo).
+        """
+        old_state = self._state
+        if old_state == new_state:
+            return
+
+        self._state = new_state
+        if new_state == STATE_OPEN:
+            self._opened_at = self._clock()
+            self.stats['opened'] += 1
+            logger.warning(f"Circuito '{self.name}' aberto: chamadas falharão imediatamente "
+                           f"por {self.open_duration:.0f}s")
+            if self.probe is not None:
+                self._start_probe()
+        elif new_state == STATE_CLOSED:
+            self._window.clear()
+            logger.info(f"Circuito '{self.name}' fechado: servidor disponível novamente")
+        else:
+            logger.info(f"Circuito '{self.name}' meio-aberto: testando servidor")
+
+        self._events.append((old_state, new_state))
+
+    def _start_probe(self) -> None:
+        """Inicia a thread de sondagem, se ainda não estiver em execução."""
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._stop_probe.clear()
+            self._probe_thread = threading.Thread(
+                target=self._probe_worker,
+                daemon=True,
+                name=f"circuit-probe-{self.name}"
+            )
+            self._probe_thread.start()
+
+    def _probe_worker(self) -> None:
+        """Aguarda o tempo de abertura e sonda o servidor até o circuito fechar."""
+        while not self._stop_probe.wait(self.open_duration):
+            with self._locked():
+                if self._state != STATE_OPEN:
+                    return
+                self._transition(STATE_HALF_OPEN)
+
+            try:
+                self.probe()
+            except Exception as e:
+                logger.debug(f"Sondagem do circuito '{self.name}' falhou: {e}")
+                with self._locked():
+                    if self._state == STATE_HALF_OPEN:
+                        self._transition(STATE_OPEN)
+                continue
+
+            with self._locked():
+                if self._state == STATE_HALF_OPEN:
+                    self._transition(STATE_CLOSED)
+            return
+
+# Circuitos compartilhados por processo, indexados por nome
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str, probe: Optional[Callable[[], None]] = None, **kwargs) -> CircuitBreaker:
+    """
+    Obtém o circuit breaker compartilhado de um nome, criando-o no primeiro uso.
+
+    Args:
+        name: Nome do circuito
+        probe: Função de sondagem (definida apenas se o circuito ainda não tiver uma)
+        **kwargs: Parâmetros repassados ao CircuitBreaker na criação
+
+    Returns:
+        CircuitBreaker: Circuito compartilhado
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, probe=probe, **kwargs)
+            _breakers[name] = breaker
+        elif breaker.probe is None and probe is not None:
+            breaker.probe = probe
+        return breaker
@@ -17,6 +17,11 @@ from typing import Optional, Dict, Any, List, Union
 from pathlib import Path
 from datetime import datetime, timedelta
 from app.config.settings import DATABASE, MYSQL_DIR
+from app.data.mysql.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, get_circuit_breaker, is_connection_error
+)
+from app.core.observer.connection_observer import connection_observer
+from app.core.metrics import metrics
 import queue
 
 # Configuração de logging
@@ -26,6 +31,9 @@ class MySQLPool:
     """
     Implementa um pool de conexões MySQL com suporte para health check e reconexão automática.
     
+    Cada pool é protegido por um circuit breaker: com o servidor fora do ar as chamadas
+    falham imediatamente e a sondagem em segundo plano decide quando voltar a conectar.
+    
     Atributos:
         max_connections (int): Número máximo de conexões no pool
         config (dict): Configurações de conexão MySQL
@@ -33,6 +41,7 @@ class MySQLPool:
         connection_timeout (int): Timeout para obtenção de conexão em segundos
         idle_timeout (int): Tempo máximo que uma conexão pode ficar ociosa em segundos
         health_check_interval (int): Intervalo para verificação de saúde das conexões em segundos
+        circuit_breaker (CircuitBreaker): Circuito que protege o servidor do pool
     """
     
     def __init__(self, 
@@ -41,7 +50,8 @@ class MySQLPool:
                  pool_name: str = "mysql_pool",
                  connection_timeout: int = 30,
                  idle_timeout: int = 600,
-                 health_check_interval: int = 60):
+                 health_check_interval: int = 60,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         """
         Inicializa o pool de conexões MySQL.
         
@@ -52,6 +62,7 @@ class MySQLPool:
             connection_timeout: Timeout para obtenção de conexão em segundos
             idle_timeout: Tempo máximo que uma conexão pode ficar ociosa em segundos
             health_check_interval: Intervalo para verificação de saúde das conexões em segundos
+            circuit_breaker: Circuito a ser usado (padrão: circuito compartilhado com o nome do pool)
         """
         self.max_connections = max_connections
         self.config = config or {}
@@ -65,8 +76,18 @@ class MySQLPool:
         self._health_check_thread = None
         self._stop_health_check = threading.Event()
         
-        # Inicializar o pool
-        self._create_pool()
+        # Tempo de espera por conexão, em série temporal compartilhada com os monitores
+        self.wait_metrics = metrics.series(f"pool_{pool_name}", ('wait_ms',))
+        
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(pool_name, probe=self._probe)
+        if self.circuit_breaker.probe is None:
+            self.circuit_breaker.probe = self._probe
+        
+        # Inicializar o pool (com o servidor fora do ar, ele é criado no primeiro get_connection)
+        try:
+            self._create_pool()
+        except Error as e:
+            logger.warning(f"Pool '{self.pool_name}' será criado quando o servidor estiver disponível: {e}")
         
         # Iniciar thread de health check
         self._start_health_check()
@@ -85,9 +106,30 @@ class MySQLPool:
                     )
                     logger.info(f"Pool de conexões MySQL '{self.pool_name}' criado com sucesso")
         except Error as e:
+            if is_connection_error(e):
+                self.circuit_breaker.record_failure()
             logger.error(f"Erro ao criar pool de conexões MySQL: {e}")
             raise
     
+    def _probe(self) -> None:
+        """
+        Testa o servidor com uma conexão avulsa de timeout curto (sondagem do circuito meio-aberto).
+        
+        Raises:
+            Error: Se o servidor continuar inacessível
+        """
+        config = {k: v for k, v in self.config.items() if k not in ('pool_name', 'pool_size')}
+        config['connection_timeout'] = min(self.connection_timeout, 5)
+        
+        conn = mysql.connector.connect(**config)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+    
     def _start_health_check(self) -> None:
         """Inicia a thread de health check para verificar a saúde das conexões periodicamente."""
         if self._health_check_thread is None or not self._health_check_thread.is_alive():
@@ -118,6 +160,11 @@ class MySQLPool:
     
     def _check_pool_health(self) -> None:
         """Verifica a saúde do pool de conexões e reconecta se necessário."""
+        # Com o circuito aberto quem testa o servidor é a sondagem do circuit breaker
+        if not self.circuit_breaker.is_closed():
+            logger.debug(f"Health check do pool '{self.pool_name}' ignorado: circuito {self.circuit_breaker.state}")
+            return
+        
         try:
             # Obter uma conexão do pool para testar
             conn = self.get_connection()
@@ -133,8 +180,9 @@ class MySQLPool:
                 self.release_connection(conn)
         except Exception as e:
             logger.warning(f"Health check do pool '{self.pool_name}' falhou: {e}")
-            # Tentar recriar o pool
-            self._recreate_pool()
+            # Tentar recriar o pool apenas enquanto o servidor não estiver marcado como indisponível
+            if self.circuit_breaker.is_closed():
+                self._recreate_pool()
     
     def _recreate_pool(self) -> None:
         """Recria o pool de conexões em caso de falha."""
@@ -160,8 +208,12 @@ class MySQLPool:
             MySQLConnection: Uma conexão MySQL do pool
             
         Raises:
+            CircuitOpenError: Se o circuito do servidor está aberto
             Error: Se não for possível obter uma conexão
         """
+        # Falha imediata enquanto o servidor estiver marcado como indisponível
+        self.circuit_breaker.before_call()
+        
         start_time = time.time()
         last_error = None
         
@@ -173,11 +225,24 @@ class MySQLPool:
                     
                     conn = self._pool.get_connection()
                     logger.debug(f"Conexão obtida do pool '{self.pool_name}'")
+                    self.wait_metrics.append(((time.time() - start_time) * 1000,))
+                    self.circuit_breaker.record_success()
                     return conn
             except Error as e:
                 last_error = e
                 logger.warning(f"Erro ao obter conexão do pool '{self.pool_name}': {e}")
                 
+                if is_connection_error(e):
+                    # _create_pool já registrou a falha se ela ocorreu na criação do pool
+                    if self._pool is not None:
+                        self.circuit_breaker.record_failure()
+                    
+                    # O circuito abriu durante as tentativas: não esperar pelo restante do timeout
+                    if not self.circuit_breaker.is_closed():
+                        raise CircuitOpenError(
+                            msg=f"Servidor do pool '{self.pool_name}' indisponível: {e}"
+                        ) from e
+                
                 # Esperar um pouco antes de tentar novamente
                 time.sleep(0.5)
                 
@@ -186,6 +251,7 @@ class MySQLPool:
                     self._recreate_pool()
         
         # Se chegou aqui, não foi possível obter uma conexão dentro do timeout
+        self.circuit_breaker.release_trial()
         error_msg = f"Timeout ao obter conexão do pool '{self.pool_name}' após {self.connection_timeout}s"
         logger.error(error_msg)
         if last_error:
@@ -251,6 +317,8 @@ class MySQLConnectionManager:
             logger.info("Inicializando gerenciador de conexões MySQL")
             self.local_pool = None
             self.remote_pool = None
+            self.local_config: Optional[Dict[str, Any]] = None
+            self.remote_config: Optional[Dict[str, Any]] = None
             self.initialized = True
             self._ensure_app_directories()
             self._initialize_pools()
@@ -267,7 +335,7 @@ class MySQLConnectionManager:
             logger.error(f"Erro ao verificar diretórios necessários: {str(e)}")
     
     def _initialize_pools(self):
-        """Inicializa os pools de conexão local e remoto com as configurações padrão"""
+        """Registra as configurações padrão; os pools são criados no primeiro uso de cada lado."""
         try:
             # Configurações do banco local
             local_config = DATABASE['mysql']['local']
@@ -275,7 +343,7 @@ class MySQLConnectionManager:
             # Configurações do banco remoto
             remote_config = DATABASE['mysql']['remote']
             
-            # Inicializar pools
+            # Registrar configurações
             self.initialize_pools(local_config, remote_config)
         except Exception as e:
             logger.error(f"Erro ao inicializar pools de conexão MySQL: {e}")
@@ -284,7 +352,10 @@ class MySQLConnectionManager:
                          local_config: Dict[str, Any], 
                          remote_config: Dict[str, Any]) -> None:
         """
-        Inicializa os pools de conexão local e remoto.
+        Define as configurações dos pools de conexão local e remoto.
+        
+        Os pools existentes são fechados e os novos só são criados quando
+        uma conexão do respectivo lado for solicitada.
         
         Args:
             local_config (Dict[str, Any]): Configuração do banco local
@@ -294,22 +365,48 @@ class MySQLConnectionManager:
             # Fechar pools existentes
             if self.local_pool:
                 self.local_pool.close()
+                self.local_pool = None
             
             if self.remote_pool:
                 self.remote_pool.close()
+                self.remote_pool = None
             
-            # Criar novos pools
-            self.local_pool = MySQLPool(
-                pool_name="mysql_local_pool",
-                **local_config
-            )
+            self.local_config = local_config
+            self.remote_config = remote_config
             
-            self.remote_pool = MySQLPool(
-                pool_name="mysql_remote_pool",
-                **remote_config
-            )
+            logger.info("Configurações dos pools de conexão MySQL registradas")
+    
+    def _get_pool(self, is_local: bool) -> MySQLPool:
+        """
+        Obtém o pool de um lado, criando-o no primeiro uso.
+        
+        Args:
+            is_local: Se True, retorna o pool local
             
-            logger.info("Pools de conexão MySQL inicializados com sucesso")
+        Returns:
+            MySQLPool: Pool de conexões
+        """
+        pool = self.local_pool if is_local else self.remote_pool
+        if pool is not None:
+            return pool
+        
+        with self._lock:
+            config = self.local_config if is_local else self.remote_config
+            if config is None:
+                raise ValueError(f"Pool de conexão {'local' if is_local else 'remoto'} não inicializado")
+            
+            if is_local:
+                if self.local_pool is None:
+                    self.local_pool = MySQLPool(pool_name="mysql_local_pool", config=config)
+                return self.local_pool
+            
+            if self.remote_pool is None:
+                # A disponibilidade do pool remoto alimenta o sinal de modo offline
+                breaker = get_circuit_breaker("mysql_remote_pool")
+                breaker.add_listener(connection_observer.on_circuit_state_change)
+                self.remote_pool = MySQLPool(pool_name="mysql_remote_pool", config=config,
+                                             circuit_breaker=breaker)
+            return self.remote_pool
     
     def get_local_connection(self) -> mysql.connector.MySQLConnection:
         """
@@ -318,10 +415,7 @@ class MySQLConnectionManager:
         Returns:
             mysql.connector.MySQLConnection: Conexão MySQL local
         """
-        if not self.local_pool:
-            raise ValueError("Pool de conexão local não inicializado")
-        
-        return self.local_pool.get_connection()
+        return self._get_pool(is_local=True).get_connection()
     
     def get_remote_connection(self) -> mysql.connector.MySQLConnection:
         """
@@ -330,10 +424,7 @@ class MySQLConnectionManager:
         Returns:
             mysql.connector.MySQLConnection: Conexão MySQL remota
         """
-        if not self.remote_pool:
-            raise ValueError("Pool de conexão remoto não inicializado")
-        
-        return self.remote_pool.get_connection()
+        return self._get_pool(is_local=False).get_connection()
     
     def close_pools(self) -> None:
         """Fecha todos os pools de conexão"""
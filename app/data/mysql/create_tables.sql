@@ -143,6 +143,26 @@ CREATE TABLE IF NOT EXISTS sync_metadata (
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Sync Outbox Table (local: escritas pendentes para o remoto)
+CREATE TABLE IF NOT EXISTS sync_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    idempotency_key CHAR(36) NOT NULL UNIQUE,
+    table_name VARCHAR(100),
+    query_text TEXT NOT NULL,
+    params MEDIUMTEXT,
+    status ENUM('PENDING', 'FAILED') NOT NULL DEFAULT 'PENDING',
+    attempts INT NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_outbox_status (status, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Sync Outbox Applied Table (remoto: chaves de idempotência já aplicadas)
+CREATE TABLE IF NOT EXISTS sync_outbox_applied (
+    idempotency_key CHAR(36) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Create trigger for auto-inserting lock status when a new user is created
 DELIMITER //
 CREATE TRIGGER after_usuario_insert 
@@ -5,37 +5,98 @@ Módulo para gerenciar conexões MySQL.
 import mysql.connector
 from mysql.connector import Error, pooling
 import logging
+import threading
 from typing import Optional, Dict, List, Any, Set, Tuple
-from app.config.encrypted_settings import EncryptedSettings
+from app.config.settings import MYSQL_LOCAL_DIR, MYSQL_REMOTE_DIR
+from app.config.encrypted_settings import EncryptedSettings, get_encrypted_settings
 from app.config.cache.cache_factory import CacheFactory
+from app.data.mysql.batch_writer import BatchWriter, DEFAULT_MAX_ALLOWED_PACKET
+from app.data.mysql.schema_diff import SchemaSynchronizer
+from app.data.mysql.circuit_breaker import (
+    CircuitBreaker, get_circuit_breaker, is_connection_error
+)
+from app.core.observer.connection_observer import connection_observer
+from app.core.cache.cache_keys import query_key
+from app.core.cache.single_flight import SingleFlight
+from app.core.cache.revalidation import refresh_pool, unwrap, wrap
+from app.core.cache.table_generations import table_tags
+from app.data.cache.cache_invalidator import cache_invalidator
+from app.data.mysql.sql_tables import extract_tables, extract_write_tables
 
 logger = logging.getLogger(__name__)
 
+# Configurações descriptografadas, memoizadas por processo (diretório, is_local)
+_db_config_cache: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+_db_config_lock = threading.Lock()
+
+# Timeout (em segundos) da conexão avulsa usada para sondar um servidor com circuito aberto
+PROBE_CONNECTION_TIMEOUT = 5
+
 class MySQLConnection:
     """Gerencia conexões com bancos MySQL local e remoto."""
     
-    def __init__(self, local_settings: EncryptedSettings, remote_settings: EncryptedSettings):
+    def __init__(self, local_settings: Optional[EncryptedSettings] = None,
+                 remote_settings: Optional[EncryptedSettings] = None):
         """
         Inicializa o gerenciador de conexões MySQL.
         
+        Os pools não são criados aqui: cada lado é inicializado no primeiro uso
+        (ou por warm_up), e as configurações criptografadas só são carregadas
+        quando o respectivo pool é criado.
+        
         Args:
-            local_settings: Configurações do banco local
-            remote_settings: Configurações do banco remoto
+            local_settings: Configurações do banco local (se None, carregadas sob demanda)
+            remote_settings: Configurações do banco remoto (se None, carregadas sob demanda)
         """
-        self.local_settings = local_settings
-        self.remote_settings = remote_settings
+        self._local_settings = local_settings
+        self._remote_settings = remote_settings
         
         # Pools de conexão
         self.local_pool = None
         self.remote_pool = None
+        # Um lock por lado: um handshake remoto lento não bloqueia a criação do pool local
+        self._local_pool_lock = threading.Lock()
+        self._remote_pool_lock = threading.Lock()
+        
+        # max_allowed_packet consultado por banco (True = local, False = remoto)
+        self._max_allowed_packet: Dict[bool, int] = {}
+        
+        # Circuit breakers por lado, compartilhados entre instâncias
+        self.local_breaker = get_circuit_breaker('mysql_local', probe=lambda: self._probe(True))
+        self.remote_breaker = get_circuit_breaker('mysql_remote', probe=lambda: self._probe(False))
+        self.remote_breaker.add_listener(connection_observer.on_circuit_state_change)
         
         # Cache
         self.cache_factory = CacheFactory()
         self.cache = self.cache_factory.get_cache()
+        cache_invalidator.register_cache(self.cache)
         
-        # Inicializar pools
-        self._init_local_pool()
-        self._init_remote_pool()
+        # Consultas concorrentes com a mesma chave executam uma única vez; com Redis,
+        # um lease coordena também os demais processos
+        lease_client = (lambda: self.cache.client) if hasattr(self.cache, 'client') else None
+        self.single_flight = SingleFlight(lease_client, prefix=f"{self.cache.config.key_prefix}lease:")
+    
+    @property
+    def local_settings(self) -> EncryptedSettings:
+        """Configurações do banco local, carregadas no primeiro acesso."""
+        if self._local_settings is None:
+            self._local_settings = get_encrypted_settings(MYSQL_LOCAL_DIR)
+        return self._local_settings
+    
+    @local_settings.setter
+    def local_settings(self, settings: EncryptedSettings) -> None:
+        self._local_settings = settings
+    
+    @property
+    def remote_settings(self) -> EncryptedSettings:
+        """Configurações do banco remoto, carregadas no primeiro acesso."""
+        if self._remote_settings is None:
+            self._remote_settings = get_encrypted_settings(MYSQL_REMOTE_DIR)
+        return self._remote_settings
+    
+    @remote_settings.setter
+    def remote_settings(self, settings: EncryptedSettings) -> None:
+        self._remote_settings = settings
     
     def _get_db_config(self, is_local: bool = True) -> Dict[str, Any]:
         """
@@ -48,6 +109,11 @@ class MySQLConnection:
             Dict[str, Any]: Configurações do banco
         """
         settings = self.local_settings if is_local else self.remote_settings
+        cache_key = (str(settings.security_dir), is_local)
+        
+        cached_config = _db_config_cache.get(cache_key)
+        if cached_config is not None:
+            return dict(cached_config)
         
         try:
             config = settings.decrypt_env()
@@ -107,7 +173,10 @@ class MySQLConnection:
             safe_config = {k: v if k != 'password' else '***' for k, v in final_config.items()}
             logger.info(f"Configuração final para banco {'local' if is_local else 'remoto'}: {safe_config}")
             
-            return final_config
+            with _db_config_lock:
+                _db_config_cache[cache_key] = final_config
+            
+            return dict(final_config)
             
         except Exception as e:
             logger.error(f"Erro ao obter configurações do banco {'local' if is_local else 'remoto'}: {e}")
@@ -116,10 +185,11 @@ class MySQLConnection:
     def _init_local_pool(self) -> None:
         """Inicializa o pool de conexões local."""
         try:
-            if not self.local_pool:
-                config = self._get_db_config(is_local=True)
-                self.local_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
-                logger.info("Pool de conexões local inicializado")
+            with self._local_pool_lock:
+                if not self.local_pool:
+                    config = self._get_db_config(is_local=True)
+                    self.local_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
+                    logger.info("Pool de conexões local inicializado")
         except Exception as e:
             logger.error(f"Erro ao inicializar pool local: {e}")
             raise
@@ -127,28 +197,132 @@ class MySQLConnection:
     def _init_remote_pool(self) -> None:
         """Inicializa o pool de conexões remoto."""
         try:
-            if not self.remote_pool:
-                config = self._get_db_config(is_local=False)
-                self.remote_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
-                logger.info("Pool de conexões remoto inicializado")
+            with self._remote_pool_lock:
+                if not self.remote_pool:
+                    config = self._get_db_config(is_local=False)
+                    self.remote_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
+                    logger.info("Pool de conexões remoto inicializado")
         except Exception as e:
             logger.error(f"Erro ao inicializar pool remoto: {e}")
             raise
     
-    def get_local_connection(self) -> mysql.connector.MySQLConnection:
+    def has_pool(self, is_local: bool = True) -> bool:
         """
-        Obtém uma conexão do pool local.
+        Verifica se o pool de um lado já foi criado, sem abrir conexões.
         
+        Args:
+            is_local: Se True, verifica o pool local
+            
         Returns:
-            MySQLConnection: Conexão com o banco local
+            bool: True se o pool já existe
+        """
+        return (self.local_pool if is_local else self.remote_pool) is not None
+    
+    def warm_up(self, include_remote: bool = True) -> Dict[str, bool]:
+        """
+        Cria os pools antecipadamente (local primeiro, depois remoto).
+        
+        Falhas são apenas registradas: o pool será novamente tentado no primeiro uso.
+        
+        Args:
+            include_remote: Se True, também inicializa o pool remoto
+            
+        Returns:
+            Dict[str, bool]: Situação de cada pool após o aquecimento
+        """
+        status = {'local': False, 'remote': False}
+        
+        try:
+            self._init_local_pool()
+            status['local'] = True
+        except Exception as e:
+            logger.warning(f"Aquecimento do pool local falhou: {e}")
+        
+        if include_remote:
+            try:
+                self._init_remote_pool()
+                status['remote'] = True
+            except Exception as e:
+                logger.warning(f"Aquecimento do pool remoto falhou: {e}")
+        
+        return status
+    
+    def _get_breaker(self, is_local: bool) -> CircuitBreaker:
+        """Obtém o circuit breaker de um lado."""
+        return self.local_breaker if is_local else self.remote_breaker
+    
+    def _probe(self, is_local: bool) -> None:
+        """
+        Testa o servidor com uma conexão avulsa de timeout curto (sondagem do circuito meio-aberto).
+        
+        Args:
+            is_local: Se True, sonda o banco local
+            
+        Raises:
+            Error: Se o servidor continuar inacessível
         """
+        config = self._get_db_config(is_local)
+        config.pop('pool_name', None)
+        config.pop('pool_size', None)
+        config['connection_timeout'] = PROBE_CONNECTION_TIMEOUT
+        
+        connection = mysql.connector.connect(**config)
         try:
-            if not self.local_pool:
-                self._init_local_pool()
-            return self.local_pool.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+    
+    def _get_connection(self, is_local: bool) -> mysql.connector.MySQLConnection:
+        """
+        Obtém uma conexão de um lado, passando pelo circuit breaker.
+        
+        Com o circuito aberto a chamada falha imediatamente com CircuitOpenError,
+        sem esperar pelo timeout de conexão.
+        
+        Args:
+            is_local: Se True, usa o pool local
+            
+        Returns:
+            MySQLConnection: Conexão do pool
+        """
+        side = 'local' if is_local else 'remota'
+        breaker = self._get_breaker(is_local)
+        breaker.before_call()
+        
+        try:
+            if is_local:
+                if not self.local_pool:
+                    self._init_local_pool()
+                connection = self.local_pool.get_connection()
+            else:
+                if not self.remote_pool:
+                    self._init_remote_pool()
+                connection = self.remote_pool.get_connection()
         except Exception as e:
-            logger.error(f"Erro ao obter conexão local: {e}")
+            if is_connection_error(e):
+                breaker.record_failure()
+            else:
+                breaker.release_trial()
+            logger.error(f"Erro ao obter conexão {side}: {e}")
             raise
+        
+        breaker.record_success()
+        return connection
+    
+    def get_local_connection(self) -> mysql.connector.MySQLConnection:
+        """
+        Obtém uma conexão do pool local.
+        
+        Returns:
+            MySQLConnection: Conexão com o banco local
+            
+        Raises:
+            CircuitOpenError: Se o banco local está marcado como indisponível
+        """
+        return self._get_connection(is_local=True)
     
     def get_remote_connection(self) -> mysql.connector.MySQLConnection:
         """
@@ -156,14 +330,11 @@ class MySQLConnection:
         
         Returns:
             MySQLConnection: Conexão com o banco remoto
+            
+        Raises:
+            CircuitOpenError: Se o banco remoto está marcado como indisponível
         """
-        try:
-            if not self.remote_pool:
-                self._init_remote_pool()
-            return self.remote_pool.get_connection()
-        except Exception as e:
-            logger.error(f"Erro ao obter conexão remota: {e}")
-            raise
+        return self._get_connection(is_local=False)
     
     def release_connection(self, connection: mysql.connector.MySQLConnection) -> None:
         """
@@ -178,25 +349,47 @@ class MySQLConnection:
         except Exception as e:
             logger.error(f"Erro ao liberar conexão: {e}")
     
-    def _get_cache_key(self, query: str, params: tuple = None, is_local: bool = True) -> str:
+    def _get_cache_key(self, query: str, params: tuple = None, is_local: bool = True) -> Optional[str]:
         """
         Gera uma chave de cache para a consulta.
         
+        A chave inclui a geração atual de cada tabela lida, de modo que uma escrita
+        em uma tabela invalida apenas as consultas que a leem.
+        
         Args:
             query: Consulta SQL
             params: Parâmetros da consulta
             is_local: Se True, usa o banco local
             
         Returns:
-            str: Chave de cache
+            Optional[str]: Chave de cache, ou None se as gerações não puderem ser lidas
         """
-        key = f"mysql_{'local' if is_local else 'remote'}_{hash(query)}"
-        if params:
-            key += f"_{hash(str(params))}"
-        return key
+        generations = self.cache.generations.get_many(table_tags(extract_tables(query), is_local))
+        if generations is None:
+            return None
+        
+        # Chave estável entre processos: o Redis compartilhado pode ser reaproveitado
+        return query_key(query, params, namespace=f"mysql_{'local' if is_local else 'remote'}",
+                         generations=generations)
+    
+    def invalidate_query_cache(self, query: str, is_local: bool = True) -> None:
+        """
+        Invalida as consultas em cache que leem as tabelas alteradas por uma instrução.
+        
+        Args:
+            query: Instrução SQL de escrita
+            is_local: Se True, a instrução foi executada no banco local
+        """
+        tables = extract_write_tables(query)
+        if tables:
+            cache_invalidator.invalidate_tables(tables, is_local)
+        else:
+            # Tabela não identificada: descartar todo o cache
+            cache_invalidator.invalidate_all()
     
     def execute_query(self, query: str, params: tuple = None, is_local: bool = True,
-                     use_cache: bool = True, cache_ttl: Optional[int] = None) -> List[Dict]:
+                     use_cache: bool = True, cache_ttl: Optional[int] = None,
+                     stale_ttl: Optional[int] = None) -> List[Dict]:
         """
         Executa uma consulta SQL e retorna os resultados.
         
@@ -206,18 +399,76 @@ class MySQLConnection:
             is_local: Se True, usa o banco local
             use_cache: Se True, usa cache
             cache_ttl: Tempo de vida do cache em segundos
+            stale_ttl: Tempo adicional em segundos durante o qual um resultado vencido
+                ainda é retornado imediatamente, enquanto é atualizado em segundo plano
             
         Returns:
             List[Dict]: Lista de resultados
         """
         # Verificar cache
-        if use_cache:
-            cache_key = self._get_cache_key(query, params, is_local)
-            cached_result = self.cache.get(cache_key)
-            if cached_result is not None:
+        cache_key = self._get_cache_key(query, params, is_local) if use_cache else None
+        if cache_key is None:
+            return self._fetch_query(query, params, is_local)
+        
+        def compute():
+            result = self._fetch_query(query, params, is_local)
+            self._store_query_result(cache_key, result, cache_ttl, stale_ttl)
+            return result
+        
+        def lookup():
+            entry = self.cache.get(cache_key)
+            if entry is None:
+                return None
+            result, stale = unwrap(entry)
+            return None if stale else result
+        
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            cached_result, stale = unwrap(entry)
+            if not stale:
                 logger.debug(f"Cache hit para query: {query}")
                 return cached_result
+            if stale_ttl:
+                # Resultado vencido, mas dentro da janela de obsolescência: retornar já e atualizar depois
+                logger.debug(f"Cache obsoleto para query, atualizando em segundo plano: {query}")
+                refresh_pool.schedule(cache_key, lambda: self.single_flight.do(cache_key, compute, lookup))
+                return cached_result
         
+        # Chamadas concorrentes aguardam o resultado da primeira
+        return self.single_flight.do(cache_key, compute, lookup)
+    
+    def _store_query_result(self, cache_key: str, result: List[Dict], cache_ttl: Optional[int],
+                            stale_ttl: Optional[int]) -> None:
+        """
+        Armazena o resultado de uma consulta no cache.
+        
+        Com stale_ttl, o resultado é gravado em um envelope com o instante de validade
+        e permanece no cache por cache_ttl + stale_ttl.
+        
+        Args:
+            cache_key: Chave de cache
+            result: Resultado da consulta
+            cache_ttl: Tempo de vida em segundos (padrão: o da configuração do cache)
+            stale_ttl: Janela de obsolescência em segundos
+        """
+        if not stale_ttl:
+            self.cache.set(cache_key, result, ttl=cache_ttl)
+            return
+        fresh_ttl = cache_ttl if cache_ttl is not None else self.cache.config.default_ttl
+        self.cache.set(cache_key, wrap(result, fresh_ttl), ttl=fresh_ttl + stale_ttl)
+    
+    def _fetch_query(self, query: str, params: tuple, is_local: bool) -> List[Dict]:
+        """
+        Executa uma consulta no banco, sem cache.
+        
+        Args:
+            query: Consulta SQL
+            params: Parâmetros para a consulta
+            is_local: Se True, usa o banco local
+            
+        Returns:
+            List[Dict]: Lista de resultados
+        """
         connection = None
         try:
             # Obter conexão apropriada
@@ -228,15 +479,11 @@ class MySQLConnection:
             
             # Executar consulta
             cursor.execute(query, params or ())
-            result = cursor.fetchall()
-            
-            # Armazenar em cache se necessário
-            if use_cache:
-                self.cache.set(cache_key, result, ttl=cache_ttl)
-            
-            return result
+            return cursor.fetchall()
             
         except Error as e:
+            if connection and is_connection_error(e):
+                self._get_breaker(is_local).record_failure()
             logger.error(f"Erro ao executar query: {e}")
             raise
         finally:
@@ -271,12 +518,14 @@ class MySQLConnection:
             
             # Invalidar cache se necessário
             if invalidate_cache:
-                self.cache.clear()
+                self.invalidate_query_cache(query, is_local)
             
             return cursor.rowcount
             
         except Error as e:
-            if connection:
+            if connection and is_connection_error(e):
+                self._get_breaker(is_local).record_failure()
+            elif connection:
                 connection.rollback()
             logger.error(f"Erro ao executar update: {e}")
             raise
@@ -284,46 +533,67 @@ class MySQLConnection:
             if connection:
                 self.release_connection(connection)
     
+    def get_max_allowed_packet(self, is_local: bool = True) -> int:
+        """
+        Obtém o max_allowed_packet do servidor, consultado uma única vez por banco.
+        
+        Args:
+            is_local: Se True, consulta o banco local
+            
+        Returns:
+            int: Tamanho máximo de pacote em bytes
+        """
+        if is_local not in self._max_allowed_packet:
+            try:
+                result = self.execute_query("SELECT @@max_allowed_packet AS max_packet",
+                                            is_local=is_local, use_cache=False)
+                self._max_allowed_packet[is_local] = int(result[0]['max_packet'])
+            except Exception as e:
+                logger.warning(f"Não foi possível obter max_allowed_packet, usando padrão: {e}")
+                return DEFAULT_MAX_ALLOWED_PACKET
+        return self._max_allowed_packet[is_local]
+    
     def execute_batch(self, query: str, params_list: List[tuple], is_local: bool = True,
-                     invalidate_cache: bool = True) -> int:
+                     invalidate_cache: bool = True, parallel: int = 1) -> int:
         """
         Executa uma operação em lote.
         
+        INSERT/REPLACE ... VALUES e UPDATE ... SET col = %s WHERE chave = %s são
+        reescritos em instruções multi-linha e divididos em blocos que respeitam
+        o max_allowed_packet do servidor. Demais instruções usam executemany por bloco.
+        
         Args:
             query: Consulta SQL
             params_list: Lista de parâmetros
             is_local: Se True, usa o banco local
             invalidate_cache: Se True, invalida o cache
+            parallel: Número de blocos executados em paralelo em conexões separadas
+                      (com parallel > 1 cada bloco é confirmado em sua própria transação)
             
         Returns:
             int: Número total de linhas afetadas
         """
-        connection = None
+        if not params_list:
+            return 0
+        
         try:
-            # Obter conexão apropriada
-            connection = self.get_local_connection() if is_local else self.get_remote_connection()
-            
-            # Criar cursor
-            cursor = connection.cursor()
-            
-            # Executar operações em lote
-            cursor.executemany(query, params_list)
-            connection.commit()
+            writer = BatchWriter(
+                get_connection=self.get_local_connection if is_local else self.get_remote_connection,
+                release_connection=self.release_connection,
+                max_allowed_packet=self.get_max_allowed_packet(is_local),
+                parallel=parallel
+            )
+            affected = writer.execute(query, params_list)
             
             # Invalidar cache se necessário
             if invalidate_cache:
-                self.cache.clear()
+                self.invalidate_query_cache(query, is_local)
             
-            return cursor.rowcount
+            return affected
             
         except Error as e:
-            if connection:
-                connection.rollback()
             logger.error(f"Erro ao executar batch: {e}")
             raise
-        finally:
-            if connection:
-                self.release_connection(connection)
     
     def close(self) -> None:
         """Fecha todas as conexões."""
@@ -425,6 +695,9 @@ class MySQLConnection:
         """
         Compara a estrutura de uma tabela entre os bancos local e remoto.
         
+        A comparação usa colunas e índices do INFORMATION_SCHEMA, ignorando
+        diferenças de formatação do SHOW CREATE TABLE.
+        
         Args:
             table_name: Nome da tabela
             
@@ -432,25 +705,31 @@ class MySQLConnection:
             Tuple[bool, Optional[str]]: (são_iguais, diferenças)
         """
         try:
-            local_structure = self.get_table_structure(table_name, is_local=True)
-            remote_structure = self.get_table_structure(table_name, is_local=False)
-            
-            if not local_structure or not remote_structure:
-                return False, "Tabela não encontrada em um dos bancos"
-            
-            if local_structure['create_statement'] == remote_structure['create_statement']:
+            differences = SchemaSynchronizer(self).compare([table_name])
+            if table_name not in differences:
                 return True, None
-            
-            return False, "Estruturas diferentes"
+            return False, "; ".join(differences[table_name])
             
         except Error as e:
             logger.error(f"Erro ao comparar estruturas da tabela {table_name}: {e}")
             return False, str(e)
 
+    def compare_all_structures(self) -> Dict[str, List[str]]:
+        """
+        Compara as estruturas de todas as tabelas com duas consultas por banco.
+        
+        Returns:
+            Dict[str, List[str]]: Diferenças por tabela (apenas tabelas diferentes)
+        """
+        return SchemaSynchronizer(self).compare()
+
     def sync_table_structure(self, table_name: str, source_is_local: bool = True) -> bool:
         """
         Sincroniza a estrutura de uma tabela entre os bancos.
         
+        Cria a tabela no destino se ela não existir; caso contrário aplica apenas
+        o ALTER TABLE necessário para as diferenças encontradas.
+        
         Args:
             table_name: Nome da tabela
             source_is_local: Se True, usa estrutura local como fonte
@@ -458,64 +737,29 @@ class MySQLConnection:
         Returns:
             bool: True se sincronização foi bem sucedida
         """
-        try:
-            source_structure = self.get_table_structure(table_name, is_local=source_is_local)
-            if not source_structure:
-                logger.error(f"Tabela {table_name} não encontrada no banco {'local' if source_is_local else 'remoto'}")
-                return False
-            
-            # Criar tabela no destino se não existir
-            create_statement = source_structure['create_statement']
-            self.execute_update(create_statement, is_local=not source_is_local)
-            
-            logger.info(f"Estrutura da tabela {table_name} sincronizada com sucesso")
-            return True
-            
-        except Error as e:
-            logger.error(f"Erro ao sincronizar estrutura da tabela {table_name}: {e}")
+        report = SchemaSynchronizer(self).sync(source_is_local, tables=[table_name])
+        if not report['success']:
+            logger.error(f"Erro ao sincronizar estrutura da tabela {table_name}: {'; '.join(report['errors'])}")
             return False
+        
+        logger.info(f"Estrutura da tabela {table_name} sincronizada com sucesso")
+        return True
 
-    def check_and_sync_structures(self, source_is_local: bool = True) -> Dict[str, Any]:
+    def check_and_sync_structures(self, source_is_local: bool = True, allow_drops: bool = False) -> Dict[str, Any]:
         """
         Verifica e sincroniza estruturas de todas as tabelas.
         
+        Tabelas com a mesma impressão digital nos dois bancos são ignoradas e
+        os ALTER TABLE das demais são executados em paralelo.
+        
         Args:
             source_is_local: Se True, usa estruturas locais como fonte
+            allow_drops: Se True, remove do destino colunas e índices ausentes na fonte
             
         Returns:
             Dict[str, Any]: Relatório da sincronização
         """
-        report = {
-            'success': True,
-            'synced_tables': [],
-            'failed_tables': [],
-            'errors': []
-        }
-        
-        try:
-            # Obter lista de tabelas da fonte
-            source_tables = self.get_all_tables(is_local=source_is_local)
-            
-            for table in source_tables:
-                try:
-                    if self.sync_table_structure(table, source_is_local):
-                        report['synced_tables'].append(table)
-                    else:
-                        report['failed_tables'].append(table)
-                except Exception as e:
-                    report['failed_tables'].append(table)
-                    report['errors'].append(f"Erro na tabela {table}: {str(e)}")
-            
-            if report['failed_tables']:
-                report['success'] = False
-                
-            return report
-            
-        except Exception as e:
-            logger.error(f"Erro ao sincronizar estruturas: {e}")
-            report['success'] = False
-            report['errors'].append(str(e))
-            return report
+        return SchemaSynchronizer(self).sync(source_is_local, allow_drops=allow_drops)
             
     def test_connection(self, credentials: Optional[Dict] = None) -> bool:
         """
@@ -0,0 +1,500 @@
+"""
+Outbox durável para escritas destinadas ao banco remoto (write-behind).
+A alteração local e o registro da escrita pendente são confirmados na mesma
+transação local; uma thread de segundo plano reaplica as escritas no banco remoto
+em lotes ordenados e agrupados, com chaves de idempotência.
+"""
+
+import json
+import uuid
+import base64
+import logging
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from mysql.connector import Error
+
+from app.data.mysql.batch_writer import BatchWriter
+from app.data.mysql.circuit_breaker import CircuitOpenError, is_connection_error
+from app.data.mysql.sql_tables import extract_write_tables
+from app.core.observer.connection_observer import connection_observer, is_remote_available
+
+logger = logging.getLogger(__name__)
+
+# Tabela local com as escritas pendentes
+OUTBOX_TABLE = "sync_outbox"
+
+# Tabela remota com as chaves de idempotência já aplicadas
+APPLIED_TABLE = "sync_outbox_applied"
+
+CREATE_OUTBOX_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {OUTBOX_TABLE} (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        idempotency_key CHAR(36) NOT NULL UNIQUE,
+        table_name VARCHAR(100),
+        query_text TEXT NOT NULL,
+        params MEDIUMTEXT,
+        status ENUM('PENDING', 'FAILED') NOT NULL DEFAULT 'PENDING',
+        attempts INT NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_outbox_status (status, id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+CREATE_APPLIED_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {APPLIED_TABLE} (
+        idempotency_key CHAR(36) PRIMARY KEY,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_applied_at (applied_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Tentativas antes de uma escrita rejeitada pelo remoto ser marcada como FAILED
+MAX_ATTEMPTS = 10
+
+# Quantidade de escritas lidas do outbox por ciclo de drenagem
+DRAIN_BATCH_SIZE = 500
+
+# Intervalo (em segundos) entre verificações do outbox sem novas escritas
+DRAIN_INTERVAL = 5
+
+# Dias durante os quais as chaves aplicadas são mantidas no remoto. Uma chave só é
+# consultada se a remoção local falhou após a aplicação, o que é resolvido na
+# drenagem seguinte; o prazo apenas precisa superar qualquer interrupção plausível
+APPLIED_RETENTION_DAYS = 7
+
+# Intervalo (em segundos) entre limpezas das chaves aplicadas expiradas
+APPLIED_PRUNE_INTERVAL = 3600
+
+# Máximo de chaves removidas por limpeza (evita transações longas no remoto)
+APPLIED_PRUNE_LIMIT = 10000
+
+
+def _encode_value(value: Any) -> Any:
+    """Converte um parâmetro em um valor serializável em JSON, preservando o tipo."""
+    if isinstance(value, datetime):
+        return {'__type__': 'datetime', 'value': value.isoformat()}
+    if isinstance(value, date):
+        return {'__type__': 'date', 'value': value.isoformat()}
+    if isinstance(value, dt_time):
+        return {'__type__': 'time', 'value': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'__type__': 'timedelta', 'value': value.total_seconds()}
+    if isinstance(value, Decimal):
+        return {'__type__': 'decimal', 'value': str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__type__': 'bytes', 'value': base64.b64encode(bytes(value)).decode('ascii')}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Reverte _encode_value."""
+    if not isinstance(value, dict) or '__type__' not in value:
+        return value
+
+    kind, raw = value['__type__'], value['value']
+    if kind == 'datetime':
+        return datetime.fromisoformat(raw)
+    if kind == 'date':
+        return date.fromisoformat(raw)
+    if kind == 'time':
+        return dt_time.fromisoformat(raw)
+    if kind == 'timedelta':
+        return timedelta(seconds=raw)
+    if kind == 'decimal':
+        return Decimal(raw)
+    if kind == 'bytes':
+        return base64.b64decode(raw)
+    return value
+
+
+def encode_params(params: Optional[Union[Sequence[Any], Dict[str, Any]]]) -> Optional[str]:
+    """
+    Serializa os parâmetros de uma consulta em JSON.
+
+    Args:
+        params: Parâmetros posicionais ou nomeados
+
+    Returns:
+        Optional[str]: JSON com os parâmetros ou None
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return json.dumps({'named': {k: _encode_value(v) for k, v in params.items()}})
+    return json.dumps({'positional': [_encode_value(v) for v in params]})
+
+
+def decode_params(text: Optional[str]) -> Union[Tuple[Any, ...], Dict[str, Any]]:
+    """
+    Desserializa parâmetros gerados por encode_params.
+
+    Args:
+        text: JSON com os parâmetros
+
+    Returns:
+        Union[Tuple, Dict]: Parâmetros posicionais (tupla) ou nomeados (dicionário)
+    """
+    if not text:
+        return ()
+    data = json.loads(text)
+    if 'named' in data:
+        return {k: _decode_value(v) for k, v in data['named'].items()}
+    return tuple(_decode_value(v) for v in data['positional'])
+
+
+def coalesce_runs(entries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Agrupa escritas consecutivas com a mesma instrução, preservando a ordem.
+
+    Cada grupo pode ser reescrito em instruções multi-linha pelo BatchWriter
+    sem alterar a ordem relativa das escritas.
+
+    Args:
+        entries: Linhas do outbox ordenadas por id
+
+    Returns:
+        List[List[Dict[str, Any]]]: Grupos de escritas consecutivas
+    """
+    runs: List[List[Dict[str, Any]]] = []
+    for entry in entries:
+        if runs and runs[-1][0]['query_text'] == entry['query_text']:
+            runs[-1].append(entry)
+        else:
+            runs.append([entry])
+    return runs
+
+
+class SyncOutbox:
+    """
+    Outbox de escritas write-behind para o banco remoto.
+
+    Atributos:
+        db_connection (MySQLConnection): Conexão com os bancos MySQL
+        drain_interval (float): Intervalo entre verificações do outbox em segundos
+        stats (Dict[str, int]): Contadores de escritas enfileiradas, aplicadas e falhas
+    """
+
+    def __init__(self, db_connection, drain_interval: float = DRAIN_INTERVAL):
+        """
+        Inicializa o outbox.
+
+        Args:
+            db_connection: Instância de MySQLConnection
+            drain_interval: Intervalo entre verificações do outbox em segundos
+        """
+        self.db_connection = db_connection
+        self.drain_interval = drain_interval
+
+        self._local_ready = False
+        self._remote_ready = False
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._drainer_thread = None
+        self._last_prune: Optional[float] = None
+
+        self.stats = {'enqueued': 0, 'applied': 0, 'skipped': 0, 'failed': 0}
+
+        connection_observer.add_observer(self._on_remote_availability_change)
+
+    def _ensure_local_table(self) -> None:
+        """Cria a tabela do outbox no banco local, se necessário."""
+        if not self._local_ready:
+            self.db_connection.execute_update(CREATE_OUTBOX_SQL, is_local=True, invalidate_cache=False)
+            self._local_ready = True
+
+    def _ensure_remote_table(self) -> None:
+        """Cria a tabela de chaves aplicadas no banco remoto, se necessário."""
+        if not self._remote_ready:
+            self.db_connection.execute_update(CREATE_APPLIED_SQL, is_local=False, invalidate_cache=False)
+            self._remote_ready = True
+
+    def write(self, query: str, params: Optional[Union[Sequence[Any], Dict[str, Any]]] = None) -> int:
+        """
+        Aplica uma escrita no banco local e a enfileira para o remoto na mesma transação.
+
+        Args:
+            query: Instrução SQL de escrita
+            params: Parâmetros da instrução
+
+        Returns:
+            int: Número de linhas afetadas no banco local
+        """
+        self._ensure_local_table()
+
+        tables = extract_write_tables(query)
+        table_name = next(iter(sorted(tables)), None)
+
+        connection = None
+        try:
+            connection = self.db_connection.get_local_connection()
+            cursor = connection.cursor()
+
+            cursor.execute(query, params or ())
+            affected = cursor.rowcount
+
+            cursor.execute(
+                f"INSERT INTO {OUTBOX_TABLE} (idempotency_key, table_name, query_text, params) "
+                f"VALUES (%s, %s, %s, %s)",
+                (str(uuid.uuid4()), table_name, query, encode_params(params))
+            )
+            connection.commit()
+            cursor.close()
+        except Error as e:
+            if connection:
+                connection.rollback()
+            logger.error(f"Erro ao registrar escrita no outbox: {e}")
+            raise
+        finally:
+            if connection:
+                self.db_connection.release_connection(connection)
+
+        self.db_connection.invalidate_query_cache(query, is_local=True)
+        self.stats['enqueued'] += 1
+        self._wake.set()
+        return affected
+
+    def pending_count(self) -> int:
+        """
+        Obtém a quantidade de escritas pendentes.
+
+        Returns:
+            int: Escritas ainda não aplicadas no remoto
+        """
+        self._ensure_local_table()
+        result = self.db_connection.execute_query(
+            f"SELECT COUNT(*) AS count FROM {OUTBOX_TABLE} WHERE status = 'PENDING'",
+            is_local=True, use_cache=False
+        )
+        return int(result[0]['count'])
+
+    def drain(self, limit: int = DRAIN_BATCH_SIZE) -> int:
+        """
+        Reaplica no banco remoto as escritas pendentes, em ordem.
+
+        Cada grupo de escritas consecutivas com a mesma instrução é aplicado em uma
+        transação remota junto com o registro das chaves de idempotência; chaves já
+        registradas no remoto (de uma drenagem interrompida) não são reaplicadas.
+
+        A ordem é preservada: uma escrita rejeitada pelo remoto bloqueia as seguintes
+        até ser aplicada ou marcada como FAILED após MAX_ATTEMPTS tentativas.
+
+        Args:
+            limit: Número máximo de escritas lidas do outbox
+
+        Returns:
+            int: Número de escritas removidas do outbox
+        """
+        with self._drain_lock:
+            self._ensure_local_table()
+            entries = self.db_connection.execute_query(
+                f"SELECT id, idempotency_key, query_text, params, attempts FROM {OUTBOX_TABLE} "
+                f"WHERE status = 'PENDING' ORDER BY id LIMIT %s",
+                (limit,), is_local=True, use_cache=False
+            )
+            if not entries:
+                return 0
+
+            self._ensure_remote_table()
+            writer = BatchWriter(
+                get_connection=self.db_connection.get_remote_connection,
+                release_connection=self.db_connection.release_connection,
+                max_allowed_packet=self.db_connection.get_max_allowed_packet(is_local=False)
+            )
+
+            drained = 0
+            for run in coalesce_runs(entries):
+                try:
+                    drained += self._apply_run(writer, run)
+                except Error as e:
+                    if isinstance(e, CircuitOpenError) or is_connection_error(e):
+                        # Remoto indisponível: as escritas permanecem no outbox
+                        logger.warning(f"Drenagem do outbox interrompida: {e}")
+                        break
+                    # Escrita rejeitada pelo remoto: isolar a entrada problemática
+                    applied, blocked = self._apply_individually(writer, run)
+                    drained += applied
+                    if blocked:
+                        # Aplicar as seguintes antes dela inverteria a ordem no remoto
+                        break
+
+            if drained:
+                logger.info(f"{drained} escrita(s) do outbox aplicada(s) no banco remoto")
+                self._prune_applied()
+            return drained
+
+    def _filter_applied(self, run: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Separa as escritas cuja chave de idempotência já foi aplicada no remoto.
+
+        Returns:
+            Tuple[List, List]: (pendentes, já aplicadas)
+        """
+        keys = [entry['idempotency_key'] for entry in run]
+        placeholders = ', '.join(['%s'] * len(keys))
+        result = self.db_connection.execute_query(
+            f"SELECT idempotency_key FROM {APPLIED_TABLE} WHERE idempotency_key IN ({placeholders})",
+            tuple(keys), is_local=False, use_cache=False
+        )
+        applied = {row['idempotency_key'] for row in result}
+        pending = [entry for entry in run if entry['idempotency_key'] not in applied]
+        done = [entry for entry in run if entry['idempotency_key'] in applied]
+        return pending, done
+
+    def _apply_run(self, writer: BatchWriter, run: List[Dict[str, Any]]) -> int:
+        """
+        Aplica um grupo de escritas e as chaves de idempotência em uma transação remota.
+
+        Returns:
+            int: Número de escritas removidas do outbox
+        """
+        pending, done = self._filter_applied(run)
+        if done:
+            self.stats['skipped'] += len(done)
+            logger.debug(f"{len(done)} escrita(s) do outbox já aplicada(s) no remoto")
+
+        if pending:
+            params_list = [decode_params(entry['params']) for entry in pending]
+            if any(isinstance(params, dict) for params in params_list):
+                # Parâmetros nomeados não são reescritos em multi-linha
+                plan = [(pending[0]['query_text'], params_list, True)]
+            else:
+                plan = writer.plan(pending[0]['query_text'], params_list)
+            plan += writer.plan(
+                f"INSERT INTO {APPLIED_TABLE} (idempotency_key) VALUES (%s)",
+                [(entry['idempotency_key'],) for entry in pending]
+            )
+            writer.execute_plan(plan)
+            self.db_connection.invalidate_query_cache(pending[0]['query_text'], is_local=False)
+            self.stats['applied'] += len(pending)
+
+        self._delete_entries(run)
+        return len(run)
+
+    def _apply_individually(self, writer: BatchWriter, run: List[Dict[str, Any]]) -> Tuple[int, bool]:
+        """
+        Aplica um grupo escrita a escrita, registrando falhas nas entradas rejeitadas.
+
+        Para na primeira escrita rejeitada que continua PENDING; escritas marcadas
+        como FAILED deixam de bloquear as seguintes.
+
+        Returns:
+            Tuple[int, bool]: Número de escritas removidas do outbox e se a drenagem está bloqueada
+        """
+        drained = 0
+        for entry in run:
+            try:
+                drained += self._apply_run(writer, [entry])
+            except Error as e:
+                if isinstance(e, CircuitOpenError) or is_connection_error(e):
+                    raise
+                if not self._record_failure(entry, e):
+                    return drained, True
+        return drained, False
+
+    def _record_failure(self, entry: Dict[str, Any], error: Exception) -> bool:
+        """
+        Incrementa as tentativas de uma escrita e a marca como FAILED após MAX_ATTEMPTS.
+
+        Returns:
+            bool: True se a escrita foi marcada como FAILED (não será mais reaplicada)
+        """
+        attempts = int(entry['attempts']) + 1
+        status = 'FAILED' if attempts >= MAX_ATTEMPTS else 'PENDING'
+        self.db_connection.execute_update(
+            f"UPDATE {OUTBOX_TABLE} SET attempts = %s, status = %s, last_error = %s WHERE id = %s",
+            (attempts, status, str(error)[:1000], entry['id']),
+            is_local=True, invalidate_cache=False
+        )
+        if status == 'FAILED':
+            self.stats['failed'] += 1
+            logger.error(f"Escrita {entry['idempotency_key']} do outbox rejeitada pelo remoto "
+                         f"após {attempts} tentativas: {error}")
+            return True
+        logger.warning(f"Escrita {entry['idempotency_key']} do outbox rejeitada pelo remoto "
+                       f"(tentativa {attempts}), bloqueando as seguintes: {error}")
+        return False
+
+    def _prune_applied(self) -> None:
+        """Remove do remoto as chaves aplicadas há mais de APPLIED_RETENTION_DAYS (no máximo uma vez por intervalo)."""
+        now = time.monotonic()
+        if self._last_prune is not None and now - self._last_prune < APPLIED_PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        try:
+            removed = self.db_connection.execute_update(
+                f"DELETE FROM {APPLIED_TABLE} WHERE applied_at < NOW() - INTERVAL %s DAY LIMIT %s",
+                (APPLIED_RETENTION_DAYS, APPLIED_PRUNE_LIMIT),
+                is_local=False, invalidate_cache=False
+            )
+            if removed:
+                logger.info(f"{removed} chave(s) de idempotência expirada(s) removida(s) do remoto")
+        except Error as e:
+            logger.warning(f"Erro ao limpar chaves de idempotência aplicadas: {e}")
+
+    def _delete_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """Remove do outbox local as escritas já aplicadas."""
+        ids = [entry['id'] for entry in entries]
+        placeholders = ', '.join(['%s'] * len(ids))
+        self.db_connection.execute_update(
+            f"DELETE FROM {OUTBOX_TABLE} WHERE id IN ({placeholders})",
+            tuple(ids), is_local=True, invalidate_cache=False
+        )
+
+    def start(self) -> None:
+        """Inicia a thread de drenagem, que também reaplica escritas pendentes de execuções anteriores."""
+        if self._drainer_thread is None or not self._drainer_thread.is_alive():
+            self._stop.clear()
+            self._wake.set()
+            self._drainer_thread = threading.Thread(
+                target=self._drainer_worker,
+                daemon=True,
+                name="mysql-outbox-drainer"
+            )
+            self._drainer_thread.start()
+            logger.info("Thread de drenagem do outbox iniciada")
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Para a thread de drenagem.
+
+        Args:
+            timeout: Tempo máximo de espera pela thread em segundos
+        """
+        if self._drainer_thread and self._drainer_thread.is_alive():
+            self._stop.set()
+            self._wake.set()
+            self._drainer_thread.join(timeout=timeout)
+            if self._drainer_thread.is_alive():
+                logger.warning("Thread de drenagem do outbox não finalizou dentro do timeout")
+
+    def _drainer_worker(self) -> None:
+        """Worker que drena o outbox quando há escritas novas ou a cada intervalo."""
+        while not self._stop.is_set():
+            self._wake.wait(self.drain_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            # Com o circuito remoto aberto, aguardar a notificação de disponibilidade
+            if not is_remote_available():
+                continue
+
+            try:
+                # Continuar enquanto houver lotes completos pendentes
+                while not self._stop.is_set() and self.drain() >= DRAIN_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                logger.error(f"Erro na drenagem do outbox: {e}")
+
+        logger.info("Thread de drenagem do outbox finalizada")
+
+    def _on_remote_availability_change(self, available: bool) -> None:
+        """Drena o outbox assim que o banco remoto volta a ficar disponível."""
+        if available:
+            self._wake.set()
@@ -0,0 +1,558 @@
+"""
+Comparação e sincronização de estruturas de tabelas entre os bancos MySQL.
+Lê colunas e índices de todas as tabelas em lote a partir do INFORMATION_SCHEMA,
+ignora tabelas com a mesma impressão digital e gera apenas os ALTER TABLE
+necessários, executados em paralelo.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de ALTER TABLE executados simultaneamente
+DEFAULT_MAX_WORKERS = 4
+
+COLUMNS_QUERY = """
+    SELECT TABLE_NAME AS table_name, COLUMN_NAME AS column_name,
+           ORDINAL_POSITION AS ordinal_position, COLUMN_TYPE AS column_type,
+           IS_NULLABLE AS is_nullable, COLUMN_DEFAULT AS column_default, EXTRA AS extra,
+           COLLATION_NAME AS collation_name, COLUMN_COMMENT AS column_comment,
+           GENERATION_EXPRESSION AS generation_expression
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE(){table_filter}
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+INDEXES_QUERY = """
+    SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, NON_UNIQUE AS non_unique,
+           SEQ_IN_INDEX AS seq_in_index, COLUMN_NAME AS column_name,
+           SUB_PART AS sub_part, INDEX_TYPE AS index_type, EXPRESSION AS expression
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE(){table_filter}
+    ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+"""
+
+# Valores padrão que são expressões (não devem ser colocados entre aspas)
+_DEFAULT_EXPRESSIONS = ('CURRENT_TIMESTAMP', 'NOW()', 'LOCALTIME', 'LOCALTIMESTAMP')
+
+
+def _text(value: Any) -> Optional[str]:
+    """Normaliza valores do INFORMATION_SCHEMA (alguns drivers retornam bytes)."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8')
+    return value
+
+
+def _quote_identifier(name: str) -> str:
+    """Coloca um identificador entre crases."""
+    return f"`{name.replace('`', '``')}`"
+
+
+def _quote_literal(value: str) -> str:
+    """Coloca um literal entre aspas simples."""
+    return "'" + value.replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class ColumnDef:
+    """Definição de uma coluna, como descrita no INFORMATION_SCHEMA."""
+    name: str
+    column_type: str
+    nullable: bool
+    default: Optional[str] = None
+    extra: str = ""
+    collation: Optional[str] = None
+    comment: str = ""
+    generation_expression: str = ""
+
+    def definition(self) -> str:
+        """
+        Gera a definição da coluna para ADD/MODIFY COLUMN.
+
+        Returns:
+            str: Definição SQL da coluna
+        """
+        parts = [_quote_identifier(self.name), self.column_type]
+        extra = self.extra.replace('DEFAULT_GENERATED', '').strip()
+
+        if self.generation_expression:
+            kind = 'STORED' if 'STORED' in extra.upper() else 'VIRTUAL'
+            parts.append(f"GENERATED ALWAYS AS ({self.generation_expression}) {kind}")
+            extra = ""
+
+        if self.collation:
+            parts.append(f"COLLATE {self.collation}")
+
+        parts.append("NULL" if self.nullable else "NOT NULL")
+
+        if self.default is not None and not self.generation_expression:
+            if self.default.upper().startswith(_DEFAULT_EXPRESSIONS):
+                parts.append(f"DEFAULT {self.default}")
+            elif 'DEFAULT_GENERATED' in self.extra:
+                parts.append(f"DEFAULT ({self.default})")
+            else:
+                parts.append(f"DEFAULT {_quote_literal(self.default)}")
+
+        if extra:
+            parts.append(extra)
+
+        if self.comment:
+            parts.append(f"COMMENT {_quote_literal(self.comment)}")
+
+        return " ".join(parts)
+
+
+@dataclass(frozen=True)
+class IndexDef:
+    """Definição de um índice (colunas na ordem do índice, com prefixo quando houver)."""
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool
+    index_type: str = "BTREE"
+
+    @property
+    def is_primary(self) -> bool:
+        """Indica se é a chave primária."""
+        return self.name == 'PRIMARY'
+
+    def definition(self) -> str:
+        """
+        Gera a definição do índice para ADD.
+
+        Returns:
+            str: Definição SQL do índice
+        """
+        columns = ", ".join(self.columns)
+        if self.is_primary:
+            return f"PRIMARY KEY ({columns})"
+        if self.index_type == 'FULLTEXT':
+            return f"FULLTEXT INDEX {_quote_identifier(self.name)} ({columns})"
+        if self.index_type == 'SPATIAL':
+            return f"SPATIAL INDEX {_quote_identifier(self.name)} ({columns})"
+        kind = "UNIQUE INDEX" if self.unique else "INDEX"
+        return f"{kind} {_quote_identifier(self.name)} ({columns})"
+
+    def drop_clause(self) -> str:
+        """Gera a cláusula de remoção do índice."""
+        if self.is_primary:
+            return "DROP PRIMARY KEY"
+        return f"DROP INDEX {_quote_identifier(self.name)}"
+
+
+@dataclass
+class TableSchema:
+    """Estrutura de uma tabela: colunas (na ordem da tabela) e índices."""
+    name: str
+    columns: Dict[str, ColumnDef] = field(default_factory=dict)
+    indexes: Dict[str, IndexDef] = field(default_factory=dict)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Impressão digital da estrutura (independe da ordem das colunas).
+
+        Returns:
+            str: Hash hexadecimal da definição canônica
+        """
+        canonical = (
+            tuple(sorted((column.name, column.definition()) for column in self.columns.values())),
+            tuple(sorted((index.name, index.definition()) for index in self.indexes.values()))
+        )
+        return hashlib.blake2b(repr(canonical).encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class TableChange:
+    """
+    Alteração necessária para alinhar uma tabela do destino com a da origem.
+
+    Atributos:
+        table (str): Nome da tabela
+        action (str): 'create' (tabela ausente no destino) ou 'alter'
+        clauses (List[str]): Cláusulas do ALTER TABLE
+        differences (List[str]): Descrição legível das diferenças
+        skipped (List[str]): Diferenças ignoradas (remoções sem allow_drops)
+    """
+    table: str
+    action: str
+    clauses: List[str] = field(default_factory=list)
+    differences: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def statement(self) -> Optional[str]:
+        """Instrução ALTER TABLE (None para criação ou quando não há cláusulas)."""
+        if self.action != 'alter' or not self.clauses:
+            return None
+        return f"ALTER TABLE {_quote_identifier(self.table)} " + ", ".join(self.clauses)
+
+
+def _index_part(row: Dict[str, Any]) -> Optional[str]:
+    """
+    Gera a definição de uma parte de índice a partir de uma linha de STATISTICS.
+
+    Em índices funcionais (MySQL 8.0.13+) COLUMN_NAME é NULL e EXPRESSION traz a expressão.
+
+    Args:
+        row: Linha de STATISTICS
+
+    Returns:
+        Optional[str]: Coluna (com prefixo, se houver) ou expressão entre parênteses;
+        None se a linha não tiver nenhuma das duas
+    """
+    name = _text(row['column_name'])
+    if name is None:
+        expression = _text(row.get('expression'))
+        return f"({expression})" if expression else None
+    part = _quote_identifier(name)
+    if row.get('sub_part'):
+        part += f"({int(row['sub_part'])})"
+    return part
+
+
+def build_schemas(column_rows: Iterable[Dict[str, Any]],
+                  index_rows: Iterable[Dict[str, Any]]) -> Dict[str, TableSchema]:
+    """
+    Monta as estruturas das tabelas a partir das linhas do INFORMATION_SCHEMA.
+
+    Args:
+        column_rows: Linhas de COLUMNS (ordenadas por tabela e posição)
+        index_rows: Linhas de STATISTICS (ordenadas por tabela, índice e sequência)
+
+    Returns:
+        Dict[str, TableSchema]: Estruturas indexadas pelo nome da tabela
+    """
+    schemas: Dict[str, TableSchema] = {}
+
+    for row in column_rows:
+        table = _text(row['table_name'])
+        schema = schemas.setdefault(table, TableSchema(table))
+        name = _text(row['column_name'])
+        schema.columns[name] = ColumnDef(
+            name=name,
+            column_type=_text(row['column_type']),
+            nullable=_text(row['is_nullable']) == 'YES',
+            default=_text(row.get('column_default')),
+            extra=_text(row.get('extra')) or "",
+            collation=_text(row.get('collation_name')),
+            comment=_text(row.get('column_comment')) or "",
+            generation_expression=_text(row.get('generation_expression')) or ""
+        )
+
+    index_parts: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in index_rows:
+        key = (_text(row['table_name']), _text(row['index_name']))
+        index_parts.setdefault(key, []).append(row)
+
+    for (table, index_name), rows in index_parts.items():
+        columns = [_index_part(row) for row in sorted(rows, key=lambda r: int(r['seq_in_index']))]
+        if None in columns:
+            logger.warning(f"Índice {table}.{index_name} ignorado: parte sem coluna nem expressão")
+            continue
+        schema = schemas.setdefault(table, TableSchema(table))
+        schema.indexes[index_name] = IndexDef(
+            name=index_name,
+            columns=tuple(columns),
+            unique=int(rows[0]['non_unique']) == 0,
+            index_type=_text(rows[0].get('index_type')) or "BTREE"
+        )
+
+    return schemas
+
+
+def diff_table(source: TableSchema, target: TableSchema, allow_drops: bool = False) -> TableChange:
+    """
+    Gera as cláusulas mínimas de ALTER TABLE para que o destino fique igual à origem.
+
+    A ordem das colunas não é considerada diferença. Colunas e índices existentes
+    apenas no destino só são removidos com allow_drops.
+
+    Args:
+        source: Estrutura de origem
+        target: Estrutura de destino
+        allow_drops: Se True, remove colunas e índices ausentes na origem
+
+    Returns:
+        TableChange: Alteração da tabela (sem cláusulas se as estruturas forem equivalentes)
+    """
+    change = TableChange(table=source.name, action='alter')
+    drop_indexes, column_clauses, add_indexes = [], [], []
+
+    # Índices alterados ou removidos são descartados antes das alterações de colunas
+    for name, index in target.indexes.items():
+        source_index = source.indexes.get(name)
+        if source_index is None:
+            if allow_drops:
+                drop_indexes.append(index.drop_clause())
+                change.differences.append(f"Índice {name} existe apenas no destino (removido)")
+            else:
+                change.skipped.append(f"Índice {name} existe apenas no destino")
+        elif source_index != index:
+            drop_indexes.append(index.drop_clause())
+            add_indexes.append(f"ADD {source_index.definition()}")
+            change.differences.append(f"Índice {name} diferente")
+
+    previous = None
+    for name, column in source.columns.items():
+        target_column = target.columns.get(name)
+        if target_column is None:
+            position = f"AFTER {_quote_identifier(previous)}" if previous else "FIRST"
+            column_clauses.append(f"ADD COLUMN {column.definition()} {position}")
+            change.differences.append(f"Coluna {name} ausente no destino")
+        elif target_column.definition() != column.definition():
+            column_clauses.append(f"MODIFY COLUMN {column.definition()}")
+            change.differences.append(f"Coluna {name} diferente: {target_column.definition()} → {column.definition()}")
+        previous = name
+
+    for name in target.columns:
+        if name not in source.columns:
+            if allow_drops:
+                column_clauses.append(f"DROP COLUMN {_quote_identifier(name)}")
+                change.differences.append(f"Coluna {name} existe apenas no destino (removida)")
+            else:
+                change.skipped.append(f"Coluna {name} existe apenas no destino")
+
+    for name, index in source.indexes.items():
+        if name not in target.indexes:
+            add_indexes.append(f"ADD {index.definition()}")
+            change.differences.append(f"Índice {name} ausente no destino")
+
+    change.clauses = drop_indexes + column_clauses + add_indexes
+    return change
+
+
+def build_sync_plan(source: Dict[str, TableSchema], target: Dict[str, TableSchema],
+                    tables: Optional[Sequence[str]] = None, allow_drops: bool = False) -> List[TableChange]:
+    """
+    Gera o plano de sincronização de estruturas, ignorando tabelas idênticas.
+
+    Args:
+        source: Estruturas da origem
+        target: Estruturas do destino
+        tables: Tabelas a considerar (padrão: todas as da origem)
+        allow_drops: Se True, remove colunas e índices ausentes na origem
+
+    Returns:
+        List[TableChange]: Alterações necessárias (criações primeiro)
+    """
+    creates, alters = [], []
+    for table in (tables if tables is not None else sorted(source)):
+        source_schema = source.get(table)
+        if source_schema is None:
+            continue
+
+        target_schema = target.get(table)
+        if target_schema is None:
+            creates.append(TableChange(table=table, action='create',
+                                       differences=["Tabela ausente no destino"]))
+            continue
+
+        if source_schema.fingerprint == target_schema.fingerprint:
+            continue
+
+        change = diff_table(source_schema, target_schema, allow_drops)
+        if change.clauses or change.skipped:
+            alters.append(change)
+
+    return creates + alters
+
+
+class SchemaSynchronizer:
+    """
+    Compara e sincroniza estruturas entre os bancos local e remoto.
+
+    Atributos:
+        db_connection (MySQLConnection): Conexão com os bancos MySQL
+        max_workers (int): Número máximo de instruções executadas em paralelo
+    """
+
+    def __init__(self, db_connection, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.db_connection = db_connection
+        self.max_workers = max_workers
+
+    def fetch_schema(self, is_local: bool, tables: Optional[Sequence[str]] = None) -> Dict[str, TableSchema]:
+        """
+        Lê colunas e índices de todas as tabelas de um banco em duas consultas.
+
+        Args:
+            is_local: Se True, lê o banco local
+            tables: Restringe a leitura a estas tabelas
+
+        Returns:
+            Dict[str, TableSchema]: Estruturas indexadas pelo nome da tabela
+        """
+        params: Tuple[Any, ...] = ()
+        table_filter = ""
+        if tables:
+            table_filter = f" AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})"
+            params = tuple(tables)
+
+        column_rows = self.db_connection.execute_query(
+            COLUMNS_QUERY.format(table_filter=table_filter), params, is_local=is_local, use_cache=False
+        )
+        index_rows = self.db_connection.execute_query(
+            INDEXES_QUERY.format(table_filter=table_filter), params, is_local=is_local, use_cache=False
+        )
+        return build_schemas(column_rows, index_rows)
+
+    def fetch_both(self, tables: Optional[Sequence[str]] = None) -> Tuple[Dict[str, TableSchema], Dict[str, TableSchema]]:
+        """
+        Lê as estruturas dos dois bancos em paralelo.
+
+        Returns:
+            Tuple[Dict, Dict]: (estruturas locais, estruturas remotas)
+        """
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="schema-fetch") as executor:
+            local = executor.submit(self.fetch_schema, True, tables)
+            remote = executor.submit(self.fetch_schema, False, tables)
+            return local.result(), remote.result()
+
+    def compare(self, tables: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+        """
+        Compara as estruturas dos dois bancos.
+
+        Args:
+            tables: Tabelas a comparar (padrão: todas)
+
+        Returns:
+            Dict[str, List[str]]: Diferenças por tabela (apenas tabelas diferentes)
+        """
+        local, remote = self.fetch_both(tables)
+        differences: Dict[str, List[str]] = {}
+
+        for table in sorted(set(local) | set(remote)):
+            if tables is not None and table not in tables:
+                continue
+            if table not in remote:
+                differences[table] = ["Tabela existe apenas no banco local"]
+            elif table not in local:
+                differences[table] = ["Tabela existe apenas no banco remoto"]
+            elif local[table].fingerprint != remote[table].fingerprint:
+                change = diff_table(local[table], remote[table], allow_drops=True)
+                differences[table] = change.differences or ["Estruturas diferentes"]
+
+        if tables is not None:
+            for table in tables:
+                if table not in local and table not in remote:
+                    differences[table] = ["Tabela não encontrada em nenhum dos bancos"]
+
+        return differences
+
+    def plan(self, source_is_local: bool = True, tables: Optional[Sequence[str]] = None,
+             allow_drops: bool = False) -> List[TableChange]:
+        """
+        Gera o plano de sincronização da origem para o destino.
+
+        Args:
+            source_is_local: Se True, o banco local é a origem
+            tables: Tabelas a sincronizar (padrão: todas as da origem)
+            allow_drops: Se True, remove colunas e índices ausentes na origem
+
+        Returns:
+            List[TableChange]: Alterações necessárias
+        """
+        local, remote = self.fetch_both(tables)
+        source, target = (local, remote) if source_is_local else (remote, local)
+        return build_sync_plan(source, target, tables, allow_drops)
+
+    def _create_table(self, table: str, source_is_local: bool) -> None:
+        """Cria uma tabela no destino a partir do SHOW CREATE TABLE da origem."""
+        structure = self.db_connection.get_table_structure(table, is_local=source_is_local)
+        if not structure:
+            raise ValueError(f"Tabela {table} não encontrada na origem")
+        self.db_connection.execute_update(structure['create_statement'], is_local=not source_is_local,
+                                          invalidate_cache=False)
+
+    def _alter_table(self, change: TableChange, source_is_local: bool) -> None:
+        """Executa o ALTER TABLE de uma alteração no destino."""
+        # Invalida apenas as consultas em cache que leem a tabela alterada
+        self.db_connection.execute_update(change.statement, is_local=not source_is_local)
+
+    def sync(self, source_is_local: bool = True, tables: Optional[Sequence[str]] = None,
+             allow_drops: bool = False) -> Dict[str, Any]:
+        """
+        Sincroniza as estruturas da origem para o destino.
+
+        Tabelas ausentes são criadas em sequência (novas tentativas resolvem
+        dependências de chaves estrangeiras); os ALTER TABLE são executados em paralelo.
+
+        Args:
+            source_is_local: Se True, o banco local é a origem
+            tables: Tabelas a sincronizar (padrão: todas as da origem)
+            allow_drops: Se True, remove colunas e índices ausentes na origem
+
+        Returns:
+            Dict[str, Any]: Relatório no formato de check_and_sync_structures
+        """
+        report = {
+            'success': True,
+            'synced_tables': [],
+            'failed_tables': [],
+            'skipped_tables': [],
+            'statements': [],
+            'errors': []
+        }
+
+        try:
+            local, remote = self.fetch_both(tables)
+            source, target = (local, remote) if source_is_local else (remote, local)
+            changes = build_sync_plan(source, target, tables, allow_drops)
+        except Exception as e:
+            logger.error(f"Erro ao gerar plano de sincronização de estruturas: {e}")
+            report['success'] = False
+            report['errors'].append(str(e))
+            return report
+
+        for table in tables or []:
+            if table not in source:
+                report['failed_tables'].append(table)
+                report['errors'].append(f"Tabela {table} não encontrada no banco {'local' if source_is_local else 'remoto'}")
+
+        # Criações em sequência, repetindo as que falharem enquanto houver progresso
+        pending = [change for change in changes if change.action == 'create']
+        while pending:
+            failed = []
+            for change in pending:
+                try:
+                    self._create_table(change.table, source_is_local)
+                    report['synced_tables'].append(change.table)
+                except Exception as e:
+                    failed.append((change, e))
+            if len(failed) == len(pending):
+                for change, error in failed:
+                    report['failed_tables'].append(change.table)
+                    report['errors'].append(f"Erro na tabela {change.table}: {error}")
+                break
+            pending = [change for change, _ in failed]
+
+        alters = [change for change in changes if change.action == 'alter']
+        for change in alters:
+            if change.skipped:
+                report['skipped_tables'].append(change.table)
+                logger.info(f"Tabela {change.table}: diferenças ignoradas sem allow_drops: {', '.join(change.skipped)}")
+
+        runnable = [change for change in alters if change.statement]
+        if runnable:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(runnable)),
+                                    thread_name_prefix="schema-alter") as executor:
+                futures = {change.table: (change, executor.submit(self._alter_table, change, source_is_local))
+                           for change in runnable}
+                for table, (change, future) in futures.items():
+                    try:
+                        future.result()
+                        report['synced_tables'].append(table)
+                        report['statements'].append(change.statement)
+                    except Exception as e:
+                        report['failed_tables'].append(table)
+                        report['errors'].append(f"Erro na tabela {table}: {e}")
+
+        if report['failed_tables']:
+            report['success'] = False
+
+        logger.info(f"Sincronização de estruturas: {len(report['synced_tables'])} tabela(s) alterada(s), "
+                    f"{len(report['failed_tables'])} com erro")
+        return report
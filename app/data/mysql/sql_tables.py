@@ -0,0 +1,173 @@
+"""
+Extração leve de nomes de tabelas a partir de instruções SQL.
+Reconhece FROM/JOIN (inclusive em subconsultas e listas separadas por vírgula)
+e os alvos de INSERT, REPLACE, UPDATE, DELETE e TRUNCATE.
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, List
+
+# Literais, identificadores entre crases e comentários
+_TOKEN_RE = re.compile(
+    r"(?P<comment>--[^\n]*|#[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")"
+    r"|(?P<ident>`(?:[^`]|``)+`(?:\s*\.\s*`(?:[^`]|``)+`)?|[A-Za-z_][\w$]*(?:\s*\.\s*[A-Za-z_`][\w$`]*)?)"
+    r"|(?P<punct>[(),;])",
+    re.DOTALL
+)
+
+# Palavras que encerram uma lista de tabelas após FROM
+_CLAUSE_KEYWORDS = {
+    'WHERE', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'UNION', 'JOIN', 'INNER', 'LEFT', 'RIGHT',
+    'CROSS', 'NATURAL', 'STRAIGHT_JOIN', 'ON', 'USING', 'SET', 'VALUES', 'VALUE', 'SELECT',
+    'FOR', 'LOCK', 'WINDOW', 'INTO', 'PARTITION', 'FULL', 'OUTER', 'EXCEPT', 'INTERSECT',
+    'USE', 'IGNORE', 'FORCE'
+}
+
+_WRITE_PREFIXES = ('INSERT', 'REPLACE', 'UPDATE', 'DELETE', 'TRUNCATE', 'ALTER', 'DROP', 'CREATE')
+
+
+def _normalize(identifier: str) -> str:
+    """Remove crases e prefixo de banco, retornando o nome da tabela em minúsculas."""
+    name = identifier.replace(' ', '').split('.')[-1]
+    return name.strip('`').replace('``', '`').lower()
+
+
+def _tokens(query: str) -> List[str]:
+    """Divide a consulta em identificadores e pontuação relevantes, descartando literais."""
+    tokens = []
+    for match in _TOKEN_RE.finditer(query):
+        if match.lastgroup in ('comment', 'string'):
+            continue
+        tokens.append(match.group())
+    return tokens
+
+
+def _is_identifier(token: str) -> bool:
+    """Verifica se o token é um identificador (e não pontuação)."""
+    return token not in ('(', ')', ',', ';')
+
+
+@lru_cache(maxsize=1024)
+def extract_tables(query: str) -> FrozenSet[str]:
+    """
+    Extrai todas as tabelas lidas ou escritas por uma consulta.
+
+    Args:
+        query: Consulta SQL
+
+    Returns:
+        FrozenSet[str]: Nomes das tabelas em minúsculas
+    """
+    tokens = _tokens(query)
+    upper = [token.upper() for token in tokens]
+    tables = set()
+
+    i = 0
+    while i < len(tokens):
+        keyword = upper[i]
+
+        if keyword in ('FROM', 'JOIN', 'STRAIGHT_JOIN', 'INTO', 'UPDATE', 'TABLE'):
+            i += 1
+            # Lista de tabelas: tabela [AS] [alias] [, tabela [AS] [alias] ...]
+            while i < len(tokens):
+                if upper[i] in ('LOW_PRIORITY', 'IGNORE', 'QUICK', 'IF', 'NOT', 'EXISTS'):
+                    i += 1
+                    continue
+                if not _is_identifier(tokens[i]) or upper[i] in _CLAUSE_KEYWORDS:
+                    break
+                tables.add(_normalize(tokens[i]))
+                i += 1
+                # Alias opcional
+                if i < len(tokens) and upper[i] == 'AS':
+                    i += 1
+                if i < len(tokens) and _is_identifier(tokens[i]) and upper[i] not in _CLAUSE_KEYWORDS:
+                    i += 1
+                # Continua apenas em listas separadas por vírgula (FROM/UPDATE)
+                if i < len(tokens) and tokens[i] == ',' and keyword in ('FROM', 'UPDATE'):
+                    i += 1
+                    continue
+                break
+            continue
+
+        i += 1
+
+    return frozenset(tables)
+
+
+@lru_cache(maxsize=1024)
+def extract_write_tables(query: str) -> FrozenSet[str]:
+    """
+    Extrai as tabelas modificadas por uma instrução de escrita.
+
+    Args:
+        query: Instrução SQL
+
+    Returns:
+        FrozenSet[str]: Tabelas modificadas (vazio para SELECT)
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return frozenset()
+
+    upper = [token.upper() for token in tokens]
+    command = upper[0]
+    if command not in _WRITE_PREFIXES:
+        return frozenset()
+
+    if command in ('UPDATE', 'DELETE'):
+        # UPDATE/DELETE multi-tabela: qualquer tabela da junção pode ser alterada
+        end_keyword = 'SET' if command == 'UPDATE' else 'WHERE'
+        end = upper.index(end_keyword) if end_keyword in upper else len(upper)
+        if 'JOIN' in upper[:end] or 'STRAIGHT_JOIN' in upper[:end]:
+            return extract_tables(' '.join(tokens[:end]))
+
+    targets = set()
+    i = 1
+    # Palavras que antecedem o alvo em cada comando
+    markers = {
+        'INSERT': ('INTO',), 'REPLACE': ('INTO',), 'DELETE': ('FROM',), 'TRUNCATE': (),
+        'UPDATE': (), 'ALTER': ('TABLE',), 'DROP': ('TABLE',), 'CREATE': ('TABLE',)
+    }[command]
+
+    if markers:
+        while i < len(tokens) and upper[i] not in markers:
+            i += 1
+        i += 1
+
+    while i < len(tokens):
+        if upper[i] in ('LOW_PRIORITY', 'IGNORE', 'QUICK', 'TABLE', 'IF', 'NOT', 'EXISTS',
+                        'TEMPORARY', 'DELAYED', 'HIGH_PRIORITY'):
+            i += 1
+            continue
+        if not _is_identifier(tokens[i]) or upper[i] in _CLAUSE_KEYWORDS:
+            break
+        targets.add(_normalize(tokens[i]))
+        i += 1
+        if i < len(tokens) and upper[i] == 'AS':
+            i += 1
+        if i < len(tokens) and _is_identifier(tokens[i]) and upper[i] not in _CLAUSE_KEYWORDS:
+            i += 1
+        if i < len(tokens) and tokens[i] == ',':
+            i += 1
+            continue
+        break
+
+    return frozenset(targets)
+
+
+def is_read_query(query: str) -> bool:
+    """
+    Verifica se a consulta é somente leitura (SELECT, SHOW ou WITH ... SELECT).
+
+    Args:
+        query: Consulta SQL
+
+    Returns:
+        bool: True se a consulta não modifica dados
+    """
+    tokens = _tokens(query)
+    while tokens and tokens[0] == '(':
+        tokens = tokens[1:]
+    return bool(tokens) and tokens[0].upper() in ('SELECT', 'SHOW', 'WITH', 'DESCRIBE', 'EXPLAIN')
@@ -12,10 +12,16 @@ from enum import Enum
 from typing import Dict, List, Any, Optional, Tuple, Set
 
 from app.data.mysql.mysql_connection import MySQLConnection
+from app.data.mysql.sync_watermarks import sync_watermarks
+from app.core.metrics import metrics
+from app.core.observer.connection_observer import connection_observer, is_remote_available
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+# Campos gravados na série temporal de cada sincronização concluída
+SYNC_METRIC_FIELDS = ('duration_seconds', 'tables_synced', 'records_synced', 'conflicts', 'errors')
+
 class SyncDirection(Enum):
     """Direção da sincronização entre bancos MySQL."""
     LOCAL_TO_REMOTE = "local_to_remote"
@@ -145,12 +151,17 @@ class MySQLSyncManager:
         
         # Configuração das tabelas
         self.tables_config = tables_config or DEFAULT_TABLES
+        sync_watermarks.set_replicated_tables(self.tables_config.keys())
         
         # Configuração de sincronização automática
         self.sync_interval = sync_interval
         self.auto_sync = auto_sync
         self.sync_thread = None
         self.stop_sync = threading.Event()
+        self.sync_requested = threading.Event()
+        
+        # Sincronizar assim que o banco remoto voltar a ficar disponível
+        connection_observer.add_observer(self._on_remote_availability_change)
         
         # Verificar tabelas de controle
         self.verify_tables_exist()
@@ -314,11 +325,15 @@ class MySQLSyncManager:
         
         while not self.stop_sync.is_set():
             try:
-                # Sincronizar
-                self.synchronize(SyncDirection.BIDIRECTIONAL)
+                # Modo offline: adiar até o banco remoto voltar (ou até o próximo intervalo)
+                if is_remote_available():
+                    self.synchronize(SyncDirection.BIDIRECTIONAL)
+                else:
+                    logger.info("Banco remoto indisponível: sincronização automática adiada")
                 
-                # Aguardar até o próximo intervalo ou até o evento de parada
-                self.stop_sync.wait(self.sync_interval)
+                # Aguardar até o próximo intervalo, uma sincronização solicitada ou o evento de parada
+                self.sync_requested.wait(self.sync_interval)
+                self.sync_requested.clear()
             except Exception as e:
                 logger.error(f"Erro na sincronização automática: {e}")
                 # Aguardar um pouco antes de tentar novamente
@@ -331,12 +346,24 @@ class MySQLSyncManager:
         if self.sync_thread and self.sync_thread.is_alive():
             logger.info("Parando thread de sincronização automática")
             self.stop_sync.set()
+            self.sync_requested.set()
             self.sync_thread.join(timeout=10)
             if self.sync_thread.is_alive():
                 logger.warning("Thread de sincronização não finalizou dentro do timeout")
             else:
                 logger.info("Thread de sincronização finalizada")
     
+    def _on_remote_availability_change(self, available: bool) -> None:
+        """
+        Antecipa a sincronização automática quando o banco remoto volta a ficar disponível.
+        
+        Args:
+            available: True se o banco remoto está disponível
+        """
+        if available and self.sync_thread and self.sync_thread.is_alive():
+            logger.info("Banco remoto disponível novamente: antecipando sincronização")
+            self.sync_requested.set()
+    
     def verify_tables_exist(self) -> Dict[str, Dict[str, bool]]:
         """
         Verifica se todas as tabelas configuradas para sincronização existem nos bancos local e remoto.
@@ -445,6 +472,7 @@ class MySQLSyncManager:
             
             stats["end_time"] = datetime.now()
             stats["duration_seconds"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+            metrics.series('sync', SYNC_METRIC_FIELDS).append(stats)
             
             logger.info(f"Sincronização concluída: {stats['records_synced']} registros sincronizados, "
                        f"{stats['conflicts']} conflitos, {stats['errors']} erros")
@@ -480,8 +508,13 @@ class MySQLSyncManager:
         # Sincronizar cada tabela configurada
         for table_name, config in self.tables_config.items():
             try:
+                started_at = datetime.now()
                 table_stats = self._sync_table_remote_to_local(table_name, config, last_sync)
                 
+                # A cópia local só é considerada atualizada se a tabela sincronizou sem erros
+                if table_stats["errors"] == 0:
+                    sync_watermarks.record(table_name, started_at)
+                
                 stats["records_synced"] += table_stats["records_synced"]
                 stats["conflicts"] += table_stats["conflicts"]
                 stats["errors"] += table_stats["errors"]
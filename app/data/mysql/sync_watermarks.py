@@ -0,0 +1,143 @@
+"""
+Registro das marcas d'água de sincronização por tabela.
+Guarda o instante da última sincronização bem-sucedida de cada tabela espelhada
+no banco local, usado para decidir se uma leitura pode ser servida localmente.
+As marcas d'água são persistidas em disco para sobreviver a reinícios (o warm
+start dos caches as compara com as salvas no snapshot).
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+from app.config.settings import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+class SyncWatermarks:
+    """
+    Marcas d'água de sincronização remoto → local, por tabela.
+
+    Atributos:
+        replicated_tables (Set[str]): Tabelas mantidas espelhadas pelo gerenciador de sincronização
+        path (Optional[Path]): Arquivo em que as marcas d'água são persistidas (None = só em memória)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Inicializa o registro, carregando as marcas d'água persistidas.
+
+        Args:
+            path: Arquivo de persistência (None = apenas em memória)
+        """
+        self._lock = threading.Lock()
+        self.path = Path(path) if path is not None else None
+        self._watermarks: Dict[str, datetime] = self._load()
+        self.replicated_tables: Set[str] = set()
+
+    def _load(self) -> Dict[str, datetime]:
+        """Lê as marcas d'água persistidas (vazio se o arquivo não existe ou é inválido)."""
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return {table: datetime.fromisoformat(value) for table, value in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Marcas d'água de sincronização ignoradas: {e}")
+            return {}
+
+    def _persist(self) -> None:
+        """Grava as marcas d'água de forma atômica; requer o lock."""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({table: value.isoformat() for table, value in self._watermarks.items()}, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao gravar marcas d'água de sincronização: {e}")
+
+    def set_replicated_tables(self, tables: Iterable[str]) -> None:
+        """
+        Define as tabelas espelhadas localmente.
+
+        Args:
+            tables: Nomes das tabelas configuradas para sincronização
+        """
+        with self._lock:
+            self.replicated_tables = {table.lower() for table in tables}
+
+    def record(self, table: str, synced_at: Optional[datetime] = None) -> None:
+        """
+        Registra uma sincronização bem-sucedida.
+
+        Args:
+            table: Nome da tabela
+            synced_at: Instante em que a leitura do remoto começou (padrão: agora)
+        """
+        synced_at = synced_at or datetime.now()
+        with self._lock:
+            current = self._watermarks.get(table.lower())
+            if current is None or synced_at > current:
+                self._watermarks[table.lower()] = synced_at
+                self._persist()
+        logger.debug(f"Marca d'água de sincronização da tabela {table}: {synced_at.isoformat()}")
+
+    def get(self, table: str) -> Optional[datetime]:
+        """
+        Obtém a marca d'água de uma tabela.
+
+        Args:
+            table: Nome da tabela
+
+        Returns:
+            Optional[datetime]: Instante da última sincronização ou None
+        """
+        return self._watermarks.get(table.lower())
+
+    def age(self, table: str) -> Optional[float]:
+        """
+        Obtém a idade, em segundos, da cópia local de uma tabela.
+
+        Args:
+            table: Nome da tabela
+
+        Returns:
+            Optional[float]: Segundos desde a última sincronização ou None se nunca sincronizada
+        """
+        watermark = self.get(table)
+        if watermark is None:
+            return None
+        return (datetime.now() - watermark).total_seconds()
+
+    def is_fresh(self, table: str, max_staleness: float) -> bool:
+        """
+        Verifica se a cópia local de uma tabela está dentro do limite de defasagem.
+
+        Args:
+            table: Nome da tabela
+            max_staleness: Defasagem máxima aceita em segundos
+
+        Returns:
+            bool: True se a tabela é espelhada e foi sincronizada dentro do limite
+        """
+        if table.lower() not in self.replicated_tables:
+            return False
+        age = self.age(table)
+        return age is not None and age <= max_staleness
+
+    def clear(self) -> None:
+        """Remove todas as marcas d'água registradas."""
+        with self._lock:
+            self._watermarks.clear()
+            self._persist()
+
+# Instância global
+sync_watermarks = SyncWatermarks(CACHE_DIR / 'sync_watermarks.json')
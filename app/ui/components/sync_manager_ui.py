@@ -5,8 +5,11 @@ Interface de usuário para gerenciamento de sincronização.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.data.mysql.mysql_connection import MySQLConnection
+from app.data.mysql.circuit_breaker import CircuitOpenError
+from app.data.async_connection import async_db
+from app.ui.dispatcher import tk_dispatcher
 from app.config.encrypted_settings import EncryptedSettings
 
 logger = logging.getLogger(__name__)
@@ -38,7 +41,12 @@ class SyncManagerUI(ttk.Frame):
         # Progresso
         self.progress_var = tk.DoubleVar()
         
+        # Verificação de estruturas em andamento (cancelada se o frame for destruído)
+        self._structures_future = None
+        
         self._init_ui()
+        tk_dispatcher.attach(self)
+        self.bind("<Destroy>", self._on_destroy, add="+")
         self.initialize_managers()
     
     def _init_ui(self):
@@ -60,8 +68,9 @@ class SyncManagerUI(ttk.Frame):
         ttk.Button(actions_frame, text="Verificar Conexões", 
                   command=self.check_connections).pack(fill=tk.X, padx=5, pady=2)
         
-        ttk.Button(actions_frame, text="Verificar Estruturas", 
-                  command=self.check_structures).pack(fill=tk.X, padx=5, pady=2)
+        self.check_structures_button = ttk.Button(actions_frame, text="Verificar Estruturas", 
+                                                  command=self.check_structures)
+        self.check_structures_button.pack(fill=tk.X, padx=5, pady=2)
         
         ttk.Button(actions_frame, text="Sincronizar Local → Remoto", 
                   command=lambda: self.sync_structures(True)).pack(fill=tk.X, padx=5, pady=2)
@@ -103,60 +112,70 @@ class SyncManagerUI(ttk.Frame):
             # Testar conexão remota
             self.mysql_connection.get_remote_connection()
             self.remote_status.set("Conectado")
+        except CircuitOpenError:
+            self.remote_status.set("Offline")
         except Exception as e:
             logger.error(f"Erro na conexão remota: {e}")
             self.remote_status.set("Erro")
     
     def check_structures(self):
-        """Verifica as estruturas das tabelas."""
+        """Verifica as estruturas das tabelas sem bloquear a interface."""
         if not self.mysql_connection:
             messagebox.showerror("Erro", "Conexão não inicializada")
             return
         
+        if self._structures_future is not None and not self._structures_future.done():
+            return
+        
+        self.check_structures_button.configure(state="disabled")
+        self._structures_future = tk_dispatcher.bind_future(
+            async_db.submit(self._collect_structure_differences()),
+            on_success=self._show_structure_differences,
+            on_error=self._on_structures_error,
+            on_done=self._on_structures_done
+        )
+    
+    async def _collect_structure_differences(self) -> List[str]:
+        """
+        Compara as estruturas de todas as tabelas (leitura em lote dos dois bancos em paralelo).
+        
+        Returns:
+            List[str]: Descrição das diferenças encontradas
+        """
+        tk_dispatcher.call_soon(self.progress_var.set, 50)
+        differences = await async_db.arun(self.mysql_connection.compare_all_structures)
+        tk_dispatcher.call_soon(self.progress_var.set, 100)
+        
+        return [f"Tabela {table}: {'; '.join(items)}" for table, items in differences.items()]
+    
+    def _show_structure_differences(self, differences: List[str]):
+        """Exibe o resultado da verificação de estruturas."""
+        if differences:
+            messagebox.showwarning("Diferenças Encontradas", 
+                                 "As seguintes diferenças foram encontradas:\n\n" + 
+                                 "\n".join(differences))
+        else:
+            messagebox.showinfo("Verificação Concluída", 
+                              "Nenhuma diferença encontrada nas estruturas")
+    
+    def _on_structures_error(self, error: BaseException):
+        """Exibe falhas da verificação de estruturas."""
+        logger.error(f"Erro ao verificar estruturas: {error}")
+        messagebox.showerror("Erro", f"Erro ao verificar estruturas: {error}")
+    
+    def _on_structures_done(self):
+        """Restaura a interface ao final da verificação de estruturas."""
         try:
-            # Obter lista de tabelas
-            local_tables = set(self.mysql_connection.get_all_tables(is_local=True))
-            remote_tables = set(self.mysql_connection.get_all_tables(is_local=False))
-            
-            # Comparar tabelas
-            all_tables = local_tables.union(remote_tables)
-            total_tables = len(all_tables)
-            current_table = 0
-            
-            differences = []
-            
-            for table in all_tables:
-                current_table += 1
-                self.progress_var.set((current_table / total_tables) * 100)
-                self.update_idletasks()
-                
-                if table not in local_tables:
-                    differences.append(f"Tabela {table} existe apenas no banco remoto")
-                    continue
-                    
-                if table not in remote_tables:
-                    differences.append(f"Tabela {table} existe apenas no banco local")
-                    continue
-                
-                # Comparar estruturas
-                are_equal, diff = self.mysql_connection.compare_table_structures(table)
-                if not are_equal:
-                    differences.append(f"Tabela {table}: {diff}")
-            
-            # Exibir resultado
-            if differences:
-                messagebox.showwarning("Diferenças Encontradas", 
-                                     "As seguintes diferenças foram encontradas:\n\n" + 
-                                     "\n".join(differences))
-            else:
-                messagebox.showinfo("Verificação Concluída", 
-                                  "Nenhuma diferença encontrada nas estruturas")
-                
-        except Exception as e:
-            logger.error(f"Erro ao verificar estruturas: {e}")
-            messagebox.showerror("Erro", f"Erro ao verificar estruturas: {e}")
-        finally:
             self.progress_var.set(0)
+            self.check_structures_button.configure(state="normal")
+        except tk.TclError:
+            # Frame destruído durante a verificação
+            pass
+    
+    def _on_destroy(self, event):
+        """Cancela operações em andamento quando o frame é destruído."""
+        if event.widget is self and self._structures_future is not None:
+            self._structures_future.cancel()
     
     def sync_structures(self, source_is_local: bool):
         """
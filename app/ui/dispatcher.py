@@ -0,0 +1,131 @@
+"""
+Despachante de callbacks para a thread da interface Tk.
+Threads de segundo plano enfileiram callbacks; um único laço baseado em after()
+os executa na thread da interface, a única autorizada a alterar widgets.
+"""
+
+import queue
+import logging
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (em milissegundos) entre verificações da fila
+DEFAULT_POLL_INTERVAL = 16
+
+class TkDispatcher:
+    """
+    Executa na thread da interface callbacks enfileirados por outras threads.
+
+    Atributos:
+        poll_interval (int): Intervalo entre verificações da fila em milissegundos
+    """
+
+    def __init__(self, poll_interval: int = DEFAULT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._widget = None
+        self._after_id = None
+
+    def attach(self, widget) -> None:
+        """
+        Associa o despachante a um widget e inicia o laço de verificação.
+
+        Chamadas repetidas mantêm o widget atual enquanto ele existir; se ele foi
+        destruído, o laço passa a usar o novo widget.
+
+        Args:
+            widget: Widget Tk (normalmente a janela principal)
+        """
+        if self._widget is not None and self._widget_exists(self._widget):
+            return
+        self._widget = widget
+        self._after_id = widget.after(self.poll_interval, self._poll)
+        logger.debug("Despachante da interface associado a um novo widget")
+
+    def is_attached(self) -> bool:
+        """
+        Indica se há um widget ativo executando os callbacks enfileirados.
+
+        Returns:
+            bool: True se call_soon será atendido pela thread da interface
+        """
+        return self._widget is not None and self._widget_exists(self._widget)
+
+    @staticmethod
+    def _widget_exists(widget) -> bool:
+        """Verifica se o widget ainda existe."""
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def call_soon(self, callback: Callable[..., Any], *args) -> None:
+        """
+        Agenda um callback para a thread da interface (seguro em qualquer thread).
+
+        Args:
+            callback: Função a ser executada
+            *args: Argumentos do callback
+        """
+        self._queue.put((callback, args))
+
+    def _poll(self) -> None:
+        """Executa os callbacks pendentes e reagenda a próxima verificação."""
+        # Reagendar antes de executar: um callback pode abrir um mainloop aninhado
+        try:
+            self._after_id = self._widget.after(self.poll_interval, self._poll)
+        except Exception:
+            self._widget = None
+            self._after_id = None
+
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Erro em callback da interface: {e}")
+
+    def bind_future(self, future: Future,
+                    on_success: Callable[[Any], None],
+                    on_error: Optional[Callable[[BaseException], None]] = None,
+                    on_done: Optional[Callable[[], None]] = None) -> Future:
+        """
+        Entrega o resultado de um Future aos callbacks na thread da interface.
+
+        Futures cancelados não chamam on_success nem on_error, apenas on_done.
+
+        Args:
+            future: Future de uma operação em segundo plano
+            on_success: Callback com o resultado
+            on_error: Callback com a exceção
+            on_done: Callback sempre executado ao final (ex.: reabilitar botões)
+
+        Returns:
+            Future: O próprio future, para permitir cancelamento
+        """
+        def deliver(done: Future) -> None:
+            try:
+                if not done.cancelled():
+                    error = done.exception()
+                    if error is None:
+                        on_success(done.result())
+                    elif on_error is not None:
+                        on_error(error)
+                    else:
+                        logger.error(f"Erro em operação de segundo plano: {error}")
+            except CancelledError:
+                pass
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        future.add_done_callback(lambda done: self.call_soon(deliver, done))
+        return future
+
+# Instância global do despachante
+tk_dispatcher = TkDispatcher()
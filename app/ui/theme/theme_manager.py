@@ -26,12 +26,14 @@ class ThemeManager:
         
         # Usa o dynamic_settings ao invés de ler diretamente do arquivo
         self._theme_mode = ThemeMode(dynamic_settings.get_window_setting('appearance_mode', 'system'))
+        self._color_theme = None
         
         # Aplica o tema inicial
         self._apply_theme()
         
-        # Registra-se como observador das configurações
-        dynamic_settings.add_observer(self._on_settings_changed)
+        # Inscreve-se apenas nos caminhos do tema (posições de janela não interessam)
+        dynamic_settings.subscribe(['window', 'appearance_mode'], self._on_settings_changed)
+        dynamic_settings.subscribe(['window', 'color_theme'], self._on_color_theme_changed)
         
         self._initialized = True
         logger.debug(f"ThemeManager inicializado com sucesso. Tema atual: {self.current_theme.value}")
@@ -67,13 +69,20 @@ class ThemeManager:
         """Retorna o tema atual"""
         return self._theme_mode
     
-    def _on_settings_changed(self, setting_type: str = None):
-        """Callback para mudanças nas configurações"""
-        if setting_type in (None, 'window', 'appearance_mode'):
-            new_mode = dynamic_settings.get_window_setting('appearance_mode', 'system')
-            if new_mode != self.current_theme.value:
-                self._theme_mode = ThemeMode(new_mode)
-                self._apply_theme()
+    def _on_settings_changed(self, changed_paths: List = None):
+        """Callback para mudanças no modo de aparência"""
+        new_mode = dynamic_settings.get_window_setting('appearance_mode', 'system')
+        if new_mode != self.current_theme.value:
+            self._theme_mode = ThemeMode(new_mode)
+            self._apply_theme()
+    
+    def _on_color_theme_changed(self, changed_paths: List = None):
+        """Callback para mudanças no tema de cores"""
+        color_theme = dynamic_settings.get_window_setting('color_theme', 'blue')
+        if color_theme != self._color_theme:
+            self._color_theme = color_theme
+            ctk.set_default_color_theme(color_theme)
+            self._notify_observers()
     
     def set_theme(self, theme: ThemeMode) -> bool:
         """Define um novo tema"""
@@ -157,8 +166,8 @@ class ThemeManager:
                 ctk.set_appearance_mode("light")
                 
             # Define o tema de cores
-            color_theme = dynamic_settings.get_window_setting('color_theme', 'blue')
-            ctk.set_default_color_theme(color_theme)
+            self._color_theme = dynamic_settings.get_window_setting('color_theme', 'blue')
+            ctk.set_default_color_theme(self._color_theme)
             
             # Configura cores personalizadas
             self._configure_custom_colors(theme_style)
@@ -196,6 +205,7 @@ class ThemeManager:
             # Atualiza a configuração
             dynamic_settings.set_window_setting('color_theme', color_theme)
             # Aplica o tema
+            self._color_theme = color_theme
             ctk.set_default_color_theme(color_theme)
             # Notifica observadores
             self._notify_observers()
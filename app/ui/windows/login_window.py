@@ -2,6 +2,8 @@ import logging
 import customtkinter as ctk
 from typing import Optional, Callable, Dict
 from app.data.connection import db
+from app.data.async_connection import async_db
+from app.ui.dispatcher import tk_dispatcher
 from app.config.settings import LOGIN_WINDOW_SETTINGS, APP_ICONS, APP_NAME
 from app.ui.theme.theme_manager import theme_manager
 from app.ui.notifications import notifications
@@ -50,6 +52,13 @@ class LoginWindow(WindowPositionMixin, ctk.CTk):
         # Registra para observar autenticação
         auth_observer.add_observer(self._on_auth_change)
         
+        # Resultados de operações em segundo plano são entregues por esta janela
+        tk_dispatcher.attach(self)
+        self._login_future = None
+        
+        # Aquece os pools de conexão depois que a janela estiver visível
+        self.after(100, db.warm_up)
+        
         logger.debug("Janela de login inicializada")
 
     def _create_widgets(self):
@@ -125,36 +134,46 @@ class LoginWindow(WindowPositionMixin, ctk.CTk):
         db.set_status_label(self.status_label)
 
     def _handle_login(self):
-        """Gerencia o processo de login"""
-        try:
-            self.login_button.configure(state="disabled")
-            self.status_label.configure(text="Conectando...", text_color="gray")
-            
-            credentials = {
-                'user': self.username_entry.get(),
-                'password': self.password_entry.get()
-            }
-            
-            if db.test_connection(credentials):
-                # A notificação será feita pelo observer
-                self.withdraw()  # Esconde a janela de login
-                main_window = MainWindow()
-                main_window.protocol("WM_DELETE_WINDOW", self._on_main_window_close)
-                main_window.mainloop()
-            else:
-                self.status_label.configure(
-                    text="Usuário ou senha inválidos",
-                    text_color="red"
-                )
-                
-        except Exception as e:
-            logger.error(f"Erro ao tentar login: {e}")
+        """Gerencia o processo de login (o teste de conexão roda fora da thread da interface)"""
+        if self._login_future is not None and not self._login_future.done():
+            return
+        
+        self.login_button.configure(state="disabled")
+        self.status_label.configure(text="Conectando...", text_color="gray")
+        
+        credentials = {
+            'user': self.username_entry.get(),
+            'password': self.password_entry.get()
+        }
+        
+        self._login_future = tk_dispatcher.bind_future(
+            async_db.submit(async_db.atest_connection(credentials)),
+            on_success=self._on_login_result,
+            on_error=self._on_login_error,
+            on_done=lambda: self.login_button.configure(state="normal")
+        )
+    
+    def _on_login_result(self, success: bool):
+        """Trata o resultado do teste de conexão do login"""
+        if success:
+            # A notificação será feita pelo observer
+            self.withdraw()  # Esconde a janela de login
+            main_window = MainWindow()
+            main_window.protocol("WM_DELETE_WINDOW", self._on_main_window_close)
+            main_window.mainloop()
+        else:
             self.status_label.configure(
-                text=f"Erro: {str(e)}",
+                text="Usuário ou senha inválidos",
                 text_color="red"
             )
-        finally:
-            self.login_button.configure(state="normal")
+    
+    def _on_login_error(self, error: BaseException):
+        """Trata falhas no teste de conexão do login"""
+        logger.error(f"Erro ao tentar login: {error}")
+        self.status_label.configure(
+            text=f"Erro: {str(error)}",
+            text_color="red"
+        )
 
     def _on_main_window_close(self):
         """Chamado quando a janela principal é fechada"""
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a fachada assíncrona do banco e o despachante da interface.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.async_connection import AsyncDatabase
+from app.ui.dispatcher import TkDispatcher
+
+
+class SlowDB:
+    """DatabaseConnection simulada com consultas lentas."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.threads = set()
+
+    def execute_query(self, query, params=None, is_local=True, use_cache=False):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return [{'query': query, 'is_local': is_local}]
+
+
+class FakeWidget:
+    """Widget simulado: after() apenas registra o callback."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+    def winfo_exists(self):
+        return True
+
+    def run_pending(self):
+        callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+class TestAsyncDatabase(unittest.TestCase):
+    """Testes para a fachada assíncrona."""
+
+    def setUp(self):
+        self.db = SlowDB()
+        self.async_db = AsyncDatabase(self.db)
+
+    def tearDown(self):
+        self.async_db.close()
+
+    def test_concurrent_queries(self):
+        """Consultas agrupadas com gather rodam em paralelo fora da thread chamadora."""
+        async def run_all():
+            return await asyncio.gather(*(self.async_db.aquery(f"SELECT {i}") for i in range(4)))
+
+        start = time.perf_counter()
+        results = self.async_db.submit(run_all()).result(timeout=5)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([r[0]['query'] for r in results], [f"SELECT {i}" for i in range(4)])
+        self.assertLess(elapsed, 0.6)
+        self.assertNotIn(threading.current_thread().name, self.db.threads)
+
+    def test_cancel(self):
+        """O future de uma consulta pode ser cancelado."""
+        future = self.async_db.submit(self.async_db.aquery("SELECT 1"))
+        self.assertTrue(future.cancel() or future.cancelled())
+        self.assertTrue(future.cancelled())
+
+
+class TestTkDispatcher(unittest.TestCase):
+    """Testes para o despachante de callbacks da interface."""
+
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.dispatcher = TkDispatcher()
+        self.dispatcher.attach(self.widget)
+
+    def test_callbacks_run_on_poll(self):
+        """Callbacks de outras threads só executam no laço da interface."""
+        calls = []
+        worker = threading.Thread(target=self.dispatcher.call_soon, args=(calls.append, 'ok'))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(calls, [])
+        self.widget.run_pending()
+        self.assertEqual(calls, ['ok'])
+        # O laço continua agendado
+        self.assertEqual(len(self.widget.scheduled), 1)
+
+    def test_is_attached(self):
+        """Só há entrega pela interface depois de associar um widget."""
+        self.assertFalse(TkDispatcher().is_attached())
+        self.assertTrue(self.dispatcher.is_attached())
+
+    def test_bind_future(self):
+        """Resultado, erro e cancelamento de futures chegam aos callbacks corretos."""
+        async_db = AsyncDatabase(SlowDB(delay=0))
+        try:
+            results, errors, done = [], [], []
+
+            async def fail():
+                raise ValueError("falha")
+
+            f1 = self.dispatcher.bind_future(async_db.submit(async_db.aquery("SELECT 1")),
+                                             results.append, errors.append, lambda: done.append(1))
+            f2 = self.dispatcher.bind_future(async_db.submit(fail()),
+                                             results.append, errors.append, lambda: done.append(2))
+            f1.result(timeout=5)
+            with self.assertRaises(ValueError):
+                f2.result(timeout=5)
+
+            self.widget.run_pending()
+            self.assertEqual(results[0][0]['query'], "SELECT 1")
+            self.assertIsInstance(errors[0], ValueError)
+            self.assertEqual(sorted(done), [1, 2])
+        finally:
+            async_db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
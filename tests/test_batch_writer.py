@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a reescrita e divisão de lotes MySQL.
+"""
+
+import os
+import sys
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.mysql.batch_writer import (
+    BatchWriter, parse_batch_statement, build_multi_row_insert, build_case_update
+)
+
+
+class FakeCursor:
+    """Cursor simulado que registra as instruções executadas."""
+
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        self.log.append(('execute', query, params))
+        self.rowcount = query.count('(%s') or 1
+
+    def executemany(self, query, params_list):
+        self.log.append(('executemany', query, list(params_list)))
+        self.rowcount = len(params_list)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Conexão simulada."""
+
+    def __init__(self, log):
+        self.log = log
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class TestBatchStatementParsing(unittest.TestCase):
+    """Testes para a análise de instruções de lote."""
+
+    def test_plain_insert(self):
+        """INSERT simples é reescrito em multi-linha."""
+        statement = parse_batch_statement("INSERT INTO equipes (id, nome) VALUES (%s, %s)")
+        self.assertEqual(statement.kind, 'insert')
+
+        query, params = build_multi_row_insert(statement, [(1, 'a'), (2, 'b')])
+        self.assertEqual(query, "INSERT INTO equipes (id, nome) VALUES (%s, %s), (%s, %s)")
+        self.assertEqual(params, (1, 'a', 2, 'b'))
+
+    def test_insert_on_duplicate_key(self):
+        """ON DUPLICATE KEY UPDATE sem placeholders é preservado no final."""
+        statement = parse_batch_statement(
+            "INSERT INTO equipes (id, nome) VALUES (%s, %s) ON DUPLICATE KEY UPDATE nome = VALUES(nome)"
+        )
+        self.assertEqual(statement.kind, 'insert')
+        query, _ = build_multi_row_insert(statement, [(1, 'a'), (2, 'b')])
+        self.assertTrue(query.endswith("(%s, %s) ON DUPLICATE KEY UPDATE nome = VALUES(nome)"))
+
+    def test_insert_on_duplicate_key_with_placeholders(self):
+        """ODKU com placeholders não pode ser reescrito."""
+        statement = parse_batch_statement(
+            "INSERT INTO equipes (id, nome) VALUES (%s, %s) ON DUPLICATE KEY UPDATE nome = %s"
+        )
+        self.assertEqual(statement.kind, 'generic')
+
+    def test_replace_with_functions(self):
+        """REPLACE com funções dentro do grupo de valores."""
+        statement = parse_batch_statement("REPLACE INTO logs (id, criado) VALUES (%s, NOW())")
+        self.assertEqual(statement.kind, 'insert')
+        self.assertEqual(statement.row_template, "(%s, NOW())")
+
+    def test_update_case(self):
+        """UPDATE por chave é reescrito com CASE e mantém a última linha por chave."""
+        statement = parse_batch_statement("UPDATE usuarios SET nome = %s, ativo = %s WHERE id = %s")
+        self.assertEqual(statement.kind, 'update')
+        self.assertEqual(statement.columns, ['nome', 'ativo'])
+
+        query, params = build_case_update(statement, [('a', 1, 10), ('b', 0, 20), ('c', 1, 10)])
+        self.assertIn("nome = CASE id WHEN %s THEN %s WHEN %s THEN %s ELSE nome END", query)
+        self.assertTrue(query.endswith("WHERE id IN (%s, %s)"))
+        self.assertEqual(params, (10, 'c', 20, 'b', 10, 1, 20, 0, 10, 20))
+
+    def test_generic_statement(self):
+        """DELETE e UPDATE com expressões ficam no modo genérico."""
+        self.assertEqual(parse_batch_statement("DELETE FROM equipes WHERE id = %s").kind, 'generic')
+        self.assertEqual(
+            parse_batch_statement("UPDATE usuarios SET versao = versao + 1 WHERE id = %s").kind,
+            'generic'
+        )
+
+
+class TestBatchWriter(unittest.TestCase):
+    """Testes para a execução de lotes."""
+
+    def setUp(self):
+        self.log = []
+        self.connections = []
+
+        def get_connection():
+            connection = FakeConnection(self.log)
+            self.connections.append(connection)
+            return connection
+
+        self.get_connection = get_connection
+
+    def test_packet_chunking(self):
+        """Lotes grandes são divididos pelo tamanho estimado do pacote."""
+        writer = BatchWriter(self.get_connection, lambda c: None, max_allowed_packet=4096)
+        rows = [(i, 'x' * 100) for i in range(200)]
+
+        plan = writer.plan("INSERT INTO t (id, nome) VALUES (%s, %s)", rows)
+
+        self.assertGreater(len(plan), 1)
+        self.assertEqual(sum(len(params) for _, params, _ in plan), 400)
+        for chunk_query, _, _ in plan:
+            self.assertLess(len(chunk_query), 4096)
+
+    def test_sequential_single_transaction(self):
+        """Execução sequencial usa uma conexão e confirma uma vez."""
+        writer = BatchWriter(self.get_connection, lambda c: None, max_allowed_packet=4096)
+        writer.execute("INSERT INTO t (id, nome) VALUES (%s, %s)", [(i, 'x' * 100) for i in range(200)])
+
+        self.assertEqual(len(self.connections), 1)
+        self.assertTrue(self.connections[0].committed)
+        self.assertTrue(all(entry[0] == 'execute' for entry in self.log))
+
+    def test_parallel_chunks(self):
+        """Execução paralela usa uma conexão por bloco."""
+        writer = BatchWriter(self.get_connection, lambda c: None, max_allowed_packet=4096, parallel=4)
+        writer.execute("INSERT INTO t (id, nome) VALUES (%s, %s)", [(i, 'x' * 100) for i in range(200)])
+
+        self.assertGreater(len(self.connections), 1)
+        self.assertTrue(all(connection.committed for connection in self.connections))
+
+    def test_generic_fallback(self):
+        """Instruções não suportadas usam executemany."""
+        writer = BatchWriter(self.get_connection, lambda c: None)
+        affected = writer.execute("DELETE FROM t WHERE id = %s", [(1,), (2,), (3,)])
+
+        self.assertEqual(affected, 3)
+        self.assertEqual(self.log[0][0], 'executemany')
+
+    def test_empty_batch(self):
+        """Lote vazio não abre conexão."""
+        writer = BatchWriter(self.get_connection, lambda c: None)
+        self.assertEqual(writer.execute("INSERT INTO t (id) VALUES (%s)", []), 0)
+        self.assertEqual(self.connections, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para as operações em lote do cache (get_many/set_many/delete_many).
+"""
+
+import os
+import sys
+import unittest
+import logging
+from datetime import timedelta
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import MemoryCache, RedisCache
+from app.core.cache.lru import LRUCache
+from app.data.cache.query_cache import QueryCache
+
+
+class FakePipeline:
+    """Pipeline Redis simulado: os comandos são aplicados em uma única ida e volta."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value):
+        self.commands.append((key, value, None))
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value, ttl))
+
+    def execute(self):
+        self.client.round_trips += 1
+        for key, value, ttl in self.commands:
+            self.client.data[key] = value
+            self.client.ttls[key] = ttl
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Cliente Redis simulado que conta as idas e voltas ao servidor."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False):
+        self.data.setdefault(key, str(value).encode())
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def unlink(self, *keys):
+        self.round_trips += 1
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+
+class TestLRUBatch(unittest.TestCase):
+    """Testes para as operações em lote do LRUCache."""
+
+    def test_set_get_delete_many(self):
+        """Os lotes respeitam TTL por chave, limites e contadores."""
+        cache = LRUCache(3)
+        stored = cache.set_many({'a': 1, 'b': 2, 'c': 3, 'd': 4}, ttls={'a': 0})
+
+        self.assertTrue(all(stored.values()))
+        self.assertEqual(cache.get_many(['a', 'b', 'c', 'd', 'x']), {'b': 2, 'c': 3, 'd': 4})
+        self.assertEqual(cache.delete_many(['b', 'x']), 1)
+        self.assertEqual(cache.keys(), ['c', 'd'])
+
+    def test_oversized_values_in_batch(self):
+        """Valores maiores que o limite em bytes são recusados individualmente."""
+        cache = LRUCache(0, max_bytes=100)
+        stored = cache.set_many({'a': 'a', 'b': 'b'}, sizes={'a': 50, 'b': 500})
+        self.assertEqual(stored, {'a': True, 'b': False})
+        self.assertEqual(cache.keys(), ['a'])
+
+
+class TestMemoryCacheBatch(unittest.TestCase):
+    """Testes para os lotes no MemoryCache e no QueryCache."""
+
+    def test_memory_cache(self):
+        """MemoryCache implementa o protocolo em lote."""
+        cache = MemoryCache(CacheConfig())
+        cache.set_many({'a': 1, 'b': [1, 2]}, ttl=60)
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': [1, 2]})
+        cache.delete_many(['a'])
+        self.assertEqual(cache.get_many(['a', 'b']), {'b': [1, 2]})
+
+    def test_query_cache(self):
+        """QueryCache grava e lê lotes com timeouts por chave."""
+        now = [1000.0]
+        cache = QueryCache(max_size=10)
+        cache.cache.clock = lambda: now[0]
+        cache.set_many({'a': 1, 'b': 2}, timeout=timedelta(minutes=5), timeouts={'b': timedelta(seconds=1)})
+        now[0] += 2
+        self.assertEqual(cache.get_many(['a', 'b']), {'a': 1})
+        self.assertEqual(cache.delete_many(['a', 'b']), 1)
+
+
+class TestRedisCacheBatch(unittest.TestCase):
+    """Testes para os lotes no RedisCache."""
+
+    def setUp(self):
+        config = CacheConfig()
+        config.default_ttl = 300
+        self.cache = RedisCache(config)
+        self.client = self.cache.client = FakeRedis()
+        self.client.data['controlix:ns'] = b'7'
+
+    def test_one_round_trip_per_batch(self):
+        """N chaves custam uma ida e volta ao Redis, não N."""
+        items = {f"funcionario:{i}": {'id': i} for i in range(50)}
+        self.cache.set_many(items, ttls={'funcionario:0': 10})
+        self.assertEqual(self.client.round_trips, 1)
+
+        found = self.cache.get_many(list(items) + ['ausente'])
+        self.assertEqual(found, items)
+        self.assertEqual(self.client.round_trips, 2)
+
+        self.cache.delete_many(list(items)[:10])
+        self.assertEqual(self.client.round_trips, 3)
+        self.assertEqual(len(self.client.data), 41)
+
+    def test_per_key_ttl(self):
+        """O TTL por chave sobrepõe o padrão da configuração."""
+        self.cache.set_many({'a': 1, 'b': 2}, ttls={'a': 10})
+        self.assertEqual(self.client.ttls, {'controlix:v7:a': 10, 'controlix:v7:b': 300})
+
+    def test_undecodable_values_are_misses(self):
+        """Valores em formato antigo são omitidos do resultado."""
+        self.client.data['controlix:v7:legado'] = b'{"id": 1}'
+        self.cache.set_many({'novo': 1})
+        self.assertEqual(self.cache.get_many(['legado', 'novo']), {'novo': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
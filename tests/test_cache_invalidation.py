@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a invalidação de cache por tabela com contadores de geração.
+"""
+
+import os
+import sys
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import MemoryCache
+from app.core.cache.cache_keys import query_key
+from app.core.cache.table_generations import TableGenerations, table_tags
+from app.data.cache.cache_invalidator import CacheInvalidator, cache_invalidator
+from app.data.mysql.sql_tables import extract_tables, extract_write_tables
+
+
+class FakePipeline:
+    """Pipeline Redis simulado."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, nx=False):
+        self.commands.append(('set', key, value, nx))
+
+    def incr(self, key):
+        self.commands.append(('incr', key))
+
+    def execute(self):
+        for command in self.commands:
+            if command[0] == 'set':
+                _, key, value, nx = command
+                if not nx or key not in self.client.data:
+                    self.client.data[key] = str(value)
+            else:
+                key = command[1]
+                self.client.data[key] = str(int(self.client.data.get(key, 0)) + 1)
+        self.commands = []
+
+
+class FakeRedis:
+    """Cliente Redis simulado com MGET, SET NX e INCR."""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("Redis indisponível")
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self):
+        if self.fail:
+            raise ConnectionError("Redis indisponível")
+        return FakePipeline(self)
+
+
+class TestTableGenerations(unittest.TestCase):
+    """Testes para os contadores de geração."""
+
+    def test_memory_generations(self):
+        """Incrementos afetam apenas as etiquetas informadas."""
+        generations = TableGenerations()
+        self.assertEqual(generations.get_many(['local.a', 'local.b']), {'local.a': 0, 'local.b': 0})
+        self.assertTrue(generations.bump(['local.a']))
+        self.assertEqual(generations.get_many(['local.a', 'local.b']), {'local.a': 1, 'local.b': 0})
+
+    def test_redis_generations(self):
+        """Contadores ausentes no Redis são semeados pelo relógio e depois incrementados."""
+        client = FakeRedis()
+        generations = TableGenerations(lambda: client, prefix="controlix:gen:")
+
+        first = generations.get_many(['local.a'])['local.a']
+        self.assertGreater(first, 0)
+        self.assertTrue(generations.bump(['local.a']))
+        self.assertEqual(generations.get_many(['local.a'])['local.a'], first + 1)
+
+        # Outro processo enxerga o mesmo contador
+        other = TableGenerations(lambda: client, prefix="controlix:gen:")
+        self.assertEqual(other.get_many(['local.a'])['local.a'], first + 1)
+
+    def test_redis_failure(self):
+        """Falhas do Redis são sinalizadas ao chamador."""
+        client = FakeRedis()
+        client.fail = True
+        generations = TableGenerations(lambda: client)
+        self.assertIsNone(generations.get_many(['local.a']))
+        self.assertFalse(generations.bump(['local.a']))
+
+    def test_table_tags(self):
+        """Etiquetas separadas por banco."""
+        self.assertEqual(table_tags({'b', 'a'}, True), ['local.a', 'local.b'])
+        self.assertEqual(table_tags({'a'}), ['local.a', 'remote.a'])
+
+    def test_multi_table_write(self):
+        """UPDATE e DELETE com JOIN invalidam todas as tabelas da junção."""
+        self.assertEqual(extract_write_tables("UPDATE a JOIN b ON a.id = b.id SET b.x = 1"), {'a', 'b'})
+        self.assertEqual(extract_write_tables("DELETE t1 FROM t1 JOIN t2 ON t1.id = t2.id WHERE t2.x = 1"),
+                         {'t1', 't2'})
+
+
+class TestCacheInvalidator(unittest.TestCase):
+    """Testes para o registro de caches do invalidador."""
+
+    def test_falls_back_to_clear(self):
+        """Se o incremento falhar, o cache afetado é limpo."""
+        client = FakeRedis()
+        cache = MemoryCache(CacheConfig())
+        cache.generations = TableGenerations(lambda: client)
+        cache.set('k', 1)
+        invalidator = CacheInvalidator()
+        invalidator.register_cache(cache)
+
+        client.fail = True
+        invalidator.invalidate_table('equipes')
+        self.assertIsNone(cache.get('k'))
+
+
+class TestTableTaggedKeys(unittest.TestCase):
+    """Testes para chaves de cache marcadas com as gerações das tabelas lidas."""
+
+    def setUp(self):
+        self.cache = MemoryCache(CacheConfig())
+        cache_invalidator.register_cache(self.cache)
+
+    def tearDown(self):
+        cache_invalidator.unregister_cache(self.cache)
+
+    def key(self, query):
+        generations = self.cache.generations.get_many(table_tags(extract_tables(query), True))
+        return query_key(query, namespace="mysql_local", generations=generations)
+
+    def test_write_invalidates_only_written_table(self):
+        """Um INSERT em user_lock_unlock mantém em cache as consultas de equipes."""
+        equipes = "SELECT * FROM equipes WHERE id = 1"
+        locks = "SELECT COUNT(*) FROM user_lock_unlock u JOIN usuarios s ON s.id = u.user_id"
+        self.cache.set(self.key(equipes), ['equipe'])
+        self.cache.set(self.key(locks), [3])
+
+        cache_invalidator.invalidate_tables(
+            extract_write_tables("INSERT INTO user_lock_unlock (user_id) VALUES (%s)"), is_local=True)
+
+        self.assertEqual(self.cache.get(self.key(equipes)), ['equipe'])
+        self.assertIsNone(self.cache.get(self.key(locks)))
+
+    def test_remote_write_keeps_local_entries(self):
+        """Escritas no banco remoto não invalidam consultas do banco local."""
+        equipes = "SELECT * FROM equipes"
+        self.cache.set(self.key(equipes), ['equipe'])
+        cache_invalidator.invalidate_table('equipes', is_local=False)
+        self.assertEqual(self.cache.get(self.key(equipes)), ['equipe'])
+
+    def test_invalidate_all(self):
+        """A limpeza completa descarta todas as entradas."""
+        self.cache.set(self.key("SELECT * FROM equipes"), ['equipe'])
+        cache_invalidator.invalidate_all()
+        self.assertIsNone(self.cache.get(self.key("SELECT * FROM equipes")))
+
+
+if __name__ == '__main__':
+    unittest.main()
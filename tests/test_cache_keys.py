@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a geração determinística de chaves de cache.
+"""
+
+import os
+import sys
+import subprocess
+import unittest
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from app.core.cache.cache_keys import normalize_sql, encode_params, query_key, function_key
+
+
+class TestCacheKeys(unittest.TestCase):
+    """Testes para as chaves de cache."""
+
+    def test_normalize_sql(self):
+        """Espaços são colapsados fora de literais e preservados dentro deles."""
+        self.assertEqual(normalize_sql("  SELECT *\n\tFROM  t WHERE a = 'x  y'  "),
+                         "SELECT * FROM t WHERE a = 'x  y'")
+        self.assertEqual(query_key("SELECT 1\n FROM t"), query_key("SELECT 1 FROM t"))
+        self.assertNotEqual(query_key("SELECT 'a  b'"), query_key("SELECT 'a b'"))
+
+    def test_params_are_type_tagged(self):
+        """Valores com a mesma representação textual geram chaves diferentes."""
+        query = "SELECT * FROM t WHERE a = %s"
+        keys = {query_key(query, (value,)) for value in (1, '1', True, 1.0, None, 'None')}
+        self.assertEqual(len(keys), 6)
+
+    def test_canonical_encoding(self):
+        """Listas e tuplas, e dicionários em qualquer ordem, têm a mesma codificação."""
+        self.assertEqual(encode_params((1, 'a')), encode_params([1, 'a']))
+        self.assertEqual(encode_params({'a': 1, 'b': 2}), encode_params({'b': 2, 'a': 1}))
+        self.assertEqual(encode_params({3, 1, 2}), encode_params({2, 3, 1}))
+        encode_params((datetime(2024, 1, 2, 3, 4, 5), Decimal('1.50'), b'\x00\x01'))
+
+    def test_namespace(self):
+        """O namespace é um prefixo legível e separa as chaves."""
+        local_key = query_key("SELECT 1", namespace="mysql_local")
+        self.assertTrue(local_key.startswith("mysql_local:"))
+        self.assertNotEqual(local_key, query_key("SELECT 1", namespace="mysql_remote"))
+
+    def test_function_key(self):
+        """Chaves de funções incluem o nome qualificado e aceitam argumentos não JSON."""
+        key = function_key(normalize_sql, (datetime(2024, 1, 1),), {'b': 1})
+        self.assertTrue(key.startswith("app.core.cache.cache_keys.normalize_sql:"))
+
+    def test_stable_across_processes(self):
+        """A mesma consulta gera a mesma chave em processos com sementes de hash diferentes."""
+        code = ("from app.core.cache.cache_keys import query_key; "
+                "print(query_key('SELECT * FROM t WHERE a = %s', ('x', 1, {'k': 2.5})))")
+        keys = set()
+        for seed in ('1', '2'):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, env=env,
+                                    capture_output=True, text=True, check=True)
+            keys.add(output.stdout.strip())
+        keys.add(query_key('SELECT * FROM t WHERE a = %s', ('x', 1, {'k': 2.5})))
+        self.assertEqual(len(keys), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o decorador @cached.
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+import logging
+from datetime import date
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache.cache_keys import call_key
+from app.core.cache.cache_manager import cache_manager
+from app.core.cache.decorators import cached
+
+
+class Repositorio:
+    """Classe de exemplo com método cacheado."""
+
+    def __init__(self, base):
+        self.base = base
+        self.calls = 0
+
+    @cached(timeout=60)
+    def buscar(self, valor):
+        self.calls += 1
+        return self.base + valor
+
+
+class TestCallKey(unittest.TestCase):
+    """Testes para o construtor de chaves."""
+
+    def test_scalar_args_are_inline_and_typed(self):
+        """Argumentos escalares entram na chave sem resumo e distinguem o tipo."""
+        keys = {call_key('f', (value,)) for value in (1, '1', True, 1.0, None)}
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(call_key('f', (1,), {'b': 2, 'a': 1}), call_key('f', (1,), {'a': 1, 'b': 2}))
+
+    def test_complex_args_are_digested(self):
+        """Argumentos não escalares ou longos usam a codificação canônica resumida."""
+        self.assertEqual(len(call_key('f', (date(2024, 1, 1),)).split(':')[1]), 32)
+        self.assertEqual(len(call_key('f', ('x' * 500,)).split(':')[1]), 32)
+
+
+class TestCachedDecorator(unittest.TestCase):
+    """Testes para o decorador."""
+
+    def setUp(self):
+        cache_manager.clear()
+
+    def test_none_results_are_cached(self):
+        """Um resultado None legítimo é um acerto nas chamadas seguintes."""
+        calls = []
+
+        @cached(timeout=60)
+        def buscar(chave):
+            calls.append(chave)
+            return None
+
+        self.assertIsNone(buscar('x'))
+        self.assertIsNone(buscar('x'))
+        self.assertEqual(len(calls), 1)
+
+        @cached(timeout=60, cache_none=False)
+        def buscar_sem_negativo(chave):
+            calls.append(chave)
+
+        buscar_sem_negativo('y')
+        buscar_sem_negativo('y')
+        self.assertEqual(len(calls), 3)
+
+    def test_methods_are_cached_per_instance(self):
+        """Instâncias diferentes não compartilham resultados e self não precisa ser serializável."""
+        first, second = Repositorio(10), Repositorio(20)
+        self.assertEqual(first.buscar(1), 11)
+        self.assertEqual(first.buscar(1), 11)
+        self.assertEqual(second.buscar(1), 21)
+        self.assertEqual((first.calls, second.calls), (1, 1))
+
+    def test_key_func(self):
+        """A função de chave personalizada substitui os argumentos na chave."""
+        calls = []
+
+        @cached(timeout=60, key_func=lambda usuario, detalhes=None: usuario)
+        def perfil(usuario, detalhes=None):
+            calls.append(usuario)
+            return usuario.upper()
+
+        self.assertEqual(perfil('ana', detalhes=object()), 'ANA')
+        self.assertEqual(perfil('ana', detalhes=object()), 'ANA')
+        self.assertEqual(len(calls), 1)
+
+    def test_info_and_clear(self):
+        """cache_info() conta acertos e ausências; cache_clear() descarta só a função."""
+        @cached(timeout=60)
+        def dobro(valor):
+            return valor * 2
+
+        @cached(timeout=60)
+        def triplo(valor):
+            return valor * 3
+
+        dobro(1), dobro(1), dobro(2), triplo(1)
+        info = dobro.cache_info()
+        self.assertEqual((info['hits'], info['misses']), (1, 2))
+        self.assertGreater(info['avg_miss_ms'], 0)
+
+        dobro.cache_clear()
+        dobro(1)
+        triplo(1)
+        self.assertEqual(dobro.cache_info()['misses'], 1)
+        self.assertEqual(triplo.cache_info()['hits'], 1)
+
+    def test_async_functions(self):
+        """Funções assíncronas têm o resultado aguardado armazenado, não a corrotina."""
+        calls = []
+
+        @cached(timeout=60)
+        async def carregar(valor):
+            calls.append(valor)
+            await asyncio.sleep(0)
+            return [valor]
+
+        async def run():
+            return await carregar(5), await carregar(5)
+
+        self.assertEqual(asyncio.run(run()), ([5], [5]))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
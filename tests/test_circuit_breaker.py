@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o circuit breaker das conexões MySQL e o sinal de modo offline.
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mysql.connector import InterfaceError, ProgrammingError, PoolError
+
+from app.data.mysql.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, is_connection_error,
+    STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+)
+from app.core.observer.connection_observer import ConnectionObserver
+
+
+class FakeClock:
+    """Relógio controlado manualmente."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def connection_refused():
+    raise InterfaceError(msg="Can't connect to MySQL server", errno=2003)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Testes para as transições de estado do circuito."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker('teste', failure_rate_threshold=0.5, window_size=10,
+                                      min_calls=4, open_duration=30, clock=self.clock)
+
+    def test_opens_on_failure_rate(self):
+        """O circuito abre quando a taxa de falhas atinge o limite com chamadas suficientes."""
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    def test_open_circuit_fails_fast(self):
+        """Com o circuito aberto a chamada nem é executada."""
+        for _ in range(4):
+            with self.assertRaises(InterfaceError):
+                self.breaker.call(connection_refused)
+
+        calls = []
+        start = time.perf_counter()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: calls.append(1))
+        self.assertLess(time.perf_counter() - start, 0.01)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.breaker.stats['rejected'], 1)
+
+    def test_sql_errors_do_not_count(self):
+        """Erros de SQL não indicam servidor indisponível."""
+        def bad_query():
+            raise ProgrammingError(msg="Syntax error", errno=1064)
+
+        for _ in range(10):
+            with self.assertRaises(ProgrammingError):
+                self.breaker.call(bad_query)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    def test_half_open_trial_without_probe(self):
+        """Sem sondagem, uma única chamada de teste decide o estado após o tempo de abertura."""
+        for _ in range(4):
+            self.breaker.record_failure()
+
+        self.clock.now = 31
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+
+        # Primeira chamada passa, a concorrente é recusada
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+        self.clock.now = 62
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    def test_background_probe_closes_circuit(self):
+        """A sondagem em segundo plano fecha o circuito quando o servidor volta."""
+        attempts = []
+
+        def probe():
+            attempts.append(1)
+            if len(attempts) < 2:
+                connection_refused()
+
+        changes = []
+        breaker = CircuitBreaker('sondagem', min_calls=1, open_duration=0.05, probe=probe)
+        breaker.add_listener(lambda name, old, new: changes.append(new))
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        # Observers são notificados fora do lock, pela thread da sondagem: aguardar a entrega
+        deadline = time.time() + 2
+        while (breaker.state != STATE_CLOSED or changes[-1:] != [STATE_CLOSED]) and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(changes, [STATE_OPEN, STATE_HALF_OPEN, STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED])
+
+    def test_listener_can_query_breaker_from_another_thread(self):
+        """Observers são chamados sem o lock do circuito: consultá-lo de outra thread não trava."""
+        seen = []
+
+        def listener(name, old, new):
+            worker = threading.Thread(target=lambda: seen.append(self.breaker.state))
+            worker.start()
+            worker.join(2)
+            self.assertFalse(worker.is_alive())
+
+        self.breaker.add_listener(listener)
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.assertEqual(seen, [STATE_OPEN])
+
+    def test_error_classification(self):
+        """Classificação dos erros que contam como falha de conexão."""
+        self.assertTrue(is_connection_error(InterfaceError(msg="lost", errno=2013)))
+        self.assertTrue(is_connection_error(OSError("refused")))
+        self.assertFalse(is_connection_error(PoolError(msg="pool exhausted")))
+        self.assertFalse(is_connection_error(ProgrammingError(msg="syntax", errno=1064)))
+        self.assertFalse(is_connection_error(CircuitOpenError(msg="aberto")))
+
+
+class TestConnectionObserver(unittest.TestCase):
+    """Testes para o sinal de disponibilidade do banco remoto."""
+
+    def test_availability_follows_circuits(self):
+        """O remoto só volta a ficar disponível quando todos os circuitos fecham."""
+        observer = ConnectionObserver()
+        notifications = []
+        observer.add_observer(notifications.append)
+
+        observer.on_circuit_state_change('mysql_remote', STATE_CLOSED, STATE_OPEN)
+        observer.on_circuit_state_change('mysql_remote_pool', STATE_CLOSED, STATE_OPEN)
+        self.assertFalse(observer.is_remote_available())
+
+        observer.on_circuit_state_change('mysql_remote', STATE_HALF_OPEN, STATE_CLOSED)
+        self.assertFalse(observer.is_remote_available())
+
+        observer.on_circuit_state_change('mysql_remote_pool', STATE_HALF_OPEN, STATE_CLOSED)
+        self.assertTrue(observer.is_remote_available())
+        self.assertEqual(notifications, [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a codificação binária dos valores de cache.
+"""
+
+import os
+import sys
+import unittest
+import logging
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache import codec as codec_module
+from app.core.cache.codec import (
+    Codec, CodecError, CODEC_VERSION, HEADER_SIZE, MAGIC, COMPRESSIONS, create_codec
+)
+from app.config.cache.cache_config import CacheConfig
+
+# Linhas no formato retornado pelo conector MySQL
+ROWS = [
+    {
+        'id': i,
+        'nome': f"Funcionário {i}",
+        'salario': Decimal('1234.50'),
+        'admissao': date(2024, 1, 15),
+        'ultimo_acesso': datetime(2024, 5, 2, 8, 30, 15, 123456),
+        'jornada': timedelta(hours=8, minutes=48),
+        'entrada': time(8, 0)
+    }
+    for i in range(50)
+]
+
+
+class TestCodec(unittest.TestCase):
+    """Testes para o Codec."""
+
+    def test_round_trip_mysql_types(self):
+        """datetime, Decimal e timedelta sobrevivem à codificação."""
+        codec = Codec()
+        self.assertEqual(codec.decode(codec.encode(ROWS)), ROWS)
+
+    def test_header(self):
+        """O cabeçalho registra versão, serializador e compressão."""
+        data = Codec(compression='zlib').encode('x')
+        self.assertTrue(data.startswith(MAGIC))
+        self.assertEqual(data[len(MAGIC)], CODEC_VERSION)
+        self.assertEqual(data[HEADER_SIZE - 1], COMPRESSIONS['none'])
+
+    def test_compression_threshold(self):
+        """Apenas valores acima do limite são comprimidos."""
+        codec = Codec(compression='zlib', threshold=1024)
+        small = codec.encode({'id': 1})
+        large = codec.encode(ROWS)
+
+        self.assertEqual(small[HEADER_SIZE - 1], COMPRESSIONS['none'])
+        self.assertEqual(large[HEADER_SIZE - 1], COMPRESSIONS['zlib'])
+        self.assertLess(len(large), len(Codec(compression='none').encode(ROWS)))
+
+    def test_reads_other_write_settings(self):
+        """Valores gravados com outra compressão continuam legíveis."""
+        data = Codec(compression='zlib', threshold=0).encode(ROWS)
+        self.assertEqual(Codec(compression='none').decode(data), ROWS)
+
+    def test_unknown_formats_are_rejected(self):
+        """Valores antigos (JSON), de outra versão ou corrompidos geram CodecError."""
+        codec = Codec()
+        future = bytearray(codec.encode(ROWS))
+        future[len(MAGIC)] = CODEC_VERSION + 1
+
+        for data in (b'[1, 2, 3]', '[1, 2, 3]', bytes(future), codec.encode(ROWS)[:-10], b''):
+            with self.assertRaises(CodecError):
+                codec.decode(data)
+
+    def test_unavailable_algorithms_fall_back(self):
+        """Serializadores ou compressões ausentes caem para pickle e a melhor compressão."""
+        config = CacheConfig()
+        config.codec_serializer = 'inexistente'
+        codec = create_codec(config)
+        self.assertEqual(codec.serializer, 'pickle')
+        self.assertEqual(codec.decode(codec.encode(ROWS)), ROWS)
+
+    @unittest.skipIf(codec_module.msgpack is None, "msgpack não instalado")
+    def test_msgpack_round_trip(self):
+        """msgpack preserva os tipos do MySQL por meio de tipos estendidos."""
+        codec = Codec(serializer='msgpack')
+        value = {'rows': ROWS, 'chave': (1, 2), 'tags': {'a', 'b'}}
+        self.assertEqual(codec.decode(codec.encode(value)), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
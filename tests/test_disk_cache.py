@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o cache em disco em arquivo único SQLite.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+import logging
+from pathlib import Path
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.cache_manager import CacheManager
+
+
+class TestDiskCache(unittest.TestCase):
+    """Testes para o CacheManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'cache.db'
+        self.cache = CacheManager(self.path, max_size=1000, timeout=60)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_set_get_clear(self):
+        """Valores são gravados, lidos e removidos; chaves não viram nomes de arquivo."""
+        key = '../equipes/ativas?tipo=1'
+        self.assertTrue(self.cache.set(key, {'ids': [1, 2]}))
+        self.assertEqual(self.cache.get(key), {'ids': [1, 2]})
+        self.assertTrue(all(name.startswith('cache.db') for name in os.listdir(self.temp_dir.name)))
+
+        self.cache.clear(key)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_expiration(self):
+        """Entradas expiradas não são retornadas e são removidas pela limpeza."""
+        self.cache.set('curto', 1, timeout=60)
+        self.cache.set('longo', 2, timeout=3600)
+        self.cache._conn.execute("UPDATE entries SET expires = ? WHERE key = 'curto'", (time.time() - 1,))
+
+        self.cache.cleanup()
+        self.assertEqual(self.cache.get_stats()['entries'], 1)
+        self.assertIsNone(self.cache.get('curto'))
+        self.assertEqual(self.cache.get('longo'), 2)
+
+    def test_size_accounting_and_lru_trim(self):
+        """O tamanho total é mantido no índice e as menos usadas são removidas primeiro."""
+        value = 'x' * 200
+        size = len(json.dumps(value))
+        for i in range(4):
+            self.cache.set(f"k{i}", value)
+            self.cache._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (i, f"k{i}"))
+        self.cache.set('k0', value)  # Sobrescrita não duplica o tamanho
+        self.assertEqual(self.cache.get_stats()['total_size'], 4 * size)
+
+        self.cache.set('k4', value)
+        self.assertIsNone(self.cache.get('k1'))
+        self.assertEqual(self.cache.get('k0'), value)
+        self.assertLessEqual(self.cache.get_stats()['total_size'], 1000)
+
+    def test_persistence(self):
+        """Os valores sobrevivem à reabertura do arquivo."""
+        self.cache.set('config', {'tema': 'escuro'})
+        self.cache.close()
+        self.cache = CacheManager(self.path, max_size=1000, timeout=60)
+        self.assertEqual(self.cache.get('config'), {'tema': 'escuro'})
+
+    def test_corrupted_file_is_recreated(self):
+        """Um arquivo corrompido é descartado e o cache volta a funcionar."""
+        self.cache.close()
+        self.path.write_bytes(b'nao e um banco sqlite' * 100)
+        self.cache = CacheManager(self.path, max_size=1000, timeout=60)
+        self.assertTrue(self.cache.set('a', 1))
+        self.assertEqual(self.cache.get('a'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
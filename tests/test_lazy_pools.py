@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a criação sob demanda dos pools MySQL e o aquecimento em segundo plano.
+"""
+
+import os
+import sys
+import time
+import uuid
+import threading
+import unittest
+import logging
+from unittest.mock import patch
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.mysql import mysql_connection as module
+from app.data.mysql.mysql_connection import MySQLConnection
+
+
+class FakeSettings:
+    """Configurações criptografadas que contam as descriptografias."""
+
+    def __init__(self):
+        self.security_dir = f"/tmp/{uuid.uuid4()}"
+        self.decrypt_calls = 0
+
+    def decrypt_env(self):
+        self.decrypt_calls += 1
+        return {'DB_HOST': 'db', 'DB_USER': 'app', 'DB_PASSWORD': 'segredo', 'DB_NAME': 'controlix'}
+
+
+class FakePool:
+    """Pool que registra as criações; o handshake pode ser retido por um evento por lado."""
+
+    created = []
+    gates = {}
+
+    def __init__(self, **config):
+        gate = FakePool.gates.get(config['pool_name'])
+        if gate is not None:
+            gate.wait(5)
+        else:
+            time.sleep(0.02)
+        FakePool.created.append(config['pool_name'])
+
+
+class TestLazyPools(unittest.TestCase):
+    """Testes para a inicialização dos pools no primeiro uso."""
+
+    def setUp(self):
+        FakePool.created = []
+        FakePool.gates = {}
+        self.patcher = patch.object(module.mysql.connector.pooling, 'MySQLConnectionPool', FakePool)
+        self.patcher.start()
+        self.connection = MySQLConnection(FakeSettings(), FakeSettings())
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_no_pool_at_construction(self):
+        """Construir o gerenciador não cria pools nem descriptografa configurações."""
+        self.assertEqual(FakePool.created, [])
+        self.assertFalse(self.connection.has_pool(True))
+        self.assertFalse(self.connection.has_pool(False))
+        self.assertEqual(self.connection.local_settings.decrypt_calls, 0)
+
+    def test_concurrent_first_use_creates_one_pool(self):
+        """Vários primeiros usos simultâneos criam exatamente um pool."""
+        threads = [threading.Thread(target=self.connection._init_local_pool) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(FakePool.created, ['local_pool'])
+        self.assertTrue(self.connection.has_pool(True))
+
+    def test_slow_remote_does_not_block_local(self):
+        """Um handshake remoto retido não impede a criação do pool local."""
+        gate = threading.Event()
+        FakePool.gates['remote_pool'] = gate
+        remote = threading.Thread(target=self.connection._init_remote_pool)
+        remote.start()
+        try:
+            started = time.monotonic()
+            self.connection._init_local_pool()
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertEqual(FakePool.created, ['local_pool'])
+        finally:
+            gate.set()
+            remote.join()
+        self.assertTrue(self.connection.has_pool(False))
+
+    def test_db_config_is_memoized(self):
+        """As configurações são descriptografadas uma única vez por diretório."""
+        settings = self.connection.local_settings
+        other = MySQLConnection(settings, FakeSettings())
+        self.connection._get_db_config(True)
+        config = other._get_db_config(True)
+        config['host'] = 'alterado'
+        self.assertEqual(settings.decrypt_calls, 1)
+        self.assertEqual(self.connection._get_db_config(True)['host'], 'db')
+
+
+class TestWarmUp(unittest.TestCase):
+    """Testes para o aquecimento dos pools em segundo plano."""
+
+    def test_warm_up_does_not_block_caller(self):
+        """warm_up retorna imediatamente e inicia o outbox após aquecer o pool local."""
+        from app.data.connection import DatabaseConnection
+
+        gate = threading.Event()
+        started = threading.Event()
+
+        class FakeMySQLConnection:
+            def warm_up(self, include_remote=True):
+                gate.wait(5)
+                return {'local': True, 'remote': False}
+
+        class FakeOutbox:
+            def start(self):
+                started.set()
+
+        database = object.__new__(DatabaseConnection)
+        database.mysql_connection = FakeMySQLConnection()
+        database.outbox = FakeOutbox()
+        database._warm_up_thread = None
+
+        begin = time.monotonic()
+        thread = database.warm_up()
+        self.assertLess(time.monotonic() - begin, 1)
+        self.assertTrue(thread.is_alive())
+        self.assertIs(database.warm_up(), thread)
+
+        gate.set()
+        thread.join(5)
+        self.assertTrue(started.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o mecanismo LRU compartilhado pelos caches em memória.
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+import logging
+from datetime import timedelta
+from unittest import mock
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache.lru import LRUCache, estimate_size
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import MemoryCache
+from app.data.cache.memory_monitor import memory_monitor, PRESSURE_CRITICAL, PRESSURE_NORMAL, PRESSURE_WARNING
+from app.data.cache.query_cache import QueryCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Testes para o LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        """O item lido recentemente sobrevive; o menos usado é removido."""
+        evicted = []
+        cache = LRUCache(2, on_evict=lambda key, value: evicted.append(key))
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertEqual(evicted, ['b'])
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.keys(), ['a', 'c'])
+
+    def test_stats(self):
+        """Hits, misses e evictions são contabilizados."""
+        cache = LRUCache(1)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('x')
+        cache.set('b', 2)
+
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 1, 1))
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['hit_ratio'], 50)
+
+    def test_peek_and_delete(self):
+        """peek não altera a ordem; delete informa se a chave existia."""
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.peek('a'), 1)
+        cache.set('c', 3)
+        self.assertNotIn('a', cache)
+        self.assertTrue(cache.delete('b'))
+        self.assertFalse(cache.delete('b'))
+
+    def test_constant_time_insert(self):
+        """Inserções com o cache cheio não dependem do tamanho do cache."""
+        def fill(size):
+            cache = LRUCache(size)
+            for i in range(size):
+                cache.set(i, i)
+            start = time.perf_counter()
+            for i in range(size, size + 2000):
+                cache.set(i, i)
+            return time.perf_counter() - start
+
+        small, large = fill(1000), fill(100000)
+        self.assertLess(large, small * 10 + 0.05)
+
+    def test_thread_safety(self):
+        """Escritas concorrentes respeitam o limite de tamanho."""
+        cache = LRUCache(100)
+
+        def worker(offset):
+            for i in range(1000):
+                cache.set(offset + i, i)
+                cache.get(offset + i // 2)
+
+        threads = [threading.Thread(target=worker, args=(n * 10000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 100)
+
+
+class TestByteBounds(unittest.TestCase):
+    """Testes para o limite em bytes."""
+
+    def test_estimate_size(self):
+        """Resultados maiores têm tamanho estimado maior."""
+        small = [{'id': 1, 'nome': 'a'}]
+        large = [{'id': i, 'nome': 'x' * 100} for i in range(100)]
+        self.assertGreater(estimate_size(large), estimate_size(small) * 50)
+
+    def test_evicts_by_bytes(self):
+        """Itens antigos são removidos quando o total de bytes excede o limite."""
+        cache = LRUCache(0, max_bytes=300)
+        for key in 'abcd':
+            cache.set(key, key, size=100)
+
+        self.assertEqual(cache.keys(), ['b', 'c', 'd'])
+        self.assertEqual(cache.total_bytes, 300)
+        cache.delete('c')
+        self.assertEqual(cache.total_bytes, 200)
+        cache.set('b', 'b', size=50)
+        self.assertEqual(cache.total_bytes, 150)
+
+    def test_oversized_value_is_rejected(self):
+        """Um valor maior que o limite não é armazenado nem remove os demais."""
+        cache = LRUCache(0, max_bytes=100)
+        cache.set('a', 'a', size=60)
+        self.assertFalse(cache.set('b', 'b', size=200))
+        self.assertEqual(cache.keys(), ['a'])
+
+    def test_trim(self):
+        """trim remove apenas o necessário, dos menos para os mais usados."""
+        cache = LRUCache(0)
+        for key in 'abcd':
+            cache.set(key, key, size=100)
+        cache.get('a')
+
+        self.assertEqual(cache.trim(200), 2)
+        self.assertEqual(cache.keys(), ['d', 'a'])
+
+
+class FakeClock:
+    """Relógio monotônico controlado pelo teste."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestExpiration(unittest.TestCase):
+    """Testes para a expiração indexada por heap."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LRUCache(0, clock=self.clock)
+
+    def test_expired_entry_is_not_returned(self):
+        """Itens com TTL vencido não são retornados nem contados como presentes."""
+        self.cache.set('a', 1, ttl=10)
+        self.cache.set('b', 2)
+        self.clock.now += 10
+        self.assertNotIn('a', self.cache)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertEqual(self.cache.get_stats()['expirations'], 1)
+
+    def test_purge_removes_only_expired(self):
+        """A limpeza remove apenas os itens vencidos e libera seus bytes."""
+        for i in range(10):
+            self.cache.set(i, i, size=10, ttl=i + 1)
+        self.clock.now += 5
+
+        self.assertEqual(self.cache.purge_expired(), 5)
+        self.assertEqual(self.cache.keys(), [5, 6, 7, 8, 9])
+        self.assertEqual(self.cache.total_bytes, 50)
+        self.assertEqual(self.cache.purge_expired(), 0)
+
+    def test_overwrite_replaces_expiration(self):
+        """Reescrever uma chave descarta a expiração anterior."""
+        self.cache.set('a', 1, ttl=5)
+        self.cache.set('a', 2, ttl=20)
+        self.clock.now += 10
+        self.assertEqual(self.cache.get('a'), 2)
+
+        self.cache.set('a', 3)
+        self.clock.now += 100
+        self.assertEqual(self.cache.get('a'), 3)
+
+    def test_heap_is_compacted(self):
+        """Entradas obsoletas do heap não crescem sem limite."""
+        for _ in range(1000):
+            self.cache.set('a', 1, ttl=60)
+        self.assertLess(len(self.cache._heap), 100)
+
+    def test_query_cache_reclaims_on_write(self):
+        """Entradas expiradas do QueryCache são liberadas nas escritas seguintes."""
+        cache = QueryCache(max_size=100)
+        cache.cache.clock = self.clock
+        for i in range(5):
+            cache.set(f"k{i}", 'x' * 1000, timeout=timedelta(seconds=1))
+        self.clock.now += 2
+        cache.set('novo', 1)
+
+        self.assertEqual(len(cache.cache), 1)
+        self.assertIsNone(cache.get('k0'))
+        self.assertEqual(cache.get('novo'), 1)
+
+
+class TestMemoryPressure(unittest.TestCase):
+    """Testes para a pressão de memória amostrada em segundo plano."""
+
+    def tearDown(self):
+        memory_monitor.pressure = PRESSURE_NORMAL
+
+    def test_set_does_not_sample_memory(self):
+        """Escritas no cache não consultam o sistema operacional."""
+        cache = QueryCache(max_size=10)
+        with mock.patch.object(memory_monitor, 'get_memory_usage', side_effect=AssertionError):
+            cache.set('a', [1, 2, 3])
+            cache.set_query_result("SELECT 1", (), [{'x': 1}])
+        self.assertEqual(cache.get('a'), [1, 2, 3])
+
+    def test_pressure_trims_incrementally(self):
+        """Sob pressão crítica o cache perde parte das entradas, não todas."""
+        cache = QueryCache(max_size=100)
+        for i in range(10):
+            cache.set(f"k{i}", 'x' * 1000)
+        cache.get('k0')
+
+        usage = {'timestamp': '', 'rss': 1.0, 'vms': 1.0, 'percent': 1.0, 'system_percent': 99.0}
+        with mock.patch.object(memory_monitor, 'get_memory_usage', return_value=usage):
+            memory_monitor.sample()
+
+        self.assertEqual(memory_monitor._classify(99.0), PRESSURE_CRITICAL)
+        self.assertEqual(len(cache.cache), 5)
+        self.assertIsNotNone(cache.get('k0'))
+
+    def _sample(self, system_percent):
+        usage = {'timestamp': '', 'rss': 1.0, 'vms': 1.0, 'percent': 1.0, 'system_percent': system_percent}
+        with mock.patch.object(memory_monitor, 'get_memory_usage', return_value=usage):
+            memory_monitor.sample()
+
+    def test_sustained_pressure_does_not_empty_cache(self):
+        """Amostras seguidas no mesmo nível mantêm o limite, sem esvaziar o cache."""
+        cache = QueryCache(max_size=100)
+        for i in range(10):
+            cache.set(f"k{i}", 'x' * 1000)
+
+        for _ in range(6):
+            self._sample(99.0)
+        self.assertEqual(len(cache.cache), 5)
+
+        # O cache não volta a crescer além do limite enquanto a pressão dura
+        for i in range(10, 13):
+            cache.set(f"k{i}", 'x' * 1000)
+        self._sample(99.0)
+        self.assertEqual(len(cache.cache), 5)
+
+        # Fim da pressão: o limite é removido
+        self._sample(10.0)
+        for i in range(13, 16):
+            cache.set(f"k{i}", 'x' * 1000)
+        self._sample(10.0)
+        self.assertEqual(len(cache.cache), 8)
+
+    def test_pressure_level_has_hysteresis(self):
+        """O nível só é deixado quando o uso cai abaixo do limite menos a margem."""
+        self._sample(91.0)
+        self.assertEqual(memory_monitor.pressure, PRESSURE_CRITICAL)
+        self._sample(88.0)
+        self.assertEqual(memory_monitor.pressure, PRESSURE_CRITICAL)
+        self._sample(84.0)
+        self.assertEqual(memory_monitor.pressure, PRESSURE_WARNING)
+        self._sample(72.0)
+        self.assertEqual(memory_monitor.pressure, PRESSURE_WARNING)
+        self._sample(69.0)
+        self.assertEqual(memory_monitor.pressure, PRESSURE_NORMAL)
+
+    def test_hit_counts_are_not_lost_under_concurrency(self):
+        """Acessos concorrentes contam todos os acertos usados no ranking do warm start."""
+        cache = QueryCache(max_size=10)
+        cache.set('quente', 1)
+
+        def reader():
+            for _ in range(2000):
+                cache.get('quente')
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.cache.peek('quente')['hits'], 8000)
+
+
+class TestMemoryCacheLRU(unittest.TestCase):
+    """Testes para o MemoryCache sobre o mecanismo LRU."""
+
+    def test_hot_entry_is_kept(self):
+        """Entradas lidas com frequência não são removidas antes das frias."""
+        config = CacheConfig()
+        config.memory_max_size = 2
+        cache = MemoryCache(config)
+        cache.set('quente', 1)
+        cache.set('fria', 2)
+        cache.get('quente')
+        cache.set('nova', 3)
+
+        self.assertEqual(cache.get('quente'), 1)
+        self.assertIsNone(cache.get('fria'))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para as séries temporais de métricas em buffer circular.
+"""
+
+import os
+import sys
+import math
+import tempfile
+import unittest
+import logging
+from pathlib import Path
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.metrics import MetricsRegistry, TimeSeries
+
+
+class TestTimeSeries(unittest.TestCase):
+    """Testes para o TimeSeries."""
+
+    def test_ring_overwrites_oldest(self):
+        """Com o buffer cheio, a amostra mais antiga é sobrescrita."""
+        series = TimeSeries(('valor',), capacity=3)
+        for i in range(5):
+            series.append((i,), timestamp=100 + i)
+        self.assertEqual(len(series), 3)
+        self.assertEqual([row['valor'] for row in series.range()], [2, 3, 4])
+        self.assertEqual(series.latest(), {'timestamp': 104, 'valor': 4})
+
+    def test_range_and_summary(self):
+        """Consultas por intervalo são inclusivas e o resumo ignora campos ausentes."""
+        series = TimeSeries(('rss', 'percent'), capacity=10)
+        for i in range(6):
+            series.append({'rss': i * 10} if i % 2 else {'rss': i * 10, 'percent': i}, timestamp=i)
+
+        self.assertEqual([row['timestamp'] for row in series.range(2, 4)], [2, 3, 4])
+        self.assertTrue(math.isnan(series.range(1, 1)[0]['percent']))
+
+        summary = series.summary(start=2)
+        self.assertEqual(summary['count'], 4)
+        self.assertEqual(summary['rss'], {'avg': 35, 'min': 20, 'max': 50, 'last': 50})
+        self.assertEqual(summary['percent']['avg'], 3)
+
+    def test_downsample(self):
+        """As amostras são agrupadas em intervalos fixos."""
+        series = TimeSeries(('valor',), capacity=100)
+        for i in range(10):
+            series.append((i,), timestamp=60 + i * 15)
+        buckets = series.downsample(60)
+        self.assertEqual([bucket['timestamp'] for bucket in buckets], [60, 120, 180])
+        self.assertEqual([bucket['count'] for bucket in buckets], [4, 4, 2])
+        self.assertEqual(buckets[0]['valor']['avg'], 1.5)
+
+    def test_file_is_reused(self):
+        """O buffer em arquivo sobrevive à reabertura; outro formato o recria."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'memoria.ts'
+            series = TimeSeries(('rss',), capacity=4, path=path)
+            series.append((1.5,), timestamp=10)
+            series.close()
+
+            series = TimeSeries(('rss',), capacity=4, path=path)
+            self.assertEqual(series.range(), [{'timestamp': 10, 'rss': 1.5}])
+            series.close()
+
+            series = TimeSeries(('rss', 'vms'), capacity=4, path=path)
+            self.assertEqual(len(series), 0)
+            series.close()
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testes para o MetricsRegistry."""
+
+    def test_series_are_shared_by_name(self):
+        """O mesmo nome retorna a mesma série; campos diferentes são recusados."""
+        registry = MetricsRegistry()
+        series = registry.series('sync', ('duration_seconds',))
+        self.assertIs(registry.series('sync', ('duration_seconds',)), series)
+        self.assertRaises(ValueError, registry.series, 'sync', ('errors',))
+        self.assertEqual(registry.names(), ['sync'])
+
+
+if __name__ == '__main__':
+    unittest.main()
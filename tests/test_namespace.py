@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a limpeza de cache por versão de namespace e o varredor SCAN + UNLINK.
+"""
+
+import os
+import sys
+import fnmatch
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import RedisCache
+from app.core.cache.namespace import KeySweeper, NamespaceVersion
+
+
+class FakeRedis:
+    """Cliente Redis simulado com GET/SET/INCR, SCAN paginado e UNLINK."""
+
+    def __init__(self):
+        self.data = {}
+        self.blocking_calls = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value).encode()
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def scan(self, cursor, match=None, count=10):
+        # Como no Redis, chaves presentes durante toda a varredura são retornadas
+        if cursor == 0:
+            self._snapshot = sorted(self.data)
+        keys = self._snapshot
+        page = keys[cursor:cursor + count]
+        found = [key.encode() for key in page if fnmatch.fnmatchcase(key, match)]
+        following = cursor + count
+        return (following if following < len(keys) else 0), found
+
+    def unlink(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key.decode(), None) is not None
+        return removed
+
+    def keys(self, pattern):
+        self.blocking_calls += 1
+        return [key.encode() for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def close(self):
+        pass
+
+
+class TestNamespaceVersion(unittest.TestCase):
+    """Testes para a versão do namespace."""
+
+    def test_bump_changes_prefix(self):
+        """Incrementar a versão muda o prefixo de todas as chaves."""
+        client = FakeRedis()
+        namespace = NamespaceVersion(lambda: client, "controlix:")
+        before = namespace.key_prefix()
+        self.assertTrue(namespace.bump())
+        self.assertNotEqual(namespace.key_prefix(), before)
+
+    def test_version_is_cached_locally(self):
+        """Dentro do intervalo de atualização a versão não é relida do Redis."""
+        client = FakeRedis()
+        namespace = NamespaceVersion(lambda: client, "controlix:", refresh_interval=60)
+        version = namespace.current()
+        client.incr("controlix:ns")
+        self.assertEqual(namespace.current(), version)
+
+        namespace.refresh_interval = 0
+        namespace._expires = 0
+        self.assertEqual(namespace.current(), version + 1)
+
+
+class TestRedisCacheClear(unittest.TestCase):
+    """Testes para a limpeza do RedisCache."""
+
+    def setUp(self):
+        self.cache = RedisCache(CacheConfig())
+        self.client = self.cache.client = FakeRedis()
+
+    def tearDown(self):
+        self.cache.sweeper.stop()
+
+    def test_clear_is_constant_time(self):
+        """clear() não usa KEYS e as entradas antigas deixam de ser lidas."""
+        self.cache.set('funcionarios', [1, 2, 3], ttl=60)
+        self.cache.sweeper.schedule = lambda: None
+        self.cache.clear()
+
+        self.assertEqual(self.client.blocking_calls, 0)
+        self.assertIsNone(self.cache.get('funcionarios'))
+
+    def test_sweeper_unlinks_old_versions(self):
+        """O varredor remove apenas as chaves de versões antigas, em iterações limitadas."""
+        for i in range(50):
+            self.cache.set(f"k{i}", i, ttl=60)
+        self.client.data['controlix:gen:local.equipes'] = b'1'
+        self.cache.namespace.bump()
+        self.cache.set('novo', 1, ttl=60)
+
+        sweeper = KeySweeper(lambda: self.client, self.cache.namespace, budget=0, scan_count=10)
+        steps = 1
+        while not sweeper.step():
+            steps += 1
+
+        self.assertGreater(steps, 1)
+        self.assertEqual(sweeper.stats['unlinked'], 50)
+        self.assertEqual(self.cache.get('novo'), 1)
+        self.assertIn('controlix:gen:local.equipes', self.client.data)
+
+    def test_sweeper_keeps_versions_bumped_elsewhere(self):
+        """Uma versão incrementada por outro processo não é removida pela cópia local antiga."""
+        for i in range(20):
+            self.cache.set(f"k{i}", i, ttl=60)
+        self.cache.namespace.refresh_interval = 60
+        self.cache.namespace.current()
+
+        # Outro processo incrementa a versão e grava; a cópia local da versão ainda é a antiga
+        other = NamespaceVersion(lambda: self.client, "controlix:")
+        self.assertTrue(other.bump())
+        newer = f"{other.key_prefix()}novo"
+        self.client.data[newer] = b'1'
+
+        sweeper = KeySweeper(lambda: self.client, self.cache.namespace, budget=0, scan_count=5)
+        while not sweeper.step():
+            pass
+        self.assertIn(newer, self.client.data)
+        self.assertEqual(sweeper.stats['unlinked'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o outbox de escritas write-behind.
+"""
+
+import os
+import sys
+import unittest
+import logging
+from datetime import datetime, date
+from decimal import Decimal
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mysql.connector import IntegrityError
+
+from app.data.mysql.outbox import (
+    SyncOutbox, encode_params, decode_params, coalesce_runs, OUTBOX_TABLE, APPLIED_TABLE, MAX_ATTEMPTS
+)
+
+
+class FakeCursor:
+    """Cursor simulado que registra as instruções no banco remoto simulado."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        if self.connection.db.reject and self.connection.db.reject in query:
+            raise IntegrityError(msg="Duplicate entry", errno=1062)
+        self.connection.pending.append((query, params))
+        self.rowcount = 1
+
+    def executemany(self, query, params_list):
+        for params in params_list:
+            self.execute(query, params)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Conexão remota simulada com transação."""
+
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.db.remote_log.extend(self.pending)
+        for query, params in self.pending:
+            if query.startswith(f"INSERT INTO {APPLIED_TABLE}"):
+                self.db.applied.update(params)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+class FakeDB:
+    """MySQLConnection simulada com outbox local em memória."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.applied = set()
+        self.remote_log = []
+        self.reject = None
+        self.invalidated = []
+        self.updates = []
+
+    def invalidate_query_cache(self, query, is_local=True):
+        self.invalidated.append((query, is_local))
+
+    def execute_update(self, query, params=None, is_local=True, invalidate_cache=True):
+        self.updates.append((query, params, is_local))
+        if query.startswith(f"DELETE FROM {OUTBOX_TABLE}"):
+            self.entries = [entry for entry in self.entries if entry['id'] not in params]
+        elif query.startswith(f"UPDATE {OUTBOX_TABLE}"):
+            attempts, status, error, entry_id = params
+            for entry in self.entries:
+                if entry['id'] == entry_id:
+                    entry.update(attempts=attempts, status=status)
+        return 1
+
+    def execute_query(self, query, params=None, is_local=True, use_cache=True):
+        if query.startswith(f"SELECT idempotency_key FROM {APPLIED_TABLE}"):
+            return [{'idempotency_key': key} for key in params if key in self.applied]
+        return [entry for entry in self.entries if entry.get('status', 'PENDING') == 'PENDING']
+
+    def get_remote_connection(self):
+        return FakeConnection(self)
+
+    def release_connection(self, connection):
+        pass
+
+    def get_max_allowed_packet(self, is_local=True):
+        return 4 * 1024 * 1024
+
+
+def make_entry(entry_id, query, params):
+    return {'id': entry_id, 'idempotency_key': f"key-{entry_id}", 'query_text': query,
+            'params': encode_params(params), 'attempts': 0}
+
+
+INSERT_LOG = "INSERT INTO logs_sistema (acao, criado_em) VALUES (%s, %s)"
+UPDATE_USER = "UPDATE usuarios SET nome = %s WHERE id = %s"
+
+
+class TestOutboxEncoding(unittest.TestCase):
+    """Testes para a serialização dos parâmetros."""
+
+    def test_round_trip(self):
+        """Tipos do MySQL sobrevivem à serialização JSON."""
+        params = (1, 'texto', datetime(2024, 5, 1, 12, 30), date(2024, 5, 1), Decimal('10.50'), b'\x00\x01', None)
+        self.assertEqual(decode_params(encode_params(params)), params)
+
+    def test_named_params(self):
+        """Parâmetros nomeados são preservados."""
+        params = {'nome': 'Ana', 'quando': datetime(2024, 1, 1)}
+        self.assertEqual(decode_params(encode_params(params)), params)
+
+    def test_coalesce_preserves_order(self):
+        """Apenas escritas consecutivas com a mesma instrução são agrupadas."""
+        entries = [make_entry(1, INSERT_LOG, ('a', None)), make_entry(2, INSERT_LOG, ('b', None)),
+                   make_entry(3, UPDATE_USER, ('Ana', 1)), make_entry(4, INSERT_LOG, ('c', None))]
+        runs = coalesce_runs(entries)
+        self.assertEqual([[entry['id'] for entry in run] for run in runs], [[1, 2], [3], [4]])
+
+
+class TestOutboxDrain(unittest.TestCase):
+    """Testes para a drenagem do outbox."""
+
+    def make_outbox(self, entries):
+        self.db = FakeDB(entries)
+        outbox = SyncOutbox(self.db)
+        outbox._local_ready = outbox._remote_ready = True
+        return outbox
+
+    def test_drain_batches_in_order(self):
+        """Grupos são reescritos em multi-linha e aplicados com as chaves de idempotência."""
+        outbox = self.make_outbox([
+            make_entry(1, INSERT_LOG, ('login', datetime(2024, 1, 1))),
+            make_entry(2, INSERT_LOG, ('logout', datetime(2024, 1, 2))),
+            make_entry(3, UPDATE_USER, ('Ana', 7)),
+        ])
+
+        self.assertEqual(outbox.drain(), 3)
+
+        queries = [query for query, _ in self.db.remote_log]
+        self.assertEqual(queries[0], "INSERT INTO logs_sistema (acao, criado_em) VALUES (%s, %s), (%s, %s)")
+        self.assertTrue(queries[1].startswith(f"INSERT INTO {APPLIED_TABLE}"))
+        self.assertTrue(queries[2].startswith("UPDATE usuarios"))
+        self.assertEqual(self.db.applied, {'key-1', 'key-2', 'key-3'})
+        self.assertEqual(self.db.entries, [])
+        self.assertEqual(self.db.invalidated, [(INSERT_LOG, False), (UPDATE_USER, False)])
+
+    def test_already_applied_keys_are_skipped(self):
+        """Escritas já aplicadas por uma drenagem interrompida não são repetidas."""
+        outbox = self.make_outbox([make_entry(1, INSERT_LOG, ('a', None)), make_entry(2, INSERT_LOG, ('b', None))])
+        self.db.applied.add('key-1')
+
+        self.assertEqual(outbox.drain(), 2)
+        self.assertEqual(self.db.remote_log[0][1], ('b', None))
+        self.assertEqual(outbox.stats['skipped'], 1)
+
+    def test_rejected_write_is_isolated(self):
+        """Uma escrita rejeitada pelo remoto não impede as demais."""
+        outbox = self.make_outbox([make_entry(1, INSERT_LOG, ('a', None)), make_entry(2, INSERT_LOG, ('b', None))])
+        self.db.reject = "VALUES (%s, %s), (%s, %s)"
+
+        self.assertEqual(outbox.drain(), 2)
+        self.assertEqual(self.db.applied, {'key-1', 'key-2'})
+        self.assertEqual(len([q for q, _ in self.db.remote_log if q.startswith("INSERT INTO logs")]), 2)
+
+    def test_failed_write_is_retried_later(self):
+        """Escritas rejeitadas permanecem no outbox com a tentativa registrada."""
+        outbox = self.make_outbox([make_entry(1, INSERT_LOG, ('a', None))])
+        self.db.reject = "INSERT INTO logs_sistema"
+
+        self.assertEqual(outbox.drain(), 0)
+        self.assertEqual(self.db.entries[0]['attempts'], 1)
+        self.assertEqual(self.db.entries[0]['status'], 'PENDING')
+
+    def test_rejected_write_blocks_later_writes(self):
+        """Uma escrita rejeitada impede que as seguintes sejam aplicadas antes dela."""
+        outbox = self.make_outbox([
+            make_entry(1, INSERT_LOG, ('a', None)),
+            make_entry(2, UPDATE_USER, ('Ana', 7)),
+            make_entry(3, INSERT_LOG, ('b', None)),
+        ])
+        self.db.reject = "UPDATE usuarios"
+
+        self.assertEqual(outbox.drain(), 1)
+        self.assertEqual(self.db.applied, {'key-1'})
+        self.assertEqual([entry['id'] for entry in self.db.entries], [2, 3])
+        self.assertNotIn(('b', None), [params for _, params in self.db.remote_log])
+
+        # Após MAX_ATTEMPTS a escrita é marcada como FAILED e deixa de bloquear
+        self.db.entries[0]['attempts'] = MAX_ATTEMPTS - 1
+        self.assertEqual(outbox.drain(), 1)
+        self.assertEqual(self.db.applied, {'key-1', 'key-3'})
+        self.assertEqual(self.db.entries[0]['status'], 'FAILED')
+
+    def test_applied_keys_are_pruned(self):
+        """Chaves aplicadas antigas são removidas do remoto, no máximo uma vez por intervalo."""
+        outbox = self.make_outbox([make_entry(1, INSERT_LOG, ('a', None))])
+        outbox.drain()
+        self.db.entries = [make_entry(2, INSERT_LOG, ('b', None))]
+        outbox.drain()
+
+        prunes = [update for update in self.db.updates if update[0].startswith(f"DELETE FROM {APPLIED_TABLE}")]
+        self.assertEqual(len(prunes), 1)
+        self.assertFalse(prunes[0][2])
+
+
+if __name__ == '__main__':
+    unittest.main()
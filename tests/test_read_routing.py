@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a extração de tabelas e as marcas d'água usadas no roteamento de leituras.
+"""
+
+import os
+import sys
+import unittest
+import logging
+from datetime import datetime, timedelta
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.mysql.sql_tables import extract_tables, extract_write_tables, is_read_query
+from app.data.mysql.sync_watermarks import SyncWatermarks
+
+
+class TestSqlTables(unittest.TestCase):
+    """Testes para o extrator de tabelas."""
+
+    def test_simple_select(self):
+        """SELECT simples com alias."""
+        self.assertEqual(extract_tables("SELECT * FROM equipes e WHERE e.id = %s"), {'equipes'})
+
+    def test_joins_and_subqueries(self):
+        """JOINs, subconsultas e listas separadas por vírgula."""
+        query = """
+            SELECT f.nome, e.nome
+            FROM funcionarios AS f
+            LEFT JOIN equipes e ON e.id = f.equipe_id
+            INNER JOIN `controlix`.`usuarios` u ON u.id = f.usuario_id
+            WHERE f.id IN (SELECT funcionario_id FROM atividades WHERE status = 'FROM logs')
+        """
+        self.assertEqual(extract_tables(query), {'funcionarios', 'equipes', 'usuarios', 'atividades'})
+        self.assertEqual(extract_tables("SELECT * FROM equipes, usuarios u WHERE 1"), {'equipes', 'usuarios'})
+
+    def test_derived_table(self):
+        """Tabelas derivadas contam apenas as tabelas internas."""
+        query = "SELECT t.total FROM (SELECT COUNT(*) AS total FROM logs_sistema) AS t"
+        self.assertEqual(extract_tables(query), {'logs_sistema'})
+
+    def test_write_tables(self):
+        """Alvos de instruções de escrita."""
+        self.assertEqual(extract_write_tables("INSERT INTO user_lock_unlock (id) VALUES (%s)"), {'user_lock_unlock'})
+        self.assertEqual(extract_write_tables("INSERT IGNORE INTO equipes VALUES (%s)"), {'equipes'})
+        self.assertEqual(extract_write_tables("UPDATE usuarios SET nome = %s WHERE id = %s"), {'usuarios'})
+        self.assertEqual(extract_write_tables("DELETE FROM atividades WHERE id = %s"), {'atividades'})
+        self.assertEqual(extract_write_tables("TRUNCATE TABLE logs_sistema"), {'logs_sistema'})
+        self.assertEqual(extract_write_tables("SELECT * FROM equipes"), frozenset())
+
+    def test_is_read_query(self):
+        """Identificação de consultas somente leitura."""
+        self.assertTrue(is_read_query("  select 1"))
+        self.assertTrue(is_read_query("(SELECT 1) UNION (SELECT 2)"))
+        self.assertFalse(is_read_query("UPDATE equipes SET nome = 'SELECT'"))
+
+
+class TestSyncWatermarks(unittest.TestCase):
+    """Testes para as marcas d'água de sincronização."""
+
+    def setUp(self):
+        self.watermarks = SyncWatermarks()
+        self.watermarks.set_replicated_tables(['equipes', 'usuarios'])
+
+    def test_fresh_table(self):
+        """Tabela sincronizada recentemente está dentro do limite."""
+        self.watermarks.record('equipes')
+        self.assertTrue(self.watermarks.is_fresh('equipes', 60))
+
+    def test_stale_table(self):
+        """Tabela sincronizada há muito tempo está fora do limite."""
+        self.watermarks.record('usuarios', datetime.now() - timedelta(minutes=10))
+        self.assertFalse(self.watermarks.is_fresh('usuarios', 60))
+        self.assertTrue(self.watermarks.is_fresh('usuarios', 3600))
+
+    def test_unreplicated_or_unsynced(self):
+        """Tabelas não espelhadas ou nunca sincronizadas nunca são servidas localmente."""
+        self.watermarks.record('logs_sistema')
+        self.assertFalse(self.watermarks.is_fresh('logs_sistema', 3600))
+        self.assertFalse(self.watermarks.is_fresh('usuarios', 3600))
+
+    def test_watermark_never_moves_back(self):
+        """Registros mais antigos não retrocedem a marca d'água."""
+        now = datetime.now()
+        self.watermarks.record('equipes', now)
+        self.watermarks.record('equipes', now - timedelta(minutes=5))
+        self.assertEqual(self.watermarks.get('equipes'), now)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o pool de conexões Redis compartilhado pelo processo.
+"""
+
+import os
+import sys
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import RedisCache
+from app.config.cache.redis_adapter import RedisAdapter
+from app.core.cache.redis_connections import RedisConnectionManager
+
+
+class TestRedisConnectionManager(unittest.TestCase):
+    """Testes para o RedisConnectionManager."""
+
+    def setUp(self):
+        self.manager = RedisConnectionManager()
+
+    def tearDown(self):
+        self.manager.close_all()
+
+    def test_clients_share_pool_per_endpoint(self):
+        """Clientes do mesmo servidor compartilham o pool; outro banco usa outro pool."""
+        first = self.manager.get_client(db=3)
+        second = self.manager.get_client(db=3)
+        other = self.manager.get_client(db=4)
+
+        self.assertIs(first.connection_pool, second.connection_pool)
+        self.assertIsNot(first.connection_pool, other.connection_pool)
+
+    def test_pool_options(self):
+        """O pool é limitado e usa keepalive e verificação de conexões ociosas."""
+        pool = self.manager.get_client(max_connections=7, health_check_interval=15).connection_pool
+        self.assertEqual(pool.max_connections, 7)
+        self.assertTrue(pool.connection_kwargs['socket_keepalive'])
+        self.assertEqual(pool.connection_kwargs['health_check_interval'], 15)
+
+    def test_stats(self):
+        """As estatísticas informam clientes e utilização por servidor."""
+        self.manager.get_client(db=5, max_connections=10)
+        self.manager.get_client(db=5)
+
+        stats = self.manager.get_stats()['localhost:6379/5']
+        self.assertEqual(stats['clients'], 2)
+        self.assertEqual(stats['max_connections'], 10)
+        self.assertEqual((stats['in_use'], stats['utilization']), (0, 0))
+
+    def test_closing_client_keeps_pool(self):
+        """Fechar um cliente não fecha o pool compartilhado."""
+        client = self.manager.get_client()
+        client.close()
+        self.assertIn('localhost:6379/0', self.manager.get_stats())
+
+
+class TestSharedAdapters(unittest.TestCase):
+    """Testes para o compartilhamento do pool entre os adaptadores."""
+
+    def test_cache_and_adapter_share_pool(self):
+        """RedisCache e RedisAdapter com a mesma configuração usam o mesmo pool."""
+        config = CacheConfig()
+        cache = RedisCache(config)
+        adapter = RedisAdapter(config)
+        self.assertIs(cache.client.connection_pool, adapter._client.connection_pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
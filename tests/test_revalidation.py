@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o modo stale-while-revalidate.
+"""
+
+import os
+import sys
+import threading
+import unittest
+import logging
+from unittest import mock
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache import revalidation
+from app.core.cache.revalidation import RefreshPool, unwrap, wrap
+
+
+class TestEnvelope(unittest.TestCase):
+    """Testes para o envelope com instante de validade."""
+
+    def test_fresh_then_stale(self):
+        """O valor é atual até o fim do TTL e obsoleto depois."""
+        with mock.patch.object(revalidation.time, 'time', return_value=1000.0):
+            entry = wrap(['equipe'], 60)
+            self.assertEqual(unwrap(entry), (['equipe'], False))
+        with mock.patch.object(revalidation.time, 'time', return_value=1060.0):
+            self.assertEqual(unwrap(entry), (['equipe'], True))
+
+    def test_plain_values_are_fresh(self):
+        """Valores gravados sem envelope são retornados como atuais."""
+        self.assertEqual(unwrap([{'id': 1}]), ([{'id': 1}], False))
+        self.assertEqual(unwrap({'fresh_until': 0}), ({'fresh_until': 0}, False))
+
+
+class TestRefreshPool(unittest.TestCase):
+    """Testes para o pool de atualização em segundo plano."""
+
+    def setUp(self):
+        self.pool = RefreshPool(max_workers=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_deduplicates_per_key(self):
+        """Enquanto uma atualização está pendente, novos agendamentos da chave são ignorados."""
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(5)
+
+        self.assertTrue(self.pool.schedule('equipes', refresh))
+        self.assertFalse(self.pool.schedule('equipes', refresh))
+        self.assertTrue(self.pool.schedule('usuarios', lambda: None))
+        release.set()
+        self.pool.shutdown()
+
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(self.pool.is_pending('equipes'))
+        self.assertEqual(self.pool.stats['deduplicated'], 1)
+
+    def test_failure_releases_key(self):
+        """Uma atualização com erro não impede novos agendamentos."""
+        def refresh():
+            raise RuntimeError("banco indisponível")
+
+        self.pool.schedule('equipes', refresh)
+        self.pool.shutdown()
+        self.assertEqual(self.pool.stats['failed'], 1)
+        self.assertTrue(self.pool.schedule('equipes', lambda: None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a comparação e sincronização de estruturas de tabelas.
+"""
+
+import os
+import sys
+import threading
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.mysql.schema_diff import build_schemas, build_sync_plan, diff_table, SchemaSynchronizer
+
+
+def column(table, name, position, column_type, nullable='NO', default=None, extra=''):
+    return {'table_name': table, 'column_name': name, 'ordinal_position': position,
+            'column_type': column_type, 'is_nullable': nullable, 'column_default': default,
+            'extra': extra, 'collation_name': None, 'column_comment': '', 'generation_expression': ''}
+
+
+def index(table, name, seq, column_name, non_unique=1, expression=None):
+    return {'table_name': table, 'index_name': name, 'non_unique': non_unique,
+            'seq_in_index': seq, 'column_name': column_name, 'sub_part': None, 'index_type': 'BTREE',
+            'expression': expression}
+
+
+BASE_COLUMNS = [
+    column('equipes', 'id', 1, 'int', extra='auto_increment'),
+    column('equipes', 'nome', 2, 'varchar(100)'),
+    column('equipes', 'criado_em', 3, 'timestamp', default='CURRENT_TIMESTAMP', extra='DEFAULT_GENERATED'),
+]
+BASE_INDEXES = [index('equipes', 'PRIMARY', 1, 'id', non_unique=0)]
+
+
+class TestSchemaDiff(unittest.TestCase):
+    """Testes para o cálculo de diferenças."""
+
+    def test_identical_tables_are_skipped(self):
+        """Tabelas com a mesma impressão digital não geram alterações."""
+        source = build_schemas(BASE_COLUMNS, BASE_INDEXES)
+        target = build_schemas(list(reversed(BASE_COLUMNS)), BASE_INDEXES)
+
+        self.assertEqual(source['equipes'].fingerprint, target['equipes'].fingerprint)
+        self.assertEqual(build_sync_plan(source, target), [])
+
+    def test_added_and_modified_columns(self):
+        """Colunas ausentes são adicionadas na posição correta e as diferentes modificadas."""
+        source = build_schemas(BASE_COLUMNS + [column('equipes', 'descricao', 4, 'text', nullable='YES')],
+                               BASE_INDEXES)
+        target = build_schemas([BASE_COLUMNS[0], column('equipes', 'nome', 2, 'varchar(50)'), BASE_COLUMNS[2]],
+                               BASE_INDEXES)
+
+        change = diff_table(source['equipes'], target['equipes'])
+        self.assertEqual(change.statement,
+                         "ALTER TABLE `equipes` MODIFY COLUMN `nome` varchar(100) NOT NULL, "
+                         "ADD COLUMN `descricao` text NULL AFTER `criado_em`")
+
+    def test_index_changes(self):
+        """Índices diferentes são recriados e os ausentes adicionados."""
+        source = build_schemas(BASE_COLUMNS, BASE_INDEXES + [
+            index('equipes', 'idx_nome', 1, 'nome', non_unique=0),
+            index('equipes', 'idx_criado', 1, 'criado_em'),
+        ])
+        target = build_schemas(BASE_COLUMNS, BASE_INDEXES + [index('equipes', 'idx_nome', 1, 'nome')])
+
+        change = diff_table(source['equipes'], target['equipes'])
+        self.assertEqual(change.clauses, [
+            "DROP INDEX `idx_nome`",
+            "ADD UNIQUE INDEX `idx_nome` (`nome`)",
+            "ADD INDEX `idx_criado` (`criado_em`)",
+        ])
+
+    def test_functional_indexes(self):
+        """Partes funcionais (COLUMN_NAME NULL) usam a expressão; sem ela, o índice é ignorado."""
+        source = build_schemas(BASE_COLUMNS, BASE_INDEXES + [
+            index('equipes', 'idx_nome_lower', 1, None, expression='lower(`nome`)'),
+            index('equipes', 'idx_nome_lower', 2, 'criado_em'),
+            index('equipes', 'idx_sem_expressao', 1, None),
+        ])
+        target = build_schemas(BASE_COLUMNS, BASE_INDEXES)
+
+        self.assertNotIn('idx_sem_expressao', source['equipes'].indexes)
+        change = diff_table(source['equipes'], target['equipes'])
+        self.assertEqual(change.clauses, ["ADD INDEX `idx_nome_lower` ((lower(`nome`)), `criado_em`)"])
+
+    def test_drops_only_when_allowed(self):
+        """Colunas existentes apenas no destino só são removidas com allow_drops."""
+        source = build_schemas(BASE_COLUMNS[:2], BASE_INDEXES)
+        target = build_schemas(BASE_COLUMNS, BASE_INDEXES)
+
+        change = diff_table(source['equipes'], target['equipes'])
+        self.assertEqual(change.clauses, [])
+        self.assertEqual(len(change.skipped), 1)
+
+        change = diff_table(source['equipes'], target['equipes'], allow_drops=True)
+        self.assertEqual(change.clauses, ["DROP COLUMN `criado_em`"])
+
+    def test_default_rendering(self):
+        """Valores padrão literais são escapados e expressões mantidas."""
+        schema = build_schemas([
+            column('t', 'status', 1, "enum('a','b')", default="a"),
+            column('t', 'nota', 2, 'varchar(10)', default="it's"),
+            column('t', 'atualizado', 3, 'timestamp', default='CURRENT_TIMESTAMP',
+                   extra='DEFAULT_GENERATED on update CURRENT_TIMESTAMP'),
+        ], [])['t']
+
+        self.assertEqual(schema.columns['status'].definition(), "`status` enum('a','b') NOT NULL DEFAULT 'a'")
+        self.assertEqual(schema.columns['nota'].definition(), "`nota` varchar(10) NOT NULL DEFAULT 'it''s'")
+        self.assertEqual(schema.columns['atualizado'].definition(),
+                         "`atualizado` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP")
+
+
+class FakeDB:
+    """MySQLConnection simulada que responde ao INFORMATION_SCHEMA e registra as instruções."""
+
+    def __init__(self, local, remote):
+        self.rows = {True: local, False: remote}
+        self.executed = []
+        self.lock = threading.Lock()
+
+    def execute_query(self, query, params=None, is_local=True, use_cache=True):
+        columns, indexes = self.rows[is_local]
+        return columns if 'INFORMATION_SCHEMA.COLUMNS' in query else indexes
+
+    def execute_update(self, query, params=None, is_local=True, invalidate_cache=True):
+        with self.lock:
+            self.executed.append((query, is_local))
+        return 0
+
+    def get_table_structure(self, table_name, is_local=True):
+        return {'table_name': table_name, 'create_statement': f"CREATE TABLE `{table_name}` (...)"}
+
+
+class TestSchemaSynchronizer(unittest.TestCase):
+    """Testes para a execução do plano de sincronização."""
+
+    def test_sync_creates_and_alters(self):
+        """Tabelas ausentes são criadas e as diferentes alteradas; as idênticas são ignoradas."""
+        logs_columns = [column('logs', 'id', 1, 'int')]
+        local = (BASE_COLUMNS + [column('equipes', 'sigla', 4, 'char(3)')] + logs_columns, BASE_INDEXES)
+        remote = (BASE_COLUMNS, BASE_INDEXES)
+        db = FakeDB(local, remote)
+
+        report = SchemaSynchronizer(db).sync(source_is_local=True)
+
+        self.assertTrue(report['success'])
+        self.assertEqual(sorted(report['synced_tables']), ['equipes', 'logs'])
+        self.assertEqual(db.executed[0], ("CREATE TABLE `logs` (...)", False))
+        self.assertEqual(db.executed[1],
+                         ("ALTER TABLE `equipes` ADD COLUMN `sigla` char(3) NOT NULL AFTER `criado_em`", False))
+
+    def test_compare(self):
+        """A comparação lista apenas as tabelas diferentes."""
+        db = FakeDB((BASE_COLUMNS, BASE_INDEXES), (BASE_COLUMNS[:2], BASE_INDEXES))
+        differences = SchemaSynchronizer(db).compare()
+        self.assertEqual(list(differences), ['equipes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
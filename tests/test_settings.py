@@ -51,6 +51,7 @@ class TestDynamicSettings(unittest.TestCase):
         """Testa se as configurações são salvas e carregadas corretamente"""
         # Define um tema
         self.settings.set_window_setting('appearance_mode', 'dark')
+        self.settings.flush()
         
         # Verifica se foi salvo
         with open(self.test_config_file, 'r', encoding='utf-8') as f:
@@ -64,6 +65,7 @@ class TestDynamicSettings(unittest.TestCase):
         
         # Muda para outro tema
         self.settings.set_window_setting('appearance_mode', 'light')
+        self.settings.flush()
         
         # Verifica se foi atualizado
         with open(self.test_config_file, 'r', encoding='utf-8') as f:
@@ -79,6 +81,7 @@ class TestDynamicSettings(unittest.TestCase):
         """Testa se as configurações de tema de cores são salvas corretamente"""
         # Define um tema de cores
         self.settings.set_window_setting('color_theme', 'dark-blue')
+        self.settings.flush()
         
         # Verifica se foi salvo
         with open(self.test_config_file, 'r', encoding='utf-8') as f:
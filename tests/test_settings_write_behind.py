@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a gravação em lote (write-behind) das configurações dinâmicas.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import unittest
+import logging
+from pathlib import Path
+from unittest.mock import patch
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.settings import DynamicSettings
+
+
+class FakeDispatcher:
+    """Despachante que enfileira os callbacks até run() (simula a thread da interface)."""
+
+    def __init__(self):
+        self.pending = []
+
+    def is_attached(self):
+        return True
+
+    def call_soon(self, callback, *args):
+        self.pending.append((callback, args))
+
+    def run(self):
+        pending, self.pending = self.pending, []
+        for callback, args in pending:
+            callback(*args)
+
+
+class TestSettingsWriteBehind(unittest.TestCase):
+    """Testes para a gravação em lote e as inscrições por caminho."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / 'user_settings.json'
+        self.config_file.write_text(json.dumps({'window': {'appearance_mode': 'system'}}),
+                                    encoding='utf-8')
+        self.settings = self._create(flush_delay=60)
+
+    def tearDown(self):
+        self.settings.flush()
+        self.temp_dir.cleanup()
+
+    def _create(self, flush_delay, dispatcher=None):
+        settings = DynamicSettings(flush_delay=flush_delay, dispatcher=dispatcher)
+        settings.config_file = self.config_file
+        settings._settings = settings._load_settings()
+        return settings
+
+    def _saved(self):
+        return json.loads(self.config_file.read_text(encoding='utf-8'))
+
+    def test_changes_are_coalesced_until_flush(self):
+        """Várias alterações ficam em memória e são gravadas de uma só vez."""
+        calls = []
+        self.settings.add_observer(lambda: calls.append(1))
+        for x in range(5):
+            self.settings.save_window_position('main', x, 10, 800, 600)
+
+        self.assertEqual(self.settings.get_window_position('main')['position'], [4, 10])
+        self.assertNotIn('windows', self._saved()['window'])
+        self.assertEqual(calls, [])
+
+        self.assertTrue(self.settings.flush())
+        self.assertEqual(self._saved()['window']['windows']['main']['position'], [4, 10])
+        self.assertEqual(calls, [1])
+        self.assertFalse(self.settings.flush())
+        self.assertFalse(self.config_file.with_suffix('.json.tmp').exists())
+
+    def test_quiet_period_triggers_flush(self):
+        """Sem novas alterações, a gravação ocorre após o intervalo configurado."""
+        settings = self._create(flush_delay=0.05)
+        settings.set_window_setting('appearance_mode', 'dark')
+
+        deadline = time.time() + 2
+        while self._saved()['window']['appearance_mode'] != 'dark' and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self._saved()['window']['appearance_mode'], 'dark')
+
+    def test_subscriptions_receive_only_affecting_paths(self):
+        """Inscrições recebem, por gravação, apenas os caminhos que as afetam."""
+        theme_calls, window_calls = [], []
+        self.settings.subscribe(['window', 'appearance_mode'], theme_calls.append)
+        self.settings.subscribe(['window'], window_calls.append)
+
+        self.settings.save_window_position('main', 1, 2, 3, 4)
+        self.settings.flush()
+        self.assertEqual(theme_calls, [])
+        self.assertEqual(window_calls, [[('window', 'windows', 'main')]])
+
+        self.settings.set_window_setting('appearance_mode', 'dark')
+        self.settings.set_window_setting('appearance_mode', 'light')
+        self.settings.flush()
+        self.assertEqual(theme_calls, [[('window', 'appearance_mode')]])
+
+        self.settings.clear()
+        self.assertEqual(len(theme_calls), 2)
+
+    def test_timer_flush_notifies_on_ui_thread(self):
+        """A gravação pelo temporizador entrega as notificações pelo despachante da interface."""
+        dispatcher = FakeDispatcher()
+        settings = self._create(flush_delay=0.05, dispatcher=dispatcher)
+        threads = []
+        settings.add_observer(lambda: threads.append(threading.current_thread()))
+        settings.subscribe(['window'], lambda paths: threads.append(threading.current_thread()))
+        settings.set_window_setting('appearance_mode', 'dark')
+
+        deadline = time.time() + 2
+        while not dispatcher.pending and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self._saved()['window']['appearance_mode'], 'dark')
+        self.assertEqual(threads, [])
+
+        dispatcher.run()
+        self.assertEqual(threads, [threading.main_thread()] * 2)
+
+    def test_unchanged_value_is_not_written(self):
+        """Definir o valor já existente não agenda gravação nem notificação."""
+        self.settings.set_window_setting('appearance_mode', 'system')
+        self.assertFalse(self.settings.flush())
+
+
+class TestSettingsSnapshot(unittest.TestCase):
+    """Testes para o índice imutável de leitura."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings = DynamicSettings(flush_delay=60)
+        self.settings.config_file = Path(self.temp_dir.name) / 'user_settings.json'
+        self.settings._settings = {'window': {'appearance_mode': 'dark', 'windows': {}}}
+
+    def tearDown(self):
+        self.settings.flush()
+        self.temp_dir.cleanup()
+
+    def test_snapshot_is_read_only_and_swapped_on_change(self):
+        """O índice não pode ser alterado e cada alteração gera um novo índice."""
+        before = self.settings.snapshot()
+        self.assertEqual(before[('window', 'appearance_mode')], 'dark')
+        with self.assertRaises(TypeError):
+            before[('window', 'appearance_mode')] = 'light'
+
+        self.settings.set_setting(['window', 'windows', 'main'], {'position': [1, 2]})
+        after = self.settings.snapshot()
+        self.assertIsNot(before, after)
+        self.assertNotIn(('window', 'windows', 'main'), before)
+        self.assertEqual(after[('window', 'windows', 'main', 'position')], [1, 2])
+        self.assertEqual(self.settings.get_window_position('main'), {'position': [1, 2]})
+
+    def test_snapshot_branches_do_not_change(self):
+        """Ramos de um índice anterior não refletem alterações posteriores."""
+        before = self.settings.snapshot()
+        window = self.settings.get_setting(['window'])
+        with self.assertRaises(TypeError):
+            window['appearance_mode'] = 'light'
+
+        value = {'position': [1, 2]}
+        self.settings.set_setting(['window', 'windows', 'main'], value)
+        value['size'] = [3, 4]
+        self.settings.delete_setting(['window', 'appearance_mode'])
+
+        self.assertEqual(before[('window',)], {'appearance_mode': 'dark', 'windows': {}})
+        self.assertEqual(window, {'appearance_mode': 'dark', 'windows': {}})
+        self.assertEqual(self.settings.get_setting(['window']),
+                         {'windows': {'main': {'position': [1, 2]}}})
+        self.assertEqual(self.settings.get_setting([]), {'window': {'windows': {'main': {'position': [1, 2]}}}})
+
+        # Um ramo lido pode ser gravado de volta
+        self.settings.set_setting(['backup'], self.settings.get_setting(['window']))
+        self.assertTrue(self.settings.flush())
+        saved = json.loads(self.settings.config_file.read_text(encoding='utf-8'))
+        self.assertEqual(saved['backup'], saved['window'])
+
+    def test_replaced_and_deleted_branches_are_reindexed(self):
+        """Ramos substituídos ou removidos não deixam caminhos antigos no índice."""
+        self.settings.set_setting(['a', 'b', 'c'], 1)
+        self.settings.set_setting(['a', 'b'], {'d': 2})
+        self.assertIsNone(self.settings.get_setting(['a', 'b', 'c']))
+        self.assertEqual(self.settings.get_setting(['a', 'b', 'd']), 2)
+        self.assertEqual(self.settings.get_setting(['a']), {'b': {'d': 2}})
+
+        self.settings.delete_setting(['a', 'b'])
+        self.assertEqual(self.settings.get_setting(['a', 'b', 'd'], 'padrão'), 'padrão')
+        self.assertEqual(self.settings.get_setting(['a']), {})
+
+    def test_settings_cache_refreshes_only_changed_keys(self):
+        """SettingsCache descarta apenas as chaves alteradas a cada gravação."""
+        from app.config.cache import settings_cache as module
+        from app.core.cache.cache_manager import cache_manager
+
+        with patch.object(module, 'dynamic_settings', self.settings):
+            cache = module.SettingsCache()
+            self.settings.set_window_setting('color_theme', 'blue')
+            self.settings.flush()
+            self.assertEqual(cache.get_setting('appearance_mode'), 'dark')
+            self.assertEqual(cache.get_setting('color_theme'), 'blue')
+
+            self.settings.set_window_setting('appearance_mode', 'light')
+            self.settings.flush()
+            self.assertIsNone(cache_manager.get('settings:appearance_mode'))
+            self.assertEqual(cache_manager.get('settings:color_theme'), 'blue')
+            self.assertEqual(cache.get_setting('appearance_mode'), 'light')
+            cache.invalidate_cache()
+
+
+if __name__ == '__main__':
+    unittest.main()
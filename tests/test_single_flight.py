@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a coalescência de consultas concorrentes (single-flight).
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache.single_flight import SingleFlight
+
+
+class FakeRedis:
+    """Cliente Redis simulado com SET NX PX e liberação condicional."""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def set(self, key, value, nx=False, px=None):
+        if self.fail:
+            raise ConnectionError("Redis indisponível")
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Testes para o SingleFlight."""
+
+    def run_concurrently(self, flight, compute, count=10):
+        """Executa do() em várias threads que começam ao mesmo tempo."""
+        barrier = threading.Barrier(count)
+        results, errors = [], []
+
+        def worker():
+            barrier.wait()
+            try:
+                results.append(flight.do('funcionarios', compute))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Apenas a primeira chamada consulta o banco; as demais recebem o mesmo resultado."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return ['funcionario']
+
+        flight = SingleFlight()
+        results, errors = self.run_concurrently(flight, compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [['funcionario']] * 10)
+        self.assertEqual(flight.get_stats()['coalesced'], 9)
+        self.assertEqual(flight.get_stats()['in_flight'], 0)
+
+    def test_error_is_shared(self):
+        """Um erro do executor é repassado às chamadas coalescidas."""
+        def compute():
+            time.sleep(0.2)
+            raise RuntimeError("banco indisponível")
+
+        results, errors = self.run_concurrently(SingleFlight(), compute, count=5)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+
+    def test_sequential_calls_recompute(self):
+        """Após a conclusão, uma nova chamada executa novamente."""
+        flight = SingleFlight()
+        self.assertEqual(flight.do('k', lambda: 1), 1)
+        self.assertEqual(flight.do('k', lambda: 2), 2)
+
+    def test_lookup_avoids_recompute(self):
+        """Se o valor já estiver no cache ao assumir a execução, ele é reutilizado."""
+        flight = SingleFlight()
+        self.assertEqual(flight.do('k', lambda: 'novo', lookup=lambda: 'em cache'), 'em cache')
+
+
+class TestRedisLease(unittest.TestCase):
+    """Testes para o lease entre processos."""
+
+    def test_lease_is_released(self):
+        """O lease é obtido durante a execução e liberado ao final."""
+        client = FakeRedis()
+        flight = SingleFlight(lambda: client, prefix="controlix:lease:")
+
+        def compute():
+            self.assertIn("controlix:lease:k", client.data)
+            return 1
+
+        self.assertEqual(flight.do('k', compute), 1)
+        self.assertEqual(client.data, {})
+
+    def test_waits_for_other_process(self):
+        """Com o lease em outro processo, o resultado é lido do cache compartilhado."""
+        client = FakeRedis()
+        client.data["lease:k"] = "outro-processo"
+        cache = {}
+        flight = SingleFlight(lambda: client, poll_interval=0.01)
+
+        def other_process():
+            time.sleep(0.05)
+            cache['k'] = 'resultado'
+
+        threading.Thread(target=other_process).start()
+        result = flight.do('k', lambda: self.fail("não deveria consultar o banco"),
+                           lookup=lambda: cache.get('k'))
+
+        self.assertEqual(result, 'resultado')
+        self.assertGreater(flight.get_stats()['lease_waits'], 0)
+
+    def test_expired_wait_computes_locally(self):
+        """Se o outro processo não concluir a tempo, o valor é calculado localmente."""
+        client = FakeRedis()
+        client.data["lease:k"] = "outro-processo"
+        flight = SingleFlight(lambda: client, wait_timeout=0.05, poll_interval=0.01)
+        self.assertEqual(flight.do('k', lambda: 'local', lookup=lambda: None), 'local')
+
+    def test_redis_failure_computes(self):
+        """Sem Redis, a execução prossegue sem coordenação entre processos."""
+        client = FakeRedis()
+        client.fail = True
+        flight = SingleFlight(lambda: client)
+        self.assertEqual(flight.do('k', lambda: 1), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o cache em dois níveis (L1 em memória + L2 Redis) com invalidação via pub/sub.
+"""
+
+import os
+import sys
+import time
+import queue
+import unittest
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config.cache.cache_config import CacheConfig
+from app.config.cache.cache_factory import CacheFactory, RedisCache, TieredRedisCache
+
+
+class FakeBroker:
+    """Servidor Redis simulado compartilhado por vários clientes."""
+
+    def __init__(self):
+        self.data = {b'controlix:ns': b'1'}
+        self.subscribers = {}
+
+
+class FakePubSub:
+    """Assinatura pub/sub simulada."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.broker.subscribers.setdefault(channel, []).append(self.messages)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for subscribers in self.broker.subscribers.values():
+            if self.messages in subscribers:
+                subscribers.remove(self.messages)
+
+
+class FakeRedis:
+    """Cliente Redis simulado que conta as leituras."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.reads = 0
+
+    def get(self, key):
+        if not key.endswith('ns'):
+            self.reads += 1
+        return self.broker.data.get(key.encode())
+
+    def mget(self, keys):
+        self.reads += 1
+        return [self.broker.data.get(key.encode()) for key in keys]
+
+    def set(self, key, value, nx=False):
+        if not nx or key.encode() not in self.broker.data:
+            self.broker.data[key.encode()] = value
+
+    def incr(self, key):
+        value = int(self.broker.data.get(key.encode(), 0)) + 1
+        self.broker.data[key.encode()] = str(value).encode()
+        return value
+
+    def setex(self, key, ttl, value):
+        self.broker.data[key.encode()] = value
+
+    def delete(self, key):
+        self.broker.data.pop(key.encode(), None)
+
+    def unlink(self, *keys):
+        for key in keys:
+            self.delete(key)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self.broker)
+
+    def publish(self, channel, message):
+        subscribers = list(self.broker.subscribers.get(channel, []))
+        for messages in subscribers:
+            messages.put({'type': 'message', 'data': message.encode()})
+        return len(subscribers)
+
+    def close(self):
+        pass
+
+
+class UnreachableRedis:
+    """Cliente Redis que registra e recusa qualquer comando."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        raise ConnectionError(f"Comando Redis inesperado: {name}")
+
+
+class TestTieredRedisCache(unittest.TestCase):
+    """Testes para o TieredRedisCache."""
+
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.caches = [self._create_cache() for _ in range(2)]
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+
+    def _create_cache(self):
+        cache = TieredRedisCache(CacheConfig())
+        cache.client = FakeRedis(self.broker)
+        cache._ensure_listener()
+        deadline = time.monotonic() + 2
+        while not cache._subscribed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(cache._subscribed)
+        return cache
+
+    def _wait(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_l1_hits_skip_redis(self):
+        """Leituras repetidas são atendidas pelo L1 sem ida ao Redis."""
+        first, second = self.caches
+        first.set('funcionario:1', {'nome': 'Ana'}, ttl=60)
+
+        self.assertEqual(second.get('funcionario:1'), {'nome': 'Ana'})
+        self.assertEqual(second.get('funcionario:1'), {'nome': 'Ana'})
+        self.assertEqual(second.client.reads, 1)
+        self.assertEqual(second.get_stats()['l1_hits'], 1)
+
+    def test_write_invalidates_other_l1(self):
+        """Uma escrita em uma instância remove a entrada do L1 da outra."""
+        first, second = self.caches
+        first.set('equipe', 'A', ttl=60)
+        self.assertEqual(second.get('equipe'), 'A')
+
+        received = second.get_stats()['invalidations_received']
+        first.set('equipe', 'B', ttl=60)
+        self.assertTrue(self._wait(lambda: second.get_stats()['invalidations_received'] > received))
+        self.assertEqual(second.get('equipe'), 'B')
+
+    def test_delete_and_clear_propagate(self):
+        """Remoções e limpezas também invalidam o L1 das demais instâncias."""
+        first, second = self.caches
+        first.set_many({'a': 1, 'b': 2}, ttl=60)
+        self.assertEqual(second.get_many(['a', 'b']), {'a': 1, 'b': 2})
+
+        first.delete('a')
+        self.assertTrue(self._wait(lambda: 'a' not in second.l1.keys()))
+        self.assertIsNone(second.get('a'))
+
+        first.clear()
+        self.assertTrue(self._wait(lambda: not second.l1.keys()))
+
+    def test_l1_bypassed_when_unsubscribed(self):
+        """Sem assinatura ativa, o L1 não é usado (invalidações poderiam ser perdidas)."""
+        cache = self.caches[0]
+        cache.set('x', 1, ttl=60)
+        cache._subscribed = False
+        self.assertEqual(cache.get('x'), 1)
+        self.assertEqual(cache.client.reads, 1)
+
+    def test_l1_is_bounded_in_bytes(self):
+        """O L1 tem limite de bytes, como os demais caches em memória."""
+        config = CacheConfig()
+        self.assertGreater(config.l1_max_bytes, 0)
+        self.assertEqual(self.caches[0].l1.max_bytes, config.l1_max_bytes)
+        self.assertEqual(config.to_dict()['l1']['max_bytes'], config.l1_max_bytes)
+
+    def test_generations_are_kept_locally_and_invalidated_by_bump(self):
+        """As gerações ficam em cópia local; um incremento é publicado às demais instâncias."""
+        first, second = self.caches
+        tags = ['local.equipes']
+        before = second.generations.get_many(tags)
+        reads = second.client.reads
+        self.assertEqual(second.generations.get_many(tags), before)
+        self.assertEqual(second.client.reads, reads)
+
+        received = second.get_stats()['invalidations_received']
+        self.assertTrue(first.generations.bump(tags))
+        self.assertTrue(self._wait(lambda: second.get_stats()['invalidations_received'] > received))
+        self.assertEqual(second.generations.get_many(tags)['local.equipes'],
+                         before['local.equipes'] + 1)
+        self.assertEqual(second.client.reads, reads + 1)
+
+    def test_generations_not_kept_when_unsubscribed(self):
+        """Sem assinatura ativa, as gerações são sempre lidas do Redis."""
+        cache = self.caches[0]
+        cache._subscribed = False
+        cache.generations.get_many(['local.equipes'])
+        cache.generations.get_many(['local.equipes'])
+        self.assertEqual(cache.client.reads, 3)
+
+    def test_query_l1_hit_makes_no_redis_calls(self):
+        """Uma consulta atendida pelo L1 não faz nenhum comando Redis em execute_query."""
+        from app.core.cache.single_flight import SingleFlight
+        from app.data.mysql.mysql_connection import MySQLConnection
+
+        cache = self.caches[1]
+        fetched = []
+        connection = object.__new__(MySQLConnection)
+        connection.cache = cache
+        connection.single_flight = SingleFlight()
+        connection._fetch_query = lambda query, params, is_local: fetched.append(query) or [{'id': 1}]
+
+        query = "SELECT id FROM equipes WHERE id = %s"
+        self.assertEqual(connection.execute_query(query, (1,)), [{'id': 1}])
+
+        # O pub/sub já foi assinado; qualquer comando ao Redis falharia e seria registrado
+        client, cache.client = cache.client, UnreachableRedis()
+        try:
+            self.assertEqual(connection.execute_query(query, (1,)), [{'id': 1}])
+        finally:
+            unreachable, cache.client = cache.client, client
+        self.assertEqual(unreachable.calls, [])
+        self.assertEqual(fetched, [query])
+
+
+class TestFactory(unittest.TestCase):
+    """Testes para a escolha do cache Redis pela fábrica."""
+
+    def test_l1_can_be_disabled(self):
+        """Com l1_max_size = 0 a fábrica cria o RedisCache simples."""
+        config = CacheConfig()
+        config.cache_type = 'redis'
+        self.assertIsInstance(CacheFactory.create_from_config(config), TieredRedisCache)
+
+        config.l1_max_size = 0
+        cache = CacheFactory.create_from_config(config)
+        self.assertIsInstance(cache, RedisCache)
+        self.assertNotIsInstance(cache, TieredRedisCache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o snapshot de aquecimento (warm start) dos caches.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache.cache_keys import query_key
+from app.core.cache.cache_manager import CacheManager, cache_manager
+from app.core.cache.decorators import cached
+from app.core.cache.table_generations import TableGenerations
+from app.core.cache.warm_start import CacheSnapshot, WarmStart, rank_entries
+from app.data.cache.query_cache import QueryCache
+
+
+class TestCacheSnapshot(unittest.TestCase):
+    """Testes para o arquivo de snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.watermarks = {}
+        self.snapshot = CacheSnapshot(Path(self.temp_dir.name) / 'cache.snapshot', max_entries=2,
+                                      watermark_getter=self.watermarks.get)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hottest_entries_are_kept(self):
+        """Somente as N entradas com mais acertos (e mais recentes no empate) são gravadas."""
+        entries = [
+            {'key': 'a', 'value': 1, 'ttl': 60, 'tags': [], 'hits': 5, 'recency': 0},
+            {'key': 'b', 'value': 2, 'ttl': 60, 'tags': [], 'hits': 1, 'recency': 1},
+            {'key': 'c', 'value': 3, 'ttl': 60, 'tags': [], 'hits': 1, 'recency': 2},
+        ]
+        self.assertEqual([entry['key'] for entry in rank_entries(entries, 2)], ['a', 'c'])
+
+        self.snapshot.save(entries)
+        loaded, _ = self.snapshot.load()
+        self.assertEqual(sorted(entry['key'] for entry in loaded), ['a', 'c'])
+        self.assertFalse(self.snapshot.path.exists())
+
+    def test_moved_watermark_drops_entries(self):
+        """Entradas de tabelas sincronizadas após o snapshot são descartadas."""
+        self.watermarks['equipes'] = datetime(2024, 1, 1, 8, 0)
+        self.snapshot.save([
+            {'key': 'equipes', 'value': [1], 'ttl': 60, 'tags': ['local.equipes'], 'hits': 1},
+            {'key': 'usuarios', 'value': [2], 'ttl': 60, 'tags': ['local.usuarios'], 'hits': 1},
+        ])
+
+        self.watermarks['equipes'] = datetime(2024, 1, 1, 9, 0)
+        loaded, _ = self.snapshot.load()
+        self.assertEqual([entry['key'] for entry in loaded], ['usuarios'])
+
+    def test_unknown_current_watermark_drops_entries(self):
+        """Uma marca d'água salva mas desconhecida agora conta como mudança."""
+        self.watermarks['equipes'] = datetime(2024, 1, 1, 8, 0)
+        self.snapshot.save([{'key': 'equipes', 'value': [1], 'ttl': 60, 'tags': ['local.equipes'], 'hits': 1}])
+
+        self.watermarks.clear()
+        self.assertEqual(self.snapshot.load(), ([], {}))
+
+    def test_persisted_watermarks_survive_restart(self):
+        """Com marcas d'água persistidas, o snapshot só é descartado se houve sincronização."""
+        from app.data.mysql.sync_watermarks import SyncWatermarks
+
+        path = Path(self.temp_dir.name) / 'sync_watermarks.json'
+        entries = [{'key': 'equipes', 'value': [1], 'ttl': 60, 'tags': ['local.equipes'], 'hits': 1}]
+        previous = SyncWatermarks(path)
+        previous.record('equipes', datetime(2024, 1, 1, 8, 0))
+        CacheSnapshot(self.snapshot.path, watermark_getter=previous.get).save(entries)
+
+        # Nova execução, ainda sem sincronização: as entradas são reaproveitadas
+        current = SyncWatermarks(path)
+        loaded, _ = CacheSnapshot(self.snapshot.path, watermark_getter=current.get).load()
+        self.assertEqual([entry['key'] for entry in loaded], ['equipes'])
+
+        CacheSnapshot(self.snapshot.path, watermark_getter=current.get).save(entries)
+        current.record('equipes', datetime(2024, 1, 1, 9, 0))
+        loaded, _ = CacheSnapshot(self.snapshot.path, watermark_getter=SyncWatermarks(path).get).load()
+        self.assertEqual(loaded, [])
+
+    def test_expired_entries_are_dropped(self):
+        """Entradas cuja expiração passou não são restauradas."""
+        self.snapshot.save([{'key': 'a', 'value': 1, 'ttl': 0.01, 'tags': [], 'hits': 1},
+                            {'key': 'b', 'value': 2, 'ttl': 0, 'tags': [], 'hits': 1}])
+        data = self.snapshot.codec.decode(self.snapshot.path.read_bytes())
+        self.assertEqual(len(data['entries']), 1)
+
+        data['entries'][0]['expires_at'] -= 60
+        self.snapshot.path.write_bytes(self.snapshot.codec.encode(data))
+        self.assertEqual(self.snapshot.load(), ([], {}))
+
+
+class TestWarmStart(unittest.TestCase):
+    """Testes para a restauração dos caches registrados."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _query_cache_round_trip(self, before_restore=None):
+        query = "SELECT * FROM equipes"
+        previous = QueryCache(max_size=10)
+        previous.generations.bump(['local.equipes'])
+        key = query_key(query, namespace='local',
+                        generations=previous.generations.get_many(['local.equipes']))
+        previous.set(key, [{'id': 1}], tags=['local.equipes'])
+        previous.get(key)
+
+        coordinator = WarmStart(Path(self.temp_dir.name), enabled=True)
+        coordinator.register('query_cache', previous, previous.generations)
+        self.assertEqual(coordinator.save_all(), 1)
+
+        current = QueryCache(max_size=10)
+        if before_restore:
+            before_restore(current)
+        coordinator = WarmStart(Path(self.temp_dir.name), enabled=True)
+        coordinator.register('query_cache', current, current.generations)
+        coordinator.restore_async().join()
+        return current, query_key(query, namespace='local',
+                                  generations=current.generations.get_many(['local.equipes']))
+
+    def test_query_cache_keys_survive_restart(self):
+        """Gerações são restauradas, então as chaves recalculadas encontram as entradas."""
+        current, key = self._query_cache_round_trip()
+        self.assertEqual(current.get(key), [{'id': 1}])
+
+    def test_write_before_restore_invalidates(self):
+        """Uma escrita anterior à restauração impede o uso das entradas da tabela."""
+        current, key = self._query_cache_round_trip(
+            lambda cache: cache.generations.bump(['local.equipes']))
+        self.assertEqual(len(current.cache), 0)
+        self.assertIsNone(current.get(key))
+
+    def test_method_results_are_not_persisted(self):
+        """Entradas marcadas como não persistíveis ficam fora do snapshot."""
+        cache = CacheManager()
+        cache.set('funcao:(1,)', 'a', 60)
+        cache.set('metodo:(Classe#1,)', 'b', 60, persist=False)
+        self.assertEqual([entry['key'] for entry in cache.export_entries()], ['funcao:(1,)'])
+
+    def test_cached_none_survives_restart(self):
+        """Um resultado None armazenado por @cached continua None após save/clear/restore."""
+        calls = []
+
+        @cached(timeout=60)
+        def find_manager(team_id):
+            calls.append(team_id)
+            return None
+
+        self.assertIsNone(find_manager(7))
+        coordinator = WarmStart(Path(self.temp_dir.name), enabled=True)
+        coordinator.register('function_cache', cache_manager)
+        self.assertGreaterEqual(coordinator.save_all(), 1)
+
+        cache_manager.clear()
+        coordinator = WarmStart(Path(self.temp_dir.name), enabled=True)
+        coordinator.register('function_cache', cache_manager)
+        coordinator.restore_async().join()
+
+        self.assertIsNone(find_manager(7))
+        self.assertEqual(calls, [7])
+        self.assertEqual(find_manager.cache_info()['hits'], 1)
+        cache_manager.clear()
+
+    def test_cleared_results_do_not_return_after_restart(self):
+        """Resultados descartados por cache_clear() não voltam pelo snapshot."""
+        calls = []
+
+        def make():
+            @cached(timeout=60)
+            def team_size(team_id):
+                calls.append(team_id)
+                return len(calls)
+            return team_size
+
+        team_size = make()
+        self.assertEqual(team_size(7), 1)
+        team_size.cache_clear()
+        self.assertEqual(team_size(7), 2)
+
+        entries = cache_manager.export_entries()
+        cache_manager.clear()
+        cache_manager.import_entries(entries)
+
+        # Nova execução: o decorador recomeça na geração inicial
+        restarted = make()
+        self.assertEqual(restarted(7), 3)
+        self.assertEqual(restarted.cache_info()['misses'], 1)
+        cache_manager.clear()
+
+    def test_disabled_is_noop(self):
+        """Desativado, nada é registrado, gravado ou restaurado."""
+        coordinator = WarmStart(Path(self.temp_dir.name))
+        coordinator.register('function_cache', CacheManager())
+        self.assertEqual(coordinator.save_all(), 0)
+        self.assertIsNone(coordinator.restore_async())
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
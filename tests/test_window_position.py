@@ -32,6 +32,7 @@ class TestWindowPosition(unittest.TestCase):
             window = TestWindow()
             window.geometry("300x200+100+100")
             window._save_current_position()
+            self.settings.flush()
             
             with open(self.test_config_file, 'r') as f:
                 saved_settings = json.load(f)